@@ -16,12 +16,18 @@ Usage:
     python3 batch_upload.py --list-reports                # List saved reports
     python3 batch_upload.py --show-report                 # Print latest report
     python3 batch_upload.py --notify                      # macOS notification
+    python3 batch_upload.py --sequential                  # One step at a time
+    python3 batch_upload.py --subprocess                  # One process per step
 
 The script will:
     1. Show what will be uploaded (plan)
-    2. Run each platform's uploader sequentially
-    3. Print a summary report
-    4. Save report to reports/ directory
+    2. Run the uploaders: each API platform in its own lane, concurrently
+       with the others and with the browser lane, while browser platforms
+       run one after another because they share the screen. API uploaders
+       run inside this process (uploaders.py), sharing HTTP sessions,
+       tokens and the upload ledger; browser uploaders run as subprocesses
+    3. Print a merged summary report
+    4. Save report to reports/ directory (per-step logs in logs/batch_<time>/)
     5. Send macOS notification (if --notify)
 
 Reports are saved to reports/ and can be emailed via Claude Code's
@@ -36,18 +42,27 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 import subprocess
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from datetime import datetime
 from pathlib import Path
 
+import uploaders
+
 # ---------------------------------------------------------------------------
 # Config
 # ---------------------------------------------------------------------------
 
 PROJECT_DIR = Path(__file__).parent
 REPORTS_DIR = PROJECT_DIR / "reports"
+LOGS_DIR = PROJECT_DIR / "logs"
+
+STEP_TIMEOUT = 7200  # 2 hour timeout per step
 
 PLATFORM_CONFIGS = {
     "redbubble": {
@@ -133,23 +148,26 @@ def build_plan(
     return plan
 
 
-def show_plan(plan: list[dict]) -> None:
+def show_plan(plan: list[dict], sequential: bool = False) -> None:
     """Display the upload plan."""
     print("=" * 55)
     print("  BATCH UPLOAD PLAN")
     print("=" * 55)
 
     total_uploads = 0
-    total_time = 0
+    lane_time: dict[str, float] = {}
     for step in plan:
         est_time = step["limit"] * step["delay"] / 60
         total_uploads += step["limit"]
-        total_time += est_time
+        lane = step_lane(step)
+        lane_time[lane] = lane_time.get(lane, 0) + est_time
         auto = "auto" if step["type"] == "api" else "manual"
         retry = " [RETRY FAILED]" if step["retry_failed"] else ""
         print(f"  {step['platform']:<12} {step['folder']:<10} up to {step['limit']:>4} uploads  ~{est_time:.0f} min  [{auto}]{retry}")
 
     print("-" * 55)
+    # Lanes run in parallel, so the batch takes as long as the longest lane
+    total_time = sum(lane_time.values()) if sequential else max(lane_time.values(), default=0)
     if total_time < 60:
         print(f"  Total: up to {total_uploads} uploads, ~{total_time:.0f} min")
     else:
@@ -161,81 +179,244 @@ def show_plan(plan: list[dict]) -> None:
 # Execution
 # ---------------------------------------------------------------------------
 
-def run_step(step: dict, dry_run: bool = False) -> dict:
-    """Run a single upload step. Returns result dict."""
+def step_lane(step: dict) -> str:
+    """Steps in the same lane run one after another; lanes run in parallel.
+
+    Browser platforms share one lane (they need the screen and the user for
+    CAPTCHAs); each API platform gets its own, since it hits its own service
+    and quota.
+    """
+    return "browser" if step["type"] == "browser" else step["platform"]
+
+
+def step_options(step: dict, dry_run: bool = False) -> dict:
+    """Uploader arguments for a step (keyword arguments of uploaders.build_argv)."""
+    platform = step["platform"]
+    options = {
+        "limit": step["limit"],
+        "retry_failed": step.get("retry_failed", False),
+        "dry_run": dry_run,
+    }
+
+    # Video platforms use --source-dir instead of --folder
+    if platform in ("tiktok", "instagram"):
+        options["source_dir"] = PROJECT_DIR / "output" / "videos"
+    else:
+        # Pinterest and Etsy have no --shuffle (argparse would reject the step)
+        options.update(folder=step["folder"], shuffle=step["type"] == "browser")
+
+    # Platform-specific args
+    if platform in ("pinterest", "etsy"):
+        options["daily_limit"] = step["limit"]
+
+    return options
+
+
+def build_command(step: dict, dry_run: bool = False) -> list[str]:
+    return uploaders.command(step["platform"], **step_options(step, dry_run))
+
+
+def _tee(stream, log_file) -> None:
+    """Copy a child's output to the terminal and its log as it arrives."""
+    fd = stream.fileno()
+    while chunk := os.read(fd, 4096):
+        sys.stdout.buffer.write(chunk)
+        sys.stdout.flush()
+        log_file.write(chunk)
+        log_file.flush()
+
+
+def run_step(
+    step: dict,
+    dry_run: bool = False,
+    log_dir: Path | None = None,
+    interactive: bool = True,
+    stop: threading.Event | None = None,
+    in_process: bool = False,
+) -> dict:
+    """Run a single upload step. Returns result dict.
+
+    With ``log_dir`` the step's output goes to ``<platform>.log`` there:
+    interactive steps (browser lane) are also shown on the terminal and
+    keep stdin; non-interactive ones write only to the log.
+
+    ``in_process`` calls the uploader through uploaders.run instead of a
+    subprocess (no per-step timeout; Ctrl-C goes through uploaders.interrupt).
+    """
     platform = step["platform"]
     folder = step["folder"]
     script = PROJECT_DIR / step["script"]
     start_time = time.time()
-
-    print(f"\n{'='*50}")
-    print(f"  {platform.upper()} / {folder} (limit: {step['limit']})")
-    print(f"{'='*50}\n")
+    result = {"platform": platform, "folder": folder}
 
     if not script.exists():
-        print(f"  Script not found: {script}")
-        return {"platform": platform, "folder": folder, "status": "skipped", "reason": "script not found"}
+        print(f"  [{platform}/{folder}] Script not found: {script}")
+        return {**result, "status": "skipped", "reason": "script not found"}
 
-    # Build command — video platforms use --source-dir instead of --folder
-    if platform in ("tiktok", "instagram"):
-        cmd = [sys.executable, str(script), "--source-dir", str(PROJECT_DIR / "output" / "videos")]
+    cmd = build_command(step, dry_run)
+    log_path = log_dir / f"{platform}.log" if log_dir else None
+
+    if interactive:
+        print(f"\n{'='*50}")
+        print(f"  {platform.upper()} / {folder} (limit: {step['limit']})")
+        print(f"{'='*50}\n")
+        print(f"  Running{' in-process' if in_process else ''}: {' '.join(cmd)}\n")
     else:
-        cmd = [sys.executable, str(script), "--folder", folder, "--shuffle"]
+        print(f"  [{platform}/{folder}] started -> {log_path}")
+
+    header = (f"\n=== {platform} / {folder} — {datetime.now():%Y-%m-%d %H:%M:%S} ===\n"
+              f"$ {' '.join(cmd)}{'  (in-process)' if in_process else ''}\n\n")
+
+    if in_process:
+        with open(log_path, "a") if log_path else nullcontext() as log:
+            if log:
+                log.write(header)
+            returncode = uploaders.run(platform, log=log, **step_options(step, dry_run))
+        if returncode == 130 or (stop is not None and stop.is_set() and returncode != 0):
+            status = "interrupted"
+        else:
+            status = "success" if returncode == 0 else "error"
+        result.update(status=status, returncode=returncode, elapsed_min=(time.time() - start_time) / 60)
+        return _finish_step(result, log_path, interactive)
+
+    log_file = None
+    if log_path:
+        log_file = open(log_path, "ab")
+        log_file.write(header.encode())
+        log_file.flush()
+
+    try:
+        if log_file is None:
+            proc = subprocess.Popen(cmd, cwd=str(PROJECT_DIR))
+            tee = None
+        elif interactive:
+            proc = subprocess.Popen(
+                cmd, cwd=str(PROJECT_DIR), stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                env={**os.environ, "PYTHONUNBUFFERED": "1"},
+            )
+            tee = threading.Thread(target=_tee, args=(proc.stdout, log_file), daemon=True)
+            tee.start()
+        else:
+            proc = subprocess.Popen(
+                cmd, cwd=str(PROJECT_DIR), stdin=subprocess.DEVNULL,
+                stdout=log_file, stderr=subprocess.STDOUT,
+                env={**os.environ, "PYTHONUNBUFFERED": "1"},
+            )
+            tee = None
 
-    if step["limit"]:
-        cmd.extend(["--limit", str(step["limit"])])
+        try:
+            returncode = proc.wait(timeout=STEP_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+            result.update(status="timeout", elapsed_min=STEP_TIMEOUT / 60)
+        except KeyboardInterrupt:
+            print("\n\n  Interrupted by user.")
+            proc.wait()
+            result.update(status="interrupted", elapsed_min=(time.time() - start_time) / 60)
+        else:
+            if stop is not None and stop.is_set() and returncode != 0:
+                status = "interrupted"
+            else:
+                status = "success" if returncode == 0 else "error"
+            result.update(status=status, returncode=returncode, elapsed_min=(time.time() - start_time) / 60)
+        if tee:
+            tee.join(timeout=5)
+    finally:
+        if log_file:
+            log_file.close()
+
+    return _finish_step(result, log_path, interactive)
+
+
+def _finish_step(result: dict, log_path: Path | None, interactive: bool) -> dict:
+    if log_path:
+        result["log"] = str(log_path)
+    if not interactive:
+        print(f"  [{result['platform']}/{result['folder']}] {result['status']} "
+              f"({result['elapsed_min']:.1f} min)")
+    return result
+
+
+def run_lane(
+    steps: list[dict],
+    dry_run: bool,
+    log_dir: Path | None,
+    interactive: bool,
+    stop: threading.Event,
+    in_process: bool = False,
+) -> list[dict]:
+    """Run one lane's steps in order, stopping early if the batch is stopped.
 
-    if step.get("retry_failed"):
-        cmd.append("--retry-failed")
+    With ``in_process`` API steps run through uploaders.run; browser steps
+    always get a subprocess (they own the screen and stdin, need the step
+    timeout, and a browser launch dwarfs interpreter start-up anyway).
+    """
+    results = []
+    for step in steps:
+        if stop.is_set():
+            break
+        result = run_step(step, dry_run=dry_run, log_dir=log_dir, interactive=interactive, stop=stop,
+                          in_process=in_process and step["type"] == "api")
+        results.append(result)
+        if result["status"] == "interrupted":
+            stop.set()
+    return results
+
+
+def run_plan(
+    plan: list[dict],
+    dry_run: bool = False,
+    sequential: bool = False,
+    in_process: bool = True,
+) -> tuple[list[dict], float]:
+    """Execute the plan. Returns (results in plan order, wall time in minutes)."""
+    start_time = time.time()
+    stop = threading.Event()
 
-    if dry_run:
-        cmd.append("--dry-run")
+    if sequential:
+        results = []
+        try:
+            results = run_lane(plan, dry_run, None, True, stop, in_process)
+        except KeyboardInterrupt:
+            print("\n\nBatch interrupted.")
+        return results, (time.time() - start_time) / 60
 
-    # Platform-specific args
-    if platform == "pinterest":
-        cmd.extend(["--daily-limit", str(step["limit"])])
-    elif platform == "etsy":
-        cmd.extend(["--daily-limit", str(step["limit"])])
+    log_dir = LOGS_DIR / f"batch_{datetime.now():%Y%m%d_%H%M%S}"
+    log_dir.mkdir(parents=True, exist_ok=True)
+    print(f"\n  Per-platform logs: {log_dir}/\n")
 
-    print(f"  Running: {' '.join(cmd)}\n")
+    lanes: dict[str, list[dict]] = {}
+    for step in plan:
+        lanes.setdefault(step_lane(step), []).append(step)
 
-    try:
-        result = subprocess.run(
-            cmd,
-            cwd=str(PROJECT_DIR),
-            timeout=7200,  # 2 hour timeout per step
-        )
-        elapsed = time.time() - start_time
-        status = "success" if result.returncode == 0 else "error"
-        return {
-            "platform": platform,
-            "folder": folder,
-            "status": status,
-            "returncode": result.returncode,
-            "elapsed_min": elapsed / 60,
-        }
-    except subprocess.TimeoutExpired:
-        return {
-            "platform": platform,
-            "folder": folder,
-            "status": "timeout",
-            "elapsed_min": 120,
-        }
-    except KeyboardInterrupt:
-        print("\n\n  Interrupted by user.")
-        return {
-            "platform": platform,
-            "folder": folder,
-            "status": "interrupted",
-            "elapsed_min": (time.time() - start_time) / 60,
-        }
+    with ThreadPoolExecutor(max_workers=len(lanes), thread_name_prefix="batch-lane") as pool:
+        futures = [
+            pool.submit(run_lane, steps, dry_run, log_dir, lane == "browser", stop, in_process)
+            for lane, steps in lanes.items()
+        ]
+        try:
+            # Poll rather than block so Ctrl-C reaches the main thread
+            while not all(f.done() for f in futures):
+                time.sleep(0.5)
+        except KeyboardInterrupt:
+            # The children got the same SIGINT; in-process steps are interrupted
+            # here. Lanes record it and start nothing new
+            print("\n\nBatch interrupted — waiting for running steps to exit...")
+            stop.set()
+            uploaders.interrupt()
+        results = [r for f in futures for r in f.result()]
+
+    order = {(s["platform"], s["folder"]): i for i, s in enumerate(plan)}
+    results.sort(key=lambda r: order.get((r["platform"], r["folder"]), len(order)))
+    return results, (time.time() - start_time) / 60
 
 
 # ---------------------------------------------------------------------------
 # Report
 # ---------------------------------------------------------------------------
 
-def print_report(results: list[dict]) -> None:
+def print_report(results: list[dict], wall_min: float | None = None) -> None:
     """Print a summary report of the batch run."""
     print("\n" + "=" * 55)
     print("  BATCH UPLOAD REPORT")
@@ -258,6 +439,11 @@ def print_report(results: list[dict]) -> None:
 
     print("-" * 55)
     print(f"  Total time: {total_time:.1f} min")
+    if wall_min is not None:
+        print(f"  Wall time:  {wall_min:.1f} min")
+    logs = sorted({r["log"] for r in results if r.get("log")})
+    if logs:
+        print(f"  Logs:       {Path(logs[0]).parent}/")
 
     # Run status dashboard
     print()
@@ -265,7 +451,7 @@ def print_report(results: list[dict]) -> None:
     print()
 
 
-def generate_report_text(results: list[dict]) -> str:
+def generate_report_text(results: list[dict], wall_min: float | None = None) -> str:
     """Generate a plain-text report for email."""
     lines = ["POD Batch Upload Report", f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M')}", ""]
 
@@ -273,6 +459,12 @@ def generate_report_text(results: list[dict]) -> str:
         elapsed = r.get("elapsed_min", 0)
         lines.append(f"  [{r['status'].upper():>11}] {r['platform']:<12} {r['folder']:<10} {elapsed:.1f} min")
 
+    if wall_min is not None:
+        lines.append(f"\n  Wall time: {wall_min:.1f} min")
+    logs = sorted({r["log"] for r in results if r.get("log")})
+    if logs:
+        lines.append("  Logs:")
+        lines.extend(f"    {log}" for log in logs)
     lines.append("")
 
     # Add current totals
@@ -297,12 +489,12 @@ def generate_report_text(results: list[dict]) -> str:
 # Report delivery
 # ---------------------------------------------------------------------------
 
-def save_report(results: list[dict]) -> Path:
+def save_report(results: list[dict], wall_min: float | None = None) -> Path:
     """Save the report to a timestamped file. Returns the file path."""
     REPORTS_DIR.mkdir(exist_ok=True)
     timestamp = datetime.now().strftime("%Y%m%d_%H%M")
     report_path = REPORTS_DIR / f"batch_report_{timestamp}.txt"
-    report_text = generate_report_text(results)
+    report_text = generate_report_text(results, wall_min)
     report_path.write_text(report_text)
     print(f"  Report saved: {report_path}")
     return report_path
@@ -375,6 +567,8 @@ Examples:
   python3 batch_upload.py --list-reports                      # List reports
   python3 batch_upload.py --show-report                      # Print latest
   python3 batch_upload.py --notify                           # macOS alert
+  python3 batch_upload.py --sequential                       # No parallel lanes
+  python3 batch_upload.py --subprocess                       # One process per step
 """,
     )
     parser.add_argument(
@@ -413,6 +607,15 @@ Examples:
         "--notify", action="store_true",
         help="Send a macOS desktop notification when the batch finishes",
     )
+    parser.add_argument(
+        "--sequential", action="store_true",
+        help="Run steps one at a time on the terminal instead of in parallel lanes",
+    )
+    parser.add_argument(
+        "--subprocess", action="store_true",
+        help="Run API uploaders as subprocesses too (default: in-process, sharing "
+             "HTTP sessions, tokens and the ledger; no per-step timeout)",
+    )
     parser.add_argument(
         "--yes", "-y", action="store_true",
         help="Skip confirmation prompt (for scheduled/unattended runs)",
@@ -449,7 +652,7 @@ Examples:
 
     # Build and show plan
     plan = build_plan(platforms, args.folder, args.daily_limit, args.retry_failed)
-    show_plan(plan)
+    show_plan(plan, sequential=args.sequential)
 
     if args.dry_run:
         print("\n[DRY RUN MODE]\n")
@@ -466,26 +669,15 @@ Examples:
             return
 
     # Execute
-    results = []
-    for step in plan:
-        try:
-            result = run_step(step, dry_run=args.dry_run)
-            results.append(result)
-
-            # Stop all if interrupted
-            if result["status"] == "interrupted":
-                break
-
-        except KeyboardInterrupt:
-            print("\n\nBatch interrupted.")
-            break
+    results, wall_min = run_plan(plan, dry_run=args.dry_run, sequential=args.sequential,
+                                 in_process=not args.subprocess)
 
     # Report
     if results and not args.dry_run:
-        print_report(results)
+        print_report(results, wall_min)
 
         # Always save report to file
-        report_path = save_report(results)
+        report_path = save_report(results, wall_min)
 
         # macOS notification
         if args.notify:
@@ -8,13 +8,12 @@ from __future__ import annotations
 
 import json
 import sys
-import time
 from pathlib import Path
 
-import requests
-
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 from keychain_config import load_config as _load_keychain_config
+from src.http_client import PooledSession
+from src.rate_limit import get_limiter
 
 
 # Phase 3 landmarks
@@ -61,8 +60,9 @@ def main():
         f"https://{config['shop_domain']}/admin/api/"
         f"{config.get('api_version', '2024-01')}"
     )
-    session = requests.Session()
-    session.headers.update({
+    # Paced by the shared Shopify bucket (2 req/s, 40 burst); 429s wait it out
+    http = PooledSession("Shopify", timeout=30, limiter=get_limiter("shopify"))
+    http.session.headers.update({
         "X-Shopify-Access-Token": config["api_token"],
         "Content-Type": "application/json",
     })
@@ -73,10 +73,7 @@ def main():
     import re
     params: dict = {"limit": 250}
     while True:
-        resp = session.get(f"{base_url}/smart_collections.json", params=params, timeout=30)
-        if resp.status_code == 429:
-            time.sleep(float(resp.headers.get("Retry-After", 2)))
-            resp = session.get(f"{base_url}/smart_collections.json", params=params, timeout=30)
+        resp = http.get(f"{base_url}/smart_collections.json", params=params)
         resp.raise_for_status()
         data = resp.json()
         for c in data.get("smart_collections", []):
@@ -138,21 +135,7 @@ def main():
             created.append((landmark, title))
             continue
 
-        resp = session.post(
-            f"{base_url}/smart_collections.json",
-            json=payload,
-            timeout=30,
-        )
-
-        if resp.status_code == 429:
-            retry_after = float(resp.headers.get("Retry-After", 2))
-            print(f"  Rate limited, waiting {retry_after}s...")
-            time.sleep(retry_after)
-            resp = session.post(
-                f"{base_url}/smart_collections.json",
-                json=payload,
-                timeout=30,
-            )
+        resp = http.post(f"{base_url}/smart_collections.json", json=payload)
 
         if resp.status_code in (200, 201):
             coll = resp.json().get("smart_collection", {})
@@ -162,9 +145,6 @@ def main():
             failed.append((landmark, title, resp.status_code, resp.text[:200]))
             print(f"  FAILED: {title} — {resp.status_code}: {resp.text[:200]}")
 
-        # Small delay to respect rate limits
-        time.sleep(0.5)
-
     # --- Summary ---
     print("\n" + "=" * 60)
     print("SUMMARY")
@@ -2,9 +2,12 @@
 
 from __future__ import annotations
 
-import json
 from pathlib import Path
 
+from src.metadata_store import get_store
+from src.upload_ledger import limit_today
+from upload_common import sync_ledger
+
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 OUTPUT_DIR = PROJECT_ROOT / "output"
 
@@ -33,61 +36,36 @@ PLATFORMS = {
     "printify": {
         "tracker": PROJECT_ROOT / "uploaded_printify.json",
         "type": "api",
-        "key_prefix": "printify:",
     },
 }
 
 FOLDERS = ["tshirt", "sticker", "poster"]
 
 
-def _load_tracker(path: Path) -> dict:
-    if path.exists():
-        try:
-            return json.loads(path.read_text())
-        except (json.JSONDecodeError, OSError):
-            return {}
-    return {}
-
-
 def count_designs() -> dict[str, int]:
-    """Count available designs per folder."""
-    counts = {}
-    for folder in FOLDERS:
-        folder_path = OUTPUT_DIR / folder
-        if folder_path.is_dir():
-            counts[folder] = len(list(folder_path.glob("*.png")))
-        else:
-            counts[folder] = 0
-    return counts
+    """Count available designs (PNGs with metadata) per folder, from the index."""
+    store = get_store(OUTPUT_DIR, FOLDERS)
+    return {folder: store.image_count(folder, paired=True) for folder in FOLDERS}
 
 
 def platform_stats(platform: str, info: dict) -> dict:
-    """Get upload stats for a single platform."""
-    tracker = _load_tracker(info["tracker"])
-
-    if not tracker and "legacy_tracker" in info:
-        tracker = _load_tracker(info["legacy_tracker"])
-
-    success = sum(1 for v in tracker.values() if v.get("status") == "success")
-    failed = sum(1 for v in tracker.values() if v.get("status") == "failed")
+    """Get upload stats for a single platform (from the upload ledger)."""
+    ledger = sync_ledger(platform, info["tracker"], info.get("legacy_tracker"))
+    counts = ledger.status_counts(platform)
+    folder_counts = ledger.folder_counts(platform)
+    today = limit_today()
 
-    key_prefix = info.get("key_prefix", "")
     by_folder = {}
     for folder in FOLDERS:
-        folder_keys = [k for k in tracker if f"{folder}/" in k]
-        if key_prefix:
-            folder_keys = [k for k in tracker if k.startswith(f"{key_prefix}{folder}/")]
-        else:
-            folder_keys = [k for k in tracker if k.startswith(f"{folder}/") or f"/{folder}/" in k]
-        folder_success = sum(1 for k in folder_keys if tracker[k].get("status") == "success")
-        folder_failed = sum(1 for k in folder_keys if tracker[k].get("status") == "failed")
-        by_folder[folder] = {"success": folder_success, "failed": folder_failed}
+        fc = folder_counts.get(folder, {})
+        by_folder[folder] = {"success": fc.get("success", 0), "failed": fc.get("failed", 0)}
 
     return {
         "platform": platform,
-        "success": success,
-        "failed": failed,
-        "total_tracked": len(tracker),
+        "success": counts["success"],
+        "failed": counts["failed"],
+        "total_tracked": ledger.total(platform),
+        "uploaded_today": ledger.day_counts(platform, since=today).get(today, 0),
         "by_folder": by_folder,
         "type": info["type"],
     }
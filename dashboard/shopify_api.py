@@ -3,10 +3,12 @@
 from __future__ import annotations
 
 import re
-import time
 
 import requests
 
+from src.http_client import PooledSession
+from src.rate_limit import get_limiter
+
 from .config import get_config
 
 
@@ -18,7 +20,8 @@ class ShopifyAPI:
         self.shop_domain = config["shop_domain"]
         self.api_version = config.get("api_version", "2024-01")
         self.base_url = f"https://{self.shop_domain}/admin/api/{self.api_version}"
-        self.session = requests.Session()
+        self.http = PooledSession("Shopify", timeout=30, limiter=get_limiter("shopify"))
+        self.session = self.http.session
         self.session.headers.update({
             "X-Shopify-Access-Token": config["api_token"],
             "Content-Type": "application/json",
@@ -26,13 +29,7 @@ class ShopifyAPI:
 
     def _request(self, endpoint: str, params: dict | None = None) -> requests.Response:
         url = f"{self.base_url}{endpoint}"
-        resp = self.session.get(url, params=params, timeout=30)
-
-        if resp.status_code == 429:
-            retry_after = float(resp.headers.get("Retry-After", 2))
-            time.sleep(retry_after)
-            resp = self.session.get(url, params=params, timeout=30)
-
+        resp = self.http.get(url, params=params)
         resp.raise_for_status()
         return resp
 
@@ -13,9 +13,11 @@ Usage:
 from __future__ import annotations
 
 import argparse
-import json
 from pathlib import Path
 
+from src.metadata_store import get_store, niche_of
+from src.metadata_writer import MetadataBatchWriter
+
 OUTPUT_DIR = Path(__file__).parent / "output"
 
 # ---------------------------------------------------------------------------
@@ -215,12 +217,11 @@ def process_folder(folder: str, dry_run: bool) -> dict:
     tags_removed_total = 0
     tags_added_total = 0
 
-    for jf in sorted(folder_path.glob("*.json")):
-        with open(jf) as f:
-            meta = json.load(f)
-
+    store = get_store(OUTPUT_DIR, [folder])
+    writer = None if dry_run else MetadataBatchWriter(OUTPUT_DIR, store=store)
+    for jf, meta in store.designs(folder):
         old_tags = meta.get("tags", [])
-        niche = jf.stem.split("_")[0]
+        niche = niche_of(jf.stem)
         new_tags = clean_tags(old_tags, niche)
         total += 1
 
@@ -243,8 +244,10 @@ def process_folder(folder: str, dry_run: bool) -> dict:
 
             if not dry_run:
                 meta["tags"] = new_tags
-                with open(jf, "w") as f:
-                    json.dump(meta, f, indent=2)
+                writer.write(jf, meta)
+
+    if writer:
+        writer.flush()
 
     return {
         "total": total,
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Local stand-in for the platforms' OAuth token-refresh endpoints.
+
+Answers refresh grants at the same paths as the real hosts, so the token
+sources registered with src/credentials.py can be pointed at it by
+swapping the host of their token URL:
+
+    Etsy       POST /v3/public/oauth/token      grant_type=refresh_token, client_id
+    Pinterest  POST /v5/oauth/token             grant_type=refresh_token, Basic auth
+    TikTok     POST /v2/oauth/token/            grant_type=refresh_token, client_key
+    YouTube    POST /token                      grant_type=refresh_token, client_id
+    Instagram  GET  /refresh_access_token       grant_type=ig_refresh_token, access_token
+
+Every refresh issues a new access token (``mock-<n>``) that expires after
+--expires-in seconds, so background refresh can be watched at work
+without waiting an hour. /_stats counts refreshes per endpoint.
+
+Failures can be injected:
+    --fail-every N      every Nth refresh gets a 500
+    --latency S         seconds each refresh takes (the round trip being hidden)
+
+Usage:
+    python3 mock_oauth.py                                   # http://127.0.0.1:5057
+    python3 mock_oauth.py --expires-in 30 --latency 1
+    curl http://127.0.0.1:5057/_stats
+    # then e.g. upload_etsy.TOKEN_URL = "http://127.0.0.1:5057/v3/public/oauth/token"
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import threading
+import time
+from collections import Counter
+
+from flask import Flask, jsonify, request
+
+DEFAULT_PORT = 5057
+DEFAULT_EXPIRES_IN = 120
+
+
+def create_app(expires_in: int = DEFAULT_EXPIRES_IN, latency: float = 0.0,
+               fail_every: int = 0) -> Flask:
+    app = Flask(__name__)
+    lock = threading.Lock()
+    serial = itertools.count(1)
+    attempts = itertools.count(1)
+    refreshes: Counter[str] = Counter()
+    failures: Counter[str] = Counter()
+
+    def issue(endpoint: str, **extra):
+        time.sleep(latency)
+        with lock:
+            attempt = next(attempts)
+            if fail_every and attempt % fail_every == 0:
+                failures[endpoint] += 1
+                return jsonify({"error": "server_error", "attempt": attempt}), 500
+            refreshes[endpoint] += 1
+            n = next(serial)
+        return jsonify({
+            "access_token": f"mock-{n}",
+            "token_type": "bearer",
+            "expires_in": expires_in,
+            **extra,
+        })
+
+    def refresh_grant(endpoint: str, client_field: str | None):
+        form = request.form
+        if form.get("grant_type") != "refresh_token" or not form.get("refresh_token"):
+            return jsonify({"error": "invalid_request"}), 400
+        if client_field and not form.get(client_field):
+            return jsonify({"error": "invalid_client"}), 401
+        return issue(endpoint, refresh_token=form["refresh_token"])
+
+    @app.post("/v3/public/oauth/token")
+    def etsy():
+        return refresh_grant("etsy", "client_id")
+
+    @app.post("/v5/oauth/token")
+    def pinterest():
+        if not request.authorization:
+            return jsonify({"error": "invalid_client"}), 401
+        return refresh_grant("pinterest", None)
+
+    @app.post("/v2/oauth/token/")
+    def tiktok():
+        return refresh_grant("tiktok", "client_key")
+
+    @app.post("/token")
+    def google():
+        return refresh_grant("youtube", "client_id")
+
+    @app.route("/refresh_access_token", methods=["GET", "POST"])
+    def instagram():
+        params = request.values
+        if params.get("grant_type") != "ig_refresh_token" or not params.get("access_token"):
+            return jsonify({"error": {"message": "invalid grant", "code": 100}}), 400
+        return issue("instagram")
+
+    @app.get("/_stats")
+    def stats():
+        with lock:
+            return jsonify({"refreshes": dict(refreshes), "failures": dict(failures)})
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Local mock of the OAuth token-refresh endpoints the uploaders use.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""\
+Examples:
+  python3 mock_oauth.py
+  python3 mock_oauth.py --expires-in 30 --latency 1 --fail-every 5
+""",
+    )
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port (default: {DEFAULT_PORT})")
+    parser.add_argument("--expires-in", type=int, default=DEFAULT_EXPIRES_IN,
+                        help=f"Lifetime of issued access tokens in seconds (default: {DEFAULT_EXPIRES_IN})")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Seconds each refresh takes")
+    parser.add_argument("--fail-every", type=int, default=0,
+                        help="Answer every Nth refresh with a 500 (0 = never)")
+    args = parser.parse_args()
+
+    app = create_app(args.expires_in, args.latency, args.fail_every)
+    print(f"Mock OAuth server at http://127.0.0.1:{args.port} (stats: /_stats)")
+    app.run(host="127.0.0.1", port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
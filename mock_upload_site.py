@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""Local stand-in for the Redbubble, TeePublic and Society6 upload forms.
+
+Serves just enough of each platform's upload flow (same URLs, selectors
+and success/failure pages) for upload.py, upload_teepublic.py and
+upload_society6.py to run unchanged against it. Pass --mock-site to an
+uploader and the browser's requests to the real hosts are answered from
+here instead (see upload_common.launch_browser), with trackers and the
+browser profile kept under .mock_runs/.
+
+Failures can be injected to exercise the upload loop's recovery paths:
+    --captcha-every N   every Nth submission shows a CAPTCHA that clears itself
+    --error-rate P      fraction of submissions answered with a 500 page
+    --expire-after N    log the session out after N accepted uploads
+    --latency S         seconds each submission takes to process
+
+Usage:
+    python3 mock_upload_site.py                                  # http://127.0.0.1:5055
+    python3 mock_upload_site.py --captcha-every 7 --error-rate 0.1
+    python3 upload.py --folder tshirt --limit 20 --delay 12 --headless \\
+        --mock-site http://127.0.0.1:5055
+    curl http://127.0.0.1:5055/_stats                            # per-platform counts
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+from flask import Blueprint, Flask, jsonify, redirect, render_template_string, request
+
+from upload_common import MOCK_SITE_HOSTS
+
+DEFAULT_PORT = 5055
+CAPTCHA_CLEAR_SECONDS = 5
+
+
+# ---------------------------------------------------------------------------
+# Shared state / failure injection
+# ---------------------------------------------------------------------------
+
+@dataclass
+class MockState:
+    captcha_every: int = 0
+    error_rate: float = 0.0
+    expire_after: int = 0
+    latency: float = 0.0
+    logged_in: bool = True
+    submissions: int = 0
+    accepted: int = 0
+    since_login: int = 0
+    stats: dict[str, Counter] = field(default_factory=dict)
+    published: set[int] = field(default_factory=set)  # TeePublic design IDs
+    started: float = field(default_factory=time.time)
+    rng: random.Random = field(default_factory=random.Random)
+    ids: itertools.count = field(default_factory=lambda: itertools.count(1000))
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def count(self, platform: str, event: str) -> None:
+        self.stats.setdefault(platform, Counter())[event] += 1
+
+    def submit(self, platform: str) -> str:
+        """Outcome of one form submission: ok, captcha, error or logged_out."""
+        if self.latency:
+            time.sleep(self.latency)
+        with self.lock:
+            self.submissions += 1
+            self.count(platform, "submitted")
+            if not self.logged_in:
+                outcome = "logged_out"
+            elif self.captcha_every and self.submissions % self.captcha_every == 0:
+                outcome = "captcha"
+            elif self.error_rate and self.rng.random() < self.error_rate:
+                outcome = "error"
+            else:
+                outcome = "ok"
+                self.accepted += 1
+                self.since_login += 1
+                if self.expire_after and self.since_login >= self.expire_after:
+                    self.logged_in = False
+            self.count(platform, outcome)
+            return outcome
+
+
+def _state() -> MockState:
+    from flask import current_app
+    return current_app.config["MOCK_STATE"]
+
+
+# ---------------------------------------------------------------------------
+# Shared pages
+# ---------------------------------------------------------------------------
+
+_LAYOUT = """<!doctype html>
+<html><head><meta charset="utf-8"><title>{{ title }}</title>
+<style>body{font-family:sans-serif;margin:2em;max-width:50em}label{display:block;margin:.6em 0}
+.chip{display:inline-block;border:1px solid #999;padding:2px 6px;margin:2px}
+.chip.bg-black{background:#000;color:#fff}</style></head>
+<body>{{ body | safe }}</body></html>"""
+
+_CAPTCHA = """<h1>Checking your browser</h1>
+<div id="captcha" data-captcha><iframe src="about:blank#captcha" title="captcha"></iframe></div>
+<script>setTimeout(() => document.getElementById('captcha').remove(), {{ seconds }} * 1000);</script>"""
+
+_SERVER_ERROR = """<h1>500 Server Error</h1>
+<div class="alert-error" role="alert">Computer says 'no'. 500 server error — please try again.</div>"""
+
+_LOGIN = """<h1>Log in</h1>
+<form method="post" action="/login"><button type="submit">Log in</button></form>"""
+
+
+def _page(title: str, body: str, status: int = 200, **context):
+    html = render_template_string(body, **context)
+    return render_template_string(_LAYOUT, title=title, body=html), status
+
+
+def _failure_page(outcome: str):
+    if outcome == "logged_out":
+        return redirect("/login")
+    if outcome == "captcha":
+        return _page("Security check", _CAPTCHA, seconds=CAPTCHA_CLEAR_SECONDS)
+    return _page("500 Server Error", _SERVER_ERROR, status=500)
+
+
+def _login_routes(bp: Blueprint, home: str) -> None:
+    """GET/POST /login for a platform; logging in returns to ``home``."""
+
+    def login():
+        if request.method == "POST":
+            state = _state()
+            with state.lock:
+                state.logged_in = True
+                state.since_login = 0
+            return redirect(home)
+        return _page("Log in", _LOGIN)
+
+    bp.add_url_rule("/login", "login", login, methods=["GET", "POST"])
+
+
+def _require_login():
+    if not _state().logged_in:
+        return redirect("/login")
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Redbubble
+# ---------------------------------------------------------------------------
+
+redbubble = Blueprint("redbubble", __name__)
+_login_routes(redbubble, "/portfolio/images/new")
+
+_RB_FORM = """<h1>Add new work</h1>
+{% if error %}<div class="alert-error" role="alert">Your work could not be saved: {{ error }}</div>{% endif %}
+<form id="work-form" action="/portfolio/images" method="post" enctype="multipart/form-data"
+      onsubmit="document.getElementById('work_tags').value =
+        [...document.querySelectorAll('#main-tag-en, #supporting-tags-en')].map(e => e.innerText).join('\\n')">
+  <label>Image <input type="file" name="image" accept="image/png"></label>
+  <label>Title <input id="work_title_en" name="work[title_en]"></label>
+  <label>Main tag <span id="main-tag-en" contenteditable="true"></span></label>
+  <label>Supporting tags <span id="supporting-tags-en" contenteditable="true"></span></label>
+  <input type="hidden" id="work_tags" name="work[tags]">
+  <label>Description <textarea id="work_description_en" name="work[description_en]"></textarea></label>
+  <label><input type="radio" id="work_safe_for_work_true" name="work[safe_for_work]" value="true"> Not mature</label>
+  <label><input type="radio" id="work_safe_for_work_false" name="work[safe_for_work]" value="false"> Mature</label>
+  <label><input type="checkbox" id="rightsDeclaration" name="rights_declaration" value="1"> I own the rights</label>
+  <button id="submit-work" type="submit">Save work</button>
+</form>"""
+
+
+@redbubble.get("/portfolio/images/new")
+def rb_new():
+    return _require_login() or _page("Add new work | Redbubble", _RB_FORM, error=None)
+
+
+@redbubble.post("/portfolio/images")
+def rb_create():
+    image = request.files.get("image")
+    missing = [name for name, ok in (
+        ("image", image and image.filename),
+        ("title", request.form.get("work[title_en]")),
+        ("rights declaration", request.form.get("rights_declaration")),
+        ("mature content", request.form.get("work[safe_for_work]")),
+    ) if not ok]
+    if missing:
+        _state().count("redbubble", "invalid")
+        return _page("Add new work | Redbubble", _RB_FORM, error="missing " + ", ".join(missing))
+    outcome = _state().submit("redbubble")
+    if outcome != "ok":
+        return _failure_page(outcome)
+    return redirect(f"/portfolio/works/{next(_state().ids)}/edit")
+
+
+@redbubble.get("/portfolio/works/<int:work_id>/edit")
+def rb_work(work_id: int):
+    return _page("Edit work | Redbubble", "<h1>Work {{ work_id }} saved</h1>", work_id=work_id)
+
+
+# ---------------------------------------------------------------------------
+# TeePublic
+# ---------------------------------------------------------------------------
+
+teepublic = Blueprint("teepublic", __name__)
+_login_routes(teepublic, "/user/account")
+
+_TP_EDIT = """<h1>Design {{ design_id }}</h1>
+{% if error %}<div class="alert-error" role="alert">{{ error }}</div>{% endif %}
+<div class="design-upload">
+  <input type="file" id="design_upload_input" accept="image/png">
+  <div class="design-image-preview"><img src="/assets/placeholder.png" alt=""></div>
+</div>
+<form id="edit_design_{{ design_id }}" action="/designs/{{ design_id }}/edit" method="post">
+  <input type="hidden" name="design[artwork]" id="design_artwork">
+  <label>Title <input id="design_design_title" name="design[design_title]"></label>
+  <label>Description <textarea id="design_design_description" name="design[design_description]"></textarea></label>
+  <label>Primary tag <input id="design_primary_tag" name="design[primary_tag]"></label>
+  <div id="secondary_tags"><input class="taggle_input" type="text"></div>
+  <input type="hidden" name="design[secondary_tags]" id="design_secondary_tags">
+  <label><input type="radio" id="design_content_flag_false" name="design[content_flag]" value="false"> Not mature</label>
+  <label><input type="radio" id="design_content_flag_true" name="design[content_flag]" value="true"> Mature</label>
+  <label><input type="checkbox" id="terms" name="terms" value="1"> I agree to the Terms and Conditions</label>
+  {% if published %}<button type="button">Unpublish</button>
+  {% else %}<button type="submit" class="publish-and-promote-button">Publish</button>{% endif %}
+</form>
+<script>
+document.getElementById('design_upload_input').addEventListener('change', e => {
+  const file = e.target.files[0];
+  if (!file) return;
+  const reader = new FileReader();
+  reader.onload = () => {
+    document.querySelector('.design-image-preview img').src = reader.result;
+    document.querySelector('.design-upload').classList.add('has-image');
+    document.getElementById('design_artwork').value = 'mock/' + file.name;
+  };
+  reader.readAsDataURL(file);
+});
+const tags = [];
+document.querySelector('#secondary_tags .taggle_input').addEventListener('keydown', e => {
+  if (e.key !== 'Enter') return;
+  e.preventDefault();
+  if (e.target.value) tags.push(e.target.value);
+  e.target.value = '';
+  document.getElementById('design_secondary_tags').value = tags.join(',');
+});
+</script>"""
+
+
+@teepublic.get("/user/account")
+def tp_account():
+    return _require_login() or _page("Account | TeePublic", "<h1>Your account</h1>")
+
+
+@teepublic.get("/designs/bulk_uploader/skip")
+def tp_skip():
+    return _page("Bulk uploader | TeePublic", "<p>No pending uploads.</p>")
+
+
+@teepublic.get("/design/quick_create")
+def tp_quick_create():
+    return _require_login() or redirect(f"/designs/{next(_state().ids)}/edit")
+
+
+@teepublic.get("/designs/<int:design_id>/edit")
+def tp_edit(design_id: int):
+    return _require_login() or _page(
+        "Edit design | TeePublic", _TP_EDIT,
+        design_id=design_id, published=design_id in _state().published, error=None,
+    )
+
+
+@teepublic.post("/designs/<int:design_id>/edit")
+def tp_publish(design_id: int):
+    missing = [name for name, ok in (
+        ("artwork", request.form.get("design[artwork]")),
+        ("title", request.form.get("design[design_title]")),
+        ("terms", request.form.get("terms")),
+        ("content flag", request.form.get("design[content_flag]")),
+    ) if not ok]
+    if missing:
+        _state().count("teepublic", "invalid")
+        return _page("Edit design | TeePublic", _TP_EDIT, design_id=design_id,
+                     published=False, error="Missing " + ", ".join(missing))
+    outcome = _state().submit("teepublic")
+    if outcome != "ok":
+        return _failure_page(outcome)
+    _state().published.add(design_id)
+    return _page("Edit design | TeePublic", _TP_EDIT, design_id=design_id, published=True, error=None)
+
+
+# ---------------------------------------------------------------------------
+# Society6
+# ---------------------------------------------------------------------------
+
+society6 = Blueprint("society6", __name__)
+_login_routes(society6, "/upload")
+
+_S6_UPLOAD = """<h1>Upload artwork</h1>
+{% if error %}<p class="text-red-500">{{ error }}</p>{% endif %}
+<form action="/upload" method="post" enctype="multipart/form-data">
+  <label>Artwork <input type="file" name="artwork" accept="image/png"></label>
+  <label>Title <input id="title" name="title"></label>
+  <label>Medium <select id="medium" name="medium">
+    <option value="">Choose</option><option>Digital</option><option>Design</option>
+    <option>Illustration</option><option>Other</option></select></label>
+  <label>Tags <input class="w-auto" type="text"></label>
+  <input type="hidden" name="tags" id="tags">
+  <div><button type="button" id="subjects-toggle">Select subject(s)</button>
+    <div id="subjects" hidden>
+      {% for s in ["Architecture", "Landscape", "Nature", "Travel"] %}
+      <span class="chip" data-subject="{{ s }}">{{ s }}</span>{% endfor %}
+    </div></div>
+  <input type="hidden" name="subjects" id="subjects-field">
+  <label>Description <textarea id="description" name="description"></textarea></label>
+  <label><input type="checkbox" id="agreementCheckbox" name="agreement" value="1"> I have the rights to this artwork</label>
+  <p>Does this artwork contain mature content?</p>
+  <input type="radio" id="matureContentYes" name="mature" value="yes"><label for="matureContentYes">Yes</label>
+  <input type="radio" id="matureContentNo" name="mature" value="no"><label for="matureContentNo">No</label>
+  <button type="submit">Save And Add Products</button>
+</form>
+<script>
+const tags = [];
+document.querySelector('input.w-auto').addEventListener('keydown', e => {
+  if (e.key !== 'Enter') return;
+  e.preventDefault();
+  if (e.target.value) tags.push(e.target.value);
+  e.target.value = '';
+  document.getElementById('tags').value = tags.join(',');
+});
+document.getElementById('subjects-toggle').addEventListener('click', () => {
+  document.getElementById('subjects').hidden = false;
+});
+document.querySelectorAll('#subjects .chip').forEach(chip => chip.addEventListener('click', () => {
+  chip.classList.toggle('bg-black');
+  document.getElementById('subjects-field').value =
+    [...document.querySelectorAll('#subjects .chip.bg-black')].map(c => c.dataset.subject).join(',');
+}));
+</script>"""
+
+
+@society6.get("/")
+def s6_studio():
+    return _require_login() or redirect("/upload")
+
+
+@society6.get("/upload")
+def s6_upload_form():
+    return _require_login() or _page("Upload | Society6 Studio", _S6_UPLOAD, error=None)
+
+
+@society6.post("/upload")
+def s6_upload():
+    artwork = request.files.get("artwork")
+    missing = [name for name, ok in (
+        ("artwork", artwork and artwork.filename),
+        ("title", request.form.get("title")),
+        ("subject", request.form.get("subjects")),
+        ("agreement", request.form.get("agreement")),
+        ("mature content", request.form.get("mature")),
+    ) if not ok]
+    if missing:
+        _state().count("society6", "invalid")
+        return _page("Upload | Society6 Studio", _S6_UPLOAD, error="Required: " + ", ".join(missing))
+    outcome = _state().submit("society6")
+    if outcome != "ok":
+        return _failure_page(outcome)
+    return redirect(f"/artworks/{next(_state().ids)}/products")
+
+
+@society6.get("/artworks/<int:artwork_id>/products")
+def s6_products(artwork_id: int):
+    return _page("Products | Society6 Studio", "<h1>Artwork saved</h1><p>Select products to enable.</p>")
+
+
+# ---------------------------------------------------------------------------
+# App
+# ---------------------------------------------------------------------------
+
+BLUEPRINTS = {"redbubble": redbubble, "teepublic": teepublic, "society6": society6}
+
+
+def create_app(
+    captcha_every: int = 0,
+    error_rate: float = 0.0,
+    expire_after: int = 0,
+    latency: float = 0.0,
+    seed: int | None = None,
+) -> Flask:
+    app = Flask(__name__)
+    app.config["MOCK_STATE"] = MockState(
+        captcha_every=captcha_every,
+        error_rate=error_rate,
+        expire_after=expire_after,
+        latency=latency,
+        rng=random.Random(seed),
+    )
+    # The browser asks for https://<host>/<path>; launch_browser forwards it
+    # to <mock>/<platform>/<path>.
+    for platform in MOCK_SITE_HOSTS.values():
+        app.register_blueprint(BLUEPRINTS[platform], url_prefix=f"/{platform}")
+
+    @app.get("/_stats")
+    def stats():
+        state = app.config["MOCK_STATE"]
+        elapsed = time.time() - state.started
+        with state.lock:
+            return jsonify({
+                "elapsed_seconds": round(elapsed, 1),
+                "submissions": state.submissions,
+                "accepted": state.accepted,
+                "accepted_per_hour": round(state.accepted / (elapsed / 3600), 1) if elapsed else 0,
+                "logged_in": state.logged_in,
+                "platforms": {p: dict(c) for p, c in state.stats.items()},
+            })
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Local mock of the Redbubble, TeePublic and Society6 upload forms.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=f"""\
+Examples:
+  python3 mock_upload_site.py
+  python3 mock_upload_site.py --captcha-every 7 --error-rate 0.1 --latency 2
+  python3 upload_society6.py --folder poster --limit 10 --headless --mock-site http://127.0.0.1:{DEFAULT_PORT}
+""",
+    )
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port (default: {DEFAULT_PORT})")
+    parser.add_argument("--captcha-every", type=int, default=0,
+                        help="Show a self-clearing CAPTCHA on every Nth submission (0 = never)")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fraction of submissions answered with a 500 page")
+    parser.add_argument("--expire-after", type=int, default=0,
+                        help="Log the session out after N accepted uploads (0 = never)")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Seconds each submission takes to process")
+    parser.add_argument("--seed", type=int, help="Random seed for --error-rate")
+    args = parser.parse_args()
+
+    app = create_app(args.captcha_every, args.error_rate, args.expire_after, args.latency, args.seed)
+    print(f"Mock upload site at http://127.0.0.1:{args.port} (stats: /_stats)")
+    # Threaded so the pipelined second tab isn't blocked behind a slow submission
+    app.run(host="127.0.0.1", port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""Local stand-in for the YouTube and TikTok video upload APIs.
+
+Implements the resumable upload protocols upload_youtube.py and
+tiktok_api.py speak (see src/resumable_upload.py), at the same paths as
+the real hosts, so both uploaders run unchanged with --api-base:
+
+    YouTube   POST /upload/youtube/v3/videos?uploadType=resumable   -> Location
+              PUT  <Location>  Content-Range: bytes a-b/size        -> 308 + Range, 200 at the end
+              PUT  <Location>  Content-Range: bytes */size          -> offset probe
+    TikTok    POST /v2/post/publish/video/init/                     -> publish_id, upload_url
+              PUT  <upload_url>  one chunk per request, in order     -> 206, 201 at the end
+              POST /v2/post/publish/status/fetch/                   -> PROCESSING_* / PUBLISH_COMPLETE
+
+Chunk sizes and ranges are validated the way the real APIs do. Bytes are
+not stored; each upload keeps a running SHA-256 so /_stats can confirm a
+resumed file arrived intact.
+
+Failures can be injected to exercise resume:
+    --fail-every N      every Nth chunk gets a 503 (YouTube keeps half of it first)
+    --latency S         seconds each chunk takes to process
+    --process-polls N   status polls before a TikTok post reports PUBLISH_COMPLETE
+    --url-ttl S         seconds a TikTok upload URL stays valid
+
+Usage:
+    python3 mock_video_api.py                                    # http://127.0.0.1:5056
+    python3 mock_video_api.py --fail-every 4
+    python3 upload_youtube.py --upload --limit 3 --chunk-size 1 --api-base http://127.0.0.1:5056
+    python3 tiktok_api.py --upload --limit 3 --chunk-size 5 --api-base http://127.0.0.1:5056
+    curl http://127.0.0.1:5056/_stats                            # per-upload progress
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import itertools
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+from flask import Flask, jsonify, request
+
+from src.resumable_upload import (
+    GOOGLE_CHUNK_ALIGN,
+    TIKTOK_MAX_CHUNK,
+    TIKTOK_MAX_CHUNKS,
+    TIKTOK_MIN_CHUNK,
+    TIKTOK_URL_TTL,
+)
+
+DEFAULT_PORT = 5056
+
+_CONTENT_RANGE = re.compile(r"bytes (?:(\d+)-(\d+)|\*)/(\d+)$")
+
+
+# ---------------------------------------------------------------------------
+# Shared state / failure injection
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Upload:
+    platform: str
+    size: int
+    chunk_size: int = 0
+    total_chunks: int = 0
+    received: int = 0
+    polls: int = 0
+    created: float = field(default_factory=time.time)
+    digest: object = field(default_factory=hashlib.sha256)
+    result: dict = field(default_factory=dict)
+
+    def append(self, data: bytes) -> None:
+        self.digest.update(data)
+        self.received += len(data)
+
+    @property
+    def complete(self) -> bool:
+        return self.received >= self.size
+
+
+@dataclass
+class MockState:
+    fail_every: int = 0
+    latency: float = 0.0
+    process_polls: int = 2
+    url_ttl: float = TIKTOK_URL_TTL
+    chunks: int = 0
+    uploads: dict[str, Upload] = field(default_factory=dict)
+    stats: dict[str, Counter] = field(default_factory=dict)
+    ids: itertools.count = field(default_factory=lambda: itertools.count(1))
+    started: float = field(default_factory=time.time)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def count(self, platform: str, event: str) -> None:
+        self.stats.setdefault(platform, Counter())[event] += 1
+
+    def new_id(self, prefix: str) -> str:
+        return f"{prefix}{next(self.ids):06d}"
+
+    def chunk_fails(self) -> bool:
+        """Count a chunk PUT; True if this one should be answered with a 503."""
+        if self.latency:
+            time.sleep(self.latency)
+        self.chunks += 1
+        return bool(self.fail_every) and self.chunks % self.fail_every == 0
+
+
+def _state() -> MockState:
+    from flask import current_app
+    return current_app.config["MOCK_STATE"]
+
+
+def _content_range() -> tuple[int | None, int | None, int] | None:
+    match = _CONTENT_RANGE.match(request.headers.get("Content-Range", ""))
+    if not match:
+        return None
+    start, end, total = match.groups()
+    if start is None:
+        return None, None, int(total)
+    return int(start), int(end), int(total)
+
+
+# ---------------------------------------------------------------------------
+# YouTube (Google resumable upload)
+# ---------------------------------------------------------------------------
+
+def _google_incomplete(upload: Upload):
+    headers = {"Range": f"bytes=0-{upload.received - 1}"} if upload.received else {}
+    return "", 308, headers
+
+
+def _google_error(status: int, reason: str, message: str):
+    return jsonify({"error": {"code": status, "message": message,
+                              "errors": [{"reason": reason, "message": message}]}}), status
+
+
+def yt_initiate():
+    state = _state()
+    if request.args.get("uploadType") != "resumable":
+        return _google_error(400, "invalidUploadType", "Only uploadType=resumable is supported")
+    try:
+        size = int(request.headers["X-Upload-Content-Length"])
+    except (KeyError, ValueError):
+        return _google_error(400, "invalidUploadLength", "X-Upload-Content-Length is required")
+    body = request.get_json(silent=True) or {}
+    with state.lock:
+        upload_id = state.new_id("yt")
+        state.uploads[upload_id] = Upload(
+            "youtube", size, result={"kind": "youtube#video", "snippet": body.get("snippet", {})})
+        state.count("youtube", "sessions")
+    location = f"{request.base_url}?uploadType=resumable&upload_id={upload_id}"
+    return "", 200, {"Location": location}
+
+
+def yt_chunk():
+    state = _state()
+    upload_id = request.args.get("upload_id", "")
+    parsed = _content_range()
+    data = request.get_data()
+    with state.lock:
+        upload = state.uploads.get(upload_id)
+        if upload is None or upload.platform != "youtube":
+            return _google_error(404, "notFound", "Upload session not found")
+        if parsed is None or parsed[2] != upload.size:
+            return _google_error(400, "badContentRange", "Content-Range does not match the upload")
+        start, end, _ = parsed
+        if start is None:  # bytes */size: status probe
+            state.count("youtube", "probes")
+            return (jsonify(upload.result), 200) if upload.complete else _google_incomplete(upload)
+        if end - start + 1 != len(data):
+            return _google_error(400, "badContentRange", "Content-Range does not match the body")
+        if end + 1 < upload.size and len(data) % GOOGLE_CHUNK_ALIGN:
+            return _google_error(400, "badChunkSize", "Chunks must be a multiple of 256 KiB")
+        if start > upload.received:
+            return _google_error(400, "badContentRange", f"Expected offset {upload.received}")
+
+        fresh = data[upload.received - start:]  # bytes the server already holds are ignored
+        if state.chunk_fails():
+            upload.append(fresh[:len(fresh) // 2 // GOOGLE_CHUNK_ALIGN * GOOGLE_CHUNK_ALIGN])
+            state.count("youtube", "failed_chunks")
+            return _google_error(503, "backendError", "Injected failure")
+        upload.append(fresh)
+        state.count("youtube", "chunks")
+        if not upload.complete:
+            return _google_incomplete(upload)
+        upload.result["id"] = upload_id
+        upload.result["sha256"] = upload.digest.hexdigest()
+        state.count("youtube", "completed")
+        return jsonify(upload.result), 200
+
+
+# ---------------------------------------------------------------------------
+# TikTok (Content Posting API FILE_UPLOAD)
+# ---------------------------------------------------------------------------
+
+def _tiktok(data: dict | None = None, code: str = "ok", message: str = "", status: int = 200):
+    return jsonify({"data": data or {}, "error": {"code": code, "message": message,
+                                                  "log_id": "mock"}}), status
+
+
+def _check_chunking(size: int, chunk_size: int, count: int) -> str:
+    if size < TIKTOK_MIN_CHUNK:
+        return "" if (chunk_size, count) == (size, 1) else "Videos under 5MB must be uploaded whole"
+    if not TIKTOK_MIN_CHUNK <= chunk_size <= TIKTOK_MAX_CHUNK:
+        return "chunk_size must be between 5MB and 64MB"
+    if count != max(1, size // chunk_size) or count > TIKTOK_MAX_CHUNKS:
+        return "total_chunk_count does not match video_size / chunk_size"
+    return ""
+
+
+def tt_creator_info():
+    return _tiktok({"creator_username": "mock", "max_video_post_duration_sec": 600,
+                    "privacy_level_options": ["PUBLIC_TO_EVERYONE", "SELF_ONLY"]})
+
+
+def tt_init():
+    state = _state()
+    source = (request.get_json(silent=True) or {}).get("source_info", {})
+    if source.get("source") != "FILE_UPLOAD":
+        return _tiktok(code="invalid_params", message="Only FILE_UPLOAD is supported", status=400)
+    try:
+        size, chunk_size, count = (int(source[k]) for k in
+                                   ("video_size", "chunk_size", "total_chunk_count"))
+    except (KeyError, TypeError, ValueError):
+        return _tiktok(code="invalid_params", message="source_info is incomplete", status=400)
+    problem = _check_chunking(size, chunk_size, count)
+    if problem:
+        return _tiktok(code="invalid_params", message=problem, status=400)
+    with state.lock:
+        publish_id = state.new_id("v_pub_file~")
+        state.uploads[publish_id] = Upload("tiktok", size, chunk_size, count)
+        state.count("tiktok", "sessions")
+    upload_url = f"{request.host_url}tiktok/upload/{publish_id}"
+    return _tiktok({"publish_id": publish_id, "upload_url": upload_url})
+
+
+def tt_chunk(publish_id: str):
+    state = _state()
+    parsed = _content_range()
+    data = request.get_data()
+    with state.lock:
+        upload = state.uploads.get(publish_id)
+        if upload is None or upload.platform != "tiktok":
+            return _tiktok(code="not_found", message="Unknown upload", status=404)
+        if upload.complete:
+            return _tiktok(code="invalid_range", message="Upload is already complete", status=416)
+        if time.time() - upload.created > state.url_ttl:
+            return _tiktok(code="url_expired", message="Upload URL has expired", status=403)
+        index = upload.received // upload.chunk_size if upload.chunk_size else 0
+        expected_end = (upload.size if index >= upload.total_chunks - 1
+                        else upload.received + upload.chunk_size)
+        if parsed is None or parsed != (upload.received, expected_end - 1, upload.size) \
+                or len(data) != expected_end - upload.received:
+            return _tiktok(code="invalid_range",
+                           message=f"Expected bytes {upload.received}-{expected_end - 1}/{upload.size}",
+                           status=416)
+        if state.chunk_fails():
+            state.count("tiktok", "failed_chunks")
+            return _tiktok(code="internal_error", message="Injected failure", status=503)
+        upload.append(data)
+        state.count("tiktok", "chunks")
+        if not upload.complete:
+            return "", 206
+        state.count("tiktok", "completed")
+        return "", 201
+
+
+def tt_status():
+    state = _state()
+    publish_id = (request.get_json(silent=True) or {}).get("publish_id", "")
+    with state.lock:
+        upload = state.uploads.get(publish_id)
+        if upload is None or upload.platform != "tiktok":
+            return _tiktok(code="invalid_publish_id", message="Unknown publish_id", status=400)
+        upload.polls += 1
+        state.count("tiktok", "polls")
+        if not upload.complete:
+            status = "PROCESSING_UPLOAD"
+        elif upload.polls > state.process_polls:
+            status = "PUBLISH_COMPLETE"
+        else:
+            status = "PROCESSING_DOWNLOAD"
+        return _tiktok({"status": status, "uploaded_bytes": upload.received})
+
+
+# ---------------------------------------------------------------------------
+# App
+# ---------------------------------------------------------------------------
+
+def create_app(
+    fail_every: int = 0,
+    latency: float = 0.0,
+    process_polls: int = 2,
+    url_ttl: float = TIKTOK_URL_TTL,
+) -> Flask:
+    app = Flask(__name__)
+    app.config["MOCK_STATE"] = MockState(
+        fail_every=fail_every, latency=latency, process_polls=process_polls, url_ttl=url_ttl,
+    )
+    app.add_url_rule("/upload/youtube/v3/videos", view_func=yt_initiate, methods=["POST"])
+    app.add_url_rule("/upload/youtube/v3/videos", view_func=yt_chunk, methods=["PUT"])
+    app.add_url_rule("/v2/post/publish/creator_info/query/", view_func=tt_creator_info,
+                     methods=["POST"])
+    app.add_url_rule("/v2/post/publish/video/init/", view_func=tt_init, methods=["POST"])
+    app.add_url_rule("/tiktok/upload/<publish_id>", view_func=tt_chunk, methods=["PUT"])
+    app.add_url_rule("/v2/post/publish/status/fetch/", view_func=tt_status, methods=["POST"])
+
+    @app.get("/_stats")
+    def stats():
+        state = app.config["MOCK_STATE"]
+        with state.lock:
+            return jsonify({
+                "elapsed_seconds": round(time.time() - state.started, 1),
+                "chunks": state.chunks,
+                "platforms": {p: dict(c) for p, c in state.stats.items()},
+                "uploads": {
+                    upload_id: {
+                        "platform": u.platform,
+                        "size": u.size,
+                        "received": u.received,
+                        "complete": u.complete,
+                        "sha256": u.digest.hexdigest() if u.complete else None,
+                    }
+                    for upload_id, u in state.uploads.items()
+                },
+            })
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Local mock of the YouTube and TikTok resumable video upload APIs.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=f"""\
+Examples:
+  python3 mock_video_api.py
+  python3 mock_video_api.py --fail-every 4 --latency 0.5
+  python3 upload_youtube.py --upload --limit 3 --api-base http://127.0.0.1:{DEFAULT_PORT}
+""",
+    )
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port (default: {DEFAULT_PORT})")
+    parser.add_argument("--fail-every", type=int, default=0,
+                        help="Answer every Nth chunk with a 503 (0 = never)")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Seconds each chunk takes to process")
+    parser.add_argument("--process-polls", type=int, default=2,
+                        help="TikTok status polls before PUBLISH_COMPLETE (default: 2)")
+    parser.add_argument("--url-ttl", type=float, default=TIKTOK_URL_TTL,
+                        help=f"Seconds a TikTok upload URL stays valid (default: {TIKTOK_URL_TTL})")
+    args = parser.parse_args()
+
+    app = create_app(args.fail_every, args.latency, args.process_polls, args.url_ttl)
+    print(f"Mock video API at http://127.0.0.1:{args.port} (stats: /_stats)")
+    app.run(host="127.0.0.1", port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -13,23 +13,28 @@ Problems this fixes:
 
 Usage:
     python3 optimize_seo.py --analyze                  # Show current issues
+    python3 optimize_seo.py --analyze --bulk --export reports/  # Matrix analysis + CSV/JSON
     python3 optimize_seo.py --preview --limit 10       # Preview changes
     python3 optimize_seo.py --apply                    # Apply to all designs
     python3 optimize_seo.py --apply --folder tshirt    # Apply to one folder
     python3 optimize_seo.py --restore                  # Restore from backup
+
+To run these rules together with fix_tags.py and the sticker rewrites in a
+single pass, use rewrite_metadata.py.
 """
 
 from __future__ import annotations
 
 import argparse
-import json
 import re
 import shutil
 import sys
-from collections import Counter
 from datetime import datetime
 from pathlib import Path
 
+from src.metadata_store import get_store, niche_of
+from src.metadata_writer import MetadataBatchWriter
+
 # ---------------------------------------------------------------------------
 # Constants
 # ---------------------------------------------------------------------------
@@ -92,6 +97,8 @@ STOPWORDS = frozenset({
     "got", "get", "ive", "ill", "wont", "cant", "doesnt",
 })
 
+_WORD_RE = re.compile(r"[a-zA-Z]+")
+
 
 # ---------------------------------------------------------------------------
 # Phrase analysis
@@ -106,7 +113,7 @@ def extract_phrase(title: str) -> str:
 
 def phrase_to_compound_tag(phrase: str) -> str | None:
     """Convert a phrase to a hyphenated compound tag if it's short enough."""
-    words = re.findall(r"[a-zA-Z]+", phrase.lower())
+    words = _WORD_RE.findall(phrase.lower())
     words = [w for w in words if w not in STOPWORDS and len(w) > 1]
     if 2 <= len(words) <= 5:
         tag = "-".join(words)
@@ -131,7 +138,7 @@ def phrase_to_keyword_tags(phrase: str) -> list[str]:
 
     Prioritizes 2-word compound tags over weak single words.
     """
-    words = re.findall(r"[a-zA-Z]+", phrase.lower())
+    words = _WORD_RE.findall(phrase.lower())
     tags = []
     seen = set()
 
@@ -154,47 +161,57 @@ def phrase_to_keyword_tags(phrase: str) -> list[str]:
     return tags
 
 
-def _phrase_has_word(phrase_lower: str, word: str) -> bool:
-    """Check if a word appears as a whole word in the phrase (not as a substring)."""
-    return bool(re.search(rf'\b{re.escape(word)}\b', phrase_lower))
-
-
-def detect_special_context(phrase: str, niche: str) -> list[str]:
-    """Detect special context in the phrase that should generate extra tags."""
-    p = phrase.lower()
-    extra = []
-
+# Special-context keyword tables: (trigger words, tags to add, niche or None).
+# Compiled once into a single whole-word alternation so each phrase is scanned
+# once, however many tables are added.
+SPECIAL_CONTEXT_RULES: list[tuple[tuple[str, ...], tuple[str, ...], str | None]] = [
     # Fishing puns in dad niche
-    fishing_words = ["reel", "fishing", "catch", "bass", "rod", "tackle", "hooked"]
-    if any(_phrase_has_word(p, w) for w in fishing_words):
-        extra.extend(["fishing", "fishing-gift", "fisherman"])
-
+    (("reel", "fishing", "catch", "bass", "rod", "tackle", "hooked"),
+     ("fishing", "fishing-gift", "fisherman"), None),
     # Beer/drinking references
-    beer_words = ["beer", "brew", "ale", "ipa", "pint", "keg", "draft"]
-    if any(_phrase_has_word(p, w) for w in beer_words):
-        extra.extend(["beer-lover", "craft-beer"])
-
+    (("beer", "brew", "ale", "ipa", "pint", "keg", "draft"),
+     ("beer-lover", "craft-beer"), None),
     # Pet-specific (whole-word matching to avoid "education" → "cat")
-    if any(_phrase_has_word(p, w) for w in ["dog", "puppy", "bark", "woof", "paw"]):
-        extra.extend(["dog-lover", "dog-mom"])
-    if any(_phrase_has_word(p, w) for w in ["cat", "kitten", "meow", "purr"]):
-        extra.extend(["cat-lover", "cat-mom"])
-
+    (("dog", "puppy", "bark", "woof", "paw"), ("dog-lover", "dog-mom"), None),
+    (("cat", "kitten", "meow", "purr"), ("cat-lover", "cat-mom"), None),
     # Food references in coffee
-    food_words = ["espresso", "latte", "cappuccino", "mocha", "brew"]
-    if niche == "coffee" and any(_phrase_has_word(p, w) for w in food_words):
-        extra.extend(["coffee-drinker", "morning-coffee"])
-
+    (("espresso", "latte", "cappuccino", "mocha", "brew"),
+     ("coffee-drinker", "morning-coffee"), "coffee"),
     # Gaming specific
-    game_words = ["level", "respawn", "noob", "rage", "loot", "quest"]
-    if any(_phrase_has_word(p, w) for w in game_words):
-        extra.extend(["video-game", "gamer-life"])
-
+    (("level", "respawn", "noob", "rage", "loot", "quest"),
+     ("video-game", "gamer-life"), None),
     # Gym/fitness specific
-    gym_words = ["squat", "deadlift", "bench", "protein", "gains", "swole", "beast"]
-    if any(_phrase_has_word(p, w) for w in gym_words):
-        extra.extend(["gym-rat", "bodybuilder"])
+    (("squat", "deadlift", "bench", "protein", "gains", "swole", "beast"),
+     ("gym-rat", "bodybuilder"), None),
+]
+
+
+def _compile_keyword_matcher(
+    rules: list[tuple[tuple[str, ...], tuple[str, ...], str | None]],
+) -> tuple[re.Pattern, dict[str, list[int]]]:
+    """Build one whole-word regex over every trigger word, plus word -> rule indexes."""
+    word_rules: dict[str, list[int]] = {}
+    for i, (words, _, _) in enumerate(rules):
+        for w in words:
+            word_rules.setdefault(w, []).append(i)
+    alternation = "|".join(re.escape(w) for w in sorted(word_rules, key=len, reverse=True))
+    return re.compile(rf"\b(?:{alternation})\b"), word_rules
 
+
+_CONTEXT_PATTERN, _CONTEXT_WORD_RULES = _compile_keyword_matcher(SPECIAL_CONTEXT_RULES)
+
+
+def detect_special_context(phrase: str, niche: str) -> list[str]:
+    """Detect special context in the phrase that should generate extra tags."""
+    matched: set[int] = set()
+    for word in _CONTEXT_PATTERN.findall(phrase.lower()):
+        matched.update(_CONTEXT_WORD_RULES[word])
+
+    extra = []
+    for i in sorted(matched):
+        _, tags, only_niche = SPECIAL_CONTEXT_RULES[i]
+        if only_niche is None or only_niche == niche:
+            extra.extend(tags)
     return extra
 
 
@@ -271,12 +288,7 @@ def optimize_title(title: str, niche: str) -> str:
 
 def find_duplicate_titles(folder: str) -> dict[str, list[Path]]:
     """Find designs with identical titles within a folder."""
-    title_to_files: dict[str, list[Path]] = {}
-    for jf in sorted((OUTPUT_DIR / folder).glob("*.json")):
-        meta = json.loads(jf.read_text())
-        title = meta.get("title", "")
-        title_to_files.setdefault(title, []).append(jf)
-    return {t: files for t, files in title_to_files.items() if len(files) > 1}
+    return get_store(OUTPUT_DIR, [folder]).duplicate_titles(folder)
 
 
 # ---------------------------------------------------------------------------
@@ -318,6 +330,8 @@ def restore_metadata() -> None:
         for jf in src_dir.glob("*.json"):
             shutil.copy2(jf, dst_dir / jf.name)
             count += 1
+        # copy2 keeps the backup's mtime; re-read every sidecar rather than trust it
+        get_store(OUTPUT_DIR).sync(folder, force=True)
 
     print(f"Restored {count} metadata files from backup.")
     print(f"  You can delete the backup with: rm -rf {BACKUP_DIR}")
@@ -330,17 +344,13 @@ def restore_metadata() -> None:
 def analyze() -> None:
     """Print a detailed SEO analysis of current tags and titles."""
     print("=== SEO ANALYSIS ===\n")
+    store = get_store(OUTPUT_DIR, FOLDERS)
 
     for niche in sorted(CORE_NICHE_TAGS.keys()):
-        designs = list((OUTPUT_DIR / "tshirt").glob(f"{niche}_*.json"))
-        if not designs:
+        all_tags = store.tag_lists("tshirt", niche)
+        if not all_tags:
             continue
 
-        all_tags: list[list[str]] = []
-        for jf in designs:
-            meta = json.loads(jf.read_text())
-            all_tags.append(meta.get("tags", []))
-
         # Compute overlap
         tag_sets = [set(tags) for tags in all_tags]
         overlaps = []
@@ -352,11 +362,11 @@ def analyze() -> None:
         avg_overlap = sum(overlaps) / len(overlaps) if overlaps else 0
 
         # Count universal tags
-        tag_counter = Counter(t for tags in all_tags for t in tags)
-        universal = sum(1 for _, c in tag_counter.items() if c == len(designs))
+        tag_counter = store.tag_counts("tshirt", niche)
+        universal = sum(1 for _, c in tag_counter.items() if c == len(all_tags))
 
         severity = "!!!" if avg_overlap > 0.75 else "! " if avg_overlap > 0.60 else "ok"
-        print(f"  {niche:15s}  {len(designs):3d} designs  overlap={avg_overlap:.0%}  universal={universal:2d}/15  {severity}")
+        print(f"  {niche:15s}  {len(all_tags):3d} designs  overlap={avg_overlap:.0%}  universal={universal:2d}/15  {severity}")
 
     # Duplicates
     print("\nDuplicate titles:")
@@ -368,16 +378,47 @@ def analyze() -> None:
 
     # Title suffix analysis
     print("\nTitle suffixes (tshirt):")
-    suffixes = Counter()
-    for jf in (OUTPUT_DIR / "tshirt").glob("*.json"):
-        meta = json.loads(jf.read_text())
-        title = meta.get("title", "")
-        if " - " in title:
-            suffixes[title.split(" - ")[-1]] += 1
+    suffixes = store.title_suffixes("tshirt")
     for s, c in suffixes.most_common(10):
         print(f"  \"{s}\": {c}")
 
 
+def bulk_analyze(target_folder: str | None = None, export_dir: Path | None = None) -> None:
+    """Matrix-based analysis of every niche plus near-duplicate titles (numpy)."""
+    import seo_analysis
+
+    folders = [target_folder] if target_folder else FOLDERS
+    store = get_store(OUTPUT_DIR, folders)
+    reports = [
+        seo_analysis.analyze_folder(store, folder, phrase_fn=extract_phrase)
+        for folder in folders
+        if store.count(folder)
+    ]
+
+    print("=== SEO ANALYSIS (bulk) ===")
+    for r in reports:
+        print(f"\n[{r['folder']}] {r['designs']} designs, {r['distinct_tags']} distinct tags")
+        for row in sorted(r["niches"], key=lambda x: x["niche"]):
+            overlap = row["consecutive_overlap"]
+            severity = "!!!" if overlap > 0.75 else "! " if overlap > 0.60 else "ok"
+            print(f"  {row['niche']:15s}  {row['designs']:5d} designs  overlap={overlap:.0%}  "
+                  f"pairwise={row['pairwise_overlap']:.0%}  universal={row['universal_tags']:2d}  {severity}")
+
+        top = ", ".join(f"{t}({c})" for t, c in r["tag_frequency"]["top"][:10])
+        print(f"  Top tags: {top}")
+
+        dupes = r["near_duplicates"]
+        exact = sum(1 for g in dupes if g["exact"])
+        print(f"  Near-duplicate title groups: {len(dupes)} ({exact} exact)")
+        for g in dupes[:10]:
+            first = g["designs"][0]
+            print(f"    \"{first['title'][:60]}\" x{len(g['designs'])}{'' if g['exact'] else ' (similar)'}")
+
+    if export_dir:
+        for path in seo_analysis.write_reports(reports, export_dir):
+            print(f"Wrote {path}")
+
+
 # ---------------------------------------------------------------------------
 # Preview / Apply
 # ---------------------------------------------------------------------------
@@ -391,18 +432,19 @@ def process_designs(
     folders = [target_folder] if target_folder else FOLDERS
     total_modified = 0
     previewed = 0
+    store = get_store(OUTPUT_DIR)
+    writer = MetadataBatchWriter(OUTPUT_DIR, store=store) if apply else None
 
     for folder in folders:
         folder_dir = OUTPUT_DIR / folder
         if not folder_dir.is_dir():
             continue
 
-        jsons = sorted(folder_dir.glob("*.json"))
+        store.sync(folder)
         niche_counters: dict[str, int] = {}
 
-        for jf in jsons:
-            meta = json.loads(jf.read_text())
-            niche = jf.stem.split("_")[0]
+        for jf, meta in store.designs(folder):
+            niche = niche_of(jf.stem)
 
             # Track per-niche index for gift tag rotation
             niche_counters[niche] = niche_counters.get(niche, 0)
@@ -444,10 +486,11 @@ def process_designs(
                 # Apply
                 meta["tags"] = new_tags
                 meta["title"] = new_title
-                jf.write_text(json.dumps(meta, indent=2) + "\n")
+                writer.write(jf, meta)
                 total_modified += 1
 
     if apply:
+        writer.flush()
         print(f"Updated {total_modified} metadata files across {', '.join(folders)}")
     elif previewed:
         print(f"Previewed {previewed} changes. Run with --apply to write them.")
@@ -466,6 +509,7 @@ def main() -> None:
         epilog="""\
 Examples:
   python3 optimize_seo.py --analyze                  # Show current issues
+  python3 optimize_seo.py --analyze --bulk --export reports/
   python3 optimize_seo.py --preview --limit 10       # Preview first 10 changes
   python3 optimize_seo.py --preview --folder tshirt   # Preview one folder
   python3 optimize_seo.py --apply                     # Apply to all designs
@@ -476,6 +520,14 @@ Examples:
         "--analyze", action="store_true",
         help="Analyze current tag/title quality",
     )
+    parser.add_argument(
+        "--bulk", action="store_true",
+        help="With --analyze: matrix-based overlap, tag histogram and near-duplicate titles",
+    )
+    parser.add_argument(
+        "--export", type=Path,
+        help="With --analyze --bulk: write CSV and JSON reports to this directory",
+    )
     parser.add_argument(
         "--preview", action="store_true",
         help="Preview optimized tags and titles without writing",
@@ -503,7 +555,10 @@ Examples:
         return
 
     if args.analyze:
-        analyze()
+        if args.bulk:
+            bulk_analyze(target_folder=args.folder, export_dir=args.export)
+        else:
+            analyze()
         return
 
     if args.preview:
@@ -18,12 +18,14 @@ Usage:
 from __future__ import annotations
 
 import argparse
-import json
 import random
 import shutil
 import sys
 from pathlib import Path
 
+from src.metadata_store import get_store
+from src.metadata_writer import MetadataBatchWriter
+
 # ---------------------------------------------------------------------------
 # Constants
 # ---------------------------------------------------------------------------
@@ -189,6 +191,8 @@ def restore_metadata() -> None:
     for jf in BACKUP_DIR.glob("*.json"):
         shutil.copy2(jf, STICKER_DIR / jf.name)
         count += 1
+    # copy2 keeps the backup's mtime; re-read every sidecar rather than trust it
+    get_store(OUTPUT_DIR).sync("sticker", force=True)
 
     print(f"Restored {count} sticker metadata files from backup.")
     print(f"  You can delete the backup with: rm -rf {BACKUP_DIR}")
@@ -200,7 +204,8 @@ def restore_metadata() -> None:
 
 def process_stickers(apply: bool = False, preview_limit: int = 0) -> None:
     """Preview or apply sticker metadata optimizations."""
-    jsons = sorted(STICKER_DIR.glob("*.json"))
+    store = get_store(OUTPUT_DIR, ["sticker"])
+    jsons = store.designs("sticker")
 
     if not jsons:
         print("No sticker metadata files found.")
@@ -208,6 +213,7 @@ def process_stickers(apply: bool = False, preview_limit: int = 0) -> None:
 
     print(f"Found {len(jsons)} sticker metadata files\n")
 
+    writer = MetadataBatchWriter(OUTPUT_DIR, store=store) if apply else None
     modified = 0
     previewed = 0
     title_fixes = 0
@@ -215,8 +221,7 @@ def process_stickers(apply: bool = False, preview_limit: int = 0) -> None:
     tag_fixes = 0
     hyphen_tags_found = 0
 
-    for i, jf in enumerate(jsons):
-        meta = json.loads(jf.read_text())
+    for i, (jf, meta) in enumerate(jsons):
         old_title = meta.get("title", "")
         old_desc = meta.get("description", "")
         old_tags = meta.get("tags", [])
@@ -262,9 +267,12 @@ def process_stickers(apply: bool = False, preview_limit: int = 0) -> None:
             meta["title"] = new_title
             meta["description"] = new_desc
             meta["tags"] = new_tags
-            jf.write_text(json.dumps(meta, indent=2) + "\n")
+            writer.write(jf, meta)
             modified += 1
 
+    if writer:
+        writer.flush()
+
     print(f"--- Summary ---")
     print(f"  Total files:     {len(jsons)}")
     print(f"  Title fixes:     {title_fixes}")
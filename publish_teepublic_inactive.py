@@ -17,7 +17,7 @@ import re
 import time
 from pathlib import Path
 
-from upload_common import launch_browser, wait_for_cloudflare
+from upload_common import launch_browser, load_tracker, wait_for_cloudflare
 from upload_teepublic import _set_product_colors
 
 SESSION_DIR = Path(__file__).parent / ".teepublic_session"
@@ -83,21 +83,19 @@ def _find_metadata_for_design(page, design_id: str) -> dict:
     import glob
 
     # Check tracker for the design key
-    tracker_file = Path(__file__).parent / "uploaded_teepublic.json"
-    if tracker_file.exists():
-        tracker = json.loads(tracker_file.read_text())
-        for key, entry in tracker.items():
-            # The key looks like "ext:output/tshirt/amsterdam_canals_cafe_terrace"
-            # The design ID is not stored, but we can use the key to find metadata
-            base = key.replace("ext:", "")
-            # Try both phase directories
-            for phase_dir in [
-                Path("/Users/rebelhawk/Documents/Claude/landmark-style-transfer-unified/"),
-            ]:
-                json_path = phase_dir / f"{base}.json"
-                if json_path.exists():
-                    meta = json.loads(json_path.read_text())
-                    return meta
+    tracker = load_tracker(Path(__file__).parent / "uploaded_teepublic.json")
+    for key, entry in tracker.items():
+        # The key looks like "ext:output/tshirt/amsterdam_canals_cafe_terrace"
+        # The design ID is not stored, but we can use the key to find metadata
+        base = key.replace("ext:", "")
+        # Try both phase directories
+        for phase_dir in [
+            Path("/Users/rebelhawk/Documents/Claude/landmark-style-transfer-unified/"),
+        ]:
+            json_path = phase_dir / f"{base}.json"
+            if json_path.exists():
+                meta = json.loads(json_path.read_text())
+                return meta
     return {}
 
 
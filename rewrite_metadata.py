@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""Single-pass metadata rewrite engine.
+
+Runs an ordered pipeline of tag/title/description rules over every design's
+metadata JSON in one read-modify-write pass, instead of separate passes from
+fix_tags.py, optimize_seo.py and optimize_sticker_metadata.py. Only files
+whose content actually changes are written (atomically, in journaled batches
+via src/metadata_writer.py), and each original is backed up once into a
+journaled backup directory that --restore replays.
+
+Rules (applied in the order given to --rules):
+    clean_tags           fix_tags.clean_tags — drop junk tags, backfill to 15
+    optimize_tags        optimize_seo.optimize_tags — phrase/niche/gift tags
+    optimize_title       optimize_seo.optimize_title — niche title suffix
+    rewrite_title        sticker title suffix (sticker folder only)
+    rewrite_description  sticker description copy (sticker folder only)
+    rewrite_tags         Printify sticker tags (sticker folder only)
+
+Usage:
+    python3 rewrite_metadata.py --preview --limit 10          # Full SEO refresh preview
+    python3 rewrite_metadata.py --apply                        # Full SEO refresh
+    python3 rewrite_metadata.py --apply --rules clean_tags     # One rule only
+    python3 rewrite_metadata.py --apply --folder sticker
+    python3 rewrite_metadata.py --restore                      # Undo from journal
+    python3 rewrite_metadata.py --recover resume               # Finish a crashed batch
+    python3 rewrite_metadata.py --recover rollback             # ...or undo it
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import shutil
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+import fix_tags
+import optimize_seo
+import optimize_sticker_metadata
+from src.metadata_store import get_store, niche_of
+from src.metadata_writer import MetadataBatchWriter, recover_journal
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+OUTPUT_DIR = Path(__file__).parent / "output"
+BACKUP_DIR = Path(__file__).parent / "output_rewrite_backup"
+JOURNAL_FILE = BACKUP_DIR / "journal.jsonl"
+FOLDERS = ["tshirt", "sticker", "poster"]
+
+DEFAULT_RULES = [
+    "clean_tags", "optimize_tags", "optimize_title",
+    "rewrite_title", "rewrite_description", "rewrite_tags",
+]
+
+
+# ---------------------------------------------------------------------------
+# Rules
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class RewriteContext:
+    folder: str
+    niche: str
+    niche_index: int  # position within the niche (gift tag rotation)
+    file_index: int   # position within the folder (sticker template rotation)
+
+
+@dataclass(frozen=True)
+class Rule:
+    name: str
+    apply: Callable[[dict, RewriteContext], None]
+    folders: tuple[str, ...] | None = None  # None = every folder
+
+
+def _clean_tags(meta: dict, ctx: RewriteContext) -> None:
+    meta["tags"] = fix_tags.clean_tags(meta.get("tags", []), ctx.niche)
+
+
+def _optimize_tags(meta: dict, ctx: RewriteContext) -> None:
+    phrase = optimize_seo.extract_phrase(meta.get("title", ""))
+    meta["tags"] = optimize_seo.optimize_tags(meta.get("tags", []), phrase, ctx.niche, ctx.niche_index)
+
+
+def _optimize_title(meta: dict, ctx: RewriteContext) -> None:
+    meta["title"] = optimize_seo.optimize_title(meta.get("title", ""), ctx.niche)
+
+
+def _rewrite_title(meta: dict, ctx: RewriteContext) -> None:
+    meta["title"] = optimize_sticker_metadata.rewrite_title(meta.get("title", ""))
+
+
+def _rewrite_description(meta: dict, ctx: RewriteContext) -> None:
+    meta["description"] = optimize_sticker_metadata.rewrite_description(
+        meta.get("title", ""), meta.get("description", ""), ctx.file_index,
+    )
+
+
+def _rewrite_tags(meta: dict, ctx: RewriteContext) -> None:
+    meta["tags"] = optimize_sticker_metadata.rewrite_tags(meta.get("tags", []), ctx.file_index)
+
+
+RULES: dict[str, Rule] = {
+    "clean_tags": Rule("clean_tags", _clean_tags),
+    "optimize_tags": Rule("optimize_tags", _optimize_tags),
+    "optimize_title": Rule("optimize_title", _optimize_title),
+    "rewrite_title": Rule("rewrite_title", _rewrite_title, folders=("sticker",)),
+    "rewrite_description": Rule("rewrite_description", _rewrite_description, folders=("sticker",)),
+    "rewrite_tags": Rule("rewrite_tags", _rewrite_tags, folders=("sticker",)),
+}
+
+
+def build_pipeline(names: list[str]) -> list[Rule]:
+    unknown = [n for n in names if n not in RULES]
+    if unknown:
+        raise ValueError(f"Unknown rule(s): {', '.join(unknown)}. Available: {', '.join(RULES)}")
+    return [RULES[n] for n in names]
+
+
+def apply_pipeline(meta: dict, pipeline: list[Rule], ctx: RewriteContext) -> dict:
+    """Return a rewritten copy of meta; the input dict is left untouched."""
+    new_meta = copy.deepcopy(meta)
+    for rule in pipeline:
+        if rule.folders is None or ctx.folder in rule.folders:
+            rule.apply(new_meta, ctx)
+    return new_meta
+
+
+# ---------------------------------------------------------------------------
+# Journaled backup / restore
+# ---------------------------------------------------------------------------
+
+def backup_file(meta_path: Path, run_id: str) -> None:
+    """Copy the original sidecar into the backup dir (first rewrite only)."""
+    rel = meta_path.relative_to(OUTPUT_DIR)
+    dst = BACKUP_DIR / rel
+    if dst.exists():
+        return
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copy2(meta_path, dst)
+    with open(JOURNAL_FILE, "a") as f:
+        f.write(json.dumps({
+            "run": run_id,
+            "path": rel.as_posix(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }) + "\n")
+
+
+def restore_metadata() -> None:
+    """Restore every journaled original and drop the backup."""
+    if not JOURNAL_FILE.exists():
+        print("No rewrite journal found. Nothing to restore.")
+        return
+
+    store = get_store(OUTPUT_DIR)
+    count = 0
+    with open(JOURNAL_FILE) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            rel = json.loads(line)["path"]
+            src = BACKUP_DIR / rel
+            if not src.exists():
+                continue
+            dst = OUTPUT_DIR / rel
+            shutil.copy2(src, dst)
+            store.upsert(dst, json.loads(dst.read_text()))
+            count += 1
+
+    shutil.rmtree(BACKUP_DIR)
+    print(f"Restored {count} metadata files from {BACKUP_DIR}/ (backup removed).")
+
+
+# ---------------------------------------------------------------------------
+# Preview / Apply
+# ---------------------------------------------------------------------------
+
+def run_pipeline(
+    rule_names: list[str],
+    folders: list[str],
+    apply: bool = False,
+    preview_limit: int = 0,
+) -> dict:
+    """Run the pipeline over each folder in one pass. Returns stats."""
+    pipeline = build_pipeline(rule_names)
+    run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    store = get_store(OUTPUT_DIR)
+    writer = MetadataBatchWriter(OUTPUT_DIR, store=store) if apply else None
+    stats = {"total": 0, "changed": 0, "written": 0}
+    previewed = 0
+
+    for folder in folders:
+        if not (OUTPUT_DIR / folder).is_dir():
+            continue
+        store.sync(folder)
+        niche_counters: dict[str, int] = {}
+
+        for file_index, (jf, meta) in enumerate(store.designs(folder)):
+            niche = niche_of(jf.stem)
+            niche_index = niche_counters.get(niche, 0)
+            niche_counters[niche] = niche_index + 1
+
+            ctx = RewriteContext(folder, niche, niche_index, file_index)
+            new_meta = apply_pipeline(meta, pipeline, ctx)
+            stats["total"] += 1
+            if new_meta == meta:
+                continue
+            stats["changed"] += 1
+
+            if not apply:
+                if preview_limit and previewed >= preview_limit:
+                    continue
+                previewed += 1
+                print(f"[{folder}/{jf.stem}]")
+                for field in ("title", "description", "tags"):
+                    old, new = meta.get(field), new_meta.get(field)
+                    if old == new:
+                        continue
+                    if field == "tags":
+                        print(f"  Tags:   {', '.join(new)}")
+                    else:
+                        print(f"  {field.title()}:  \"{str(old)[:80]}\"")
+                        print(f"      ->  \"{str(new)[:80]}\"")
+                print()
+                continue
+
+            if not BACKUP_DIR.exists():
+                BACKUP_DIR.mkdir(parents=True)
+            backup_file(jf, run_id)
+            writer.write(jf, new_meta)
+            stats["written"] += 1
+
+    if writer:
+        writer.flush()
+    return stats
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Rewrite design metadata with an ordered rule pipeline in one pass.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=f"""\
+Rules: {', '.join(RULES)}
+
+Examples:
+  python3 rewrite_metadata.py --preview --limit 10
+  python3 rewrite_metadata.py --apply
+  python3 rewrite_metadata.py --apply --rules clean_tags,optimize_tags --folder tshirt
+  python3 rewrite_metadata.py --restore
+""",
+    )
+    parser.add_argument(
+        "--rules", default=",".join(DEFAULT_RULES),
+        help=f"Comma-separated rules in order (default: {','.join(DEFAULT_RULES)})",
+    )
+    parser.add_argument(
+        "--folder",
+        help="Target a specific folder (tshirt, sticker, poster)",
+    )
+    parser.add_argument(
+        "--preview", action="store_true",
+        help="Preview changes without writing",
+    )
+    parser.add_argument(
+        "--apply", action="store_true",
+        help="Write changed files (originals journaled to the backup dir)",
+    )
+    parser.add_argument(
+        "--restore", action="store_true",
+        help="Restore originals recorded in the rewrite journal",
+    )
+    parser.add_argument(
+        "--recover", choices=["resume", "rollback"],
+        help="Finish or undo a batch write interrupted by a crash",
+    )
+    parser.add_argument(
+        "--limit", type=int, default=0,
+        help="Limit preview output to N designs",
+    )
+    args = parser.parse_args()
+
+    if args.recover:
+        count = recover_journal(OUTPUT_DIR, args.recover)
+        if count:
+            print(f"Recovered ({args.recover}) {count} journaled metadata files.")
+        else:
+            print("No unfinished batch journal found.")
+        return
+
+    if args.restore:
+        restore_metadata()
+        return
+
+    if not (args.preview or args.apply):
+        parser.print_help()
+        return
+
+    rule_names = [r.strip() for r in args.rules.split(",") if r.strip()]
+    try:
+        build_pipeline(rule_names)
+    except ValueError as e:
+        parser.error(str(e))
+
+    folders = [args.folder] if args.folder else FOLDERS
+    stats = run_pipeline(rule_names, folders, apply=args.apply, preview_limit=args.limit)
+
+    print(f"--- Summary ({' -> '.join(rule_names)}) ---")
+    print(f"  Files scanned: {stats['total']}")
+    print(f"  Changed:       {stats['changed']}")
+    if args.apply:
+        print(f"  Written:       {stats['written']}")
+        if stats["written"]:
+            print(f"  Backup:        {BACKUP_DIR}/ (undo with --restore)")
+    elif stats["changed"]:
+        print("\n  Run with --apply to write them.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""Bulk tag-overlap and near-duplicate analysis over the metadata index.
+
+Builds a sparse design-by-tag incidence matrix (coordinate arrays) per folder
+and computes niche tag overlap, tag-frequency histograms, and MinHash/LSH
+near-duplicate title groups with numpy, so a 50k-design catalog analyzes in
+seconds instead of looping over Python sets. Used by
+``optimize_seo.py --analyze --bulk``.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+NUM_PERM = 64
+LSH_BANDS = 16  # 16 bands x 4 rows -> candidate pairs from ~0.5 similarity
+NEAR_DUP_THRESHOLD = 0.8
+SHINGLE_SIZE = 4
+
+
+# ---------------------------------------------------------------------------
+# Incidence matrix
+# ---------------------------------------------------------------------------
+
+@dataclass
+class IncidenceMatrix:
+    """Design-by-tag incidence in coordinate form (one entry per design/tag)."""
+
+    paths: list[str]
+    titles: list[str]
+    niches: list[str]       # niche name per niche id
+    niche_ids: np.ndarray   # niche id per design row
+    tags: list[str]         # tag name per column
+    rows: np.ndarray        # design row of each nonzero
+    cols: np.ndarray        # tag column of each nonzero
+
+    @property
+    def n_designs(self) -> int:
+        return len(self.paths)
+
+
+def build_incidence(store, folder: str) -> IncidenceMatrix:
+    """Build the incidence matrix for one folder, rows grouped by niche."""
+    tag_ids: dict[str, int] = {}
+    niche_index: dict[str, int] = {}
+    paths: list[str] = []
+    titles: list[str] = []
+    niche_ids: list[int] = []
+    rows: list[int] = []
+    cols: list[int] = []
+
+    last = None
+    for path, niche, title, tag in store.tag_rows(folder):
+        if path != last:
+            last = path
+            paths.append(path)
+            titles.append(title)
+            niche_ids.append(niche_index.setdefault(niche, len(niche_index)))
+        if tag is None:
+            continue
+        rows.append(len(paths) - 1)
+        cols.append(tag_ids.setdefault(tag, len(tag_ids)))
+
+    # Drop repeated tags within a design
+    n_tags = max(len(tag_ids), 1)
+    keys = np.unique(np.asarray(rows, dtype=np.int64) * n_tags + np.asarray(cols, dtype=np.int64))
+
+    return IncidenceMatrix(
+        paths=paths,
+        titles=titles,
+        niches=list(niche_index),
+        niche_ids=np.asarray(niche_ids, dtype=np.int64),
+        tags=list(tag_ids),
+        rows=keys // n_tags,
+        cols=keys % n_tags,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Overlap / frequency
+# ---------------------------------------------------------------------------
+
+def niche_overlap(m: IncidenceMatrix) -> list[dict]:
+    """Per-niche overlap stats.
+
+    consecutive_overlap is the mean Jaccard between neighbouring designs (the
+    metric the classic --analyze prints); mean_shared_tags is the average
+    number of tags any two designs in the niche share, from column counts.
+    """
+    n = m.n_designs
+    k = len(m.niches)
+    if n == 0:
+        return []
+    n_tags = max(len(m.tags), 1)
+    keys = m.rows * n_tags + m.cols
+    tags_per_row = np.bincount(m.rows, minlength=n)
+    niche_sizes = np.bincount(m.niche_ids, minlength=k)
+
+    # Consecutive-pair Jaccard: shift row i+1 onto row i and intersect
+    later = m.rows > 0
+    shifted = keys[later] - n_tags
+    shared_rows = (m.rows[later] - 1)[np.isin(shifted, keys, assume_unique=True)]
+    inter = np.bincount(shared_rows, minlength=n)[: n - 1]
+    union = tags_per_row[:-1] + tags_per_row[1:] - inter
+    valid = (m.niche_ids[:-1] == m.niche_ids[1:]) & (union > 0)
+    jaccard = np.divide(inter, union, out=np.zeros(n - 1), where=union > 0)
+    pair_niche = m.niche_ids[:-1][valid]
+    jac_sum = np.bincount(pair_niche, weights=jaccard[valid], minlength=k)
+    jac_cnt = np.bincount(pair_niche, minlength=k)
+
+    # Per-niche document frequency of each tag
+    niche_keys, df = np.unique(m.niche_ids[m.rows] * n_tags + m.cols, return_counts=True)
+    key_niche = niche_keys // n_tags
+    universal = np.bincount(key_niche[df == niche_sizes[key_niche]], minlength=k)
+    shared_pairs = np.bincount(key_niche, weights=df * (df - 1) / 2, minlength=k)
+    tag_total = np.bincount(m.niche_ids[m.rows], minlength=k)
+
+    report = []
+    for i, niche in enumerate(m.niches):
+        size = int(niche_sizes[i])
+        pairs = size * (size - 1) / 2
+        mean_shared = shared_pairs[i] / pairs if pairs else 0.0
+        mean_tags = tag_total[i] / size if size else 0.0
+        report.append({
+            "niche": niche,
+            "designs": size,
+            "consecutive_overlap": round(float(jac_sum[i] / jac_cnt[i]), 4) if jac_cnt[i] else 0.0,
+            "mean_shared_tags": round(float(mean_shared), 3),
+            "pairwise_overlap": round(float(mean_shared / mean_tags), 4) if mean_tags else 0.0,
+            "universal_tags": int(universal[i]),
+        })
+    return report
+
+
+def tag_frequency(m: IncidenceMatrix, top: int = 50) -> dict:
+    """Tag document frequencies plus a histogram of how widely tags are used."""
+    df = np.bincount(m.cols, minlength=len(m.tags))
+    order = np.argsort(-df, kind="stable")
+    hist = np.bincount(df) if len(df) else np.zeros(0, dtype=np.int64)
+    return {
+        "counts": {m.tags[i]: int(df[i]) for i in order},
+        "top": [(m.tags[i], int(df[i])) for i in order[:top]],
+        # designs-per-tag -> number of tags used by exactly that many designs
+        "histogram": {int(c): int(v) for c, v in enumerate(hist) if v and c},
+    }
+
+
+# ---------------------------------------------------------------------------
+# MinHash / LSH near-duplicate titles
+# ---------------------------------------------------------------------------
+
+def minhash_signatures(texts: list[str], num_perm: int = NUM_PERM, seed: int = 42) -> tuple[np.ndarray, np.ndarray]:
+    """MinHash signatures over character shingles.
+
+    Returns (signatures, has_shingles); rows for empty texts are not valid.
+    """
+    owners: list[int] = []
+    hashes: list[int] = []
+    for i, text in enumerate(texts):
+        s = " ".join(text.lower().split())
+        if not s:
+            continue
+        grams = {s[j:j + SHINGLE_SIZE] for j in range(max(1, len(s) - SHINGLE_SIZE + 1))}
+        owners.extend([i] * len(grams))
+        hashes.extend(zlib.crc32(g.encode()) for g in grams)
+
+    sig = np.full((len(texts), num_perm), np.iinfo(np.uint64).max, dtype=np.uint64)
+    valid = np.zeros(len(texts), dtype=bool)
+    if not owners:
+        return sig, valid
+
+    owner_arr = np.asarray(owners, dtype=np.int64)
+    x = np.asarray(hashes, dtype=np.uint64)
+    present, starts = np.unique(owner_arr, return_index=True)
+    valid[present] = True
+
+    # Multiply-shift hashing: 64-bit odd multipliers, products wrap mod 2^64
+    rng = np.random.default_rng(seed)
+    top = np.iinfo(np.uint64).max
+    a = rng.integers(0, top, size=num_perm, dtype=np.uint64, endpoint=True) | np.uint64(1)
+    b = rng.integers(0, top, size=num_perm, dtype=np.uint64, endpoint=True)
+    shift = np.uint64(32)
+    for k in range(num_perm):
+        h = (a[k] * x + b[k]) >> shift
+        sig[present, k] = np.minimum.reduceat(h, starts)
+    return sig, valid
+
+
+def near_duplicate_groups(
+    sig: np.ndarray,
+    valid: np.ndarray,
+    threshold: float = NEAR_DUP_THRESHOLD,
+    bands: int = LSH_BANDS,
+) -> list[list[tuple[int, float]]]:
+    """Group rows whose estimated Jaccard with a bucket head meets threshold.
+
+    Each group is a list of (row, similarity-to-first-row), first row first.
+    """
+    n, num_perm = sig.shape
+    per_band = num_perm // bands
+    parent = list(range(n))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    idx = np.flatnonzero(valid)
+    if len(idx) < 2:
+        return []
+    mix = np.random.default_rng(7).integers(
+        0, np.iinfo(np.uint64).max, size=per_band, dtype=np.uint64, endpoint=True,
+    ) | np.uint64(1)
+
+    for band in range(bands):
+        # Fold the band's rows into one 64-bit bucket key (collisions are re-verified)
+        block = sig[idx, band * per_band:(band + 1) * per_band]
+        bucket_key = (block * mix[:per_band]).sum(axis=1)
+        _, inverse, counts = np.unique(bucket_key, return_inverse=True, return_counts=True)
+        members = idx[np.argsort(inverse, kind="stable")]
+        starts = np.cumsum(counts) - counts
+        # Compare every bucket member against its bucket's first member at once
+        heads = members[np.repeat(starts, counts)]
+        candidate = members != heads
+        members, heads = members[candidate], heads[candidate]
+        sim = (sig[members] == sig[heads]).mean(axis=1)
+        for head, other in zip(heads[sim >= threshold].tolist(), members[sim >= threshold].tolist()):
+            ra, rb = find(head), find(other)
+            if ra != rb:
+                parent[max(ra, rb)] = min(ra, rb)
+
+    clusters: dict[int, list[int]] = {}
+    for i in idx:
+        clusters.setdefault(find(int(i)), []).append(int(i))
+
+    groups = []
+    for root, members in sorted(clusters.items()):
+        if len(members) < 2:
+            continue
+        sims = (sig[members] == sig[root]).mean(axis=1)
+        groups.append([(m, round(float(s), 3)) for m, s in zip(members, sims)])
+    return groups
+
+
+# ---------------------------------------------------------------------------
+# Catalog report
+# ---------------------------------------------------------------------------
+
+def analyze_folder(
+    store,
+    folder: str,
+    phrase_fn: Callable[[str], str] = lambda t: t,
+    threshold: float = NEAR_DUP_THRESHOLD,
+) -> dict:
+    """Overlap, tag frequency and near-duplicate groups for one folder."""
+    m = build_incidence(store, folder)
+    sig, valid = minhash_signatures([phrase_fn(t) for t in m.titles])
+    groups = []
+    for members in near_duplicate_groups(sig, valid, threshold):
+        titles = {m.titles[i] for i, _ in members}
+        groups.append({
+            "exact": len(titles) == 1,
+            "designs": [
+                {"path": m.paths[i], "title": m.titles[i], "similarity": s}
+                for i, s in members
+            ],
+        })
+    return {
+        "folder": folder,
+        "designs": m.n_designs,
+        "distinct_tags": len(m.tags),
+        "niches": niche_overlap(m),
+        "tag_frequency": tag_frequency(m),
+        "near_duplicates": groups,
+    }
+
+
+def write_reports(reports: list[dict], export_dir: Path) -> list[Path]:
+    """Write CSV tables plus a full JSON report. Returns written paths."""
+    export_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+
+    path = export_dir / "tag_overlap.csv"
+    with open(path, "w", newline="") as f:
+        fields = ["folder", "niche", "designs", "consecutive_overlap",
+                  "mean_shared_tags", "pairwise_overlap", "universal_tags"]
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for r in reports:
+            for row in r["niches"]:
+                writer.writerow({"folder": r["folder"], **row})
+    written.append(path)
+
+    path = export_dir / "tag_frequency.csv"
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["folder", "tag", "designs"])
+        for r in reports:
+            for tag, count in r["tag_frequency"]["counts"].items():
+                writer.writerow([r["folder"], tag, count])
+    written.append(path)
+
+    path = export_dir / "near_duplicates.csv"
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["folder", "group", "exact", "path", "title", "similarity"])
+        for r in reports:
+            for g, group in enumerate(r["near_duplicates"], 1):
+                for d in group["designs"]:
+                    writer.writerow([r["folder"], g, group["exact"], d["path"], d["title"], d["similarity"]])
+    written.append(path)
+
+    path = export_dir / "seo_report.json"
+    slim = [
+        {**r, "tag_frequency": {k: v for k, v in r["tag_frequency"].items() if k != "counts"}}
+        for r in reports
+    ]
+    path.write_text(json.dumps(slim, indent=2) + "\n")
+    written.append(path)
+
+    return written
@@ -0,0 +1,252 @@
+"""Process-wide OAuth access tokens with background refresh.
+
+Each API uploader registers a ``TokenSource`` for its platform: how to load
+the stored token record (token file or keychain_config entry), when it
+expires and how to refresh it. ``token(platform)`` then answers from
+memory. A daemon thread refreshes every token in use ``ahead`` seconds
+before it expires, so an upload only pays for a refresh (or a keychain
+read) when the background refresh could not happen in time: the first
+use in a process, or a token already within ``REFRESH_MARGIN`` of expiry.
+
+Sources persist what they refresh themselves, so the next process starts
+from the refreshed record. Each platform has its own lock; a refresh for
+one never holds up ``token()`` for another.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import requests
+
+REFRESH_MARGIN = 300   # seconds; closer than this to expiry, token() refreshes first
+REFRESH_AHEAD = 900    # seconds before expiry the background thread refreshes
+RETRY_AFTER = 600      # seconds before a failed background refresh is tried again
+
+
+class CredentialError(RuntimeError):
+    """No stored token for the platform, or it could not be refreshed."""
+
+
+class NotAuthorized(CredentialError):
+    """The platform has no stored token yet (run its OAuth setup)."""
+
+
+def _access_token(record: dict) -> str:
+    return record["access_token"]
+
+
+@dataclass
+class TokenSource:
+    """How one platform stores and refreshes its token.
+
+    ``load`` returns the stored record (empty/None: never authorized).
+    ``refresh`` returns the new record (and saves it); an empty result or
+    an exception means it failed. ``expires_at`` is epoch seconds, or None
+    when the record does not say: the token is used as is and refreshed
+    in the background right away.
+    """
+
+    load: Callable[[], dict | None]
+    refresh: Callable[[dict], dict]
+    expires_at: Callable[[dict], float | None]
+    access_token: Callable[[dict], str] = _access_token
+    ahead: float = REFRESH_AHEAD
+
+
+class CredentialManager:
+    def __init__(self, margin: float = REFRESH_MARGIN, retry_after: float = RETRY_AFTER):
+        self.margin = margin
+        self.retry_after = retry_after
+        self.refreshes: dict[str, int] = {}
+        self._sources: dict[str, TokenSource] = {}
+        self._records: dict[str, dict] = {}
+        self._retry_at: dict[str, float] = {}
+        self._refreshed_at: dict[str, float] = {}
+        self._locks: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def register(self, platform: str, source: TokenSource) -> None:
+        """Set a platform's source (replacing one drops its cached token)."""
+        with self._lock:
+            self._sources[platform] = source
+            self._locks.setdefault(platform, threading.Lock())
+            self._records.pop(platform, None)
+
+    def _platform(self, platform: str) -> tuple[TokenSource, threading.Lock]:
+        with self._lock:
+            if platform not in self._sources:
+                raise CredentialError(f"No token source registered for {platform}")
+            return self._sources[platform], self._locks[platform]
+
+    # -- hot path ------------------------------------------------------------
+
+    def record(self, platform: str) -> dict:
+        """The current (valid) token record for a platform."""
+        source, lock = self._platform(platform)
+        with lock:
+            record = self._records.get(platform)
+            if record is None:
+                record = source.load()
+                if not record:
+                    raise NotAuthorized(f"No stored {platform} token — run its OAuth setup first")
+                self._records[platform] = record
+            expires = source.expires_at(record)
+            if expires is not None and expires - time.time() < self.margin:
+                print(f"  {platform} token expired, refreshing...")
+                record = self._refresh(platform, source, record)
+        self._start()
+        return record
+
+    def token(self, platform: str) -> str:
+        """A valid access token for a platform."""
+        source, _ = self._platform(platform)
+        return source.access_token(self.record(platform))
+
+    def invalidate(self, platform: str) -> None:
+        """Forget the cached token (e.g. after a new authorization or a 401)."""
+        _, lock = self._platform(platform)
+        with lock:
+            self._records.pop(platform, None)
+
+    def _refresh(self, platform: str, source: TokenSource, record: dict) -> dict:
+        """Refresh under the platform lock; on failure the cached token is dropped."""
+        try:
+            new = source.refresh(record)
+        except Exception as e:
+            self._records.pop(platform, None)
+            raise CredentialError(f"{platform} token refresh failed: {e}") from e
+        if not new:
+            self._records.pop(platform, None)
+            raise CredentialError(f"{platform} token refresh failed")
+        self._records[platform] = new
+        self._refreshed_at[platform] = time.time()
+        self._retry_at.pop(platform, None)
+        if source.expires_at(new) is None:
+            # Still no expiry to go by: check again after ``ahead``
+            self._retry_at[platform] = time.time() + source.ahead
+        self.refreshes[platform] = self.refreshes.get(platform, 0) + 1
+        self._wake.set()  # the next due time changed
+        return new
+
+    # -- background refresh --------------------------------------------------
+
+    def _due(self, platform: str) -> float | None:
+        """When the background thread should refresh a cached token."""
+        with self._lock:
+            source = self._sources.get(platform)
+            record = self._records.get(platform)
+        if source is None or record is None:
+            return None
+        expires = source.expires_at(record)
+        if expires is None:
+            due = time.time()
+        else:
+            due = expires - source.ahead
+            if platform in self._refreshed_at:
+                # Tokens that live less than 2 x ahead: refresh at half-life
+                due = max(due, (self._refreshed_at[platform] + expires) / 2)
+        return max(due, self._retry_at.get(platform, 0.0))
+
+    def _refresh_due(self) -> float:
+        """Refresh every token that is due; returns seconds until the next one."""
+        with self._lock:
+            platforms = list(self._records)
+        wait = 3600.0
+        for platform in platforms:
+            due = self._due(platform)
+            if due is None:
+                continue
+            if due > time.time():
+                wait = min(wait, due - time.time())
+                continue
+            source, lock = self._platform(platform)
+            with lock:
+                record = self._records.get(platform)
+                if record is None or self._due(platform) > time.time():
+                    continue  # dropped, or refreshed by token() meanwhile
+                try:
+                    self._refresh(platform, source, record)
+                except CredentialError as e:
+                    # Keep the token we have; it may still be valid
+                    self._records[platform] = record
+                    self._retry_at[platform] = time.time() + self.retry_after
+                    print(f"  Warning: {e} (retrying in {self.retry_after / 60:.0f} min)")
+            wait = 0.0
+        return wait
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            wait = self._refresh_due()
+            if wait > 0:
+                self._wake.wait(wait)
+                self._wake.clear()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped.clear()
+                self._thread = threading.Thread(target=self._run, name="token-refresh", daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+
+_manager = CredentialManager()
+
+
+def get_manager() -> CredentialManager:
+    """The process-wide manager the uploaders register with."""
+    return _manager
+
+
+def register(platform: str, source: TokenSource) -> None:
+    _manager.register(platform, source)
+
+
+def token(platform: str) -> str:
+    """A valid access token for a platform, from the process-wide cache."""
+    return _manager.token(platform)
+
+
+def refresh_grant(
+    token_url: str,
+    refresh_token: str,
+    client_id: str | None = None,
+    client_secret: str | None = None,
+    basic_auth: bool = False,
+    **extra: str,
+) -> dict:
+    """Standard OAuth refresh_token grant; returns the token response + obtained_at.
+
+    Client credentials go in the form, or as HTTP Basic auth with
+    ``basic_auth``. Raises CredentialError on a non-200 answer.
+    """
+    data = {"grant_type": "refresh_token", "refresh_token": refresh_token, **extra}
+    auth = None
+    if basic_auth:
+        auth = (client_id, client_secret)
+    else:
+        if client_id:
+            data["client_id"] = client_id
+        if client_secret:
+            data["client_secret"] = client_secret
+    resp = requests.post(token_url, data=data, auth=auth, timeout=30,
+                         headers={"Content-Type": "application/x-www-form-urlencoded"})
+    if resp.status_code != 200:
+        raise CredentialError(f"HTTP {resp.status_code}: {resp.text.strip()[:300]}")
+    tokens = resp.json()
+    if "access_token" not in tokens:
+        raise CredentialError(f"no access_token in response: {str(tokens)[:300]}")
+    tokens["obtained_at"] = time.time()
+    return tokens
@@ -0,0 +1,172 @@
+"""Pooled keep-alive HTTP sessions for the API uploaders.
+
+``PooledSession`` wraps one ``requests.Session`` per platform so repeated
+calls reuse TLS connections instead of opening a new one each time. It
+retries 429s (honouring Retry-After) with exponential backoff. 5xx
+responses and connection errors are retried only for idempotent methods,
+since a POST that failed with a 502 or a read timeout may still have
+created the listing or pin; a POST is retried only on a connect timeout,
+when the request never reached the server. Latency is recorded per endpoint, with numeric path
+segments collapsed (``/shops/:id/listings/:id/images``).
+
+Given a ``limiter`` (see src/rate_limit.get_limiter), every attempt waits
+for a token, each response's rate-limit headers update the bucket, and a
+429 pauses the bucket for every thread sharing it.
+"""
+
+from __future__ import annotations
+
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.rate_limit import TokenBucket, retry_after_seconds
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 1.0  # seconds; doubles on each retry
+MAX_BACKOFF = 60.0
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+@dataclass
+class EndpointStats:
+    calls: int = 0
+    errors: int = 0
+    retries: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    @property
+    def avg_ms(self) -> float:
+        return self.total_seconds / self.calls * 1000 if self.calls else 0.0
+
+
+def endpoint_label(method: str, url: str) -> str:
+    """``POST /v3/application/shops/:id/listings`` for stats grouping."""
+    return f"{method.upper()} {_ID_SEGMENT.sub('/:id', urlparse(url).path)}"
+
+
+class PooledSession:
+    def __init__(
+        self,
+        name: str,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+        timeout: float = 60,
+        limiter: TokenBucket | None = None,
+    ):
+        self.name = name
+        self.limiter = limiter
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.stats: dict[str, EndpointStats] = {}
+        self._stats_lock = threading.Lock()
+
+    def _record(self, label: str, seconds: float, error: bool, retried: bool) -> None:
+        with self._stats_lock:
+            stats = self.stats.setdefault(label, EndpointStats())
+            stats.calls += 1
+            stats.errors += error
+            stats.retries += retried
+            stats.total_seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(MAX_BACKOFF, self.backoff * (2 ** attempt))
+        return delay * random.uniform(0.8, 1.2)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request with pooling, retries and latency tracking.
+
+        Returns the final response (callers check the status code); raises
+        the last connection error once retries run out, or at once when a
+        non-idempotent request may have reached the server.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        label = endpoint_label(method, url)
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+
+        for attempt in range(self.retries + 1):
+            # Multipart file objects must be re-read from the start on a retry
+            for value in (kwargs.get("files") or {}).values():
+                if isinstance(value, tuple) and hasattr(value[1], "seek"):
+                    value[1].seek(0)
+
+            if self.limiter:
+                self.limiter.acquire()
+            start = time.monotonic()
+            try:
+                resp = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._record(label, time.monotonic() - start, True, attempt > 0)
+                if attempt == self.retries or not (idempotent or isinstance(e, requests.ConnectTimeout)):
+                    raise
+                wait = self._backoff(attempt)
+                print(f"  {self.name}: {type(e).__name__} — retrying in {wait:.0f}s...")
+                time.sleep(wait)
+                continue
+
+            status = resp.status_code
+            self._record(label, time.monotonic() - start, status >= 400, attempt > 0)
+            if self.limiter:
+                self.limiter.update_from_headers(resp.headers)
+            if attempt == self.retries:
+                return resp
+            if status == 429:
+                wait = retry_after_seconds(resp.headers.get("Retry-After"), self._backoff(attempt))
+                print(f"  {self.name}: rate limited. Waiting {wait:.0f}s...")
+                if self.limiter:
+                    self.limiter.pause(wait)  # next acquire() waits it out
+                    continue
+            elif status >= 500 and status != 501 and idempotent:
+                wait = self._backoff(attempt)
+                print(f"  {self.name}: HTTP {status} — retrying in {wait:.0f}s...")
+            else:
+                return resp
+            time.sleep(wait)
+        return resp
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def latency_summary(self) -> dict[str, dict]:
+        """Per-endpoint calls, errors, retries and avg/max latency (ms)."""
+        with self._stats_lock:
+            return {
+                label: {
+                    "calls": s.calls,
+                    "errors": s.errors,
+                    "retries": s.retries,
+                    "avg_ms": round(s.avg_ms, 1),
+                    "max_ms": round(s.max_seconds * 1000, 1),
+                }
+                for label, s in sorted(self.stats.items())
+            }
+
+    def print_latency_summary(self) -> None:
+        summary = self.latency_summary()
+        if not summary:
+            return
+        print(f"\n  {self.name} API latency:")
+        for label, s in summary.items():
+            print(f"    {label:<55} {s['calls']:>4} calls  avg {s['avg_ms']:>7.0f}ms  "
+                  f"max {s['max_ms']:>7.0f}ms  {s['errors']} err  {s['retries']} retried")
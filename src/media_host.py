@@ -0,0 +1,369 @@
+"""Public URLs for local media files (Instagram's video_url and friends).
+
+The Graph API will not take an upload: it fetches the video from a URL we
+hand it. A ``MediaHost`` turns a local path into such a URL:
+
+    LocalMediaHost    serves the file straight from this machine through a
+                      small HTTP server behind ``public_url`` (a tunnel or
+                      reverse proxy); nothing is uploaded
+    S3MediaHost       puts the file in an S3-compatible bucket (S3, R2,
+                      MinIO; needs boto3) and hands out presigned GETs
+    TmpfilesHost      the old tmpfiles.org upload, kept as a fallback
+
+URLs are short-lived: local ones carry an HMAC signature and expiry, bucket
+ones are presigned. Signing happens in ``url()``, so a file staged early
+still gets a fresh URL. ``prestage(paths)`` starts staging the next videos
+in the background (for hosts that upload) while the current container is
+processing, and ``release(path)`` drops a file once the platform has
+fetched it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import mimetypes
+import re
+import secrets
+import subprocess
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, quote, urlparse
+
+DEFAULT_TTL = 3600          # seconds a URL stays valid
+DEFAULT_PORT = 8765
+PRESTAGE_WORKERS = 2
+
+_RANGE = re.compile(r"bytes=(\d*)-(\d*)$")
+
+
+class MediaHost:
+    """Base class: staging bookkeeping shared by every provider."""
+
+    name = "base"
+    uploads = False  # True when staging copies the file somewhere (worth prestaging)
+
+    def __init__(self, ttl: int = DEFAULT_TTL, workers: int = PRESTAGE_WORKERS):
+        self.ttl = ttl
+        self._staged: dict[Path, Future] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"stage-{self.name}")
+
+    # Providers implement these two
+    def _stage(self, path: Path) -> str:
+        """Make the file fetchable; returns a handle for _sign (e.g. object key)."""
+        raise NotImplementedError
+
+    def _sign(self, handle: str) -> str:
+        """A public URL for a staged handle, valid for self.ttl seconds."""
+        raise NotImplementedError
+
+    def _unstage(self, handle: str) -> None:
+        pass
+
+    def _submit(self, path: Path) -> Future:
+        with self._lock:
+            future = self._staged.get(path)
+            if future is None:
+                future = self._staged[path] = self._pool.submit(self._stage, path)
+            return future
+
+    def prestage(self, paths: list[Path]) -> None:
+        """Start staging files that will be needed soon."""
+        if not self.uploads:
+            return
+        for path in paths:
+            self._submit(Path(path))
+
+    def url(self, path: Path) -> str:
+        """Public URL for ``path``, staging it now if it wasn't prestaged."""
+        return self._sign(self._submit(Path(path)).result())
+
+    def release(self, path: Path) -> None:
+        """Forget a file once the platform has fetched it."""
+        with self._lock:
+            future = self._staged.pop(Path(path), None)
+        if future is None or future.cancelled():
+            return
+        try:
+            self._unstage(future.result())
+        except Exception as e:
+            print(f"  Warning: could not release {Path(path).name} from {self.name}: {e}")
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        for path in list(self._staged):
+            self.release(path)
+
+    def __enter__(self) -> MediaHost:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# ---------------------------------------------------------------------------
+# Local HTTP server
+# ---------------------------------------------------------------------------
+
+class _MediaRequestHandler(BaseHTTPRequestHandler):
+    server_version = "MediaHost/1.0"
+
+    def log_message(self, format: str, *args) -> None:
+        pass  # the uploader prints its own progress
+
+    def do_HEAD(self) -> None:
+        self._serve(body=False)
+
+    def do_GET(self) -> None:
+        self._serve(body=True)
+
+    def _serve(self, body: bool) -> None:
+        host: LocalMediaHost = self.server.media_host
+        parsed = urlparse(self.path)
+        path = host.resolve(parsed.path, parse_qs(parsed.query))
+        if path is None:
+            self.send_error(403, "Invalid or expired link")
+            return
+        size = path.stat().st_size
+        start, end = 0, size - 1
+        match = _RANGE.match(self.headers.get("Range", ""))
+        if match and (match.group(1) or match.group(2)):
+            if match.group(1):
+                start = int(match.group(1))
+                end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+            else:  # suffix range: the last N bytes
+                start = max(0, size - int(match.group(2)))
+            if start > end:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Type", mimetypes.guess_type(path.name)[0] or "application/octet-stream")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+        if not body:
+            return
+        with open(path, "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(remaining, 1024 * 1024))
+                if not chunk:
+                    break
+                try:
+                    self.wfile.write(chunk)
+                except (BrokenPipeError, ConnectionResetError):
+                    return
+                remaining -= len(chunk)
+
+
+class LocalMediaHost(MediaHost):
+    """Serve staged files from a local HTTP server behind ``public_url``.
+
+    ``public_url`` is what the platform can reach (for example a Cloudflare
+    tunnel or nginx location forwarding to ``bind:port``). Only staged files
+    are served, each under a random token, and only with a valid signature.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        public_url: str,
+        port: int = DEFAULT_PORT,
+        bind: str = "127.0.0.1",
+        secret: str | None = None,
+        ttl: int = DEFAULT_TTL,
+    ):
+        super().__init__(ttl=ttl)
+        self.public_url = public_url.rstrip("/")
+        self._secret = (secret or secrets.token_hex(32)).encode()
+        self._files: dict[str, Path] = {}
+        self._server = ThreadingHTTPServer((bind, port), _MediaRequestHandler)
+        self._server.daemon_threads = True
+        self._server.media_host = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        print(f"  Serving media on {bind}:{self._server.server_port} as {self.public_url}")
+
+    def _signature(self, token: str, expires: int) -> str:
+        return hmac.new(self._secret, f"{token}:{expires}".encode(), hashlib.sha256).hexdigest()
+
+    def _stage(self, path: Path) -> str:
+        token = secrets.token_urlsafe(16)
+        with self._lock:
+            self._files[token] = path
+        return token
+
+    def _sign(self, token: str) -> str:
+        expires = int(time.time()) + self.ttl
+        name = quote(self._files[token].name)
+        return (f"{self.public_url}/media/{token}/{name}"
+                f"?expires={expires}&sig={self._signature(token, expires)}")
+
+    def _unstage(self, token: str) -> None:
+        with self._lock:
+            self._files.pop(token, None)
+
+    def resolve(self, url_path: str, query: dict) -> Path | None:
+        """The staged file a request may read, or None if the link is bad/expired."""
+        parts = url_path.strip("/").split("/")
+        if len(parts) != 3 or parts[0] != "media":
+            return None
+        token = parts[1]
+        try:
+            expires = int(query["expires"][0])
+            sig = query["sig"][0]
+        except (KeyError, ValueError, IndexError):
+            return None
+        if expires < time.time() or not hmac.compare_digest(sig, self._signature(token, expires)):
+            return None
+        with self._lock:
+            return self._files.get(token)
+
+    def close(self) -> None:
+        super().close()
+        self._server.shutdown()
+        self._server.server_close()
+
+
+# ---------------------------------------------------------------------------
+# Object store
+# ---------------------------------------------------------------------------
+
+class S3MediaHost(MediaHost):
+    """Upload to an S3-compatible bucket and hand out presigned GET URLs."""
+
+    name = "s3"
+    uploads = True
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "media/",
+        endpoint_url: str | None = None,
+        region: str | None = None,
+        ttl: int = DEFAULT_TTL,
+        keep: bool = False,
+    ):
+        try:
+            import boto3
+        except ImportError:
+            raise RuntimeError("The 's3' media host needs boto3. Run: pip install boto3") from None
+        super().__init__(ttl=ttl)
+        self.bucket = bucket
+        self.prefix = prefix
+        self.keep = keep
+        self._client = boto3.client("s3", endpoint_url=endpoint_url, region_name=region)
+
+    def _stage(self, path: Path) -> str:
+        key = f"{self.prefix}{secrets.token_hex(8)}/{path.name}"
+        size_mb = path.stat().st_size / 1024 / 1024
+        print(f"  Staging {path.name} to s3://{self.bucket}/{key} ({size_mb:.1f} MB)")
+        self._client.upload_file(
+            str(path), self.bucket, key,
+            ExtraArgs={"ContentType": mimetypes.guess_type(path.name)[0] or "application/octet-stream"},
+        )
+        return key
+
+    def _sign(self, key: str) -> str:
+        return self._client.generate_presigned_url(
+            "get_object", Params={"Bucket": self.bucket, "Key": key}, ExpiresIn=self.ttl,
+        )
+
+    def _unstage(self, key: str) -> None:
+        if not self.keep:
+            self._client.delete_object(Bucket=self.bucket, Key=key)
+
+
+# ---------------------------------------------------------------------------
+# tmpfiles.org
+# ---------------------------------------------------------------------------
+
+class TmpfilesHost(MediaHost):
+    """Upload to tmpfiles.org (files auto-expire after 1 hour)."""
+
+    name = "tmpfiles"
+    uploads = True
+
+    def _stage(self, path: Path) -> str:
+        file_size_mb = path.stat().st_size / 1024 / 1024
+        print(f"  Uploading {path.name} to temp host ({file_size_mb:.1f} MB)...")
+
+        result = subprocess.run(
+            ["curl", "-s", "-F", f"file=@{path}", "https://tmpfiles.org/api/v1/upload"],
+            capture_output=True, text=True, timeout=300,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"tmpfiles.org upload failed: {result.stderr}")
+
+        resp = json.loads(result.stdout)
+        if resp.get("status") != "success":
+            raise RuntimeError(f"tmpfiles.org upload failed: {resp}")
+
+        # Convert page URL to direct download URL by inserting /dl/ after domain
+        direct_url = resp["data"]["url"].replace("tmpfiles.org/", "tmpfiles.org/dl/")
+        if direct_url.startswith("http://"):
+            direct_url = direct_url.replace("http://", "https://", 1)
+        return direct_url
+
+    def _sign(self, url: str) -> str:
+        return url  # tmpfiles.org links are already public and expire on their own
+
+
+MEDIA_HOSTS = {
+    "local": LocalMediaHost,
+    "s3": S3MediaHost,
+    "tmpfiles": TmpfilesHost,
+}
+
+
+def media_host_from_config(kind: str | None, config: dict, **overrides) -> MediaHost:
+    """Build a media host from a platform config plus CLI overrides.
+
+    Config keys: ``media_host``, ``media_public_url``, ``media_port``,
+    ``media_secret``, ``media_bucket``, ``media_prefix``,
+    ``media_endpoint_url``, ``media_region``, ``media_ttl``. Without an
+    explicit kind, a configured public URL means local, a bucket means s3,
+    and tmpfiles.org is the fallback.
+    """
+    options = {k: v for k, v in config.items() if k.startswith("media_")}
+    options.update({f"media_{k}": v for k, v in overrides.items() if v is not None})
+    kind = kind or options.get("media_host")
+    if not kind:
+        kind = ("local" if options.get("media_public_url")
+                else "s3" if options.get("media_bucket") else "tmpfiles")
+    ttl = int(options.get("media_ttl", DEFAULT_TTL))
+
+    if kind == "local":
+        if not options.get("media_public_url"):
+            raise RuntimeError("The 'local' media host needs a public URL (--public-url)")
+        return LocalMediaHost(
+            options["media_public_url"],
+            port=int(options.get("media_port", DEFAULT_PORT)),
+            secret=options.get("media_secret"),
+            ttl=ttl,
+        )
+    if kind == "s3":
+        if not options.get("media_bucket"):
+            raise RuntimeError("The 's3' media host needs media_bucket in the config")
+        return S3MediaHost(
+            options["media_bucket"],
+            prefix=options.get("media_prefix", "media/"),
+            endpoint_url=options.get("media_endpoint_url"),
+            region=options.get("media_region"),
+            ttl=ttl,
+        )
+    if kind == "tmpfiles":
+        return TmpfilesHost(ttl=ttl)
+    raise ValueError(f"Unknown media host: {kind} (choose from {', '.join(MEDIA_HOSTS)})")
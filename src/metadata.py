@@ -2,10 +2,12 @@
 
 from __future__ import annotations
 
-import json
 import re
 from pathlib import Path
 
+from src.metadata_store import get_store
+from src.metadata_writer import MetadataBatchWriter, atomic_write_json
+
 
 def generate_metadata(
     text: str,
@@ -37,11 +39,21 @@ def generate_metadata(
     }
 
 
-def save_metadata(metadata: dict, output_path: Path) -> Path:
-    """Save metadata as JSON next to the design file."""
+def save_metadata(
+    metadata: dict,
+    output_path: Path,
+    writer: MetadataBatchWriter | None = None,
+) -> Path:
+    """Save metadata as JSON next to the design file and index it in the store.
+
+    Writes atomically; pass a MetadataBatchWriter to queue the write instead.
+    """
     meta_path = output_path.with_suffix(".json")
-    with open(meta_path, "w") as f:
-        json.dump(metadata, f, indent=2)
+    if writer is not None:
+        writer.write(meta_path, metadata)
+        return meta_path
+    atomic_write_json(meta_path, metadata)
+    get_store(meta_path.parent.parent).upsert(meta_path, metadata)
     return meta_path
 
 
@@ -0,0 +1,342 @@
+"""SQLite index over design metadata sidecars (output/<folder>/*.json).
+
+The JSON files stay the source of truth; this store mirrors them so tools
+can query by folder, niche, tag, or title without re-parsing every file.
+Every sync lists the folder and compares each sidecar's mtime and size
+with its indexed row, so only changed files are re-read. The directory's
+own mtime is not enough: overwriting a sidecar in place (a restore with
+shutil.copy2, a hand edit) leaves it untouched. The folder's PNG names
+are indexed in the same pass, so uploaders can pair images with metadata
+without listing the directory again.
+
+The index lives in ``<root>/metadata.db`` for roots inside the project.
+Roots elsewhere (``--source-dir``, the landmark project's output) are
+indexed under ``.metadata_index/`` here instead, so nothing is written into
+directories this repo doesn't own.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator
+
+from src.config import OUTPUT_DIR, PROJECT_ROOT
+
+DB_NAME = "metadata.db"
+EXTERNAL_INDEX_DIR = PROJECT_ROOT / ".metadata_index"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS designs (
+    path   TEXT PRIMARY KEY,
+    folder TEXT NOT NULL,
+    stem   TEXT NOT NULL,
+    niche  TEXT NOT NULL,
+    title  TEXT NOT NULL,
+    mtime  INTEGER NOT NULL,
+    size   INTEGER NOT NULL,
+    data   TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tags (
+    path     TEXT NOT NULL REFERENCES designs(path) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    tag      TEXT NOT NULL,
+    PRIMARY KEY (path, position)
+);
+CREATE TABLE IF NOT EXISTS images (
+    folder TEXT NOT NULL,
+    stem   TEXT NOT NULL,
+    PRIMARY KEY (folder, stem)
+);
+CREATE INDEX IF NOT EXISTS idx_designs_folder_niche ON designs(folder, niche);
+CREATE INDEX IF NOT EXISTS idx_designs_title ON designs(folder, title);
+CREATE INDEX IF NOT EXISTS idx_tags_tag ON tags(tag);
+"""
+
+
+def niche_of(stem: str) -> str:
+    """Niche prefix of a design stem (``coffee_012_...`` -> ``coffee``)."""
+    return stem.split("_")[0]
+
+
+class MetadataStore:
+    """Indexed mirror of the metadata JSON files under one output root."""
+
+    def __init__(self, root: Path = OUTPUT_DIR, db_path: Path | None = None):
+        self.root = Path(root)
+        self.db_path = db_path or (self.root / DB_NAME)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # get_store() hands one instance to every thread (parallel upload
+        # lanes, dashboard requests); writes are serialized by the lock.
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(_SCHEMA)
+        self._lock = threading.RLock()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    # -- paths --------------------------------------------------------------
+
+    def _rel(self, meta_path: Path) -> str:
+        return Path(meta_path).resolve().relative_to(self.root.resolve()).as_posix()
+
+    def path_for(self, rel: str) -> Path:
+        return self.root / rel
+
+    # -- writes -------------------------------------------------------------
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Hold the write lock for several writes and commit them together."""
+        with self._lock:
+            try:
+                yield
+            except BaseException:
+                self.conn.rollback()
+                raise
+            self.conn.commit()
+
+    def upsert(self, meta_path: Path, metadata: dict, commit: bool = True) -> None:
+        """Record (or refresh) one sidecar after it has been written to disk."""
+        meta_path = Path(meta_path)
+        st = meta_path.stat()
+        rel = self._rel(meta_path)
+        stem = meta_path.stem
+        with self._lock:
+            self.conn.execute("DELETE FROM tags WHERE path = ?", (rel,))
+            self.conn.execute(
+                "INSERT OR REPLACE INTO designs (path, folder, stem, niche, title, mtime, size, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    rel, meta_path.parent.name, stem, niche_of(stem),
+                    metadata.get("title", ""), st.st_mtime_ns, st.st_size,
+                    json.dumps(metadata),
+                ),
+            )
+            self.conn.executemany(
+                "INSERT INTO tags (path, position, tag) VALUES (?, ?, ?)",
+                [(rel, i, t) for i, t in enumerate(metadata.get("tags", []))],
+            )
+            if commit:
+                self.conn.commit()
+
+    def remove(self, rel: str, commit: bool = True) -> None:
+        """Drop one sidecar's row (its file is gone)."""
+        with self._lock:
+            self.conn.execute("DELETE FROM designs WHERE path = ?", (rel,))
+            if commit:
+                self.conn.commit()
+
+    def sync(self, folder: str, force: bool = False) -> int:
+        """Bring one folder's rows in line with the JSON and PNG files on disk.
+
+        A sidecar is re-parsed when its mtime or size differs from its row
+        (any difference, not just newer: copy2 restores an older mtime);
+        ``force`` re-parses every file. Returns the number parsed.
+        """
+        # Under the lock: two threads syncing the same folder would
+        # otherwise interleave their deletes and inserts
+        with self._lock:
+            folder_path = self.root / folder
+            known = {
+                rel: (mtime, size)
+                for rel, mtime, size in self.conn.execute(
+                    "SELECT path, mtime, size FROM designs WHERE folder = ?", (folder,)
+                )
+            }
+            seen = set()
+            images = []
+            parsed = 0
+            try:
+                entries = list(os.scandir(folder_path))
+            except FileNotFoundError:
+                entries = []
+            for entry in entries:
+                name = entry.name
+                if name.endswith(".png"):
+                    images.append((folder, name[:-4]))
+                    continue
+                if not name.endswith(".json"):
+                    continue
+                rel = f"{folder}/{name}"
+                seen.add(rel)
+                st = entry.stat()
+                if not force and known.get(rel) == (st.st_mtime_ns, st.st_size):
+                    continue
+                jf = folder_path / name
+                try:
+                    metadata = json.loads(jf.read_text())
+                except (json.JSONDecodeError, OSError):
+                    continue
+                self.upsert(jf, metadata, commit=False)
+                parsed += 1
+
+            stale = [(rel,) for rel in known if rel not in seen]
+            if stale:
+                self.conn.executemany("DELETE FROM designs WHERE path = ?", stale)
+            self.conn.execute("DELETE FROM images WHERE folder = ?", (folder,))
+            self.conn.executemany("INSERT INTO images (folder, stem) VALUES (?, ?)", images)
+            self.conn.commit()
+            return parsed
+
+    # -- queries ------------------------------------------------------------
+
+    def designs(self, folder: str, niche: str | None = None) -> list[tuple[Path, dict]]:
+        """(json_path, metadata) pairs for a folder, sorted by filename."""
+        sql = "SELECT path, data FROM designs WHERE folder = ?"
+        params: list = [folder]
+        if niche:
+            sql += " AND niche = ?"
+            params.append(niche)
+        sql += " ORDER BY path"
+        return [(self.path_for(rel), json.loads(data)) for rel, data in self.conn.execute(sql, params)]
+
+    def iter_designs(
+        self, folder: str, want: Callable[[str], bool] | None = None,
+    ) -> Iterator[tuple[Path, dict]]:
+        """(json_path, metadata) for designs that have a PNG, sorted by filename.
+
+        ``want(stem)`` is checked before the metadata is parsed, so filtering
+        out already-uploaded designs costs nothing per skipped design.
+        """
+        rows = self.conn.execute(
+            "SELECT d.path, d.stem, d.data FROM designs d "
+            "JOIN images i ON i.folder = d.folder AND i.stem = d.stem "
+            "WHERE d.folder = ? ORDER BY d.path",
+            (folder,),
+        ).fetchall()
+        for rel, stem, data in rows:
+            if want is None or want(stem):
+                yield self.path_for(rel), json.loads(data)
+
+    def metadata(self, folder: str, stem: str) -> dict | None:
+        row = self.conn.execute(
+            "SELECT data FROM designs WHERE folder = ? AND stem = ?", (folder, stem)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def image_count(self, folder: str, paired: bool = False) -> int:
+        """PNGs in the folder (``paired``: only those with a metadata JSON)."""
+        sql = "SELECT COUNT(*) FROM images i"
+        if paired:
+            sql += " JOIN designs d ON d.folder = i.folder AND d.stem = i.stem"
+        row = self.conn.execute(sql + " WHERE i.folder = ?", (folder,)).fetchone()
+        return row[0]
+
+    def unpaired_images(self, folder: str) -> list[str]:
+        """Stems of PNGs in the folder with no metadata JSON."""
+        rows = self.conn.execute(
+            "SELECT i.stem FROM images i LEFT JOIN designs d "
+            "ON d.folder = i.folder AND d.stem = i.stem "
+            "WHERE i.folder = ? AND d.path IS NULL ORDER BY i.stem",
+            (folder,),
+        )
+        return [r[0] for r in rows]
+
+    def niches(self, folder: str) -> list[str]:
+        rows = self.conn.execute(
+            "SELECT DISTINCT niche FROM designs WHERE folder = ? ORDER BY niche", (folder,)
+        )
+        return [r[0] for r in rows]
+
+    def count(self, folder: str) -> int:
+        row = self.conn.execute("SELECT COUNT(*) FROM designs WHERE folder = ?", (folder,)).fetchone()
+        return row[0]
+
+    def tag_counts(self, folder: str, niche: str | None = None) -> Counter:
+        """How many designs in the folder (optionally one niche) carry each tag."""
+        sql = (
+            "SELECT t.tag, COUNT(DISTINCT t.path) FROM tags t "
+            "JOIN designs d ON d.path = t.path WHERE d.folder = ?"
+        )
+        params: list = [folder]
+        if niche:
+            sql += " AND d.niche = ?"
+            params.append(niche)
+        sql += " GROUP BY t.tag"
+        return Counter(dict(self.conn.execute(sql, params)))
+
+    def tag_lists(self, folder: str, niche: str | None = None) -> list[list[str]]:
+        """Ordered tag list for every design in the folder, sorted by filename."""
+        sql = (
+            "SELECT d.path, t.tag FROM designs d LEFT JOIN tags t ON t.path = d.path "
+            "WHERE d.folder = ?"
+        )
+        params: list = [folder]
+        if niche:
+            sql += " AND d.niche = ?"
+            params.append(niche)
+        sql += " ORDER BY d.path, t.position"
+        lists: dict[str, list[str]] = {}
+        for rel, tag in self.conn.execute(sql, params):
+            tags = lists.setdefault(rel, [])
+            if tag is not None:
+                tags.append(tag)
+        return list(lists.values())
+
+    def tag_rows(self, folder: str) -> list[tuple[str, str, str, str | None]]:
+        """(path, niche, title, tag) rows ordered by niche, path, tag position.
+
+        Designs without tags appear once with tag None.
+        """
+        return self.conn.execute(
+            "SELECT d.path, d.niche, d.title, t.tag FROM designs d "
+            "LEFT JOIN tags t ON t.path = d.path WHERE d.folder = ? "
+            "ORDER BY d.niche, d.path, t.position",
+            (folder,),
+        ).fetchall()
+
+    def duplicate_titles(self, folder: str) -> dict[str, list[Path]]:
+        """Titles shared by more than one design in the folder."""
+        rows = self.conn.execute(
+            "SELECT d.title, d.path FROM designs d JOIN ("
+            "  SELECT title FROM designs WHERE folder = ? GROUP BY title HAVING COUNT(*) > 1"
+            ") dup ON dup.title = d.title WHERE d.folder = ? ORDER BY d.path",
+            (folder, folder),
+        )
+        result: dict[str, list[Path]] = {}
+        for title, rel in rows:
+            result.setdefault(title, []).append(self.path_for(rel))
+        return result
+
+    def title_suffixes(self, folder: str) -> Counter:
+        """Count of the text after the last ' - ' in each title."""
+        suffixes = Counter()
+        for (title,) in self.conn.execute(
+            "SELECT title FROM designs WHERE folder = ? AND title LIKE '% - %'", (folder,)
+        ):
+            suffixes[title.split(" - ")[-1]] += 1
+        return suffixes
+
+
+_stores: dict[Path, MetadataStore] = {}
+_stores_lock = threading.Lock()
+
+
+def index_path(root: Path) -> Path:
+    """Where the index for an output root lives (see the module docstring)."""
+    root = Path(root).resolve()
+    if root.is_relative_to(PROJECT_ROOT):
+        return root / DB_NAME
+    digest = hashlib.sha1(str(root).encode()).hexdigest()[:12]
+    return EXTERNAL_INDEX_DIR / f"{root.name}-{digest}.db"
+
+
+def get_store(root: Path = OUTPUT_DIR, folders: list[str] | None = None) -> MetadataStore:
+    """Shared store for an output root, synced for the given folders."""
+    root = Path(root).resolve()
+    with _stores_lock:
+        store = _stores.get(root)
+        if store is None:
+            store = _stores[root] = MetadataStore(root, index_path(root))
+    for folder in folders or []:
+        store.sync(folder)
+    return store
@@ -0,0 +1,212 @@
+"""Atomic and batched writes for metadata sidecar JSONs.
+
+``atomic_write_json`` writes to a temp file in the same directory, fsyncs it
+and renames it over the target, so an interrupted run never leaves a
+truncated sidecar.
+
+``MetadataBatchWriter`` is a write-behind batcher for bulk rewrites: it
+queues sidecars and flushes them together, recording each batch in a journal
+(``<root>/.metadata_journal.json``) before any file is staged or replaced. If a run
+crashes mid-flush, ``recover_journal`` either finishes the batch (resume) or
+puts the previous files back (rollback) using only the journaled paths.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from pathlib import Path
+
+from src.metadata_store import get_store
+
+JOURNAL_NAME = ".metadata_journal.json"
+DEFAULT_BATCH_SIZE = 200
+
+
+def dump_metadata(metadata: dict) -> str:
+    return json.dumps(metadata, indent=2) + "\n"
+
+
+def _fsync_dir(path: Path) -> None:
+    try:
+        fd = os.open(str(path), os.O_RDONLY)
+    except OSError:
+        return  # not supported on this platform
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _write_synced(path: Path, text: str) -> None:
+    with open(path, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def atomic_write_json(path: Path, data, text: str | None = None) -> None:
+    """Write JSON to path via temp file + fsync + rename."""
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.tmp")
+    _write_synced(tmp, text if text is not None else dump_metadata(data))
+    os.replace(tmp, path)
+    _fsync_dir(path.parent)
+
+
+# ---------------------------------------------------------------------------
+# Write-behind batcher
+# ---------------------------------------------------------------------------
+
+def _new_path(path: Path) -> Path:
+    return path.with_name(f".{path.name}.new")
+
+
+def _orig_path(path: Path) -> Path:
+    return path.with_name(f".{path.name}.orig")
+
+
+class MetadataBatchWriter:
+    """Queue sidecar writes and flush them as journaled batches.
+
+    Use as a context manager; pending writes are flushed on a clean exit.
+    """
+
+    def __init__(self, root: Path, batch_size: int = DEFAULT_BATCH_SIZE, store=None):
+        self.root = Path(root)
+        self.batch_size = batch_size
+        self.store = store or get_store(self.root)
+        self.journal_path = self.root / JOURNAL_NAME
+        self.pending: dict[Path, dict] = {}
+        self.written = 0
+        if self.journal_path.exists():
+            raise RuntimeError(
+                f"Unfinished metadata batch journal at {self.journal_path}. "
+                "Run `python3 rewrite_metadata.py --recover resume` (or rollback) first."
+            )
+
+    def __enter__(self) -> MetadataBatchWriter:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.flush()
+
+    def write(self, meta_path: Path, metadata: dict) -> None:
+        self.pending[Path(meta_path)] = metadata
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write every pending sidecar. Returns how many were written."""
+        if not self.pending:
+            return 0
+        batch = self.pending
+        self.pending = {}
+
+        # 1. Journal the batch before writing anything, so recovery can find
+        #    every staged file even if the run dies while staging
+        entries = [
+            {"path": path.relative_to(self.root).as_posix(), "had_original": path.exists()}
+            for path in batch
+        ]
+        atomic_write_json(self.journal_path, {"state": "staging", "entries": entries})
+
+        # 2. Stage new contents next to their targets; once all are on disk
+        #    the batch can be finished instead of only undone
+        for path, metadata in batch.items():
+            _write_synced(_new_path(path), dump_metadata(metadata))
+        atomic_write_json(self.journal_path, {"state": "prepared", "entries": entries})
+
+        # 3. Keep the old inode reachable, then swap the new file in
+        for path in batch:
+            _swap_in(path)
+        for parent in {p.parent for p in batch}:
+            _fsync_dir(parent)
+
+        # 4. Commit: drop the originals and the journal, refresh the index
+        _finish(self.root, entries)
+        with self.store.batch():
+            for path, metadata in batch.items():
+                self.store.upsert(path, metadata, commit=False)
+
+        self.written += len(batch)
+        return len(batch)
+
+
+def _swap_in(path: Path) -> None:
+    new, orig = _new_path(path), _orig_path(path)
+    if not new.exists():
+        return  # already swapped in
+    if path.exists() and not orig.exists():
+        try:
+            os.link(path, orig)
+        except OSError:
+            shutil.copy2(path, orig)
+    os.replace(new, path)
+
+
+def _finish(root: Path, entries: list[dict]) -> None:
+    for entry in entries:
+        orig = _orig_path(root / entry["path"])
+        if orig.exists():
+            orig.unlink()
+    (root / JOURNAL_NAME).unlink()
+    _fsync_dir(root)
+
+
+# ---------------------------------------------------------------------------
+# Crash recovery
+# ---------------------------------------------------------------------------
+
+def recover_journal(root: Path, mode: str = "resume") -> int:
+    """Finish (resume) or undo (rollback) a batch interrupted mid-flush.
+
+    Only the journaled files are touched. A batch that crashed while still
+    staging has replaced nothing and may have half-written files, so it is
+    always rolled back. Returns the number of entries.
+    """
+    root = Path(root)
+    journal_path = root / JOURNAL_NAME
+    if not journal_path.exists():
+        return 0
+    if mode not in ("resume", "rollback"):
+        raise ValueError(f"Unknown recovery mode: {mode}")
+
+    journal = json.loads(journal_path.read_text())
+    entries = journal["entries"]
+    if journal.get("state") == "staging" and mode == "resume":
+        print("Batch was interrupted while staging; rolling it back instead.")
+        mode = "rollback"
+    store = get_store(root)
+
+    for entry in entries:
+        path = root / entry["path"]
+        new, orig = _new_path(path), _orig_path(path)
+        if mode == "resume":
+            _swap_in(path)
+        else:
+            if new.exists():
+                new.unlink()
+            if orig.exists():
+                os.replace(orig, path)
+            elif not entry["had_original"] and path.exists():
+                path.unlink()
+
+    if mode == "resume":
+        _finish(root, entries)
+    else:
+        journal_path.unlink()
+        _fsync_dir(root)
+
+    with store.batch():
+        for entry in entries:
+            path = root / entry["path"]
+            if path.exists():
+                store.upsert(path, json.loads(path.read_text()), commit=False)
+            else:
+                store.remove(entry["path"], commit=False)
+    return len(entries)
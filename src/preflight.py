@@ -0,0 +1,298 @@
+"""Per-platform image derivatives, made ahead of the upload loop.
+
+The generators write full-size PNGs (3840x3840 and up). Listing photos
+and pins are downscaled by the platform anyway, so sending the original
+wastes upload time on the slowest step of the run. A ``Profile`` says what
+a platform should receive:
+
+    etsy        listing photo: PNG fit within 2000px
+    pinterest   pin image: JPEG fit within 1000x1500, transparency
+                flattened onto white
+    teepublic   full size, with a faint 1px outline so its Cloudinary
+                check measures the whole canvas instead of the trimmed
+                artwork (done here rather than per upload in the browser)
+
+Print files (Printify, Redbubble, Society6) have no profile: they need
+every pixel, and the generators already save at zlib's default level, so
+re-compressing them costs seconds per design for no smaller file.
+
+Derivatives are cached under ``.preflight_cache/<profile>/<key>/`` where
+the key hashes the source bytes together with the profile settings, so an
+edited design or a changed profile makes a new derivative and an unchanged
+one is never re-encoded. The file keeps its source name (some sites use it
+as the default title).
+
+``Preflight.prepare(paths)`` starts encoding the whole run in a thread pool
+(Pillow releases the GIL while resizing and compressing) before the first
+upload; ``path(p)`` then returns the derivative, waiting only if that one
+is not finished yet. A derivative that cannot be made falls back to the
+source file, so preflight never fails an upload on its own.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from src.config import PROJECT_ROOT
+
+CACHE_DIR = PROJECT_ROOT / ".preflight_cache"
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+
+# Bump when the encoding code changes in a way the profile fields don't capture
+ENCODER_VERSION = 1
+
+_HASH_CHUNK = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class Profile:
+    """What one platform should be sent.
+
+    ``max_size`` is a (width, height) box the image is shrunk to fit,
+    keeping its aspect ratio; None keeps the full size. Images are never
+    enlarged. ``quality`` applies to JPEG only, whose lack of alpha is
+    handled by flattening onto ``background``. ``edge_alpha`` > 0 draws a
+    1px grey outline of that opacity around the canvas.
+    """
+
+    name: str
+    format: str = "PNG"
+    max_size: tuple[int, int] | None = None
+    quality: int = 90
+    background: tuple[int, int, int] = (255, 255, 255)
+    edge_alpha: int = 0
+
+    @property
+    def suffix(self) -> str:
+        return ".jpg" if self.format == "JPEG" else ".png"
+
+    @property
+    def fingerprint(self) -> str:
+        settings = json.dumps({**asdict(self), "encoder": ENCODER_VERSION}, sort_keys=True)
+        return hashlib.sha256(settings.encode()).hexdigest()[:12]
+
+    @property
+    def required(self) -> bool:
+        """True when the platform needs the change, not just a smaller file."""
+        return bool(self.edge_alpha)
+
+
+# Platforms not listed here upload their source files as they are
+PROFILES = {
+    "etsy": Profile("etsy", max_size=(2000, 2000)),
+    "pinterest": Profile("pinterest", format="JPEG", max_size=(1000, 1500), quality=85),
+    "teepublic": Profile("teepublic", edge_alpha=30),
+}
+
+
+def content_type(path: Path) -> str:
+    """MIME type to send a (source or derivative) image as."""
+    return mimetypes.guess_type(str(path))[0] or "application/octet-stream"
+
+
+def is_derivative(path: Path, cache_dir: Path = CACHE_DIR) -> bool:
+    """True for a file made by preflight (as opposed to a source design)."""
+    return Path(path).resolve().is_relative_to(Path(cache_dir).resolve())
+
+
+# ---------------------------------------------------------------------------
+# Encoding
+# ---------------------------------------------------------------------------
+
+def _have_pillow() -> bool:
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def source_digest(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(_HASH_CHUNK):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def cache_path(path: Path, profile: Profile, cache_dir: Path = CACHE_DIR) -> Path:
+    """Where the derivative of ``path`` for ``profile`` lives (made or not)."""
+    path = Path(path)
+    key = hashlib.sha256(f"{source_digest(path)}:{profile.fingerprint}".encode()).hexdigest()[:24]
+    return Path(cache_dir) / profile.name / key / f"{path.stem}{profile.suffix}"
+
+
+def _encode(source: Path, dest: Path, profile: Profile) -> None:
+    from PIL import Image, ImageDraw
+
+    with Image.open(source) as img:
+        img.load()
+        icc = img.info.get("icc_profile")
+        if img.mode == "P":
+            img = img.convert("RGBA")
+        if profile.max_size:
+            img.thumbnail(profile.max_size, Image.Resampling.LANCZOS)
+        if profile.edge_alpha:
+            img = img.convert("RGBA")
+            draw = ImageDraw.Draw(img)
+            draw.rectangle([0, 0, img.width - 1, img.height - 1],
+                           outline=(128, 128, 128, profile.edge_alpha))
+
+        options = {"icc_profile": icc} if icc else {}
+        if profile.format == "JPEG":
+            if img.mode in ("RGBA", "LA"):
+                rgba = img.convert("RGBA")
+                img = Image.new("RGB", img.size, profile.background)
+                img.paste(rgba, mask=rgba.getchannel("A"))
+            elif img.mode != "RGB":
+                img = img.convert("RGB")
+            img.save(dest, "JPEG", quality=profile.quality, optimize=True,
+                     progressive=True, **options)
+        else:
+            # zlib's default level: optimize (level 9) took ten times as
+            # long on textured artwork for a file about 10% smaller
+            img.save(dest, "PNG", compress_level=6, **options)
+
+
+def make_derivative(path: Path, profile: Profile, cache_dir: Path = CACHE_DIR) -> Path:
+    """The cached derivative of ``path`` for ``profile``, encoding it if needed."""
+    path = Path(path)
+    dest = cache_path(path, profile, cache_dir)
+    if dest.exists():
+        return dest
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(f".{dest.name}.{os.getpid()}.{threading.get_ident()}.tmp{profile.suffix}")
+    try:
+        _encode(path, tmp, profile)
+        if (not profile.required and path.suffix.lower() == profile.suffix
+                and tmp.stat().st_size >= path.stat().st_size):
+            # Re-encoding didn't help (flat artwork can grow when resampled):
+            # keep the original bytes, cached so the next run doesn't retry
+            tmp.unlink()
+            shutil.copyfile(path, tmp)
+        os.replace(tmp, dest)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return dest
+
+
+# ---------------------------------------------------------------------------
+# Worker pool
+# ---------------------------------------------------------------------------
+
+class Preflight:
+    """Derivatives for one upload run, encoded in a background pool.
+
+    ``profile`` None (or --no-preflight) disables the stage: ``path()``
+    hands back the source file.
+    """
+
+    def __init__(self, profile: Profile | str | None, workers: int = DEFAULT_WORKERS,
+                 cache_dir: Path = CACHE_DIR):
+        if isinstance(profile, str):
+            profile = PROFILES[profile]
+        self.profile = profile
+        self.cache_dir = Path(cache_dir)
+        self._jobs: dict[Path, Future] = {}
+        self._lock = threading.Lock()
+        self._pool = None
+        if profile is not None and not _have_pillow():
+            print("Note: Pillow is not installed; uploading original files (pip install Pillow).")
+            self.profile = None
+        if self.profile is not None:
+            self._pool = ThreadPoolExecutor(max_workers=max(1, workers),
+                                            thread_name_prefix=f"preflight-{profile.name}")
+
+    @property
+    def enabled(self) -> bool:
+        return self.profile is not None
+
+    def _submit(self, path: Path) -> Future:
+        with self._lock:
+            future = self._jobs.get(path)
+            if future is None:
+                future = self._jobs[path] = self._pool.submit(
+                    make_derivative, path, self.profile, self.cache_dir)
+            return future
+
+    def prepare(self, paths) -> None:
+        """Queue derivatives in upload order, so the first needed is done first."""
+        if not self.enabled:
+            return
+        for path in paths:
+            self._submit(Path(path))
+
+    def path(self, path: Path) -> Path:
+        """The file to upload for ``path``: its derivative, or the source itself."""
+        path = Path(path)
+        if not self.enabled:
+            return path
+        try:
+            derivative = self._submit(path).result()
+        except Exception as e:
+            print(f"  Warning: preflight failed for {path.name}, sending the original: {e}")
+            return path
+        return derivative
+
+    def wrap(self, fn):
+        """``fn(page, png_path, metadata)`` that receives the derivative instead."""
+        if fn is None or not self.enabled:
+            return fn
+
+        def wrapped(page, png_path, metadata):
+            return fn(page, self.path(png_path), metadata)
+        return wrapped
+
+    def summary(self) -> str:
+        if not self.enabled:
+            return "off (sending original files)"
+        with self._lock:
+            jobs = list(self._jobs.items())
+        ready = source_bytes = derived_bytes = 0
+        for path, future in jobs:
+            if future.done() and not future.cancelled() and not future.exception():
+                ready += 1
+                source_bytes += path.stat().st_size
+                derived_bytes += future.result().stat().st_size
+        summary = f"{self.profile.name} profile, {ready}/{len(jobs)} ready"
+        if source_bytes:
+            summary += f", {derived_bytes / 1e6:.1f} MB to send instead of {source_bytes / 1e6:.1f} MB"
+        return summary
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self) -> Preflight:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def add_arguments(parser) -> None:
+    """The --no-preflight / --preflight-workers options every uploader takes."""
+    parser.add_argument(
+        "--no-preflight", action="store_true",
+        help="Upload the original files instead of per-platform derivatives",
+    )
+    parser.add_argument(
+        "--preflight-workers", type=int, default=DEFAULT_WORKERS,
+        help=f"Threads encoding derivatives ahead of the uploads (default: {DEFAULT_WORKERS})",
+    )
+
+
+def from_args(args, platform: str) -> Preflight:
+    """A Preflight for ``platform`` configured from the uploader's arguments."""
+    profile = PROFILES.get(platform)
+    if profile is None or getattr(args, "no_preflight", False):
+        return Preflight(None)
+    return Preflight(profile, getattr(args, "preflight_workers", DEFAULT_WORKERS))
@@ -0,0 +1,196 @@
+"""Storage for upload_queue.py: immutable order + small per-platform cursor file.
+
+``upload_queue.json`` holds the shuffled video list and is written only by
+--rebuild. ``upload_queue_state.json`` holds, per platform, a cursor (every
+index below it is finished), the items claimed past the cursor and the ones
+finished out of order. Advancing rewrites that small file, never the queue.
+
+Consumers claim items with a lease under an exclusive lock on
+``upload_queue_state.lock``, so several processes or threads (one per
+platform, or more than one for the same platform) can run at once without
+two of them posting the same video. A claim that is not completed or
+renewed before its lease runs out (the consumer crashed) becomes claimable
+again. ``keep_alive()`` renews a lease in the background for as long as the
+upload it covers is running, however long that is.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+import socket
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from src.metadata_writer import atomic_write_json
+
+DEFAULT_LEASE = 900  # seconds; kept alive by keep_alive() while the upload runs
+
+_thread_locks: dict[Path, threading.Lock] = {}
+
+
+def default_owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+class QueueStore:
+    def __init__(self, order_path: Path, state_path: Path | None = None,
+                 lease_seconds: float = DEFAULT_LEASE):
+        self.order_path = Path(order_path)
+        self.state_path = Path(state_path or self.order_path.with_name(
+            f"{self.order_path.stem}_state.json"))
+        self.lock_path = self.state_path.with_suffix(".lock")
+        self.lease_seconds = lease_seconds
+        self._order: dict | None = None
+        # flock is per open file, so threads of one process also need a mutex
+        self._mutex = _thread_locks.setdefault(self.state_path.resolve(), threading.Lock())
+
+    # -- order ---------------------------------------------------------------
+
+    @property
+    def order(self) -> dict:
+        if self._order is None:
+            with open(self.order_path) as f:
+                self._order = json.load(f)
+        return self._order
+
+    @property
+    def videos(self) -> list[dict]:
+        return self.order["videos"]
+
+    @property
+    def total(self) -> int:
+        return len(self.videos)
+
+    def exists(self) -> bool:
+        return self.order_path.exists()
+
+    def write_order(self, order: dict) -> None:
+        """Replace the queue order (rebuild); every platform starts over."""
+        atomic_write_json(self.order_path, order, json.dumps(order, indent=2))
+        self._order = order
+        with self._state() as state:
+            state.clear()
+            state.update(self._empty_state())
+
+    # -- state ---------------------------------------------------------------
+
+    def _empty_state(self, cursor: int = 0) -> dict:
+        return {"queue_created": self.order.get("created"), "default_cursor": cursor,
+                "platforms": {}}
+
+    def _load_state(self) -> dict:
+        if self.state_path.exists():
+            with open(self.state_path) as f:
+                state = json.load(f)
+            if state.get("queue_created") == self.order.get("created"):
+                return state
+        # No state yet (or the queue was rebuilt): queues from before the
+        # split kept one shared position in the order file
+        return self._empty_state(self.order.get("position", 0))
+
+    @contextmanager
+    def _state(self) -> Iterator[dict]:
+        """Load, lock and (on success) atomically save the state file."""
+        with self._mutex, open(self.lock_path, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                state = self._load_state()
+                before = json.dumps(state, sort_keys=True)
+                yield state
+                if json.dumps(state, sort_keys=True) != before:
+                    atomic_write_json(self.state_path, state, json.dumps(state, indent=1))
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _platform(self, state: dict, platform: str) -> dict:
+        return state["platforms"].setdefault(platform, {
+            "cursor": state.get("default_cursor", 0), "claimed": {}, "finished": {},
+        })
+
+    @staticmethod
+    def _expire(slot: dict, now: float) -> None:
+        for index, lease in list(slot["claimed"].items()):
+            if lease["expires"] < now:
+                del slot["claimed"][index]
+
+    def claim(self, platform: str, owner: str | None = None) -> int | None:
+        """Lease the next unfinished, unclaimed item for a platform (None if none left)."""
+        owner = owner or default_owner()
+        now = time.time()
+        with self._state() as state:
+            slot = self._platform(state, platform)
+            self._expire(slot, now)
+            index = slot["cursor"]
+            while index < self.total and (str(index) in slot["claimed"]
+                                          or str(index) in slot["finished"]):
+                index += 1
+            if index >= self.total:
+                return None
+            slot["claimed"][str(index)] = {"owner": owner, "expires": now + self.lease_seconds}
+            return index
+
+    def renew(self, platform: str, index: int, owner: str | None = None) -> bool:
+        """Extend a lease; False if it has already lapsed to someone else."""
+        owner = owner or default_owner()
+        with self._state() as state:
+            lease = self._platform(state, platform)["claimed"].get(str(index))
+            if not lease or lease["owner"] != owner:
+                return False
+            lease["expires"] = time.time() + self.lease_seconds
+            return True
+
+    @contextmanager
+    def keep_alive(self, platform: str, index: int, owner: str) -> Iterator[None]:
+        """Renew a lease every third of its length until the block exits."""
+        done = threading.Event()
+
+        def heartbeat() -> None:
+            while not done.wait(self.lease_seconds / 3):
+                try:
+                    if not self.renew(platform, index, owner):
+                        print(f"  [{platform}] Warning: lease on item {index + 1} was lost")
+                        return
+                except OSError as e:
+                    print(f"  [{platform}] Warning: could not renew lease: {e}")
+
+        thread = threading.Thread(target=heartbeat, name=f"lease-{platform}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            done.set()
+            thread.join()
+
+    def complete(self, platform: str, index: int, status: str = "done") -> None:
+        """Mark an item finished and move the cursor past any finished run."""
+        with self._state() as state:
+            slot = self._platform(state, platform)
+            slot["claimed"].pop(str(index), None)
+            slot["finished"][str(index)] = status
+            while str(slot["cursor"]) in slot["finished"]:
+                del slot["finished"][str(slot["cursor"])]
+                slot["cursor"] += 1
+
+    def release(self, platform: str, index: int) -> None:
+        """Give a claimed item back unfinished (e.g. on Ctrl-C)."""
+        with self._state() as state:
+            self._platform(state, platform)["claimed"].pop(str(index), None)
+
+    def progress(self, platform: str) -> dict:
+        """cursor, done, in-flight claims and remaining count for a platform."""
+        now = time.time()
+        with self._state() as state:
+            slot = self._platform(state, platform)
+            self._expire(slot, now)
+            done = slot["cursor"] + len(slot["finished"])
+            return {
+                "cursor": slot["cursor"],
+                "done": done,
+                "claimed": sorted(int(i) for i in slot["claimed"]),
+                "remaining": self.total - done,
+            }
@@ -0,0 +1,157 @@
+"""Thread-safe token-bucket rate limiting shared across the API platforms.
+
+A bucket holds up to ``capacity`` tokens and refills at ``rate`` tokens per
+second; every request takes one. ``get_limiter(platform)`` hands out one
+bucket per platform, configured from PLATFORM_QUOTAS, so every client and
+worker thread talking to that platform in this process stays within its
+quota together while other platforms run at their own pace. Buckets are
+corrected from the rate-limit headers each response carries, and a 429
+``Retry-After`` pauses the whole bucket rather than just the caller.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+
+# Known API quotas: platform -> (requests, window seconds, burst)
+PLATFORM_QUOTAS = {
+    "printify": (600, 60, 10),                 # 600 requests/minute
+    "printify_publish": (200, 30 * 60, 200),   # 200 publishes per 30 minutes
+    "etsy": (10, 1, 10),                       # 10 requests/second
+    "pinterest": (100, 60, 10),                # write tier; reads allow more
+    "shopify": (2, 1, 40),                     # REST leaky bucket: 2/s, 40 deep
+    "tiktok_init": (6, 60, 1),                 # post init: 6/minute per user
+    "tiktok_status": (30, 60, 5),              # publish status fetch: 30/minute
+}
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_window(cls, requests: int, seconds: float, burst: float | None = None) -> TokenBucket:
+        """Bucket for a quota stated as N requests per time window."""
+        return cls(requests / seconds, burst if burst is not None else requests)
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until ``tokens`` are available. Returns seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                elif self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+                else:
+                    wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def update_from_headers(self, headers: Mapping) -> None:
+        """Trust the server's view of the quota when it is tighter than ours."""
+        remaining, reset = parse_rate_headers(headers)
+        if remaining is None:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens = min(self.tokens, float(remaining))
+            if remaining <= 0 and reset:
+                self.paused_until = max(self.paused_until, now + reset)
+                self.updated = max(self.updated, self.paused_until)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller for ``seconds`` (e.g. after a 429) and drain the bucket."""
+        with self._lock:
+            now = time.monotonic()
+            self.paused_until = max(self.paused_until, now + seconds)
+            self.tokens = 0.0
+            self.updated = self.paused_until  # refill resumes after the pause
+
+
+_limiters: dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(platform: str) -> TokenBucket:
+    """Process-wide bucket for a platform in PLATFORM_QUOTAS."""
+    with _limiters_lock:
+        bucket = _limiters.get(platform)
+        if bucket is None:
+            count, seconds, burst = PLATFORM_QUOTAS[platform]
+            bucket = _limiters[platform] = TokenBucket.per_window(count, seconds, burst)
+        return bucket
+
+
+def parse_rate_headers(headers: Mapping) -> tuple[float | None, float | None]:
+    """(remaining, seconds until reset) from a response's rate-limit headers.
+
+    Understands Shopify's ``X-Shopify-Shop-Api-Call-Limit: used/limit``,
+    Etsy's ``X-Remaining-This-Second`` and the common
+    ``X-RateLimit-Remaining`` / ``X-RateLimit-Reset`` pair (reset given as
+    seconds or as an epoch timestamp). Returns (None, None) if absent.
+    """
+    call_limit = headers.get("X-Shopify-Shop-Api-Call-Limit")
+    if call_limit:
+        try:
+            used, limit = (float(x) for x in call_limit.split("/"))
+            return limit - used, None
+        except ValueError:
+            return None, None
+
+    remaining = headers.get("X-Remaining-This-Second")
+    if remaining is not None:
+        try:
+            return float(remaining), 1.0
+        except ValueError:
+            return None, None
+
+    remaining = headers.get("X-RateLimit-Remaining")
+    if remaining is None:
+        return None, None
+    try:
+        remaining_f = float(remaining)
+    except ValueError:
+        return None, None
+    reset = headers.get("X-RateLimit-Reset")
+    try:
+        reset_f = float(reset) if reset is not None else None
+    except ValueError:
+        reset_f = None
+    if reset_f is not None and reset_f > 1e9:  # epoch timestamp
+        reset_f = max(0.0, reset_f - time.time())
+    return remaining_f, reset_f
+
+
+def retry_after_seconds(value: str | None, default: float = 60.0) -> float:
+    """Parse a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,311 @@
+"""Chunked, resumable video uploads for the YouTube and TikTok APIs.
+
+Both APIs take a video as a series of ``Content-Range`` PUTs to a session
+URL handed out when the upload is initiated. ``UploadSession`` is what it
+takes to pick a transfer back up (session URL, file size and mtime, chunk
+size and the byte offset the server has acknowledged); uploaders persist
+it in their tracker after every chunk, so a restarted run continues from
+the last acknowledged byte instead of re-sending the whole file.
+
+YouTube follows Google's resumable protocol: each partial chunk is
+answered with ``308 Resume Incomplete`` and a ``Range`` header, and a
+``bytes */<size>`` probe reports how much the server holds after an
+interruption. TikTok has no probe; chunks are sent in order at the chunk
+size agreed at init (the last one absorbs the remainder), so resuming
+means carrying on from the recorded chunk while the upload URL is valid.
+"""
+
+from __future__ import annotations
+
+import random
+import re
+import threading
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+import requests
+
+from src.http_client import PooledSession
+
+MiB = 1024 * 1024
+DEFAULT_CHUNK_SIZE = 10 * MiB
+MAX_RETRIES = 5          # consecutive failed chunks before giving up
+RETRY_BACKOFF = 2.0      # seconds; doubles on each consecutive failure
+
+# Google: every chunk but the last must be a multiple of 256 KiB
+GOOGLE_CHUNK_ALIGN = 256 * 1024
+
+# TikTok FILE_UPLOAD: 5-64 MB chunks, the last up to 128 MB, at most 1000
+# chunks; videos under 5 MB go up whole. Upload URLs expire after an hour.
+TIKTOK_MIN_CHUNK = 5 * MiB
+TIKTOK_MAX_CHUNK = 64 * MiB
+TIKTOK_MAX_CHUNKS = 1000
+TIKTOK_URL_TTL = 3600
+
+_RANGE = re.compile(r"bytes=(\d+)-(\d+)")
+
+
+class UploadError(RuntimeError):
+    """The server rejected the upload (non-retryable status)."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"HTTP {status}: {message.strip()[:300]}")
+        self.status = status
+        self.message = message
+
+
+class SessionExpired(UploadError):
+    """The upload session is gone; start a new one from byte zero."""
+
+
+class UploadStopped(RuntimeError):
+    """The caller's stop event was set; the session holds the last acknowledged offset."""
+
+
+@dataclass
+class UploadSession:
+    url: str
+    size: int
+    mtime: float
+    chunk_size: int
+    offset: int = 0
+    publish_id: str = ""
+    started_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+
+    @classmethod
+    def start(cls, url: str, path: Path, chunk_size: int, publish_id: str = "") -> UploadSession:
+        st = Path(path).stat()
+        return cls(url=url, size=st.st_size, mtime=st.st_mtime,
+                   chunk_size=chunk_size, publish_id=publish_id)
+
+    @classmethod
+    def from_entry(cls, entry: dict | None, path: Path) -> UploadSession | None:
+        """The session saved in a tracker entry, if the file is unchanged since."""
+        if not entry or entry.get("status") != "uploading" or not entry.get("upload_session"):
+            return None
+        try:
+            session = cls(**entry["upload_session"])
+        except TypeError:
+            return None
+        st = Path(path).stat()
+        if st.st_size != session.size or abs(st.st_mtime - session.mtime) > 1:
+            return None
+        return session
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @property
+    def age(self) -> float:
+        """Seconds since the session was opened."""
+        started = datetime.fromisoformat(self.started_at)
+        return (datetime.now(timezone.utc) - started).total_seconds()
+
+    @property
+    def progress(self) -> float:
+        return self.offset / self.size if self.size else 1.0
+
+
+def google_chunk_size(chunk_size: int) -> int:
+    """Round a requested chunk size down to Google's 256 KiB granularity."""
+    return max(GOOGLE_CHUNK_ALIGN, chunk_size - chunk_size % GOOGLE_CHUNK_ALIGN)
+
+
+def tiktok_chunking(size: int, chunk_size: int) -> tuple[int, int]:
+    """(chunk_size, total_chunk_count) for a TikTok FILE_UPLOAD init."""
+    if size < TIKTOK_MIN_CHUNK:
+        return size, 1
+    chunk_size = min(max(chunk_size, TIKTOK_MIN_CHUNK), TIKTOK_MAX_CHUNK)
+    if size <= chunk_size:
+        return size, 1
+    count = max(1, size // chunk_size)
+    if count > TIKTOK_MAX_CHUNKS:
+        chunk_size = -(-size // TIKTOK_MAX_CHUNKS)
+        count = size // chunk_size
+    return chunk_size, count
+
+
+# ---------------------------------------------------------------------------
+# Chunk loop
+# ---------------------------------------------------------------------------
+
+class ChunkedUpload:
+    """Send a file to an upload session, chunk by chunk, from session.offset.
+
+    ``on_progress(session)`` runs after every acknowledged chunk so the
+    caller can persist the offset. Connection errors and 5xx responses are
+    retried with backoff (``recover`` re-syncs the offset first); other
+    errors raise UploadError. Setting ``stop`` (e.g. from Ctrl-C while the
+    upload runs in a worker thread) ends the loop before the next chunk
+    with UploadStopped. Subclasses implement the protocol details.
+    """
+
+    content_type = "video/mp4"
+
+    def __init__(
+        self,
+        http: PooledSession,
+        path: Path,
+        session: UploadSession,
+        on_progress: Callable[[UploadSession], None] | None = None,
+        headers: dict | None = None,
+        retries: int = MAX_RETRIES,
+        stop: threading.Event | None = None,
+    ):
+        self.http = http
+        self.path = Path(path)
+        self.session = session
+        self.on_progress = on_progress
+        self.headers = headers or {}
+        self.retries = retries
+        self.stop = stop or threading.Event()
+        self.result: dict | None = None
+
+    def chunk_end(self, start: int) -> int:
+        return min(start + self.session.chunk_size, self.session.size)
+
+    def handle(self, resp: requests.Response, start: int, end: int) -> bool:
+        """Apply a chunk response to the session; True once the upload is done."""
+        raise NotImplementedError
+
+    def recover(self) -> bool:
+        """Re-sync with the server after a failed chunk; True if it already has it all."""
+        return False
+
+    def _put(self, data: bytes, content_range: str) -> requests.Response:
+        headers = {
+            **self.headers,
+            "Content-Type": self.content_type,
+            "Content-Length": str(len(data)),
+            "Content-Range": content_range,
+        }
+        # One attempt per call: retrying a chunk is this loop's decision
+        return self.http.session.request("PUT", self.session.url, data=data,
+                                         headers=headers, timeout=self.http.timeout)
+
+    def run(self) -> dict:
+        """Upload the remaining chunks; returns the final response body."""
+        session = self.session
+        if session.offset >= session.size:
+            return self.result or {}
+        if session.offset:
+            print(f"  Resuming upload at {session.offset // MiB}MB/{session.size // MiB}MB "
+                  f"({session.progress:.0%})")
+        failures = 0
+        with open(self.path, "rb") as f:
+            while True:
+                if self.stop.is_set():
+                    raise UploadStopped(f"stopped at {session.offset // MiB}MB/{session.size // MiB}MB")
+                start = session.offset
+                end = self.chunk_end(start)
+                f.seek(start)
+                data = f.read(end - start)
+                try:
+                    resp = self._put(data, f"bytes {start}-{end - 1}/{session.size}")
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    error: Exception | None = e
+                    resp = None
+                else:
+                    error = None
+                    if resp.status_code >= 500:
+                        error = UploadError(resp.status_code, resp.text)
+
+                if error is None:
+                    done = self.handle(resp, start, end)
+                    failures = 0
+                    if self.on_progress:
+                        self.on_progress(session)
+                    if done:
+                        return self.result or {}
+                    print(f"  Uploading... {session.progress:.0%}")
+                    continue
+
+                failures += 1
+                if failures > self.retries:
+                    raise error
+                wait = RETRY_BACKOFF * (2 ** (failures - 1)) * random.uniform(0.8, 1.2)
+                print(f"  Chunk at {start // MiB}MB failed ({error}) — "
+                      f"retrying in {wait:.0f}s ({failures}/{self.retries})")
+                self.stop.wait(wait)
+                try:
+                    if self.recover():
+                        return self.result or {}
+                except (requests.ConnectionError, requests.Timeout):
+                    pass  # next attempt re-sends from the last known offset
+
+
+class GoogleResumableUpload(ChunkedUpload):
+    """Google resumable media upload (YouTube Data API videos.insert)."""
+
+    @classmethod
+    def initiate(
+        cls,
+        http: PooledSession,
+        init_url: str,
+        path: Path,
+        metadata: dict,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        headers: dict | None = None,
+    ) -> UploadSession:
+        """Open a resumable session; the session URI comes back in Location."""
+        size = Path(path).stat().st_size
+        resp = http.post(init_url, json=metadata, headers={
+            **(headers or {}),
+            "X-Upload-Content-Type": cls.content_type,
+            "X-Upload-Content-Length": str(size),
+        })
+        if resp.status_code != 200 or not resp.headers.get("Location"):
+            raise UploadError(resp.status_code, resp.text)
+        return UploadSession.start(resp.headers["Location"], path, google_chunk_size(chunk_size))
+
+    def _apply_range(self, resp: requests.Response) -> None:
+        match = _RANGE.match(resp.headers.get("Range", ""))
+        self.session.offset = int(match.group(2)) + 1 if match else 0
+
+    def handle(self, resp: requests.Response, start: int, end: int) -> bool:
+        if resp.status_code in (200, 201):
+            self.session.offset = self.session.size
+            self.result = resp.json()
+            return True
+        if resp.status_code == 308:
+            # The server may keep less than was sent; trust its Range
+            self._apply_range(resp)
+            return False
+        if resp.status_code in (404, 410):
+            raise SessionExpired(resp.status_code, resp.text)
+        raise UploadError(resp.status_code, resp.text)
+
+    def query_offset(self) -> bool:
+        """Ask how many bytes the server holds; True if the upload is complete."""
+        resp = self._put(b"", f"bytes */{self.session.size}")
+        return self.handle(resp, self.session.offset, self.session.offset)
+
+    recover = query_offset
+
+
+class TikTokChunkedUpload(ChunkedUpload):
+    """TikTok Content Posting API FILE_UPLOAD transfer."""
+
+    def __init__(self, *args, total_chunks: int = 0, **kwargs):
+        super().__init__(*args, **kwargs)
+        _, count = tiktok_chunking(self.session.size, self.session.chunk_size)
+        self.total_chunks = total_chunks or count
+
+    def chunk_end(self, start: int) -> int:
+        index = start // self.session.chunk_size
+        if index >= self.total_chunks - 1:
+            return self.session.size  # the last chunk takes the remainder
+        return start + self.session.chunk_size
+
+    def handle(self, resp: requests.Response, start: int, end: int) -> bool:
+        if resp.status_code in (200, 201, 206):
+            self.session.offset = end
+            return end >= self.session.size
+        # 416: out of step with the server (a chunk was acknowledged after the
+        # last saved offset); without a probe the only way back is a new upload
+        if resp.status_code in (404, 410, 416) or (resp.status_code == 403
+                                                    and self.session.age > TIKTOK_URL_TTL):
+            raise SessionExpired(resp.status_code, resp.text)
+        raise UploadError(resp.status_code, resp.text)
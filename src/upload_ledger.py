@@ -0,0 +1,301 @@
+"""SQLite ledger of upload results across every platform.
+
+One row per (platform, folder, design_key) with status, timestamps, the
+platform's remote ID and error text. The per-platform tracker files
+(uploaded_<platform>.json + .jsonl log) stay the source of truth; the
+ledger mirrors them so upload_status.py and the dashboard can answer
+"how many done / failed / uploaded today" with indexed queries instead of
+loading and scanning every tracker.
+
+``daily_counts`` keeps a running count of rows per (platform, day, status),
+maintained by triggers as rows are written, so daily-limit checks are a
+primary-key lookup however large the trackers grow. A new day is simply a
+new key; past days stay for the dashboard's history. Days are calendar
+dates in LIMIT_TZ (US Eastern), where the Etsy and Pinterest daily limits
+have always been counted, not UTC dates.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+from src.config import PROJECT_ROOT
+
+DB_NAME = "uploads.db"
+
+# Daily limits reset at midnight in this timezone
+LIMIT_TZ = ZoneInfo("America/New_York")
+
+# PRAGMA user_version: 1 = ``day`` is the LIMIT_TZ date (before: UTC date)
+LEDGER_VERSION = 1
+
+# Tracker entry fields that carry the platform's ID for the upload
+REMOTE_ID_FIELDS = ("product_id", "listing_id", "pin_id", "media_id", "video_id", "publish_id")
+
+# Tracker key prefixes that namespace a platform inside its tracker
+KEY_PREFIXES = ("printify:",)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS uploads (
+    platform    TEXT NOT NULL,
+    folder      TEXT NOT NULL,
+    design_key  TEXT NOT NULL,
+    source      TEXT NOT NULL,
+    niche       TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    uploaded_at TEXT,
+    day         TEXT,
+    remote_id   TEXT,
+    error       TEXT,
+    data        TEXT NOT NULL,
+    PRIMARY KEY (platform, folder, design_key)
+);
+CREATE TABLE IF NOT EXISTS trackers (
+    platform  TEXT PRIMARY KEY,
+    signature TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_uploads_status ON uploads(platform, status, source);
+CREATE INDEX IF NOT EXISTS idx_uploads_day ON uploads(platform, day, status);
+"""
+
+# INSERT OR REPLACE deletes the old row first; with recursive_triggers on
+# that fires the delete trigger, so a re-recorded entry moves its count
+# rather than adding to it.
+_COUNTS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily_counts (
+    platform TEXT NOT NULL,
+    day      TEXT NOT NULL,
+    status   TEXT NOT NULL,
+    n        INTEGER NOT NULL,
+    PRIMARY KEY (platform, day, status)
+);
+CREATE TRIGGER IF NOT EXISTS daily_counts_insert AFTER INSERT ON uploads
+WHEN NEW.day IS NOT NULL BEGIN
+    INSERT INTO daily_counts (platform, day, status, n)
+    VALUES (NEW.platform, NEW.day, NEW.status, 1)
+    ON CONFLICT (platform, day, status) DO UPDATE SET n = n + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS daily_counts_delete AFTER DELETE ON uploads
+WHEN OLD.day IS NOT NULL BEGIN
+    UPDATE daily_counts SET n = n - 1
+    WHERE platform = OLD.platform AND day = OLD.day AND status = OLD.status;
+END;
+"""
+
+# Rebuild the counters from the rows (first open of a ledger without them)
+_COUNTS_BACKFILL = """
+DELETE FROM daily_counts;
+INSERT INTO daily_counts (platform, day, status, n)
+SELECT platform, day, status, COUNT(*) FROM uploads WHERE day IS NOT NULL
+GROUP BY platform, day, status;
+"""
+
+
+def limit_day(timestamp: str | None) -> str | None:
+    """LIMIT_TZ date (YYYY-MM-DD) of an ISO timestamp; None if unparseable."""
+    if not timestamp:
+        return None
+    try:
+        return datetime.fromisoformat(timestamp).astimezone(LIMIT_TZ).date().isoformat()
+    except ValueError:
+        return None
+
+
+def limit_today() -> str:
+    """Today's date in LIMIT_TZ, the key daily limits are counted under."""
+    return datetime.now(LIMIT_TZ).date().isoformat()
+
+
+def parse_key(key: str) -> tuple[str, str, str]:
+    """(source, folder, stem) for a tracker key.
+
+    ``tshirt/coffee_001`` -> ("pod", "tshirt", "coffee_001");
+    ``ext:unified/poster/eiffel`` -> ("ext", "poster", "eiffel").
+    """
+    raw = key
+    for prefix in KEY_PREFIXES:
+        if raw.startswith(prefix):
+            raw = raw[len(prefix):]
+            break
+    if raw.startswith("ext:"):
+        parts = raw[len("ext:"):].split("/")
+        folder = parts[1] if len(parts) >= 3 else ""
+        return "ext", folder, parts[-1]
+    folder, _, stem = raw.rpartition("/")
+    return "pod", folder.split("/")[0], stem
+
+
+def _row(platform: str, key: str, entry: dict) -> tuple:
+    source, folder, stem = parse_key(key)
+    uploaded_at = entry.get("timestamp") or entry.get("uploaded_at")
+    remote_id = next((entry[f] for f in REMOTE_ID_FIELDS if entry.get(f)), None)
+    return (
+        platform, folder, key, source, stem.split("_")[0],
+        entry.get("status") or "", uploaded_at,
+        limit_day(uploaded_at),
+        str(remote_id) if remote_id is not None else None,
+        entry.get("error"), json.dumps(entry),
+    )
+
+
+_INSERT = (
+    "INSERT OR REPLACE INTO uploads (platform, folder, design_key, source, niche, status, "
+    "uploaded_at, day, remote_id, error, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+class UploadLedger:
+    """Indexed mirror of every platform's upload tracker."""
+
+    def __init__(self, root: Path = PROJECT_ROOT, db_path: Path | None = None):
+        self.root = Path(root)
+        self.db_path = db_path or (self.root / DB_NAME)
+        # Shared across uploader worker threads and dashboard requests;
+        # writes are serialized by the lock.
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA recursive_triggers = ON")
+        self.conn.executescript(_SCHEMA)
+        if not self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'daily_counts'"
+        ).fetchone():
+            # One transaction, so no write lands between the triggers and the backfill
+            self.conn.executescript(f"BEGIN IMMEDIATE;{_COUNTS_SCHEMA}{_COUNTS_BACKFILL}COMMIT;")
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] < LEDGER_VERSION:
+            # Ledgers from before LIMIT_TZ keyed days by UTC date: re-key the
+            # rows, then recount (an UPDATE doesn't fire the count triggers)
+            self.conn.create_function("limit_day", 1, limit_day, deterministic=True)
+            self.conn.executescript(
+                "BEGIN IMMEDIATE; UPDATE uploads SET day = limit_day(uploaded_at);"
+                f"{_COUNTS_BACKFILL} PRAGMA user_version = {LEDGER_VERSION}; COMMIT;"
+            )
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    # -- writes -------------------------------------------------------------
+
+    def record(self, platform: str, key: str, entry: dict, signature: str | None = None) -> None:
+        """Upsert one tracker entry (and the tracker's new file signature)."""
+        with self._lock:
+            self.conn.execute(_INSERT, _row(platform, key, entry))
+            if signature is not None:
+                self._set_signature(platform, signature)
+            self.conn.commit()
+
+    def replace_platform(self, platform: str, tracker: dict, signature: str) -> None:
+        """Re-import a platform's whole tracker in one transaction."""
+        rows = [_row(platform, k, v) for k, v in tracker.items()]
+        with self._lock:
+            self.conn.execute("DELETE FROM uploads WHERE platform = ?", (platform,))
+            self.conn.executemany(_INSERT, rows)
+            self._set_signature(platform, signature)
+            self.conn.commit()
+
+    def signature(self, platform: str) -> str | None:
+        row = self.conn.execute(
+            "SELECT signature FROM trackers WHERE platform = ?", (platform,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _set_signature(self, platform: str, signature: str) -> None:
+        self.conn.execute(
+            "INSERT OR REPLACE INTO trackers (platform, signature) VALUES (?, ?)",
+            (platform, signature),
+        )
+
+    # -- queries ------------------------------------------------------------
+
+    def status_counts(self, platform: str, source: str | None = None) -> Counter:
+        """{status: count} for a platform, optionally one source (pod / ext)."""
+        sql = "SELECT status, COUNT(*) FROM uploads WHERE platform = ?"
+        params: list = [platform]
+        if source:
+            sql += " AND source = ?"
+            params.append(source)
+        sql += " GROUP BY status"
+        return Counter(dict(self.conn.execute(sql, params)))
+
+    def folder_counts(self, platform: str, source: str | None = None) -> dict[str, Counter]:
+        """{folder: {status: count}} for a platform."""
+        sql = "SELECT folder, status, COUNT(*) FROM uploads WHERE platform = ?"
+        params: list = [platform]
+        if source:
+            sql += " AND source = ?"
+            params.append(source)
+        sql += " GROUP BY folder, status"
+        result: dict[str, Counter] = {}
+        for folder, status, n in self.conn.execute(sql, params):
+            result.setdefault(folder, Counter())[status] = n
+        return result
+
+    def niche_counts(self, platform: str, source: str | None = None, status: str = "success") -> Counter:
+        sql = "SELECT niche, COUNT(*) FROM uploads WHERE platform = ? AND status = ?"
+        params: list = [platform, status]
+        if source:
+            sql += " AND source = ?"
+            params.append(source)
+        sql += " GROUP BY niche"
+        return Counter(dict(self.conn.execute(sql, params)))
+
+    def day_counts(self, platform: str, status: str = "success", since: str | None = None) -> dict[str, int]:
+        """{YYYY-MM-DD: count} of uploads per LIMIT_TZ day, oldest first."""
+        sql = "SELECT day, n FROM daily_counts WHERE platform = ? AND status = ? AND n > 0"
+        params: list = [platform, status]
+        if since:
+            sql += " AND day >= ?"
+            params.append(since)
+        sql += " ORDER BY day"
+        return dict(self.conn.execute(sql, params))
+
+    def day_count(self, platform: str, day: str, status: str = "success") -> int:
+        """Uploads with ``status`` on one LIMIT_TZ day (YYYY-MM-DD), from the running counters."""
+        row = self.conn.execute(
+            "SELECT n FROM daily_counts WHERE platform = ? AND day = ? AND status = ?",
+            (platform, day, status),
+        ).fetchone()
+        return row[0] if row else 0
+
+    def count_since(self, platform: str, since: datetime, status: str = "success") -> int:
+        """Uploads with ``status`` at or after ``since`` (an aware datetime).
+
+        For rolling windows such as Instagram's 24 hours: the indexed ``day``
+        column narrows the scan to the last day or two, then the timestamps
+        of those rows are compared exactly.
+        """
+        rows = self.conn.execute(
+            "SELECT uploaded_at FROM uploads WHERE platform = ? AND status = ? AND day >= ?",
+            (platform, status, since.astimezone(LIMIT_TZ).date().isoformat()),
+        )
+        return sum(1 for (uploaded_at,) in rows if datetime.fromisoformat(uploaded_at).astimezone() >= since)
+
+    def total(self, platform: str) -> int:
+        row = self.conn.execute("SELECT COUNT(*) FROM uploads WHERE platform = ?", (platform,)).fetchone()
+        return row[0]
+
+    def keys(self, platform: str, status: str) -> set[str]:
+        rows = self.conn.execute(
+            "SELECT design_key FROM uploads WHERE platform = ? AND status = ?", (platform, status)
+        )
+        return {r[0] for r in rows}
+
+
+_ledgers: dict[Path, UploadLedger] = {}
+_ledgers_lock = threading.Lock()
+
+
+def get_ledger(root: Path = PROJECT_ROOT) -> UploadLedger:
+    """Shared ledger for the directory holding the tracker files."""
+    root = Path(root).resolve()
+    with _ledgers_lock:
+        ledger = _ledgers.get(root)
+        if ledger is None:
+            ledger = _ledgers[root] = UploadLedger(root)
+        return ledger
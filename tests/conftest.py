@@ -0,0 +1,16 @@
+"""Make the repo's top-level modules and ``src`` importable from the tests."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture(autouse=True)
+def _external_index_dir(tmp_path_factory, monkeypatch):
+    """Keep indexes for tmp roots out of the checkout's .metadata_index/."""
+    from src import metadata_store
+
+    monkeypatch.setattr(metadata_store, "EXTERNAL_INDEX_DIR", tmp_path_factory.mktemp("metadata_index"))
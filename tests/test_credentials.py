@@ -0,0 +1,168 @@
+"""CredentialManager against the mock_oauth stand-in for the token endpoints."""
+
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+import requests
+from werkzeug.serving import make_server
+
+import mock_oauth
+from src.credentials import (
+    CredentialError, CredentialManager, NotAuthorized, TokenSource, refresh_grant,
+)
+
+
+@pytest.fixture
+def oauth():
+    """Start mock_oauth; returns a function (expires_in, fail_every) -> base URL."""
+    servers = []
+
+    def start(expires_in: int = 3600, fail_every: int = 0) -> str:
+        app = mock_oauth.create_app(expires_in=expires_in, fail_every=fail_every)
+        server = make_server("127.0.0.1", 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+@pytest.fixture
+def manager():
+    manager = CredentialManager(margin=60, retry_after=30)
+    yield manager
+    manager.stop()
+
+
+def etsy_source(base: str, stored: dict, ahead: float = 900) -> TokenSource:
+    """An Etsy-style source whose 'token file' is the ``stored`` dict."""
+
+    def refresh(record: dict) -> dict:
+        new = refresh_grant(f"{base}/v3/public/oauth/token", record["refresh_token"], client_id="key")
+        new["expires_at"] = new["obtained_at"] + new["expires_in"]
+        stored.clear()
+        stored.update(new)
+        return new
+
+    return TokenSource(
+        load=lambda: dict(stored),
+        refresh=refresh,
+        expires_at=lambda r: r.get("expires_at"),
+        ahead=ahead,
+    )
+
+
+def stats(base: str) -> dict:
+    return requests.get(f"{base}/_stats", timeout=5).json()
+
+
+def expired() -> dict:
+    return {"access_token": "old", "refresh_token": "r1", "expires_at": time.time() - 10}
+
+
+def test_expired_token_is_refreshed_once_and_persisted(oauth, manager):
+    base = oauth()
+    stored = expired()
+    manager.register("etsy", etsy_source(base, stored))
+
+    assert manager.token("etsy") == "mock-1"
+    assert manager.token("etsy") == "mock-1"  # from memory
+    assert stats(base)["refreshes"] == {"etsy": 1}
+    assert stored["access_token"] == "mock-1"  # the next process starts from here
+
+
+def test_valid_token_is_used_without_a_refresh(oauth, manager):
+    base = oauth()
+    stored = {"access_token": "fresh", "refresh_token": "r1", "expires_at": time.time() + 7200}
+    manager.register("etsy", etsy_source(base, stored))
+    assert manager.token("etsy") == "fresh"
+    assert stats(base)["refreshes"] == {}
+
+
+def test_threads_share_one_refresh(oauth, manager):
+    base = oauth()
+    manager.register("etsy", etsy_source(base, expired()))
+    start = threading.Barrier(8)
+    tokens = []
+
+    def use():
+        start.wait()
+        tokens.append(manager.token("etsy"))
+
+    threads = [threading.Thread(target=use) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert tokens == ["mock-1"] * 8
+    assert stats(base)["refreshes"] == {"etsy": 1}
+
+
+def test_failed_refresh_raises_and_drops_the_cached_token(oauth, manager):
+    base = oauth(fail_every=1)
+    stored = expired()
+    loads = []
+    source = etsy_source(base, stored)
+    load = source.load
+    source.load = lambda: loads.append(1) or load()
+    manager.register("etsy", source)
+
+    with pytest.raises(CredentialError, match="HTTP 500"):
+        manager.token("etsy")
+    with pytest.raises(CredentialError):
+        manager.token("etsy")
+    assert len(loads) == 2  # reloaded from storage after the failure
+    assert stored["access_token"] == "old"
+    assert stats(base)["failures"] == {"etsy": 2}
+
+
+def test_background_refresh_failure_keeps_the_token_and_retries_later(oauth, manager):
+    base = oauth(fail_every=1)
+    stored = {"access_token": "still-valid", "refresh_token": "r1", "expires_at": time.time() + 600}
+    manager.register("etsy", etsy_source(base, stored, ahead=900))
+    assert manager.token("etsy") == "still-valid"
+
+    deadline = time.time() + 5
+    while not stats(base)["failures"] and time.time() < deadline:
+        time.sleep(0.05)
+    assert stats(base)["failures"] == {"etsy": 1}
+    assert manager.token("etsy") == "still-valid"
+    assert manager._due("etsy") >= time.time() + 20  # waits retry_after before trying again
+
+
+def test_background_thread_refreshes_before_expiry(oauth, manager):
+    base = oauth(expires_in=3600)
+    stored = {"access_token": "expiring", "refresh_token": "r1", "expires_at": time.time() + 120}
+    manager.register("etsy", etsy_source(base, stored, ahead=900))
+    assert manager.token("etsy") == "expiring"  # outside the margin: no wait for a refresh
+
+    deadline = time.time() + 5
+    while manager.refreshes.get("etsy") != 1 and time.time() < deadline:
+        time.sleep(0.05)
+    assert manager.token("etsy") == "mock-1"
+    assert stats(base)["refreshes"] == {"etsy": 1}
+
+
+def test_unknown_and_unauthorized_platforms(manager):
+    with pytest.raises(CredentialError, match="No token source"):
+        manager.token("nowhere")
+    manager.register("etsy", TokenSource(load=lambda: None, refresh=dict, expires_at=lambda r: None))
+    with pytest.raises(NotAuthorized):
+        manager.token("etsy")
+
+
+@pytest.mark.parametrize("path, data, auth", [
+    ("/v5/oauth/token", {"grant_type": "refresh_token", "refresh_token": "r"}, ("id", "secret")),
+    ("/v2/oauth/token/", {"grant_type": "refresh_token", "refresh_token": "r", "client_key": "k"}, None),
+    ("/token", {"grant_type": "refresh_token", "refresh_token": "r", "client_id": "c"}, None),
+])
+def test_mock_endpoints_accept_each_platforms_grant(oauth, path, data, auth):
+    base = oauth()
+    resp = requests.post(f"{base}{path}", data=data, auth=auth, timeout=5)
+    assert resp.status_code == 200 and resp.json()["access_token"] == "mock-1"
@@ -0,0 +1,75 @@
+"""PooledSession retries: what is safe to send twice."""
+
+from __future__ import annotations
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from src import http_client
+from src.http_client import PooledSession
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    """Counts requests and answers after the client has given up."""
+
+    hits = 0
+
+    def _slow(self):
+        type(self).hits += 1
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        time.sleep(0.3)
+        try:
+            self.send_response(200)
+            self.end_headers()
+        except OSError:
+            pass
+
+    do_GET = do_POST = _slow
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(http_client, "MAX_BACKOFF", 0)
+    SlowHandler.hits = 0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_read_timeout_retries_get(server):
+    http = PooledSession("test", retries=2, backoff=0, timeout=0.1)
+    with pytest.raises(requests.ReadTimeout):
+        http.get(f"{server}/listings")
+    assert SlowHandler.hits == 3
+
+
+def test_read_timeout_does_not_resend_post(server):
+    http = PooledSession("test", retries=2, backoff=0, timeout=0.1)
+    with pytest.raises(requests.ReadTimeout):
+        http.post(f"{server}/listings", json={"title": "x"})
+    assert SlowHandler.hits == 1
+
+
+def test_connect_timeout_retries_post(monkeypatch):
+    monkeypatch.setattr(http_client, "MAX_BACKOFF", 0)
+    http = PooledSession("test", retries=2, backoff=0)
+    attempts = []
+
+    def refuse(method, url, **kwargs):
+        attempts.append(method)
+        raise requests.ConnectTimeout("never connected")
+
+    monkeypatch.setattr(http.session, "request", refuse)
+    with pytest.raises(requests.ConnectTimeout):
+        http.post("https://api.test/listings")
+    assert attempts == ["POST"] * 3
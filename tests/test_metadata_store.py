@@ -0,0 +1,116 @@
+"""MetadataStore: which sidecars sync() re-reads, and what it drops."""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+
+import pytest
+
+from src import metadata_store
+from src.metadata_store import MetadataStore
+
+
+@pytest.fixture
+def root(tmp_path):
+    folder = tmp_path / "tshirt"
+    folder.mkdir()
+    for stem in ("coffee_001", "coffee_002", "cat_001"):
+        (folder / f"{stem}.json").write_text(json.dumps({"title": stem, "tags": [stem, "gift"]}))
+        (folder / f"{stem}.png").write_bytes(b"png")
+    return tmp_path
+
+
+@pytest.fixture
+def store(root):
+    store = MetadataStore(root)
+    yield store
+    store.close()
+
+
+def write(path, metadata, mtime_ns=None):
+    path.write_text(json.dumps(metadata))
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_first_sync_indexes_sidecars_and_images(store):
+    assert store.sync("tshirt") == 3
+    assert store.count("tshirt") == 3
+    assert store.image_count("tshirt", paired=True) == 3
+    assert store.niches("tshirt") == ["cat", "coffee"]
+    assert store.tag_counts("tshirt")["gift"] == 3
+
+
+def test_unchanged_files_are_not_reparsed(store):
+    store.sync("tshirt")
+    assert store.sync("tshirt") == 0
+    assert store.sync("tshirt", force=True) == 3
+
+
+def test_in_place_overwrite_is_picked_up(store, root):
+    path = root / "tshirt" / "coffee_001.json"
+    backup = root / "coffee_001.json.bak"
+    shutil.copy2(path, backup)
+    store.sync("tshirt")
+
+    write(path, {"title": "Optimized - Coffee"}, mtime_ns=path.stat().st_mtime_ns + 10**9)
+    assert store.sync("tshirt") == 1
+    assert store.metadata("tshirt", "coffee_001")["title"] == "Optimized - Coffee"
+
+    # A restore puts back the older mtime (copy2) without touching the directory
+    shutil.copy2(backup, path)
+    assert store.sync("tshirt") == 1
+    assert store.metadata("tshirt", "coffee_001")["title"] == "coffee_001"
+
+
+def test_same_size_edit_with_same_mtime_needs_force(store, root):
+    path = root / "tshirt" / "cat_001.json"
+    store.sync("tshirt")
+    mtime = path.stat().st_mtime_ns
+    write(path, {"title": "cat_00X", "tags": ["cat_001", "gift"]}, mtime_ns=mtime)
+
+    assert store.sync("tshirt") == 0
+    assert store.sync("tshirt", force=True) == 3
+    assert store.metadata("tshirt", "cat_001")["title"] == "cat_00X"
+
+
+def test_deleted_files_leave_the_index(store, root):
+    store.sync("tshirt")
+    (root / "tshirt" / "coffee_002.json").unlink()
+    (root / "tshirt" / "cat_001.png").unlink()
+    store.sync("tshirt")
+
+    assert store.count("tshirt") == 2
+    assert store.unpaired_images("tshirt") == ["coffee_002"]
+    assert store.image_count("tshirt", paired=True) == 1
+    assert "coffee_002" not in store.tag_counts("tshirt")
+
+
+def test_missing_folder_empties_it(store, root):
+    store.sync("tshirt")
+    shutil.rmtree(root / "tshirt")
+    store.sync("tshirt")
+    assert store.count("tshirt") == 0
+    assert store.image_count("tshirt") == 0
+
+
+def test_upsert_replaces_tags(store, root):
+    store.sync("tshirt")
+    path = root / "tshirt" / "coffee_001.json"
+    metadata = {"title": "New", "tags": ["espresso"]}
+    write(path, metadata)
+    store.upsert(path, metadata)
+    assert store.tag_counts("tshirt", "coffee") == {"espresso": 1, "coffee_002": 1, "gift": 1}
+    assert store.sync("tshirt") == 0
+
+
+def test_external_roots_are_indexed_under_the_project(root):
+    store = metadata_store.get_store(root, ["tshirt"])
+    assert store.image_count("tshirt") == 3
+    assert not (root / metadata_store.DB_NAME).exists()
+    assert store.db_path.parent == metadata_store.EXTERNAL_INDEX_DIR
+    assert metadata_store.index_path(metadata_store.OUTPUT_DIR) == (
+        metadata_store.OUTPUT_DIR.resolve() / metadata_store.DB_NAME
+    )
@@ -0,0 +1,146 @@
+"""MetadataBatchWriter flushes and recover_journal after a crash mid-flush."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from src import metadata_writer
+from src.metadata_store import get_store
+from src.metadata_writer import JOURNAL_NAME, MetadataBatchWriter, recover_journal
+
+
+class Crash(Exception):
+    pass
+
+
+@pytest.fixture
+def root(tmp_path):
+    folder = tmp_path / "tshirt"
+    folder.mkdir()
+    for i in range(3):
+        (folder / f"cat_00{i}.json").write_text(json.dumps({"title": f"old {i}"}))
+    return tmp_path
+
+
+def titles(root):
+    return {p.name: json.loads(p.read_text())["title"] for p in sorted((root / "tshirt").glob("*.json"))}
+
+
+def leftovers(root):
+    return sorted(p.name for p in root.rglob(".*") if p.name != JOURNAL_NAME)
+
+
+def write_batch(root, paths):
+    writer = MetadataBatchWriter(root, batch_size=100)
+    for path in paths:
+        writer.write(path, {"title": f"new {path.stem}"})
+    return writer
+
+
+def targets(root):
+    folder = root / "tshirt"
+    return [folder / "cat_000.json", folder / "cat_001.json", folder / "dog_000.json"]
+
+
+def crash_after(monkeypatch, name, calls):
+    """Make metadata_writer.<name> raise Crash on its ``calls``-th call."""
+    real = getattr(metadata_writer, name)
+    count = {"n": 0}
+
+    def wrapper(*args, **kwargs):
+        count["n"] += 1
+        if count["n"] == calls:
+            raise Crash(name)
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(metadata_writer, name, wrapper)
+
+
+def test_flush_writes_everything_and_cleans_up(root):
+    with write_batch(root, targets(root)) as writer:
+        pass
+    assert writer.written == 3
+    assert titles(root) == {
+        "cat_000.json": "new cat_000", "cat_001.json": "new cat_001",
+        "cat_002.json": "old 2", "dog_000.json": "new dog_000",
+    }
+    assert not (root / JOURNAL_NAME).exists()
+    assert leftovers(root) == []
+    assert get_store(root).metadata("tshirt", "dog_000") == {"title": "new dog_000"}
+
+
+def test_batches_flush_at_batch_size(root):
+    writer = MetadataBatchWriter(root, batch_size=2)
+    for path in targets(root):
+        writer.write(path, {"title": "x"})
+    assert writer.written == 2 and len(writer.pending) == 1
+
+
+def test_unfinished_journal_blocks_a_new_writer(root, monkeypatch):
+    crash_after(monkeypatch, "_swap_in", 2)
+    with pytest.raises(Crash):
+        write_batch(root, targets(root)).flush()
+    with pytest.raises(RuntimeError, match="Unfinished metadata batch"):
+        MetadataBatchWriter(root)
+
+
+@pytest.mark.parametrize("swapped", [1, 2, 3])
+def test_resume_finishes_a_batch_that_crashed_mid_swap(root, monkeypatch, swapped):
+    crash_after(monkeypatch, "_swap_in", swapped)
+    with pytest.raises(Crash):
+        write_batch(root, targets(root)).flush()
+    monkeypatch.undo()
+
+    assert recover_journal(root, "resume") == 3
+    assert titles(root) == {
+        "cat_000.json": "new cat_000", "cat_001.json": "new cat_001",
+        "cat_002.json": "old 2", "dog_000.json": "new dog_000",
+    }
+    assert leftovers(root) == []
+    assert not (root / JOURNAL_NAME).exists()
+    assert get_store(root).metadata("tshirt", "cat_001") == {"title": "new cat_001"}
+
+
+@pytest.mark.parametrize("swapped", [1, 2, 3])
+def test_rollback_restores_the_previous_files(root, monkeypatch, swapped):
+    get_store(root, ["tshirt"])
+    crash_after(monkeypatch, "_swap_in", swapped)
+    with pytest.raises(Crash):
+        write_batch(root, targets(root)).flush()
+    monkeypatch.undo()
+
+    assert recover_journal(root, "rollback") == 3
+    # dog_000 did not exist before the batch, so rolling back removes it
+    assert titles(root) == {"cat_000.json": "old 0", "cat_001.json": "old 1", "cat_002.json": "old 2"}
+    assert leftovers(root) == []
+    store = get_store(root)
+    assert store.metadata("tshirt", "cat_000") == {"title": "old 0"}
+    assert store.metadata("tshirt", "dog_000") is None
+
+
+def test_crash_while_staging_is_rolled_back_even_on_resume(root, monkeypatch, capsys):
+    # Call 1 writes the journal's temp file, 2 stages cat_000, 3 dies on cat_001
+    crash_after(monkeypatch, "_write_synced", 3)
+    with pytest.raises(Crash):
+        write_batch(root, targets(root)).flush()
+    monkeypatch.undo()
+    assert json.loads((root / JOURNAL_NAME).read_text())["state"] == "staging"
+    assert leftovers(root) == [".cat_000.json.new"]
+
+    assert recover_journal(root, "resume") == 3
+    assert "rolling it back" in capsys.readouterr().out
+    assert titles(root) == {"cat_000.json": "old 0", "cat_001.json": "old 1", "cat_002.json": "old 2"}
+    assert leftovers(root) == []
+
+
+def test_recover_without_journal_does_nothing(root):
+    assert recover_journal(root, "resume") == 0
+
+
+def test_atomic_write_leaves_no_temp_file(tmp_path):
+    path = tmp_path / "a.json"
+    metadata_writer.atomic_write_json(path, {"title": "x"})
+    assert json.loads(path.read_text()) == {"title": "x"}
+    assert [p.name for p in tmp_path.iterdir()] == ["a.json"]
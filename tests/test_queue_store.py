@@ -0,0 +1,137 @@
+"""QueueStore: leases, out-of-order completion and the legacy shared position."""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+
+import pytest
+
+from src.queue_store import QueueStore
+
+
+def make_store(tmp_path, count=5, lease_seconds=900, **order):
+    order_path = tmp_path / "upload_queue.json"
+    order = {"created": "2026-01-01T00:00:00", "videos": [{"filename": f"v{i}.mp4"} for i in range(count)],
+             **order}
+    order_path.write_text(json.dumps(order))
+    return QueueStore(order_path, lease_seconds=lease_seconds)
+
+
+def test_claims_are_exclusive_until_completed(tmp_path):
+    store = make_store(tmp_path, count=3)
+    assert store.claim("tiktok", "a") == 0
+    assert store.claim("tiktok", "b") == 1
+    assert store.claim("tiktok", "c") == 2
+    assert store.claim("tiktok", "d") is None
+    # Platforms have their own cursors
+    assert store.claim("youtube", "a") == 0
+
+
+def test_expired_lease_is_claimable_again(tmp_path):
+    store = make_store(tmp_path, lease_seconds=0.05)
+    assert store.claim("tiktok", "crashed") == 0
+    time.sleep(0.1)
+    assert store.claim("tiktok", "other") == 0
+    assert not store.renew("tiktok", 0, "crashed")
+    assert store.renew("tiktok", 0, "other")
+
+
+def test_keep_alive_outlives_the_lease(tmp_path):
+    store = make_store(tmp_path, lease_seconds=0.15)
+    assert store.claim("tiktok", "slow") == 0
+    with store.keep_alive("tiktok", 0, "slow"):
+        time.sleep(0.5)
+        assert store.claim("tiktok", "other") == 1
+
+
+def test_out_of_order_completion_moves_cursor_past_finished_run(tmp_path):
+    store = make_store(tmp_path)
+    for owner in "abc":
+        store.claim("tiktok", owner)
+    store.complete("tiktok", 2)
+    store.complete("tiktok", 1, "error")
+    prog = store.progress("tiktok")
+    assert (prog["cursor"], prog["done"], prog["claimed"]) == (0, 2, [0])
+
+    store.complete("tiktok", 0)
+    assert store.progress("tiktok")["done"] == 3
+    state = json.loads(store.state_path.read_text())["platforms"]["tiktok"]
+    assert state == {"cursor": 3, "claimed": {}, "finished": {}}
+    assert store.claim("tiktok", "d") == 3
+
+
+def test_released_item_is_claimed_next(tmp_path):
+    store = make_store(tmp_path)
+    store.claim("tiktok", "a")
+    store.claim("tiktok", "a")
+    store.release("tiktok", 0)
+    assert store.claim("tiktok", "b") == 0
+
+
+def test_legacy_position_seeds_every_platform(tmp_path):
+    store = make_store(tmp_path, position=3)
+    assert store.claim("tiktok", "a") == 3
+    assert store.claim("instagram", "a") == 3
+    assert store.progress("youtube")["done"] == 3
+
+
+def test_rebuild_resets_state(tmp_path):
+    store = make_store(tmp_path)
+    store.claim("tiktok", "a")
+    store.complete("tiktok", 0)
+    store.write_order({"created": "2026-02-01T00:00:00", "videos": store.videos})
+    assert store.claim("tiktok", "a") == 0
+
+
+@pytest.mark.parametrize("separate_instances", [False, True])
+def test_concurrent_consumers_never_share_an_item(tmp_path, separate_instances):
+    count, workers = 40, 8
+    shared = make_store(tmp_path, count=count)
+    claimed: list[int] = []
+    lock = threading.Lock()
+    start = threading.Barrier(workers)
+
+    def consumer(n: int) -> None:
+        # Separate instances share only the files (and the per-path mutex)
+        store = QueueStore(shared.order_path) if separate_instances else shared
+        start.wait()
+        while (idx := store.claim("tiktok", f"worker-{n}")) is not None:
+            with lock:
+                claimed.append(idx)
+            store.complete("tiktok", idx)
+
+    threads = [threading.Thread(target=consumer, args=(n,)) for n in range(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(claimed) == list(range(count))
+    assert shared.progress("tiktok")["done"] == count
+
+
+def _drain(order_path, name, out):
+    store = QueueStore(order_path)
+    while (idx := store.claim("tiktok", name)) is not None:
+        out.put(idx)
+        store.complete("tiktok", idx)
+
+
+def test_consumers_in_separate_processes_never_share_an_item(tmp_path):
+    import multiprocessing
+
+    ctx = multiprocessing.get_context("fork")
+    store = make_store(tmp_path, count=30)
+    out = ctx.Queue()
+    procs = [ctx.Process(target=_drain, args=(store.order_path, f"proc-{n}", out)) for n in range(4)]
+    for p in procs:
+        p.start()
+    claimed = [out.get(timeout=10) for _ in range(30)]
+    for p in procs:
+        p.join(timeout=10)
+        assert p.exitcode == 0
+
+    assert sorted(claimed) == list(range(30))
+    assert out.empty()
@@ -0,0 +1,123 @@
+"""TokenBucket pacing, header corrections and 429 pauses, on a fake clock."""
+
+from __future__ import annotations
+
+import threading
+import time
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src import rate_limit
+from src.rate_limit import TokenBucket, parse_rate_headers, retry_after_seconds
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return 1_700_000_000 + self.now
+
+    def sleep(self, seconds):
+        # Always move time on, as a real sleep does: a float-rounding
+        # remainder below the clock's resolution would otherwise spin
+        self.now += max(seconds, 1e-6)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit, "time", clock)
+    return clock
+
+
+def test_burst_then_steady_rate(clock):
+    bucket = TokenBucket(rate=2, capacity=4)
+    start = clock.now
+    for _ in range(4):
+        assert bucket.acquire() == 0
+    for _ in range(6):
+        bucket.acquire()
+    # four from the burst, then six at 2/s
+    assert clock.now - start == pytest.approx(3.0)
+
+
+def test_idle_time_refills_only_to_capacity(clock):
+    bucket = TokenBucket(rate=1, capacity=3)
+    for _ in range(3):
+        bucket.acquire()
+    clock.sleep(60)
+    waits = [bucket.acquire() for _ in range(4)]
+    assert waits[:3] == [0, 0, 0] and waits[3] == pytest.approx(1.0)
+
+
+def test_per_window_quota(clock):
+    bucket = TokenBucket.per_window(6, 60, burst=1)
+    assert bucket.rate == pytest.approx(0.1)
+    bucket.acquire()
+    assert bucket.acquire() == pytest.approx(10.0)
+
+
+def test_pause_holds_every_caller_and_drains(clock):
+    bucket = TokenBucket(rate=10, capacity=10)
+    bucket.pause(30)
+    start = clock.now
+    bucket.acquire()
+    assert clock.now - start == pytest.approx(30.1)
+
+
+def test_headers_tighten_but_never_loosen(clock):
+    bucket = TokenBucket(rate=10, capacity=10)
+    bucket.update_from_headers({"X-RateLimit-Remaining": "50"})
+    assert bucket.tokens == 10
+    bucket.update_from_headers({"X-RateLimit-Remaining": "2"})
+    assert bucket.tokens == 2
+
+
+def test_exhausted_quota_waits_for_the_reset(clock):
+    bucket = TokenBucket(rate=10, capacity=10)
+    bucket.update_from_headers({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "20"})
+    start = clock.now
+    bucket.acquire()
+    assert clock.now - start == pytest.approx(20.1)
+
+
+def test_threads_share_the_quota():
+    # Real clock: 20 acquisitions at 100/s past a burst of 5 take ~0.15s
+    bucket = TokenBucket(rate=100, capacity=5)
+    start = time.monotonic()
+    threads = [threading.Thread(target=lambda: [bucket.acquire() for _ in range(5)]) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert time.monotonic() - start >= 0.14
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({"X-Shopify-Shop-Api-Call-Limit": "32/40"}, (8.0, None)),
+    ({"X-Remaining-This-Second": "3"}, (3.0, 1.0)),
+    ({"X-RateLimit-Remaining": "7", "X-RateLimit-Reset": "12"}, (7.0, 12.0)),
+    ({"X-RateLimit-Remaining": "bad"}, (None, None)),
+    ({}, (None, None)),
+])
+def test_parse_rate_headers(headers, expected):
+    assert parse_rate_headers(headers) == expected
+
+
+def test_parse_rate_headers_epoch_reset(clock):
+    reset = clock.time() + 45
+    assert parse_rate_headers({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(reset)}) == (0.0, 45.0)
+
+
+def test_retry_after_seconds():
+    assert retry_after_seconds("12") == 12
+    assert retry_after_seconds(None, default=5) == 5
+    assert retry_after_seconds("soon", default=5) == 5
+    when = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=90), usegmt=True)
+    assert 85 <= retry_after_seconds(when) <= 90
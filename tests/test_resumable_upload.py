@@ -0,0 +1,219 @@
+"""Chunked uploads: TikTok chunk layout, Google offset recovery, resuming."""
+
+from __future__ import annotations
+
+import re
+import threading
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from src import resumable_upload as ru
+from src.resumable_upload import (
+    MiB, GoogleResumableUpload, SessionExpired, TikTokChunkedUpload, UploadSession,
+)
+
+_CONTENT_RANGE = re.compile(r"bytes (?:(\d+)-(\d+)|\*)/(\d+)")
+
+
+def response(status: int, headers: dict | None = None, body: bytes = b"") -> requests.Response:
+    resp = requests.Response()
+    resp.status_code = status
+    resp.headers.update(headers or {})
+    resp._content = body
+    return resp
+
+
+class FakeServer:
+    """Records PUTs and answers them with ``reply(start, end, data)``."""
+
+    def __init__(self):
+        self.received = bytearray()
+        self.ranges: list[tuple[int, int] | None] = []
+        self.fail: list = []  # exceptions / status codes for the next PUTs
+
+    def http(self):
+        return SimpleNamespace(session=SimpleNamespace(request=self.request), timeout=5)
+
+    def request(self, method, url, data, headers, timeout):
+        start, end, _ = _CONTENT_RANGE.match(headers["Content-Range"]).groups()
+        if start is None:
+            self.ranges.append(None)
+            return self.probe()
+        start, end = int(start), int(end) + 1
+        self.ranges.append((start, end))
+        if self.fail:
+            failure = self.fail.pop(0)
+            if isinstance(failure, Exception):
+                raise failure
+            return response(failure)
+        return self.accept(start, end, data)
+
+
+class GoogleServer(FakeServer):
+    """Keeps at most ``keep`` bytes of each chunk, like a server that drops a tail."""
+
+    def __init__(self, size: int, keep: int | None = None):
+        super().__init__()
+        self.size = size
+        self.keep = keep
+
+    def _range(self):
+        if not self.received:
+            return response(308)
+        return response(308, {"Range": f"bytes=0-{len(self.received) - 1}"})
+
+    def accept(self, start, end, data):
+        assert start == len(self.received), "chunk does not continue the acknowledged range"
+        self.received += data[:self.keep] if self.keep else data
+        if len(self.received) >= self.size:
+            return response(200, body=b'{"id": "vid123"}')
+        return self._range()
+
+    def probe(self):
+        if len(self.received) >= self.size:
+            return response(200, body=b'{"id": "vid123"}')
+        return self._range()
+
+
+class TikTokServer(FakeServer):
+    def accept(self, start, end, data):
+        assert start == len(self.received)
+        self.received += data
+        return response(206)
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(bytes(range(256)) * (4 * 1024 * 11))  # 11 MiB
+    return path
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(ru, "RETRY_BACKOFF", 0)
+
+
+# -- chunk layout -------------------------------------------------------------
+
+@pytest.mark.parametrize("size, requested, expected", [
+    (3 * MiB, 10 * MiB, (3 * MiB, 1)),            # under 5 MB: one chunk
+    (8 * MiB, 10 * MiB, (8 * MiB, 1)),            # fits in one requested chunk
+    (25 * MiB, 10 * MiB, (10 * MiB, 2)),          # the last chunk takes the 5 MB rest
+    (30 * MiB, 1 * MiB, (5 * MiB, 6)),            # raised to the 5 MB minimum
+    (200 * MiB, 100 * MiB, (64 * MiB, 3)),        # capped at 64 MB
+])
+def test_tiktok_chunking(size, requested, expected):
+    assert ru.tiktok_chunking(size, requested) == expected
+
+
+def test_tiktok_chunking_stays_under_the_chunk_limit():
+    # 6000 chunks of 5 MB would exceed the limit; the chunks grow instead
+    assert ru.tiktok_chunking(6000 * 5 * MiB, 5 * MiB) == (30 * MiB, ru.TIKTOK_MAX_CHUNKS)
+
+
+def test_google_chunk_size_is_aligned():
+    assert ru.google_chunk_size(10 * MiB + 1000) == 10 * MiB
+    assert ru.google_chunk_size(1000) == ru.GOOGLE_CHUNK_ALIGN
+
+
+# -- TikTok -------------------------------------------------------------------
+
+def test_tiktok_last_chunk_takes_the_remainder(video):
+    size = video.stat().st_size
+    chunk_size, count = ru.tiktok_chunking(size, 5 * MiB)
+    server = TikTokServer()
+    session = UploadSession.start("https://upload.test/1", video, chunk_size)
+    saved = []
+    TikTokChunkedUpload(server.http(), video, session, total_chunks=count,
+                        on_progress=lambda s: saved.append(s.offset)).run()
+
+    assert server.ranges == [(0, 5 * MiB), (5 * MiB, size)]
+    assert bytes(server.received) == video.read_bytes()
+    assert saved == [5 * MiB, size]
+
+
+def test_tiktok_resumes_from_the_saved_offset(video):
+    size = video.stat().st_size
+    saved = UploadSession.start("https://upload.test/1", video, 5 * MiB).to_dict()
+    saved["offset"] = 5 * MiB
+    session = UploadSession.from_entry({"status": "uploading", "upload_session": saved}, video)
+
+    server = TikTokServer()
+    server.received += video.read_bytes()[:5 * MiB]
+    TikTokChunkedUpload(server.http(), video, session).run()
+    assert server.ranges == [(5 * MiB, size)]
+    assert bytes(server.received) == video.read_bytes()
+
+
+def test_saved_session_is_dropped_when_the_file_changed(video):
+    saved = UploadSession.start("https://upload.test/1", video, 5 * MiB).to_dict()
+    video.write_bytes(b"edited")
+    assert UploadSession.from_entry({"status": "uploading", "upload_session": saved}, video) is None
+
+
+def test_tiktok_expired_url_raises_session_expired(video):
+    server = TikTokServer()
+    server.fail = [410]
+    session = UploadSession.start("https://upload.test/1", video, 5 * MiB)
+    with pytest.raises(SessionExpired):
+        TikTokChunkedUpload(server.http(), video, session).run()
+
+
+# -- Google -------------------------------------------------------------------
+
+def test_google_follows_the_acknowledged_range(video):
+    size = video.stat().st_size
+    server = GoogleServer(size, keep=3 * MiB)  # acknowledges less than it was sent
+    session = UploadSession.start("https://upload.test/g", video, 4 * MiB)
+    result = GoogleResumableUpload(server.http(), video, session).run()
+
+    assert result == {"id": "vid123"}
+    assert bytes(server.received) == video.read_bytes()
+    assert [r[0] for r in server.ranges] == [0, 3 * MiB, 6 * MiB, 9 * MiB]
+
+
+def test_google_recovers_the_offset_after_a_failed_chunk(video):
+    size = video.stat().st_size
+    server = GoogleServer(size)
+    session = UploadSession.start("https://upload.test/g", video, 4 * MiB)
+    # The second chunk reaches the server but the response is lost
+    original_accept = server.accept
+    calls = {"n": 0}
+
+    def flaky_accept(start, end, data):
+        calls["n"] += 1
+        resp = original_accept(start, end, data)
+        if calls["n"] == 2:
+            raise requests.ConnectionError("connection reset")
+        return resp
+
+    server.accept = flaky_accept
+    GoogleResumableUpload(server.http(), video, session).run()
+
+    # After the lost response, a bytes */size probe finds 8 MiB on the server
+    assert server.ranges == [(0, 4 * MiB), (4 * MiB, 8 * MiB), None, (8 * MiB, size)]
+    assert bytes(server.received) == video.read_bytes()
+
+
+def test_google_retries_server_errors_then_gives_up(video):
+    server = GoogleServer(video.stat().st_size)
+    server.fail = [503] * (ru.MAX_RETRIES + 1)
+    session = UploadSession.start("https://upload.test/g", video, 4 * MiB)
+    with pytest.raises(ru.UploadError) as info:
+        GoogleResumableUpload(server.http(), video, session).run()
+    assert info.value.status == 503
+    assert len(server.ranges) == 2 * ru.MAX_RETRIES + 1  # each retry probes first
+
+
+def test_stop_event_ends_the_loop_at_a_chunk_boundary(video):
+    stop = threading.Event()
+    server = TikTokServer()
+    session = UploadSession.start("https://upload.test/1", video, 5 * MiB)
+    upload = TikTokChunkedUpload(server.http(), video, session, stop=stop,
+                                 on_progress=lambda s: stop.set())
+    with pytest.raises(ru.UploadStopped):
+        upload.run()
+    assert session.offset == 5 * MiB
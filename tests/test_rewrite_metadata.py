@@ -0,0 +1,114 @@
+"""rewrite_metadata: rule pipeline order and scoping, one-pass apply and restore."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+import fix_tags
+import optimize_seo
+import rewrite_metadata as rm
+from rewrite_metadata import RewriteContext, Rule, apply_pipeline, build_pipeline
+
+SHIRT = {
+    "title": "Coffee Lover Shirt",
+    "description": "A shirt for coffee people.",
+    "tags": ["coffee", "funny coffee", "coffee", "gift", "shirt"],
+}
+
+
+def ctx(folder="tshirt", niche="coffee", index=0):
+    return RewriteContext(folder, niche, index, index)
+
+
+def test_unknown_rule_is_rejected():
+    with pytest.raises(ValueError, match="nope"):
+        build_pipeline(["clean_tags", "nope"])
+
+
+def test_rules_run_in_the_given_order():
+    calls = []
+    pipeline = [
+        Rule("a", lambda meta, c: calls.append("a") or meta.update(title=meta["title"] + " A")),
+        Rule("b", lambda meta, c: calls.append("b") or meta.update(title=meta["title"] + " B")),
+    ]
+    assert apply_pipeline({"title": "T"}, pipeline, ctx())["title"] == "T A B"
+    assert calls == ["a", "b"]
+
+
+def test_folder_scoped_rules_only_touch_their_folder():
+    meta = {**SHIRT, "title": "Coffee Lover - Funny Coffee T-Shirt"}
+    pipeline = build_pipeline(["rewrite_title"])
+    assert apply_pipeline(meta, pipeline, ctx("tshirt")) == meta
+    assert "Shirt" not in apply_pipeline(meta, pipeline, ctx("sticker"))["title"]
+
+
+def test_input_is_not_mutated():
+    meta = json.loads(json.dumps(SHIRT))
+    apply_pipeline(meta, build_pipeline(rm.DEFAULT_RULES), ctx("sticker"))
+    assert meta == SHIRT
+
+
+def test_one_pass_matches_the_separate_scripts():
+    # What fix_tags.py then optimize_seo.py did, one after the other
+    tags = fix_tags.clean_tags(SHIRT["tags"], "coffee")
+    phrase = optimize_seo.extract_phrase(SHIRT["title"])
+    expected = {
+        **SHIRT,
+        "tags": optimize_seo.optimize_tags(tags, phrase, "coffee", 3),
+        "title": optimize_seo.optimize_title(SHIRT["title"], "coffee"),
+    }
+    pipeline = build_pipeline(["clean_tags", "optimize_tags", "optimize_title"])
+    assert apply_pipeline(SHIRT, pipeline, ctx(index=3)) == expected
+
+
+@pytest.mark.parametrize("folder", ["tshirt", "sticker"])
+def test_default_pipeline_is_idempotent(folder):
+    pipeline = build_pipeline(rm.DEFAULT_RULES)
+    once = apply_pipeline(SHIRT, pipeline, ctx(folder))
+    assert once != SHIRT
+    assert apply_pipeline(once, pipeline, ctx(folder)) == once
+
+
+# -- run_pipeline / restore -----------------------------------------------------
+
+@pytest.fixture
+def output(tmp_path, monkeypatch):
+    out = tmp_path / "output"
+    backup = tmp_path / "backup"
+    monkeypatch.setattr(rm, "OUTPUT_DIR", out)
+    monkeypatch.setattr(rm, "BACKUP_DIR", backup)
+    monkeypatch.setattr(rm, "JOURNAL_FILE", backup / "journal.jsonl")
+    (out / "tshirt").mkdir(parents=True)
+    (out / "tshirt" / "coffee_001.json").write_text(json.dumps(SHIRT))
+    return out
+
+
+def read(output, name="coffee_001"):
+    return json.loads((output / "tshirt" / f"{name}.json").read_text())
+
+
+def test_preview_writes_nothing(output, capsys):
+    stats = rm.run_pipeline(rm.DEFAULT_RULES, ["tshirt"], apply=False)
+    assert stats == {"total": 1, "changed": 1, "written": 0}
+    assert read(output) == SHIRT
+    assert "[tshirt/coffee_001]" in capsys.readouterr().out
+    assert not rm.BACKUP_DIR.exists()
+
+
+def test_apply_writes_changed_files_once_and_restore_undoes_it(output):
+    stats = rm.run_pipeline(rm.DEFAULT_RULES, ["tshirt"], apply=True)
+    assert stats == {"total": 1, "changed": 1, "written": 1}
+    rewritten = read(output)
+    assert rewritten["title"].endswith("T-Shirt")
+    assert json.loads((rm.BACKUP_DIR / "tshirt" / "coffee_001.json").read_text()) == SHIRT
+
+    # Nothing left to change: no write, and the backup keeps the true original
+    assert rm.run_pipeline(rm.DEFAULT_RULES, ["tshirt"], apply=True)["written"] == 0
+    assert len(rm.JOURNAL_FILE.read_text().splitlines()) == 1
+
+    rm.restore_metadata()
+    assert read(output) == SHIRT
+    assert not rm.BACKUP_DIR.exists()
+    assert rm.get_store(output).metadata("tshirt", "coffee_001") == SHIRT
@@ -0,0 +1,169 @@
+"""seo_analysis: numpy overlap stats against plain Python sets, MinHash/LSH groups."""
+
+from __future__ import annotations
+
+import json
+import random
+from itertools import combinations
+
+import pytest
+
+import seo_analysis as sa
+from src.metadata_store import MetadataStore
+
+
+def shingles(text: str) -> set[str]:
+    s = " ".join(text.lower().split())
+    return {s[j:j + sa.SHINGLE_SIZE] for j in range(max(1, len(s) - sa.SHINGLE_SIZE + 1))}
+
+
+def jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a | b else 0.0
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    """A small folder with repeated and shared tags across three niches."""
+    rng = random.Random(3)
+    vocab = [f"tag{i}" for i in range(12)]
+    folder = tmp_path / "tshirt"
+    folder.mkdir()
+    designs = {}
+    for niche, count in (("cat", 5), ("coffee", 4), ("dog", 1)):
+        for i in range(count):
+            tags = [niche] + rng.sample(vocab, rng.randint(2, 6))
+            if i == 1:
+                tags.append(tags[1])  # a repeated tag counts once
+            stem = f"{niche}_{i:03d}"
+            designs[stem] = tags
+            (folder / f"{stem}.json").write_text(json.dumps({"title": f"{niche} {i}", "tags": tags}))
+    (folder / "dog_untagged.json").write_text(json.dumps({"title": "dog untagged", "tags": []}))
+    designs["dog_untagged"] = []
+    store = MetadataStore(tmp_path)
+    store.sync("tshirt")
+    yield store, designs
+    store.close()
+
+
+def test_incidence_matches_the_tag_lists(catalog):
+    store, designs = catalog
+    m = sa.build_incidence(store, "tshirt")
+    assert m.n_designs == len(designs)
+    got = {}
+    for row, col in zip(m.rows.tolist(), m.cols.tolist()):
+        got.setdefault(m.paths[row], set()).add(m.tags[col])
+    for path in m.paths:
+        stem = path.split("/")[-1][:-5]
+        assert got.get(path, set()) == set(designs[stem])
+    assert len(m.rows) == sum(len(set(t)) for t in designs.values())
+
+
+def test_niche_overlap_matches_brute_force(catalog):
+    store, designs = catalog
+    m = sa.build_incidence(store, "tshirt")
+    report = {r["niche"]: r for r in sa.niche_overlap(m)}
+
+    by_niche: dict[str, list[set]] = {}
+    for path in m.paths:  # index order: niche, then path
+        stem = path.split("/")[-1][:-5]
+        by_niche.setdefault(stem.split("_")[0], []).append(set(designs[stem]))
+
+    for niche, sets in by_niche.items():
+        r = report[niche]
+        assert r["designs"] == len(sets)
+        pairs = [jaccard(a, b) for a, b in zip(sets, sets[1:]) if a | b]
+        assert r["consecutive_overlap"] == pytest.approx(sum(pairs) / len(pairs) if pairs else 0.0, abs=1e-4)
+        all_pairs = list(combinations(sets, 2))
+        shared = sum(len(a & b) for a, b in all_pairs) / len(all_pairs) if all_pairs else 0.0
+        assert r["mean_shared_tags"] == pytest.approx(shared, abs=1e-3)
+        assert r["universal_tags"] == len(set.intersection(*sets))
+
+
+def test_tag_frequency_counts_designs_per_tag(catalog):
+    store, designs = catalog
+    freq = sa.tag_frequency(sa.build_incidence(store, "tshirt"), top=3)
+    expected = {}
+    for tags in designs.values():
+        for tag in set(tags):
+            expected[tag] = expected.get(tag, 0) + 1
+    assert freq["counts"] == expected
+    assert [c for _, c in freq["top"]] == sorted(expected.values(), reverse=True)[:3]
+    assert sum(freq["histogram"].values()) == len(expected)
+
+
+# -- MinHash / LSH --------------------------------------------------------------
+
+def test_minhash_normalizes_and_flags_empty_texts():
+    sig, valid = sa.minhash_signatures(["Funny Cat Mom", "  funny   cat MOM ", "", "Dog Dad"])
+    assert valid.tolist() == [True, True, False, True]
+    assert (sig[0] == sig[1]).all()
+    assert (sig[0] == sig[3]).mean() < 0.5
+
+
+def test_minhash_estimates_jaccard():
+    texts = ["coffee lover funny barista gift", "coffee lover funny barista present",
+             "retro sunset mountain hiking", "coffee lover funny barista gift idea"]
+    sig, _ = sa.minhash_signatures(texts, num_perm=256)
+    for i, j in combinations(range(len(texts)), 2):
+        estimate = (sig[i] == sig[j]).mean()
+        assert estimate == pytest.approx(jaccard(shingles(texts[i]), shingles(texts[j])), abs=0.12)
+
+
+def test_near_duplicates_are_grouped_and_distinct_titles_are_not():
+    texts = [
+        "Funny Cat Mom Shirt",          # 0
+        "Vintage Mountain Sunset",      # 1
+        "funny cat mom shirt",          # 2 exact duplicate of 0 after normalization
+        "Funny Cat Mom Shirts",         # 3 near duplicate
+        "Coffee Then Code",             # 4
+        "",                             # 5 no shingles
+    ]
+    groups = sa.near_duplicate_groups(*sa.minhash_signatures(texts))
+    assert [[row for row, _ in g] for g in groups] == [[0, 2, 3]]
+    sims = dict(groups[0])
+    assert sims[0] == sims[2] == 1.0
+    assert sa.NEAR_DUP_THRESHOLD <= sims[3] < 1.0
+
+
+def test_near_duplicate_groups_handles_tiny_inputs():
+    assert sa.near_duplicate_groups(*sa.minhash_signatures([])) == []
+    assert sa.near_duplicate_groups(*sa.minhash_signatures(["only one"])) == []
+    sig, valid = sa.minhash_signatures(["", ""])
+    assert sa.near_duplicate_groups(sig, valid) == []
+
+
+def test_lsh_finds_the_same_pairs_as_all_pairs():
+    rng = random.Random(11)
+    words = ["cat", "dog", "coffee", "retro", "funny", "mom", "dad", "gift", "sunset", "vintage", "lover"]
+    base = [" ".join(rng.sample(words, 4)) for _ in range(40)]
+    texts = base + [t + "s" for t in base[:10]]  # ten near duplicates
+    sig, valid = sa.minhash_signatures(texts)
+    grouped = {frozenset(r for r, _ in g) for g in sa.near_duplicate_groups(sig, valid)}
+
+    sims = (sig[:, None, :] == sig[None, :, :]).mean(axis=2)
+    for i in range(10):
+        assert sims[i, 40 + i] >= sa.NEAR_DUP_THRESHOLD
+        assert any({i, 40 + i} <= g for g in grouped)
+    # Every member was joined by a verified edge: no false positives
+    for group in grouped:
+        members = sorted(group)
+        for i in members:
+            assert max(sims[i, j] for j in members if j != i) >= sa.NEAR_DUP_THRESHOLD
+
+
+def test_analyze_folder_marks_exact_duplicates(tmp_path):
+    folder = tmp_path / "tshirt"
+    folder.mkdir()
+    for stem, title in [("cat_001", "Cat Mom - Funny Cat Mom T-Shirt"),
+                        ("cat_002", "Cat Mom - Funny Cat Mom T-Shirt"),
+                        ("dog_001", "Dog Dad - Funny Dog Dad T-Shirt")]:
+        (folder / f"{stem}.json").write_text(json.dumps({"title": title, "tags": ["a", "b"]}))
+    store = MetadataStore(tmp_path)
+    store.sync("tshirt")
+    report = sa.analyze_folder(store, "tshirt")
+    store.close()
+
+    assert report["designs"] == 3 and report["distinct_tags"] == 2
+    [group] = report["near_duplicates"]
+    assert group["exact"]
+    assert [d["path"] for d in group["designs"]] == ["tshirt/cat_001.json", "tshirt/cat_002.json"]
@@ -0,0 +1,162 @@
+"""UploadLedger.daily_counts: running per-day counters kept by triggers.
+
+Days are US Eastern dates (LIMIT_TZ); timestamps are recorded in UTC.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import datetime, timezone
+
+import pytest
+
+import upload_common
+from src import upload_ledger
+from src.upload_ledger import UploadLedger, limit_day
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    ledger = UploadLedger(tmp_path)
+    yield ledger
+    ledger.close()
+
+
+def entry(status="success", day="2026-03-01"):
+    return {"status": status, "timestamp": f"{day}T12:00:00+00:00"}
+
+
+def test_inserts_count_per_platform_day_and_status(ledger):
+    ledger.record("tiktok", "promo/a", entry())
+    ledger.record("tiktok", "promo/b", entry())
+    ledger.record("tiktok", "promo/c", entry("failed"))
+    ledger.record("tiktok", "promo/d", entry(day="2026-03-02"))
+    ledger.record("youtube", "promo/a", entry())
+
+    assert ledger.day_count("tiktok", "2026-03-01") == 2
+    assert ledger.day_count("tiktok", "2026-03-01", "failed") == 1
+    assert ledger.day_count("youtube", "2026-03-01") == 1
+    assert ledger.day_counts("tiktok") == {"2026-03-01": 2, "2026-03-02": 1}
+    assert ledger.day_counts("tiktok", since="2026-03-02") == {"2026-03-02": 1}
+
+
+def test_rerecorded_entry_moves_its_count(ledger):
+    ledger.record("tiktok", "promo/a", entry("failed"))
+    ledger.record("tiktok", "promo/a", entry("success"))
+    ledger.record("tiktok", "promo/a", entry("success", day="2026-03-02"))
+
+    assert ledger.day_count("tiktok", "2026-03-01", "failed") == 0
+    assert ledger.day_count("tiktok", "2026-03-01") == 0
+    assert ledger.day_counts("tiktok") == {"2026-03-02": 1}
+
+
+def test_entries_without_timestamp_are_not_counted(ledger):
+    ledger.record("tiktok", "promo/a", {"status": "success"})
+    assert ledger.day_counts("tiktok") == {}
+    assert ledger.total("tiktok") == 1
+
+
+def test_replace_platform_matches_a_fresh_count(ledger):
+    ledger.record("tiktok", "promo/a", entry())
+    ledger.record("tiktok", "promo/b", entry())
+    ledger.replace_platform("tiktok", {
+        "promo/b": entry(),
+        "promo/c": entry("failed"),
+    }, signature="sig")
+
+    assert ledger.day_count("tiktok", "2026-03-01") == 1
+    assert ledger.day_count("tiktok", "2026-03-01", "failed") == 1
+
+
+def test_counters_are_backfilled_for_an_older_ledger(tmp_path):
+    ledger = UploadLedger(tmp_path)
+    ledger.record("tiktok", "promo/a", entry())
+    ledger.record("tiktok", "promo/b", entry())
+    ledger.close()
+
+    # A ledger written before the counters existed
+    conn = sqlite3.connect(str(tmp_path / "uploads.db"))
+    conn.executescript("DROP TRIGGER daily_counts_insert; DROP TRIGGER daily_counts_delete;"
+                       "DROP TABLE daily_counts;")
+    conn.close()
+
+    ledger = UploadLedger(tmp_path)
+    assert ledger.day_count("tiktok", "2026-03-01") == 2
+    ledger.record("tiktok", "promo/c", entry())
+    assert ledger.day_count("tiktok", "2026-03-01") == 3
+    ledger.close()
+
+
+# -- day boundary -------------------------------------------------------------
+
+@pytest.mark.parametrize("timestamp, day", [
+    ("2026-03-02T03:30:00+00:00", "2026-03-01"),   # 22:30 EST the evening before
+    ("2026-03-02T05:00:00+00:00", "2026-03-02"),   # midnight EST
+    ("2026-07-02T03:59:59+00:00", "2026-07-01"),   # 23:59 EDT
+    ("2026-07-02T04:00:00+00:00", "2026-07-02"),   # midnight EDT
+    ("2026-03-01T22:30:00-05:00", "2026-03-01"),
+    ("not a time", None),
+    (None, None),
+])
+def test_limit_day_is_the_eastern_date(timestamp, day):
+    assert limit_day(timestamp) == day
+
+
+def test_evening_uploads_count_toward_the_eastern_day(ledger):
+    # 18:00 and 23:00 EST on March 1st; the second is already March 2nd in UTC
+    ledger.record("etsy", "tshirt/a", {"status": "success", "timestamp": "2026-03-01T23:00:00+00:00"})
+    ledger.record("etsy", "tshirt/b", {"status": "success", "timestamp": "2026-03-02T04:00:00+00:00"})
+    ledger.record("etsy", "tshirt/c", {"status": "success", "timestamp": "2026-03-02T05:30:00+00:00"})
+
+    assert ledger.day_count("etsy", "2026-03-01") == 2
+    assert ledger.day_count("etsy", "2026-03-02") == 1
+
+
+def test_uploads_today_uses_the_eastern_date(tmp_path, monkeypatch):
+    # 01:00 UTC on March 2nd is still 20:00 on March 1st in New York
+    now = datetime(2026, 3, 2, 1, 0, tzinfo=timezone.utc)
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return now.astimezone(tz) if tz else now.replace(tzinfo=None)
+
+    monkeypatch.setattr(upload_ledger, "datetime", FrozenDatetime)
+    tracker_path = tmp_path / "uploaded_etsy.json"
+    tracker = {}
+    for key, ts in [("tshirt/a", "2026-03-01T15:00:00+00:00"),    # 10:00 EST, same day
+                    ("tshirt/b", "2026-03-02T00:30:00+00:00"),    # 19:30 EST, same day
+                    ("tshirt/c", "2026-02-28T23:00:00+00:00")]:   # previous day
+        upload_common.record_entry(tracker, tracker_path, key, {"status": "success", "timestamp": ts})
+
+    assert upload_common.uploads_today("etsy", tracker_path) == 2
+
+
+def test_count_since_is_a_rolling_window(ledger):
+    ledger.record("instagram", "instagram/a", {"status": "success", "timestamp": "2026-03-01T11:00:00+00:00"})
+    ledger.record("instagram", "instagram/b", {"status": "success", "timestamp": "2026-03-01T13:00:00+00:00"})
+    ledger.record("instagram", "instagram/c", {"status": "success", "timestamp": "2026-03-02T03:00:00"})
+    ledger.record("instagram", "instagram/d", {"status": "failed", "timestamp": "2026-03-02T09:00:00+00:00"})
+
+    since = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+    assert ledger.count_since("instagram", since) == 2
+    assert ledger.count_since("instagram", since, "failed") == 1
+
+
+def test_utc_keyed_ledger_is_rekeyed_on_open(tmp_path):
+    ledger = UploadLedger(tmp_path)
+    ledger.record("etsy", "tshirt/a", entry(day="2026-03-01"))
+    ledger.record("etsy", "tshirt/b", {"status": "success", "timestamp": "2026-03-02T02:00:00+00:00"})
+    ledger.close()
+
+    # How a ledger from before LIMIT_TZ stored the second row
+    conn = sqlite3.connect(str(tmp_path / "uploads.db"))
+    conn.executescript("UPDATE uploads SET day = substr(uploaded_at, 1, 10);"
+                       "DELETE FROM daily_counts;"
+                       "INSERT INTO daily_counts SELECT platform, day, status, COUNT(*) FROM uploads "
+                       "GROUP BY platform, day, status; PRAGMA user_version = 0;")
+    conn.close()
+
+    ledger = UploadLedger(tmp_path)
+    assert ledger.day_counts("etsy") == {"2026-03-01": 2}
+    ledger.close()
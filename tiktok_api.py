@@ -14,39 +14,84 @@ Usage:
     python3 tiktok_api.py --upload --dry-run --limit 10   # Preview
     python3 tiktok_api.py --upload --retry-failed         # Retry failures
     python3 tiktok_api.py --status                        # Check token & stats
+    python3 tiktok_api.py --watch                         # Follow posts still publishing
+    python3 tiktok_api.py --upload --chunk-size 32        # Bigger chunks, fewer round trips
+
+Videos are sent in chunks (FILE_UPLOAD). The upload URL, publish_id and the
+acknowledged byte offset are saved in the tracker after every chunk, so an
+interrupted upload continues on the next --upload run while TikTok still
+honours its upload URL (one hour). Test against the local stand-in with
+--api-base (see mock_video_api.py).
+
+Publishing is tracked asynchronously: once a video is sent its publish_id is
+recorded as "publishing" and a PublishManager polls every outstanding job on
+one shared schedule while the next video uploads, updating the tracker as
+each status changes. Jobs still processing when the run ends are picked up
+again by the next --upload (or --watch) run. Uploads are paced by TikTok's
+API quotas (src/rate_limit.py), not by polling waits.
 """
 
 from __future__ import annotations
 
 import argparse
+import asyncio
 import json
 import subprocess
 import sys
+import threading
 import time
 import urllib.parse
 import urllib.request
 from datetime import datetime, timezone
 from pathlib import Path
 
+import upload_common
+from src import credentials
+from src.credentials import REFRESH_MARGIN, NotAuthorized, TokenSource
+from src.http_client import PooledSession
+from src.rate_limit import get_limiter
+from src.resumable_upload import (
+    TIKTOK_URL_TTL,
+    MiB,
+    SessionExpired,
+    TikTokChunkedUpload,
+    UploadSession,
+    tiktok_chunking,
+)
+
 # ---------------------------------------------------------------------------
 # Constants
 # ---------------------------------------------------------------------------
 
 PROJECT_DIR = Path(__file__).parent
 TOKEN_FILE = PROJECT_DIR / ".tiktok_token.json"
-TRACKER_FILE = PROJECT_DIR / "uploaded_tiktok.json"
+TRACKER_NAME = "uploaded_tiktok.json"
+TRACKER_FILE = PROJECT_DIR / TRACKER_NAME  # under .mock_runs/ for --api-base runs
 
 TIKTOK_AUTH_URL = "https://www.tiktok.com/v2/auth/authorize/"
 TIKTOK_TOKEN_URL = "https://open.tiktokapis.com/v2/oauth/token/"
-TIKTOK_CREATOR_INFO_URL = "https://open.tiktokapis.com/v2/post/publish/creator_info/query/"
-TIKTOK_VIDEO_INIT_URL = "https://open.tiktokapis.com/v2/post/publish/video/init/"
-TIKTOK_STATUS_URL = "https://open.tiktokapis.com/v2/post/publish/status/fetch/"
+TIKTOK_API_BASE = "https://open.tiktokapis.com"
+CREATOR_INFO_PATH = "/v2/post/publish/creator_info/query/"
+VIDEO_INIT_PATH = "/v2/post/publish/video/init/"
+STATUS_PATH = "/v2/post/publish/status/fetch/"
+TIKTOK_CREATOR_INFO_URL = TIKTOK_API_BASE + CREATOR_INFO_PATH
+TIKTOK_VIDEO_INIT_URL = TIKTOK_API_BASE + VIDEO_INIT_PATH
+TIKTOK_STATUS_URL = TIKTOK_API_BASE + STATUS_PATH
 
 SCOPES = "user.info.basic,video.publish,video.upload"
 REDIRECT_URI = "https://moderndesignconcept.com/auth/tiktok/callback"
 
-# Rate limit: 6 requests/min per user
-UPLOAD_DELAY = 12  # seconds between uploads (safe margin)
+# Rate limits (6 inits/min, 30 status fetches/min per user) are enforced by
+# the tiktok_* buckets in src/rate_limit.py; --delay adds spacing on top
+DEFAULT_UPLOAD_DELAY = 0  # extra seconds between uploads
+UPLOAD_DELAY = DEFAULT_UPLOAD_DELAY  # this run's --delay
+PUBLISH_POLL_INTERVAL = 5  # seconds between rounds of status checks
+PUBLISH_WAIT = 300  # seconds to keep polling after the last upload
+PUBLISH_DONE = ("PUBLISH_COMPLETE", "SEND_TO_USER_INBOX")
+PUBLISH_FAILED = ("FAILED", "PUBLISH_FAILED")
+CHUNK_SIZE = 10 * MiB  # clamped to TikTok's 5-64 MB chunk range
+
+SESSION = PooledSession("TikTok")  # shared by every upload in this process
 
 
 # ---------------------------------------------------------------------------
@@ -93,16 +138,18 @@ def save_token(token_data: dict) -> None:
     print(f"  Token saved to {TOKEN_FILE.name}")
 
 
-def is_token_valid(token: dict) -> bool:
-    """Check if access token is still valid."""
+def token_expires_at(token: dict) -> float:
+    """Epoch seconds the access token expires (0 if the record doesn't say)."""
     saved_at = token.get("saved_at", "")
     expires_in = token.get("expires_in", 0)
     if not saved_at or not expires_in:
-        return False
-    from datetime import datetime, timezone
-    saved = datetime.fromisoformat(saved_at)
-    elapsed = (datetime.now(timezone.utc) - saved).total_seconds()
-    return elapsed < expires_in - 300  # 5 min buffer
+        return 0.0
+    return datetime.fromisoformat(saved_at).timestamp() + expires_in
+
+
+def is_token_valid(token: dict) -> bool:
+    """Check if access token is still valid."""
+    return token_expires_at(token) - time.time() > REFRESH_MARGIN
 
 
 def refresh_access_token(token: dict) -> dict:
@@ -134,19 +181,19 @@ def refresh_access_token(token: dict) -> dict:
     return result
 
 
+credentials.register("tiktok", TokenSource(
+    load=load_token, refresh=refresh_access_token, expires_at=token_expires_at,
+))
+
+
 def get_valid_token() -> dict:
-    """Get a valid access token, refreshing if needed."""
-    token = load_token()
-    if not token:
+    """Get a valid token (cached; refreshed in the background before expiry)."""
+    try:
+        return credentials.get_manager().record("tiktok")
+    except NotAuthorized:
         print("No token found. Run: python3 tiktok_api.py --auth")
         sys.exit(1)
 
-    if not is_token_valid(token):
-        print("  Token expired, refreshing...")
-        token = refresh_access_token(token)
-
-    return token
-
 
 # ---------------------------------------------------------------------------
 # OAuth flow
@@ -227,6 +274,7 @@ def query_creator_info(token: str) -> dict:
 
 def check_publish_status(token: str, publish_id: str) -> dict:
     """Check the status of a published video."""
+    get_limiter("tiktok_status").acquire()
     return api_request(TIKTOK_STATUS_URL, token, {"publish_id": publish_id})
 
 
@@ -234,15 +282,12 @@ def check_publish_status(token: str, publish_id: str) -> dict:
 # Video upload
 # ---------------------------------------------------------------------------
 
-def upload_video_file(token: str, video_path: Path, caption: str,
-                      privacy: str = "PUBLIC_TO_EVERYONE") -> str:
-    """Upload a video file via the Content Posting API.
-
-    Returns publish_id on success.
-    """
+def init_upload(token: str, video_path: Path, caption: str, privacy: str,
+                chunk_size: int) -> UploadSession:
+    """Create the post and its FILE_UPLOAD session (upload URL + publish_id)."""
     video_size = video_path.stat().st_size
+    chunk_size, chunk_count = tiktok_chunking(video_size, chunk_size)
 
-    # Step 1: Initialize upload
     init_body = {
         "post_info": {
             "title": caption[:2200],
@@ -255,36 +300,69 @@ def upload_video_file(token: str, video_path: Path, caption: str,
         "source_info": {
             "source": "FILE_UPLOAD",
             "video_size": video_size,
-            "chunk_size": video_size,  # Single chunk for files under 64MB
-            "total_chunk_count": 1,
+            "chunk_size": chunk_size,
+            "total_chunk_count": chunk_count,
         },
     }
 
+    get_limiter("tiktok_init").acquire()
     init_resp = api_request(TIKTOK_VIDEO_INIT_URL, token, init_body)
 
     if init_resp.get("error", {}).get("code") != "ok":
         error = init_resp.get("error", {})
         raise RuntimeError(f"Init failed: {error.get('code')} — {error.get('message')}")
 
-    publish_id = init_resp["data"]["publish_id"]
-    upload_url = init_resp["data"]["upload_url"]
+    return UploadSession.start(
+        init_resp["data"]["upload_url"], video_path, chunk_size,
+        publish_id=init_resp["data"]["publish_id"],
+    )
 
-    # Step 2: Upload video binary
-    with open(video_path, "rb") as f:
-        video_data = f.read()
 
-    upload_req = urllib.request.Request(upload_url, data=video_data, method="PUT")
-    upload_req.add_header("Content-Type", "video/mp4")
-    upload_req.add_header("Content-Length", str(video_size))
-    upload_req.add_header("Content-Range", f"bytes 0-{video_size - 1}/{video_size}")
+def send_video(token: str, video_path: Path, caption: str,
+               privacy: str = "PUBLIC_TO_EVERYONE",
+               session: UploadSession | None = None,
+               on_progress=None,
+               chunk_size: int = CHUNK_SIZE,
+               http: PooledSession | None = None,
+               stop: threading.Event | None = None) -> str:
+    """Create the post and upload the video file. Returns publish_id.
+
+    Continues ``session`` (saved from an interrupted run) while its upload
+    URL is still valid; otherwise initializes a new post. TikTok processes
+    and publishes the video afterwards (see wait_for_publish / PublishManager).
+    Setting ``stop`` ends the transfer after the chunk in flight
+    (UploadStopped); the saved session resumes it on the next run.
+    """
+    http = http or SESSION
+    if session and session.age > TIKTOK_URL_TTL - 60:
+        print("  Saved upload URL has expired — starting over")
+        session = None
+
+    for _ in range(2):
+        # Step 1: Initialize upload
+        if session is None:
+            session = init_upload(token, video_path, caption, privacy, chunk_size)
+            if on_progress:
+                on_progress(session)
+
+        # Step 2: Upload video chunks (already done if we stopped while polling)
+        if session.offset >= session.size:
+            break
+        try:
+            TikTokChunkedUpload(http, video_path, session, on_progress, stop=stop).run()
+            break
+        except SessionExpired:
+            print("  Upload session lost — starting over")
+            session = None
+    else:
+        raise RuntimeError("Upload session lost twice")
 
-    with urllib.request.urlopen(upload_req) as resp:
-        if resp.status not in (200, 201):
-            raise RuntimeError(f"Upload failed with status {resp.status}")
+    print(f"  Video uploaded, publish_id: {session.publish_id}")
+    return session.publish_id
 
-    print(f"  Video uploaded, publish_id: {publish_id}")
 
-    # Step 3: Poll for publish status
+def wait_for_publish(token: str, publish_id: str) -> str:
+    """Poll one post until TikTok reports it published (or gives up)."""
     for attempt in range(6):
         time.sleep(5)
         status_resp = check_publish_status(token, publish_id)
@@ -302,6 +380,17 @@ def upload_video_file(token: str, video_path: Path, caption: str,
     return publish_id
 
 
+def upload_video_file(token: str, video_path: Path, caption: str,
+                      privacy: str = "PUBLIC_TO_EVERYONE", **kwargs) -> str:
+    """Upload a video and wait for it to publish. Returns publish_id.
+
+    Blocking single-video flow; run_upload overlaps publishing with the
+    next upload through PublishManager instead.
+    """
+    publish_id = send_video(token, video_path, caption, privacy, **kwargs)
+    return wait_for_publish(token, publish_id)
+
+
 # ---------------------------------------------------------------------------
 # Caption builder (reuse from upload_tiktok.py)
 # ---------------------------------------------------------------------------
@@ -333,26 +422,113 @@ except ImportError:
 # ---------------------------------------------------------------------------
 
 def load_tracker() -> dict:
-    if TRACKER_FILE.exists():
-        with open(TRACKER_FILE) as f:
-            return json.load(f)
-    return {}
+    return upload_common.load_tracker(TRACKER_FILE)
 
 
-def save_tracker(tracker: dict) -> None:
-    with open(TRACKER_FILE, "w") as f:
-        json.dump(tracker, f, indent=2)
-
-
-def record(tracker: dict, key: str, status: str, error: str = "") -> None:
-    tracker[key] = {
+def record(tracker: dict, key: str, status: str, error: str = "",
+           session: UploadSession | None = None, publish_id: str = "",
+           publish_status: str = "") -> None:
+    entry = {
         "status": status,
         "uploaded_at": datetime.now(timezone.utc).isoformat(),
         "method": "api",
     }
     if error:
-        tracker[key]["error"] = error
-    save_tracker(tracker)
+        entry["error"] = error
+    if session:
+        entry["upload_session"] = session.to_dict()
+    if publish_id:
+        entry["publish_id"] = publish_id
+    if publish_status:
+        entry["publish_status"] = publish_status
+    upload_common.record_entry(tracker, TRACKER_FILE, key, entry)
+
+
+# ---------------------------------------------------------------------------
+# Publish tracking
+# ---------------------------------------------------------------------------
+
+class PublishManager:
+    """Track publish jobs in the tracker and poll them on one shared schedule.
+
+    ``track`` records a sent video as "publishing" with its publish_id;
+    ``poll`` runs alongside the uploads, checking every outstanding job each
+    round (status fetches are rate limited, so many jobs simply stretch the
+    round) and recording each status change. PUBLISH_COMPLETE marks the
+    entry success and FAILED marks it failed. ``resume`` re-adopts jobs left
+    "publishing" by an earlier run.
+    """
+
+    def __init__(self, token: str, tracker: dict, interval: float = PUBLISH_POLL_INTERVAL):
+        self.token = token
+        self.tracker = tracker
+        self.interval = interval
+        self.jobs: dict[str, dict] = {}  # key -> tracker entry
+        self.published = 0
+        self.failed = 0
+
+    def resume(self) -> int:
+        for key, entry in self.tracker.items():
+            if (key.startswith("tiktok_api/") and entry.get("status") == "publishing"
+                    and entry.get("publish_id")):
+                self.jobs[key] = entry
+        return len(self.jobs)
+
+    def track(self, key: str, publish_id: str) -> None:
+        record(self.tracker, key, "publishing", publish_id=publish_id,
+               publish_status="PROCESSING_UPLOAD")
+        self.jobs[key] = self.tracker[key]
+
+    def _update(self, key: str, data: dict) -> None:
+        entry = self.jobs[key]
+        status = data.get("status") or "UNKNOWN"
+        if status == entry.get("publish_status"):
+            return
+        name = key.split("/", 1)[1]
+        if status in PUBLISH_DONE:
+            record(self.tracker, key, "success", publish_id=entry["publish_id"],
+                   publish_status=status)
+            self.published += 1
+            del self.jobs[key]
+            print(f"  [{name}] Published ({status})")
+        elif status in PUBLISH_FAILED:
+            reason = data.get("fail_reason", "unknown")
+            record(self.tracker, key, "failed", f"Publish failed: {reason}",
+                   publish_id=entry["publish_id"], publish_status=status)
+            self.failed += 1
+            del self.jobs[key]
+            print(f"  [{name}] Publish failed: {reason}")
+        else:
+            record(self.tracker, key, "publishing", publish_id=entry["publish_id"],
+                   publish_status=status)
+            self.jobs[key] = self.tracker[key]
+            print(f"  [{name}] {status}")
+
+    async def poll_once(self) -> None:
+        for key in list(self.jobs):
+            publish_id = self.jobs[key]["publish_id"]
+            try:
+                resp = await asyncio.to_thread(check_publish_status, self.token, publish_id)
+            except Exception as e:
+                print(f"  Status check failed for {publish_id}: {e}")
+                continue
+            self._update(key, resp.get("data", {}))
+
+    async def poll(self, uploads_done: asyncio.Event, wait: float = PUBLISH_WAIT) -> None:
+        """Poll until uploads are done and every job settles (or ``wait`` runs out)."""
+        deadline = None
+        while True:
+            if self.jobs:
+                await self.poll_once()
+            if uploads_done.is_set():
+                if not self.jobs:
+                    return
+                deadline = deadline or time.monotonic() + wait
+                if time.monotonic() >= deadline:
+                    print(f"\n  {len(self.jobs)} post(s) still processing — "
+                          f"the next run keeps tracking them")
+                    return
+            await asyncio.sleep(self.interval)
 
 
 # ---------------------------------------------------------------------------
@@ -373,8 +549,7 @@ def discover_videos(source_dirs: list[Path]) -> list[tuple[Path, str, bool]]:
 
 def run_upload(args: argparse.Namespace) -> None:
     """Main upload flow using TikTok API."""
-    token_data = get_valid_token()
-    access_token = token_data["access_token"]
+    access_token = "mock-token" if args.api_base else get_valid_token()["access_token"]
 
     # Check creator info
     try:
@@ -403,14 +578,20 @@ def run_upload(args: argparse.Namespace) -> None:
         entry = tracker.get(key, {})
         status = entry.get("status")
 
-        if args.retry_failed and status == "failed":
+        if status == "uploading":
+            to_upload.append((video_path, landmark_id, is_travel, key))
+        elif args.retry_failed and status == "failed":
             to_upload.append((video_path, landmark_id, is_travel, key))
-        elif status == "success":
+        elif status in ("success", "publishing"):
             continue
         elif not args.retry_failed:
             to_upload.append((video_path, landmark_id, is_travel, key))
 
-    if not to_upload:
+    manager = PublishManager(access_token, tracker)
+    if not args.dry_run and manager.resume():
+        print(f"Tracking {len(manager.jobs)} post(s) still publishing from an earlier run")
+
+    if not to_upload and not manager.jobs:
         print("Nothing to upload.")
         return
 
@@ -422,7 +603,8 @@ def run_upload(args: argparse.Namespace) -> None:
     if args.dry_run:
         for i, (vp, lid, it, key) in enumerate(to_upload, 1):
             caption = build_caption(lid, is_travel=it)
-            print(f"  [{i}] {key}")
+            resume = UploadSession.from_entry(tracker.get(key), vp)
+            print(f"  [{i}] {key}" + (f"  (resume at {resume.progress:.0%})" if resume else ""))
             print(f"       File: {vp.name} ({vp.stat().st_size // 1024}KB)")
             print(f"       Caption: {caption[:80]}...")
             print()
@@ -433,33 +615,89 @@ def run_upload(args: argparse.Namespace) -> None:
     if args.private:
         privacy = "SELF_ONLY"
 
-    uploaded = 0
-    failed = 0
-
-    for i, (video_path, landmark_id, is_travel, key) in enumerate(to_upload, 1):
-        caption = build_caption(landmark_id, is_travel=is_travel)
-        vtype = "travel" if is_travel else "promo"
-        print(f"[{i}/{len(to_upload)}] {video_path.name} ({vtype})")
-
-        try:
-            publish_id = upload_video_file(access_token, video_path, caption, privacy)
-            record(tracker, key, "success")
-            uploaded += 1
-            print(f"  -> Success (publish_id: {publish_id})")
-        except Exception as e:
-            record(tracker, key, "failed", str(e))
-            failed += 1
-            print(f"  -> Failed: {e}")
-
-        # Rate limit delay
-        if i < len(to_upload):
-            print(f"  Waiting {UPLOAD_DELAY}s...")
-            time.sleep(UPLOAD_DELAY)
+    uploaded, failed = asyncio.run(
+        _upload_and_publish(args, to_upload, tracker, manager, access_token, privacy)
+    )
 
     print(f"\n=== Upload complete ===")
     print(f"  Uploaded: {uploaded}/{len(to_upload)}")
-    if failed:
-        print(f"  Failed: {failed}")
+    print(f"  Published: {manager.published}")
+    if failed or manager.failed:
+        print(f"  Failed: {failed + manager.failed}")
+    if manager.jobs:
+        print(f"  Still publishing: {len(manager.jobs)}")
+
+
+async def _upload_and_publish(
+    args: argparse.Namespace,
+    to_upload: list[tuple[Path, str, bool, str]],
+    tracker: dict,
+    manager: PublishManager,
+    access_token: str,
+    privacy: str,
+) -> tuple[int, int]:
+    """Send videos one after another while ``manager`` polls publish jobs."""
+    http = SESSION
+    uploads_done = asyncio.Event()
+    # asyncio.run waits for a to_thread worker on exit, so Ctrl-C must also
+    # tell the chunk loop to stop rather than let the video finish sending
+    stop = threading.Event()
+    poller = asyncio.create_task(manager.poll(uploads_done, args.publish_wait))
+    uploaded = 0
+    failed = 0
+
+    try:
+        for i, (video_path, landmark_id, is_travel, key) in enumerate(to_upload, 1):
+            caption = build_caption(landmark_id, is_travel=is_travel)
+            vtype = "travel" if is_travel else "promo"
+            print(f"[{i}/{len(to_upload)}] {video_path.name} ({vtype})")
+
+            def save_progress(session: UploadSession, key: str = key) -> None:
+                record(tracker, key, "uploading", session=session)
+
+            try:
+                publish_id = await asyncio.to_thread(
+                    send_video, access_token, video_path, caption, privacy,
+                    session=UploadSession.from_entry(tracker.get(key), video_path),
+                    on_progress=save_progress,
+                    chunk_size=args.chunk_size * MiB,
+                    http=http,
+                    stop=stop,
+                )
+                manager.track(key, publish_id)
+                uploaded += 1
+            except Exception as e:
+                record(tracker, key, "failed", str(e))
+                failed += 1
+                print(f"  -> Failed: {e}")
+
+            if UPLOAD_DELAY and i < len(to_upload):
+                print(f"  Waiting {UPLOAD_DELAY}s...")
+                await asyncio.sleep(UPLOAD_DELAY)
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        stop.set()
+        print("\n  Interrupted — partial uploads and publishing posts resume on the next run")
+        poller.cancel()
+        raise
+
+    uploads_done.set()
+    await poller
+    return uploaded, failed
+
+
+def watch_publishing(args: argparse.Namespace) -> None:
+    """Poll posts left publishing by earlier runs until they settle."""
+    access_token = "mock-token" if args.api_base else get_valid_token()["access_token"]
+    manager = PublishManager(access_token, load_tracker())
+    if not manager.resume():
+        print("No posts are waiting to publish.")
+        return
+    print(f"Tracking {len(manager.jobs)} post(s) still publishing")
+    done = asyncio.Event()
+    done.set()
+    asyncio.run(manager.poll(done, args.publish_wait))
+    print(f"\n  Published: {manager.published}  Failed: {manager.failed}  "
+          f"Still publishing: {len(manager.jobs)}")
 
 
 # ---------------------------------------------------------------------------
@@ -481,17 +719,34 @@ def show_status() -> None:
     api_entries = {k: v for k, v in tracker.items() if k.startswith("tiktok_api/")}
     success = sum(1 for v in api_entries.values() if v.get("status") == "success")
     failed = sum(1 for v in api_entries.values() if v.get("status") == "failed")
+    partial = sum(1 for v in api_entries.values() if v.get("status") == "uploading")
+    publishing = sum(1 for v in api_entries.values() if v.get("status") == "publishing")
     print(f"\nAPI upload stats:")
     print(f"  Total tracked: {len(api_entries)}")
     print(f"  Success: {success}")
     print(f"  Failed: {failed}")
+    if partial:
+        print(f"  Interrupted (will resume): {partial}")
+    if publishing:
+        print(f"  Publishing (tracked by --upload / --watch): {publishing}")
 
 
 # ---------------------------------------------------------------------------
 # CLI
 # ---------------------------------------------------------------------------
 
-def main() -> None:
+def use_api_base(base: str | None) -> None:
+    """Point the API endpoints at a mock_video_api.py server (None: TikTok itself)."""
+    global TIKTOK_CREATOR_INFO_URL, TIKTOK_VIDEO_INIT_URL, TIKTOK_STATUS_URL
+    base = (base or TIKTOK_API_BASE).rstrip("/")
+    TIKTOK_CREATOR_INFO_URL = base + CREATOR_INFO_PATH
+    TIKTOK_VIDEO_INIT_URL = base + VIDEO_INIT_PATH
+    TIKTOK_STATUS_URL = base + STATUS_PATH
+
+
+def main(argv: list[str] | None = None) -> None:
+    global UPLOAD_DELAY, TRACKER_FILE
+
     parser = argparse.ArgumentParser(
         description="TikTok Content Posting API uploader",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -499,22 +754,42 @@ def main() -> None:
     parser.add_argument("--auth", action="store_true", help="Run OAuth authorization flow")
     parser.add_argument("--upload", action="store_true", help="Upload videos")
     parser.add_argument("--status", action="store_true", help="Show token and upload stats")
+    parser.add_argument("--watch", action="store_true",
+                        help="Poll posts still publishing from earlier runs")
     parser.add_argument("--source-dir", type=str, help="Video source directory")
     parser.add_argument("--limit", type=int, default=0, help="Max videos to upload")
-    parser.add_argument("--delay", type=float, default=UPLOAD_DELAY, help="Seconds between uploads")
+    parser.add_argument("--delay", type=float, default=DEFAULT_UPLOAD_DELAY,
+                        help="Extra seconds between uploads (API quotas are always respected)")
+    parser.add_argument("--publish-wait", type=float, default=PUBLISH_WAIT,
+                        help=f"Seconds to keep polling after the last upload (default: {PUBLISH_WAIT})")
     parser.add_argument("--dry-run", action="store_true", help="Preview without uploading")
     parser.add_argument("--retry-failed", action="store_true", help="Retry failed uploads")
     parser.add_argument("--private", action="store_true",
                         help="Post as private (required for unaudited apps)")
-
-    args = parser.parse_args()
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE // MiB, metavar="MB",
+                        help=f"Upload chunk size in MB, 5-64 (default: {CHUNK_SIZE // MiB})")
+    parser.add_argument("--api-base", metavar="URL",
+                        help="Upload to a local mock_video_api.py server instead of TikTok")
+
+    args = parser.parse_args(argv)
+
+    # Set on every run: in-process runs (uploaders.run) share this module,
+    # so an earlier run's --api-base or --delay must not carry over
+    use_api_base(args.api_base)
+    TRACKER_FILE = PROJECT_DIR / TRACKER_NAME
+    UPLOAD_DELAY = args.delay
+    if args.api_base:
+        # Keep stand-in uploads out of the real tracker and ledger
+        upload_common.MOCK_RUN_DIR.mkdir(exist_ok=True)
+        TRACKER_FILE = upload_common.MOCK_RUN_DIR / TRACKER_NAME
+        print(f"API base: {args.api_base} (tracker: {TRACKER_FILE})")
 
     if args.auth:
         run_auth_flow()
     elif args.upload:
-        global UPLOAD_DELAY
-        UPLOAD_DELAY = args.delay
         run_upload(args)
+    elif args.watch:
+        watch_publishing(args)
     elif args.status:
         show_status()
     else:
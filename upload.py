@@ -91,8 +91,8 @@ def wait_for_login(page) -> None:
     time.sleep(2)
 
 
-def _upload_single_attempt(page, png_path: Path, metadata: dict) -> None:
-    """Single upload attempt to Redbubble (may raise on transient failures)."""
+def prepare_upload(page, png_path: Path, metadata: dict) -> None:
+    """Open the upload form, attach the PNG and fill every field short of saving."""
     page.goto(UPLOAD_URL, wait_until="domcontentloaded", timeout=30000)
     _wait_for_page_ready(page)
     wait_for_cloudflare(page)
@@ -234,6 +234,9 @@ def _upload_single_attempt(page, png_path: Path, metadata: dict) -> None:
     time.sleep(0.3)
     print("    Agreement: checked")
 
+
+def submit_upload(page, png_path: Path, metadata: dict) -> None:
+    """Save a form filled by prepare_upload and verify Redbubble accepted it."""
     # Click the "Save work" submit button
     page.locator('#submit-work').scroll_into_view_if_needed()
     time.sleep(0.5)
@@ -304,6 +307,12 @@ def _upload_single_attempt(page, png_path: Path, metadata: dict) -> None:
             raise UploadError(f"Redirected to error page: {page.url[:200]}")
 
 
+def _upload_single_attempt(page, png_path: Path, metadata: dict) -> None:
+    """Single upload attempt to Redbubble (may raise on transient failures)."""
+    prepare_upload(page, png_path, metadata)
+    submit_upload(page, png_path, metadata)
+
+
 def upload_single(page, png_path: Path, metadata: dict) -> None:
     """Upload one design with retry logic for transient failures."""
     last_error = None
@@ -343,9 +352,9 @@ def _migrate_legacy_tracker() -> None:
 # CLI
 # ---------------------------------------------------------------------------
 
-def main() -> None:
+def main(argv: list[str] | None = None) -> None:
     parser = build_arg_parser("Redbubble")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     if args.limit == 0:
         args.limit = None
@@ -360,6 +369,8 @@ def main() -> None:
         check_session_fn=check_session_valid,
         wait_for_login_fn=wait_for_login,
         upload_single_fn=upload_single,
+        prepare_fn=prepare_upload,
+        submit_fn=submit_upload,
     )
 
 
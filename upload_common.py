@@ -10,11 +10,23 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 import random
+import sqlite3
+import statistics
 import sys
+import threading
 import time
-from datetime import datetime, timezone
+from collections import deque
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from typing import Callable
+
+from src.metadata_store import MetadataStore, get_store
+from src.metadata_writer import atomic_write_json
+from src.preflight import add_arguments as add_preflight_arguments
+from src.preflight import from_args as preflight_from_args
+from src.upload_ledger import UploadLedger, get_ledger, limit_today
 
 
 # ---------------------------------------------------------------------------
@@ -31,6 +43,16 @@ BREAK_INTERVAL_LARGE = 100
 BREAK_SMALL_RANGE = (120, 300)   # 2-5 minutes
 BREAK_LARGE_RANGE = (300, 600)   # 5-10 minutes
 CONSECUTIVE_FAILURE_LIMIT = 5
+ADAPTIVE_MAX_DELAY = 600  # --adaptive never waits longer than this between uploads
+
+# --mock-site: platform hosts answered by mock_upload_site.py (host -> URL prefix)
+MOCK_SITE_HOSTS = {
+    "www.redbubble.com": "redbubble",
+    "www.teepublic.com": "teepublic",
+    "studio.society6.com": "society6",
+}
+# Trackers and browser profiles for mock runs, away from the real ones
+MOCK_RUN_DIR = Path(__file__).parent / ".mock_runs"
 
 
 # ---------------------------------------------------------------------------
@@ -53,61 +75,247 @@ class UploadError(Exception):
 # Tracker
 # ---------------------------------------------------------------------------
 
+# Trackers are a JSON snapshot (uploaded_<platform>.json) plus an append-only
+# JSON Lines log beside it (uploaded_<platform>.jsonl). Each record is one
+# appended line, so a write costs O(1) no matter how big the tracker is; the
+# loader replays the log over the snapshot, and every TRACKER_COMPACT_EVERY
+# records the log is folded back into the snapshot. Existing JSON trackers are
+# read as the initial snapshot, so they migrate in place on first write.
+
+TRACKER_COMPACT_EVERY = 500
+
+# Log lines not yet folded into the snapshot, per tracker path
+_tracker_log_lines: dict[Path, int] = {}
+# Serializes tracker writes across threads (reentrant: record_entry compacts)
+_tracker_lock = threading.RLock()
+
+
+def tracker_log_path(path: Path) -> Path:
+    return Path(path).with_suffix(".jsonl")
+
+
 def load_tracker(path: Path) -> dict:
+    path = Path(path)
+    tracker = {}
     if path.exists():
         with open(path) as f:
-            return json.load(f)
-    return {}
+            tracker = json.load(f)
+
+    replayed = 0
+    torn = False
+    log_path = tracker_log_path(path)
+    if log_path.exists():
+        with open(log_path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    torn = True  # partial line from a crash mid-append
+                    continue
+                tracker[record["key"]] = record["entry"]
+                replayed += 1
+
+    _tracker_log_lines[path.resolve()] = replayed
+    if torn:
+        # Compact now so the next append doesn't land on the partial line
+        save_tracker(tracker, path)
+    return tracker
 
 
 def save_tracker(tracker: dict, path: Path) -> None:
-    with open(path, "w") as f:
-        json.dump(tracker, f, indent=2)
+    """Compact: write the full snapshot atomically, then truncate the log.
+
+    A crash between the two steps is harmless — replaying the log over the
+    new snapshot yields the same dict.
+    """
+    path = Path(path)
+    with _tracker_lock:
+        atomic_write_json(path, tracker)
+        log_path = tracker_log_path(path)
+        if log_path.exists():
+            log_path.unlink()
+        _tracker_log_lines[path.resolve()] = 0
+
+
+def record_entry(tracker: dict, path: Path, key: str, entry: dict) -> None:
+    """Set tracker[key], append it to the tracker log and mirror it in the ledger.
+
+    Safe to call from several threads (e.g. chunk progress from an upload
+    worker while the event loop records publish status): the entry, the
+    log append and any compaction happen under one lock, so a compaction
+    never unlinks a log line it did not include in the snapshot.
+    """
+    path = Path(path)
+    with _tracker_lock:
+        signature_before = _tracker_signature(path)
+        tracker[key] = entry
+        with open(tracker_log_path(path), "a") as f:
+            f.write(json.dumps({"key": key, "entry": entry}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        resolved = path.resolve()
+        _tracker_log_lines[resolved] = _tracker_log_lines.get(resolved, 0) + 1
+        if _tracker_log_lines[resolved] >= TRACKER_COMPACT_EVERY:
+            save_tracker(tracker, path)
+
+        # The tracker is the source of truth; a ledger hiccup only means the
+        # next sync_ledger re-imports this platform.
+        try:
+            platform = tracker_platform(path)
+            ledger = get_ledger(path.parent)
+            in_sync = ledger.signature(platform) == signature_before
+            ledger.record(platform, key, entry, _tracker_signature(path) if in_sync else None)
+        except sqlite3.Error as e:
+            print(f"  Warning: upload ledger not updated ({e})")
+
+
+# ---------------------------------------------------------------------------
+# Upload ledger
+# ---------------------------------------------------------------------------
+
+def tracker_platform(path: Path) -> str:
+    """Platform name for a tracker file (uploaded_pinterest.json -> pinterest)."""
+    stem = Path(path).stem
+    if stem == "uploaded":
+        return "redbubble"  # pre-multi-platform tracker
+    return stem.removeprefix("uploaded_")
+
+
+def _tracker_signature(path: Path) -> str:
+    parts = [Path(path).resolve().as_posix()]
+    for p in (Path(path), tracker_log_path(path)):
+        try:
+            st = p.stat()
+            parts.append(f"{st.st_mtime_ns}:{st.st_size}")
+        except FileNotFoundError:
+            parts.append("-")
+    return "|".join(parts)
+
+
+def sync_ledger(platform: str, path: Path, legacy_path: Path | None = None) -> UploadLedger:
+    """Ledger with this platform's rows matching its tracker files.
+
+    The tracker is only re-read when its snapshot or log changed since the
+    last import. ``legacy_path`` is used while the main tracker doesn't exist.
+    """
+    path = Path(path)
+    if legacy_path and not path.exists() and not tracker_log_path(path).exists():
+        path = Path(legacy_path)
+    ledger = get_ledger(path.parent)
+    signature = _tracker_signature(path)
+    if ledger.signature(platform) != signature:
+        ledger.replace_platform(platform, load_tracker(path), signature)
+    return ledger
+
+
+def uploads_today(platform: str, path: Path, status: str = "success") -> int:
+    """Entries with ``status`` recorded today for a platform's daily limit.
+
+    "Today" is the US Eastern date (upload_ledger.LIMIT_TZ), as the Etsy
+    and Pinterest limits have always been counted. Read from the ledger's
+    running per-day counters (kept up to date as record_entry writes), not
+    by scanning the tracker's timestamps.
+    """
+    return sync_ledger(platform, path).day_count(platform, limit_today(), status)
+
 
+def uploads_since(platform: str, path: Path, seconds: float, status: str = "success") -> int:
+    """Entries with ``status`` recorded in the last ``seconds``, from the ledger."""
+    since = datetime.now(timezone.utc) - timedelta(seconds=seconds)
+    return sync_ledger(platform, path).count_since(platform, since, status)
 
-def record_upload(tracker: dict, path: Path, key: str, status: str, error: str | None = None) -> None:
-    tracker[key] = {
+
+def record_upload(
+    tracker: dict,
+    path: Path,
+    key: str,
+    status: str,
+    error: str | None = None,
+    duration: float | None = None,
+    captcha: bool = False,
+) -> None:
+    """Record an upload result; ``duration`` and ``captcha`` feed AdaptivePacer."""
+    entry = {
         "status": status,
         "timestamp": datetime.now(timezone.utc).isoformat(),
         "error": error,
     }
-    save_tracker(tracker, path)
+    if duration is not None:
+        entry["duration"] = round(duration, 1)
+    if captcha:
+        entry["captcha"] = True
+    record_entry(tracker, path, key, entry)
 
 
 # ---------------------------------------------------------------------------
 # Design discovery
 # ---------------------------------------------------------------------------
 
-def discover_designs(folder: str, shuffle_niches: bool = False, source_dir: Path | None = None) -> list[tuple[Path, dict]]:
+def design_index(folder: str, source_dir: Path | None = None) -> MetadataStore:
+    """Metadata/PNG index for a design folder, synced with disk.
+
+    The sync lists the folder and re-reads only the sidecars whose mtime
+    or size changed since the last run, so this is cheap to call at every
+    startup.
+    """
+    folder_path = (source_dir / folder) if source_dir else (OUTPUT_DIR / folder)
+    if not folder_path.is_dir():
+        print(f"Error: folder not found: {folder_path}")
+        sys.exit(1)
+    return get_store(folder_path.parent, [folder])
+
+
+def discover_designs(
+    folder: str,
+    shuffle_niches: bool = False,
+    source_dir: Path | None = None,
+    key_filter: Callable[[str], bool] | None = None,
+    limit: int = 0,
+) -> list[tuple[Path, dict]]:
     """Find PNG files with paired JSON metadata.
 
     If source_dir is provided, looks in source_dir/folder/.
     Otherwise uses the default output/<folder>/ layout.
 
+    ``key_filter(tracker_key)`` drops designs before their metadata is
+    parsed (see pending_filter); ``limit`` stops after that many designs.
+
     If shuffle_niches is True, interleave designs from different niches
     so uploads are diverse (avoids uploading 50 coffees in a row).
     """
+    store = design_index(folder, source_dir)
     folder_path = (source_dir / folder) if source_dir else (OUTPUT_DIR / folder)
-    if not folder_path.is_dir():
-        print(f"Error: folder not found: {folder_path}")
-        sys.exit(1)
+
+    for stem in store.unpaired_images(folder):
+        print(f"  Skipping {stem}.png — no metadata JSON found")
+
+    def want(stem: str) -> bool:
+        return key_filter is None or key_filter(tracker_key(folder, folder_path / f"{stem}.png", source_dir))
 
     designs = []
-    for png in sorted(folder_path.glob("*.png")):
-        meta_path = png.with_suffix(".json")
-        if not meta_path.exists():
-            print(f"  Skipping {png.name} — no metadata JSON found")
-            continue
-        with open(meta_path) as f:
-            metadata = json.load(f)
-        designs.append((png, metadata))
+    for jf, metadata in store.iter_designs(folder, want):
+        designs.append((folder_path / f"{jf.stem}.png", metadata))
+        if limit and not shuffle_niches and len(designs) >= limit:
+            break
 
     if shuffle_niches and designs:
         designs = _interleave_by_niche(designs)
+        if limit:
+            designs = designs[:limit]
 
     return designs
 
 
+def pending_filter(tracker: dict, retry_failed: bool = False) -> Callable[[str], bool]:
+    """Tracker-key predicate: not yet uploaded, or only failures if retry_failed."""
+    if retry_failed:
+        return lambda key: tracker.get(key, {}).get("status") == "failed"
+    return lambda key: tracker.get(key, {}).get("status") != "success"
+
+
 def _interleave_by_niche(designs: list[tuple[Path, dict]]) -> list[tuple[Path, dict]]:
     """Interleave designs round-robin by niche for diverse upload ordering."""
     from collections import defaultdict
@@ -162,6 +370,90 @@ def maybe_take_break(upload_count: int) -> None:
         time.sleep(pause)
 
 
+class AdaptivePacer:
+    """Delay between uploads that follows how the platform is responding.
+
+    ``delay`` starts at the configured delay and always stays between
+    ``floor`` and ``ceiling``. A failure doubles it, so a run of failures
+    backs off exponentially. A CAPTCHA also doubles it and sets ``cooldown``:
+    the next CAPTCHA_COOLDOWN healthy uploads hold the delay instead of
+    shortening it. Other successes shorten it by SPEEDUP, or lengthen it by
+    SLOWDOWN when the upload took SLOW_FACTOR times the median of
+    ``latencies``. ``latencies`` and ``outcomes`` cover the last WINDOW
+    uploads and feed summary(). Tracker entries carry each upload's duration
+    and CAPTCHA flag, so from_tracker() resumes at the pace the last run
+    ended on.
+    """
+
+    WINDOW = 20
+    SPEEDUP = 0.9
+    SLOWDOWN = 1.25        # response noticeably slower than usual
+    SLOW_FACTOR = 2.0      # "noticeably" = this many times the median
+    CAPTCHA_COOLDOWN = 10
+
+    def __init__(self, base: float, floor: float = MIN_DELAY, ceiling: float = ADAPTIVE_MAX_DELAY):
+        self.floor = floor
+        self.ceiling = max(ceiling, base, floor)
+        self.delay = min(max(base, floor), self.ceiling)
+        self.latencies: deque[float] = deque(maxlen=self.WINDOW)
+        self.outcomes: deque[str] = deque(maxlen=self.WINDOW)
+        self.cooldown = 0
+
+    @classmethod
+    def from_tracker(cls, tracker: dict, base: float, floor: float = MIN_DELAY,
+                     ceiling: float = ADAPTIVE_MAX_DELAY) -> AdaptivePacer:
+        pacer = cls(base, floor, ceiling)
+        timed = [e for e in tracker.values() if isinstance(e, dict) and "duration" in e and e.get("timestamp")]
+        timed.sort(key=lambda e: e["timestamp"])
+        for entry in timed[-cls.WINDOW:]:
+            pacer.record(entry)
+        return pacer
+
+    def record(self, entry: dict) -> None:
+        """Update the pace from one tracker entry (status / duration / captcha)."""
+        captcha = bool(entry.get("captcha"))
+        success = entry.get("status") == "success"
+        duration = entry.get("duration")
+        self.outcomes.append("captcha" if captcha else "success" if success else "failed")
+
+        if captcha:
+            self.cooldown = self.CAPTCHA_COOLDOWN
+            self._set(self.delay * 2)
+            return
+        if not success:
+            self._set(self.delay * 2)
+            return
+
+        slow = (
+            duration is not None and len(self.latencies) >= 3
+            and duration > self.SLOW_FACTOR * statistics.median(self.latencies)
+        )
+        if duration is not None:
+            self.latencies.append(duration)
+        if slow:
+            self._set(self.delay * self.SLOWDOWN)
+        elif self.cooldown:
+            self.cooldown -= 1
+        else:
+            self._set(self.delay * self.SPEEDUP)
+
+    def _set(self, delay: float) -> None:
+        self.delay = min(self.ceiling, max(self.floor, delay))
+
+    def next_delay(self) -> float:
+        lo = max(self.floor, self.delay * (1 - JITTER_FACTOR))
+        hi = max(lo, self.delay * (1 + JITTER_FACTOR))
+        return random.uniform(lo, hi)
+
+    def summary(self) -> str:
+        n = len(self.outcomes) or 1
+        errors = sum(o == "failed" for o in self.outcomes) / n
+        captchas = sum(o == "captcha" for o in self.outcomes) / n
+        latency = f"{statistics.median(self.latencies):.0f}s" if self.latencies else "n/a"
+        return (f"delay {self.delay:.0f}s | median upload {latency} | "
+                f"errors {errors:.0%} | CAPTCHAs {captchas:.0%} (last {len(self.outcomes)})")
+
+
 # ---------------------------------------------------------------------------
 # Selector helpers
 # ---------------------------------------------------------------------------
@@ -246,9 +538,14 @@ def page_has_captcha(page) -> bool:
 # Browser launch
 # ---------------------------------------------------------------------------
 
-def launch_browser(playwright, session_dir: Path):
+def launch_browser(playwright, session_dir: Path, headless: bool = False, mock_site: str | None = None):
     """Launch a persistent Chrome browser context with anti-detection measures.
 
+    ``headless`` runs without a window (no manual login or CAPTCHA solving
+    possible, so the profile must already hold a valid session). With
+    ``mock_site``, requests to the hosts in MOCK_SITE_HOSTS are answered by
+    that mock_upload_site.py server instead.
+
     Returns the browser context and the first page.
     """
     session_dir.mkdir(parents=True, exist_ok=True)
@@ -256,8 +553,8 @@ def launch_browser(playwright, session_dir: Path):
     context = playwright.chromium.launch_persistent_context(
         user_data_dir=str(session_dir),
         channel="chrome",
-        headless=False,
-        slow_mo=100,
+        headless=headless,
+        slow_mo=0 if headless else 100,
         viewport={"width": 1280, "height": 900},
         args=[
             "--disable-blink-features=AutomationControlled",
@@ -269,10 +566,32 @@ def launch_browser(playwright, session_dir: Path):
         Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
     """)
 
+    if mock_site:
+        _route_to_mock_site(context, mock_site)
+
     page = context.pages[0] if context.pages else context.new_page()
     return context, page
 
 
+def _route_to_mock_site(context, mock_site: str) -> None:
+    """Serve the platform hosts from mock_upload_site.py, keeping page URLs intact."""
+    import re
+    from urllib.parse import urlsplit
+
+    base = mock_site.rstrip("/")
+    hosts = "|".join(re.escape(h) for h in MOCK_SITE_HOSTS)
+
+    def handle(route) -> None:
+        url = urlsplit(route.request.url)
+        target = f"{base}/{MOCK_SITE_HOSTS[url.hostname]}{url.path}"
+        if url.query:
+            target += f"?{url.query}"
+        # Pass redirects back to the browser so page.url follows them
+        route.fulfill(response=route.fetch(url=target, max_redirects=0))
+
+    context.route(re.compile(rf"^https://({hosts})/"), handle)
+
+
 # ---------------------------------------------------------------------------
 # CLI builder
 # ---------------------------------------------------------------------------
@@ -289,6 +608,11 @@ Examples:
   python3 %(prog)s --folder tshirt --limit 50       # Upload batch
   python3 %(prog)s --folder sticker                 # Upload all
   python3 %(prog)s --folder tshirt --retry-failed   # Retry failures
+  python3 %(prog)s --folder tshirt --pipeline       # Fill next form in a second tab
+  python3 %(prog)s --folder tshirt --adaptive --min-delay 20
+  python3 %(prog)s --folder tshirt --headless       # No browser window
+  python3 %(prog)s --folder tshirt --headless --mock-site http://127.0.0.1:5055
+  python3 %(prog)s --folder tshirt --no-preflight   # Send the original PNGs
 """,
     )
     parser.add_argument(
@@ -319,6 +643,31 @@ Examples:
         "--source-dir",
         help="External image source directory (PNG+JSON pairs in source-dir/folder/)",
     )
+    parser.add_argument(
+        "--pipeline", action="store_true",
+        help="Prepare the next design in a second tab during the delay between uploads",
+    )
+    parser.add_argument(
+        "--adaptive", action="store_true",
+        help="Adapt the delay to the platform: speed up while healthy, back off on failures/CAPTCHAs",
+    )
+    parser.add_argument(
+        "--min-delay", type=float, default=MIN_DELAY,
+        help=f"Floor for --adaptive delays (default: {MIN_DELAY})",
+    )
+    parser.add_argument(
+        "--max-delay", type=float, default=ADAPTIVE_MAX_DELAY,
+        help=f"Ceiling for --adaptive delays (default: {ADAPTIVE_MAX_DELAY})",
+    )
+    parser.add_argument(
+        "--headless", action="store_true",
+        help="Run the browser without a window (log in once with a normal run first)",
+    )
+    parser.add_argument(
+        "--mock-site", metavar="URL",
+        help="Upload to a local mock_upload_site.py server instead of the real platform",
+    )
+    add_preflight_arguments(parser)
     return parser
 
 
@@ -326,6 +675,59 @@ Examples:
 # Generic upload loop
 # ---------------------------------------------------------------------------
 
+class TabPipeline:
+    """Two browser tabs that take turns: one submits, the other holds the next form.
+
+    During the delay after design N is saved, design N+1 is prepared
+    (navigate, attach file, fill metadata) in the other tab, and only the rest
+    of the delay is slept. The gap between submissions never drops below the
+    jittered delay; the form-filling time that used to follow it is hidden
+    inside it instead.
+    """
+
+    def __init__(self, context, first_page, prepare_fn, submit_fn, upload_single_fn):
+        self.pages = [first_page, context.new_page()]
+        self.prepare_fn = prepare_fn
+        self.submit_fn = submit_fn
+        self.upload_single_fn = upload_single_fn
+        # tab index -> (png_path, error or None) for the form sitting in that tab
+        self.prepared: dict[int, tuple[Path, Exception | None]] = {}
+
+    def page_for(self, index: int):
+        """Tab for the 1-based design ``index`` (odd designs use the first tab)."""
+        return self.pages[(index - 1) % 2]
+
+    def prepare(self, index: int, png_path: Path, metadata: dict) -> float:
+        """Pre-fill design ``index`` in its tab. Returns seconds spent."""
+        start = time.time()
+        error = None
+        try:
+            self.prepare_fn(self.page_for(index), png_path, metadata)
+        except Exception as e:
+            error = e
+            print(f"  Next design not prepared ({e}) — it will upload from scratch")
+        self.prepared[(index - 1) % 2] = (png_path, error)
+        return time.time() - start
+
+    def discard(self) -> None:
+        """Forget prepared forms (e.g. after re-login they may be stale)."""
+        self.prepared.clear()
+
+    def upload(self, index: int, png_path: Path, metadata: dict) -> None:
+        """Submit the prepared form, or fall back to a full upload_single_fn."""
+        page = self.page_for(index)
+        prepared = self.prepared.pop((index - 1) % 2, None)
+        if prepared and prepared[0] == png_path and prepared[1] is None:
+            try:
+                self.submit_fn(page, png_path, metadata)
+                return
+            except (SessionExpiredError, CaptchaError):
+                raise
+            except Exception as e:
+                print(f"    Prepared submit failed: {e} — retrying from scratch")
+        self.upload_single_fn(page, png_path, metadata)
+
+
 def run_upload_loop(
     args: argparse.Namespace,
     tracker_file: Path,
@@ -333,6 +735,8 @@ def run_upload_loop(
     check_session_fn,
     wait_for_login_fn,
     upload_single_fn,
+    prepare_fn=None,
+    submit_fn=None,
 ) -> None:
     """Main upload loop with circuit breaker, CAPTCHA/session recovery, and break scheduling.
 
@@ -340,48 +744,56 @@ def run_upload_loop(
         check_session_fn(page) -> bool
         wait_for_login_fn(page) -> None
         upload_single_fn(page, png_path, metadata) -> None
+
+    and, for --pipeline, upload_single_fn split in two:
+        prepare_fn(page, png_path, metadata) -> None   # fill the form, don't save
+        submit_fn(page, png_path, metadata) -> None    # save and verify
+
+    For platforms with a preflight profile (src/preflight.py) the callbacks
+    get each design's derivative, encoded in the background from before the
+    browser starts; tracker keys still come from the source path.
     """
     folder = args.folder
     limit = args.limit
     delay = args.delay
     dry_run = args.dry_run
     retry_failed = args.retry_failed
-
-    # Discover designs
+    headless = getattr(args, "headless", False)
+    mock_site = getattr(args, "mock_site", None)
+
+    if mock_site:
+        # Keep mock uploads out of the real trackers, ledger and browser profile
+        MOCK_RUN_DIR.mkdir(exist_ok=True)
+        tracker_file = MOCK_RUN_DIR / Path(tracker_file).name
+        session_dir = MOCK_RUN_DIR / Path(session_dir).name
+        print(f"Mock site: {mock_site} (tracker: {tracker_file})")
+
+    if headless:
+        def wait_for_login_fn(page):  # no window to log in through
+            print("\n=== Login required, but running --headless ===")
+            print("  Run once without --headless to log in; the session is kept in the profile.")
+
+    # Discover designs — tracker-filtered before any metadata is parsed
     shuffle = getattr(args, "shuffle", False)
     source_dir = Path(args.source_dir) if getattr(args, "source_dir", None) else None
-    designs = discover_designs(folder, shuffle_niches=shuffle, source_dir=source_dir)
+    total = design_index(folder, source_dir).image_count(folder, paired=True)
     location = str(source_dir / folder) if source_dir else f"output/{folder}/"
-    if not designs:
+    if not total:
         print(f"No designs found in {location}")
         return
 
-    print(f"Found {len(designs)} designs in {location}")
+    print(f"Found {total} designs in {location}")
 
-    # Load tracker
     tracker = load_tracker(tracker_file)
-
-    # Filter based on tracker
-    to_upload = []
-    for png_path, meta in designs:
-        key = tracker_key(folder, png_path, source_dir=source_dir)
-        entry = tracker.get(key, {})
-        status = entry.get("status")
-
-        if retry_failed and status == "failed":
-            to_upload.append((png_path, meta))
-        elif status == "success":
-            continue
-        elif not retry_failed:
-            to_upload.append((png_path, meta))
+    to_upload = discover_designs(
+        folder, shuffle_niches=shuffle, source_dir=source_dir,
+        key_filter=pending_filter(tracker, retry_failed), limit=max(limit or 0, 0),
+    )
 
     if not to_upload:
         print("No designs to upload (all already uploaded or no failures to retry).")
         return
 
-    if limit and limit > 0:
-        to_upload = to_upload[:limit]
-
     print(f"Will {'preview' if dry_run else 'upload'} {len(to_upload)} designs")
     print()
 
@@ -395,11 +807,22 @@ def run_upload_loop(
         print("Dry run complete — no uploads performed.")
         return
 
+    pipelined = getattr(args, "pipeline", False)
+    if pipelined and not (prepare_fn and submit_fn):
+        print("Note: --pipeline is not supported for this platform; uploading one tab at a time.")
+        pipelined = False
+
+    preflight = preflight_from_args(args, tracker_platform(tracker_file))
+    preflight.prepare(png_path for png_path, _ in to_upload)
+    upload_single_fn = preflight.wrap(upload_single_fn)
+    prepare_fn = preflight.wrap(prepare_fn)
+    submit_fn = preflight.wrap(submit_fn)
+
     # Launch browser
     from playwright.sync_api import sync_playwright
 
-    with sync_playwright() as p:
-        context, page = launch_browser(p, session_dir)
+    with sync_playwright() as p, preflight:
+        context, page = launch_browser(p, session_dir, headless=headless, mock_site=mock_site)
 
         # Check if session is valid
         if not check_session_fn(page):
@@ -411,6 +834,18 @@ def run_upload_loop(
 
         print("Session valid — starting uploads\n")
 
+        pipeline = None
+        if pipelined:
+            pipeline = TabPipeline(context, page, prepare_fn, submit_fn, upload_single_fn)
+            print("Pipelined mode: next design is prepared in a second tab during each delay\n")
+
+        pacer = None
+        if getattr(args, "adaptive", False):
+            pacer = AdaptivePacer.from_tracker(
+                tracker, delay, floor=args.min_delay, ceiling=args.max_delay,
+            )
+            print(f"Adaptive pacing: {pacer.summary()}\n")
+
         consecutive_failures = 0
         uploaded_count = 0
         session_start = time.time()
@@ -420,17 +855,30 @@ def run_upload_loop(
             print(f"[{i}/{len(to_upload)}] Uploading: {key}")
             print(f"  Title: {meta['title']}")
 
+            if pipeline:
+                page = pipeline.page_for(i)
+                page.bring_to_front()
+            started = time.time()
+
             try:
-                upload_single_fn(page, png_path, meta)
-                record_upload(tracker, tracker_file, key, "success")
+                if pipeline:
+                    pipeline.upload(i, png_path, meta)
+                else:
+                    upload_single_fn(page, png_path, meta)
+                record_upload(tracker, tracker_file, key, "success", duration=time.time() - started)
                 consecutive_failures = 0
                 uploaded_count += 1
                 print(f"  -> Success")
 
             except CaptchaError:
+                if pipeline:
+                    pipeline.discard()
                 print("\n=== CAPTCHA detected ===")
-                print("  Solve the CAPTCHA in the browser window.")
-                print("  Auto-detecting when cleared (up to 120s)...")
+                if headless:
+                    print("  Running --headless: waiting to see if it clears on its own (up to 120s)...")
+                else:
+                    print("  Solve the CAPTCHA in the browser window.")
+                    print("  Auto-detecting when cleared (up to 120s)...")
                 captcha_cleared = False
                 captcha_start = time.time()
                 while time.time() - captcha_start < 120:
@@ -443,20 +891,25 @@ def run_upload_loop(
                 if captcha_cleared:
                     try:
                         upload_single_fn(page, png_path, meta)
-                        record_upload(tracker, tracker_file, key, "success")
+                        record_upload(tracker, tracker_file, key, "success",
+                                      duration=time.time() - started, captcha=True)
                         consecutive_failures = 0
                         uploaded_count += 1
                         print(f"  -> Success (after CAPTCHA)")
                     except Exception as e2:
-                        record_upload(tracker, tracker_file, key, "failed", str(e2))
+                        record_upload(tracker, tracker_file, key, "failed", str(e2),
+                                      duration=time.time() - started, captcha=True)
                         consecutive_failures += 1
                         print(f"  -> Failed: {e2}")
                 else:
                     print("  CAPTCHA not cleared after 120s — skipping this design.")
-                    record_upload(tracker, tracker_file, key, "failed", "CAPTCHA timeout")
+                    record_upload(tracker, tracker_file, key, "failed", "CAPTCHA timeout",
+                                  duration=time.time() - started, captcha=True)
                     consecutive_failures += 1
 
             except SessionExpiredError:
+                if pipeline:
+                    pipeline.discard()
                 print("\n=== Session expired ===")
                 wait_for_login_fn(page)
                 if not check_session_fn(page):
@@ -464,20 +917,23 @@ def run_upload_loop(
                     break
                 try:
                     upload_single_fn(page, png_path, meta)
-                    record_upload(tracker, tracker_file, key, "success")
+                    record_upload(tracker, tracker_file, key, "success", duration=time.time() - started)
                     consecutive_failures = 0
                     uploaded_count += 1
                     print(f"  -> Success (after re-login)")
                 except Exception as e2:
-                    record_upload(tracker, tracker_file, key, "failed", str(e2))
+                    record_upload(tracker, tracker_file, key, "failed", str(e2), duration=time.time() - started)
                     consecutive_failures += 1
                     print(f"  -> Failed: {e2}")
 
             except Exception as e:
-                record_upload(tracker, tracker_file, key, "failed", str(e))
+                record_upload(tracker, tracker_file, key, "failed", str(e), duration=time.time() - started)
                 consecutive_failures += 1
                 print(f"  -> Failed: {e}")
 
+            if pacer and key in tracker:
+                pacer.record(tracker[key])
+
             # Circuit breaker
             if consecutive_failures >= CONSECUTIVE_FAILURE_LIMIT:
                 print(f"\n=== {CONSECUTIVE_FAILURE_LIMIT} consecutive failures ===")
@@ -493,6 +949,8 @@ def run_upload_loop(
                             break
                 except Exception:
                     pass
+                if pipeline:
+                    pipeline.discard()
                 consecutive_failures = 0
 
             # Progress stats
@@ -506,13 +964,23 @@ def run_upload_loop(
                         print(f"\n  --- Progress: {uploaded_count}/{len(to_upload)} done | {rate:.1f}/hr | ~{eta_hours * 60:.0f} min remaining ---\n")
                     else:
                         print(f"\n  --- Progress: {uploaded_count}/{len(to_upload)} done | {rate:.1f}/hr | ~{eta_hours:.1f} hr remaining ---\n")
+                if pacer:
+                    print(f"  --- Pacing: {pacer.summary()} ---\n")
 
             # Delay between uploads (skip after last)
             if i < len(to_upload):
                 maybe_take_break(uploaded_count)
-                wait_time = jittered_delay(delay)
-                print(f"  Waiting {wait_time:.0f}s before next upload...")
-                time.sleep(wait_time)
+                wait_time = pacer.next_delay() if pacer else jittered_delay(delay)
+                if pipeline:
+                    next_png, next_meta = to_upload[i]
+                    print("  Preparing next design in the other tab...")
+                    spent = pipeline.prepare(i + 1, next_png, next_meta)
+                    print(f"  Prepared in {spent:.0f}s; waiting {max(0, wait_time - spent):.0f}s more "
+                          f"({wait_time:.0f}s between submissions)...")
+                    time.sleep(max(0.0, wait_time - spent))
+                else:
+                    print(f"  Waiting {wait_time:.0f}s before next upload...")
+                    time.sleep(wait_time)
 
         # Summary
         elapsed = time.time() - session_start
@@ -529,5 +997,7 @@ def run_upload_loop(
         if failed:
             print(f"  Failed:   {failed}")
             print(f"  Re-run with --retry-failed to retry")
+        if preflight.enabled:
+            print(f"  Preflight: {preflight.summary()}")
 
         context.close()
@@ -37,13 +37,23 @@ import urllib.parse
 import webbrowser
 from datetime import datetime
 from pathlib import Path
-from zoneinfo import ZoneInfo
 
 import requests
 
+from src import credentials
+from src.credentials import CredentialError, NotAuthorized, TokenSource
+from src.http_client import PooledSession
+from src.preflight import (
+    add_arguments as add_preflight_arguments, content_type, from_args as preflight_from_args,
+)
+from src.rate_limit import get_limiter
+from src.metadata_store import niche_of
 from upload_common import (
+    design_index,
     load_tracker,
-    save_tracker,
+    pending_filter,
+    record_entry,
+    uploads_today,
     jittered_delay,
     maybe_take_break,
     CONSECUTIVE_FAILURE_LIMIT,
@@ -73,6 +83,13 @@ ETSY_DAILY_LIMIT = 500            # conservative daily cap (API allows 10k calls
 ETSY_BREAK_INTERVAL = 50          # break after every 50 listings
 ETSY_BREAK_RANGE = (120, 300)     # 2-5 minute break
 
+# Keep-alive connection pool shared by every Etsy API call
+HTTP_POOL_SIZE = 10
+HTTP_RETRIES = 3
+SESSION = PooledSession(
+    "Etsy", pool_size=HTTP_POOL_SIZE, retries=HTTP_RETRIES, limiter=get_limiter("etsy"),
+)
+
 # Default listing values
 DEFAULT_PRICE = 19.99
 DEFAULT_QUANTITY = 999
@@ -275,30 +292,28 @@ def _save_tokens(tokens: dict) -> None:
     TOKEN_FILE.chmod(0o600)
 
 
+def _refresh_tokens(tokens: dict) -> dict:
+    config = load_config()
+    return refresh_access_token(config["api_keystring"], tokens["refresh_token"])
+
+
+credentials.register("etsy", TokenSource(
+    load=_load_tokens,
+    refresh=_refresh_tokens,
+    expires_at=lambda tokens: tokens.get("obtained_at", 0) + tokens.get("expires_in", 3600),
+))
+
+
 def get_access_token(config: dict) -> str | None:
-    """Get a valid access token, refreshing if needed."""
-    tokens = _load_tokens()
-    if not tokens:
+    """Get a valid access token (cached; refreshed in the background before expiry)."""
+    try:
+        return credentials.token("etsy")
+    except NotAuthorized:
         return None
-
-    access_token = tokens.get("access_token")
-    expires_in = tokens.get("expires_in", 3600)
-    obtained_at = tokens.get("obtained_at", 0)
-
-    # Refresh if expiring within 5 minutes
-    if time.time() - obtained_at > (expires_in - 300):
-        refresh_tok = tokens.get("refresh_token")
-        if refresh_tok:
-            print("Access token expired, refreshing...")
-            new_tokens = refresh_access_token(
-                config["api_keystring"], refresh_tok
-            )
-            if new_tokens:
-                return new_tokens.get("access_token")
+    except CredentialError as e:
+        print(e)
         return None
 
-    return access_token
-
 
 # ---------------------------------------------------------------------------
 # Etsy API client
@@ -335,13 +350,7 @@ def api_request(
     if params:
         kwargs["params"] = params
 
-    resp = requests.request(method, url, **kwargs)
-
-    if resp.status_code == 429:
-        retry_after = int(resp.headers.get("Retry-After", 5))
-        print(f"  Rate limited. Waiting {retry_after}s...")
-        time.sleep(retry_after)
-        resp = requests.request(method, url, **kwargs)
+    resp = SESSION.request(method, url, **kwargs)
 
     if resp.status_code not in (200, 201):
         raise Exception(f"Etsy API error {resp.status_code}: {resp.text[:500]}")
@@ -360,7 +369,7 @@ def get_me(api_keystring: str, access_token: str) -> dict:
         "x-api-key": api_keystring,
         "Authorization": f"Bearer {access_token}",
     }
-    resp = requests.get(url, headers=headers, timeout=30)
+    resp = SESSION.get(url, headers=headers, timeout=30)
     if resp.status_code != 200:
         raise Exception(f"Failed to get user info ({resp.status_code}): {resp.text[:300]}")
     return resp.json()
@@ -584,20 +593,12 @@ def upload_listing_image(
     }
 
     with open(image_path, "rb") as f:
-        files = {"image": (image_path.name, f, "image/png")}
+        files = {"image": (image_path.name, f, content_type(image_path))}
         data = {"rank": str(rank)}
         if alt_text:
             data["alt_text"] = alt_text[:250]
 
-        resp = requests.post(url, headers=headers, files=files, data=data, timeout=120)
-
-    if resp.status_code == 429:
-        retry_after = int(resp.headers.get("Retry-After", 5))
-        print(f"  Rate limited. Waiting {retry_after}s...")
-        time.sleep(retry_after)
-        with open(image_path, "rb") as f:
-            files = {"image": (image_path.name, f, "image/png")}
-            resp = requests.post(url, headers=headers, files=files, data=data, timeout=120)
+        resp = SESSION.post(url, headers=headers, files=files, data=data, timeout=120)
 
     if resp.status_code not in (200, 201):
         raise Exception(f"Image upload failed ({resp.status_code}): {resp.text[:500]}")
@@ -643,31 +644,23 @@ def _prepare_tags(tags: list[str]) -> list[str]:
 # Design discovery
 # ---------------------------------------------------------------------------
 
-def discover_etsy_designs(folder: str) -> list[tuple[Path, dict, str]]:
+def discover_etsy_designs(folder: str, key_filter=None) -> list[tuple[Path, dict, str]]:
     """Find design images and pair them with metadata.
 
     Returns list of (image_path, metadata_dict, niche) tuples.
     Uses the original high-res designs (not mockups) since Etsy wants product images.
+    ``key_filter(tracker_key)`` drops designs before their metadata is parsed.
     """
+    store = design_index(folder)
     design_dir = OUTPUT_DIR / folder
 
-    if not design_dir.is_dir():
-        print(f"Error: design folder not found: {design_dir}")
-        sys.exit(1)
-
-    designs = []
-    for png_path in sorted(design_dir.glob("*.png")):
-        meta_path = png_path.with_suffix(".json")
-        if not meta_path.exists():
-            continue
-
-        with open(meta_path) as f:
-            metadata = json.load(f)
-
-        niche = png_path.stem.split("_")[0]
-        designs.append((png_path, metadata, niche))
+    def want(stem: str) -> bool:
+        return key_filter is None or key_filter(f"{folder}/{stem}")
 
-    return designs
+    return [
+        (design_dir / f"{jf.stem}.png", metadata, niche_of(jf.stem))
+        for jf, metadata in store.iter_designs(folder, want)
+    ]
 
 
 # ---------------------------------------------------------------------------
@@ -708,20 +701,9 @@ def build_etsy_description(metadata: dict, folder: str) -> str:
 # Daily limit tracking
 # ---------------------------------------------------------------------------
 
-def listings_created_today(tracker: dict) -> int:
-    """Count listings with status=success created today (EST)."""
-    today = datetime.now(ZoneInfo("America/New_York")).date()
-    count = 0
-    for entry in tracker.values():
-        if entry.get("status") != "success":
-            continue
-        try:
-            ts = datetime.fromisoformat(entry["timestamp"])
-            if ts.astimezone(ZoneInfo("America/New_York")).date() == today:
-                count += 1
-        except (ValueError, KeyError):
-            continue
-    return count
+def listings_created_today() -> int:
+    """Count listings with status=success created today (UTC day)."""
+    return uploads_today("etsy", TRACKER_FILE)
 
 
 # ---------------------------------------------------------------------------
@@ -735,15 +717,14 @@ def record_listing(
 ) -> None:
     """Record a listing upload result."""
     from datetime import timezone
-    tracker[key] = {
+    record_entry(tracker, TRACKER_FILE, key, {
         "status": status,
         "timestamp": datetime.now(timezone.utc).isoformat(),
         "error": error,
         "listing_id": listing_id,
         "section": section_name,
         "activated": activated,
-    }
-    save_tracker(tracker, TRACKER_FILE)
+    })
 
 
 # ---------------------------------------------------------------------------
@@ -810,13 +791,14 @@ def setup_shop(config: dict, access_token: str) -> None:
 
 def _dry_run(args: argparse.Namespace) -> None:
     """Preview designs without needing API credentials."""
-    designs = discover_etsy_designs(args.folder)
-    if not designs:
+    total = design_index(args.folder).image_count(args.folder, paired=True)
+    if not total:
         print(f"No designs found in output/{args.folder}/")
         return
-    print(f"Found {len(designs)} designs in output/{args.folder}/")
+    print(f"Found {total} designs in output/{args.folder}/")
 
     tracker = load_tracker(TRACKER_FILE)
+    designs = discover_etsy_designs(args.folder, pending_filter(tracker, args.retry_failed))
     to_upload = []
     for png_path, meta, niche in designs:
         key = f"{args.folder}/{png_path.stem}"
@@ -916,14 +898,15 @@ def run_etsy_upload(args: argparse.Namespace) -> None:
         print()
 
     # Discover designs
-    designs = discover_etsy_designs(args.folder)
-    if not designs:
+    total = design_index(args.folder).image_count(args.folder, paired=True)
+    if not total:
         print(f"No designs found in output/{args.folder}/")
         return
-    print(f"Found {len(designs)} designs in output/{args.folder}/")
+    print(f"Found {total} designs in output/{args.folder}/")
 
-    # Load tracker and filter
+    # Load tracker and filter (already-listed designs are never parsed)
     tracker = load_tracker(TRACKER_FILE)
+    designs = discover_etsy_designs(args.folder, pending_filter(tracker, args.retry_failed))
     to_upload = []
     for png_path, meta, niche in designs:
         key = f"{args.folder}/{png_path.stem}"
@@ -947,7 +930,7 @@ def run_etsy_upload(args: argparse.Namespace) -> None:
 
     # Check daily limit
     daily_limit = args.daily_limit
-    already_today = listings_created_today(tracker)
+    already_today = listings_created_today()
     remaining = daily_limit - already_today
     if remaining <= 0:
         print(f"Daily limit reached ({already_today} listings today, limit {daily_limit}).")
@@ -975,101 +958,106 @@ def run_etsy_upload(args: argparse.Namespace) -> None:
         print("Dry run complete — no listings created.")
         return
 
-    # Upload loop
+    # Upload loop — listing photos are preflighted in the background, in order
+    preflight = preflight_from_args(args, "etsy")
+    preflight.prepare(png_path for png_path, *_ in to_upload)
     consecutive_failures = 0
     uploaded_count = 0
 
-    for i, (png_path, meta, niche, key) in enumerate(to_upload, 1):
-        print(f"[{i}/{len(to_upload)}] Listing: {key}")
-        print(f"  Title: {meta['title'][:140]}")
-
-        try:
-            # Refresh token if needed
-            access_token = get_access_token(config) or access_token
-
-            # Resolve shop section
-            section_id = resolve_section(niche, api_key, access_token, shop_id)
-            section_name = NICHE_SECTIONS.get(niche, DEFAULT_SECTION)
-            print(f"  Section: {section_name}")
-
-            # Build listing data
-            description = build_etsy_description(meta, args.folder)
-            tags = meta.get("tags", [])
-
-            # Create draft listing
-            listing = create_draft_listing(
-                api_key, access_token, shop_id,
-                title=meta["title"],
-                description=description,
-                tags=tags,
-                price=price,
-                quantity=DEFAULT_QUANTITY,
-                taxonomy_id=taxonomy_id,
-                section_id=section_id,
-                shipping_profile_id=shipping_profile_id,
-                return_policy_id=return_policy_id,
-            )
-            listing_id = listing.get("listing_id")
-            print(f"  Draft created (ID: {listing_id})")
-
-            # Upload image
-            upload_listing_image(
-                api_key, access_token, shop_id, listing_id,
-                png_path, rank=1, alt_text=meta["title"][:250],
-            )
-            print(f"  Image uploaded")
-
-            # Optionally activate
-            activated = False
-            if args.activate and shipping_profile_id and return_policy_id:
-                activate_listing(api_key, access_token, shop_id, listing_id)
-                activated = True
-                print(f"  Listing activated")
-
-            record_listing(
-                tracker, key, "success",
-                listing_id=listing_id,
-                section_name=section_name,
-                activated=activated,
-            )
-            consecutive_failures = 0
-            uploaded_count += 1
-            print(f"  -> Success")
-
-        except Exception as e:
-            record_listing(tracker, key, "failed", error=str(e))
-            consecutive_failures += 1
-            print(f"  -> Failed: {e}")
-
-        # Circuit breaker
-        if consecutive_failures >= CONSECUTIVE_FAILURE_LIMIT:
-            print(f"\n=== {CONSECUTIVE_FAILURE_LIMIT} consecutive failures ===")
-            print("  Something may be wrong. Stopping.")
-            break
-
-        # Pacing
-        if i < len(to_upload):
-            maybe_take_break(uploaded_count)
-            wait_time = jittered_delay(args.delay)
-            print(f"  Waiting {wait_time:.0f}s before next listing...")
-            time.sleep(wait_time)
+    with preflight:
+        for i, (png_path, meta, niche, key) in enumerate(to_upload, 1):
+            print(f"[{i}/{len(to_upload)}] Listing: {key}")
+            print(f"  Title: {meta['title'][:140]}")
+
+            try:
+                # Refresh token if needed
+                access_token = get_access_token(config) or access_token
+
+                # Resolve shop section
+                section_id = resolve_section(niche, api_key, access_token, shop_id)
+                section_name = NICHE_SECTIONS.get(niche, DEFAULT_SECTION)
+                print(f"  Section: {section_name}")
+
+                # Build listing data
+                description = build_etsy_description(meta, args.folder)
+                tags = meta.get("tags", [])
+
+                # Create draft listing
+                listing = create_draft_listing(
+                    api_key, access_token, shop_id,
+                    title=meta["title"],
+                    description=description,
+                    tags=tags,
+                    price=price,
+                    quantity=DEFAULT_QUANTITY,
+                    taxonomy_id=taxonomy_id,
+                    section_id=section_id,
+                    shipping_profile_id=shipping_profile_id,
+                    return_policy_id=return_policy_id,
+                )
+                listing_id = listing.get("listing_id")
+                print(f"  Draft created (ID: {listing_id})")
+
+                # Upload image
+                upload_listing_image(
+                    api_key, access_token, shop_id, listing_id,
+                    preflight.path(png_path), rank=1, alt_text=meta["title"][:250],
+                )
+                print(f"  Image uploaded")
+
+                # Optionally activate
+                activated = False
+                if args.activate and shipping_profile_id and return_policy_id:
+                    activate_listing(api_key, access_token, shop_id, listing_id)
+                    activated = True
+                    print(f"  Listing activated")
+
+                record_listing(
+                    tracker, key, "success",
+                    listing_id=listing_id,
+                    section_name=section_name,
+                    activated=activated,
+                )
+                consecutive_failures = 0
+                uploaded_count += 1
+                print(f"  -> Success")
+
+            except Exception as e:
+                record_listing(tracker, key, "failed", error=str(e))
+                consecutive_failures += 1
+                print(f"  -> Failed: {e}")
+
+            # Circuit breaker
+            if consecutive_failures >= CONSECUTIVE_FAILURE_LIMIT:
+                print(f"\n=== {CONSECUTIVE_FAILURE_LIMIT} consecutive failures ===")
+                print("  Something may be wrong. Stopping.")
+                break
+
+            # Pacing
+            if i < len(to_upload):
+                maybe_take_break(uploaded_count)
+                wait_time = jittered_delay(args.delay)
+                print(f"  Waiting {wait_time:.0f}s before next listing...")
+                time.sleep(wait_time)
 
     # Summary
     print(f"\n=== Etsy session complete ===")
     print(f"  Created: {uploaded_count}/{len(to_upload)}")
-    total_today = listings_created_today(tracker)
+    total_today = listings_created_today()
     print(f"  Daily usage: {total_today}/{daily_limit}")
+    print(f"  Preflight: {preflight.summary()}")
     failed = sum(1 for _, _, _, k in to_upload if tracker.get(k, {}).get("status") == "failed")
     if failed:
         print(f"  Failed: {failed}")
         print(f"  Re-run with --retry-failed to retry")
+    SESSION.print_latency_summary()
 
 
 # ---------------------------------------------------------------------------
 # CLI
 # ---------------------------------------------------------------------------
 
-def main() -> None:
+def main(argv: list[str] | None = None) -> None:
     parser = argparse.ArgumentParser(
         description="Upload POD designs to Etsy as listings via API v3.",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -1082,6 +1070,7 @@ Examples:
   python3 upload_etsy.py --folder tshirt --limit 10                # Upload batch
   python3 upload_etsy.py --folder tshirt --activate                # Create + activate
   python3 upload_etsy.py --folder tshirt --retry-failed            # Retry failures
+  python3 upload_etsy.py --folder tshirt --no-preflight            # Send the original PNGs
 """,
     )
     parser.add_argument(
@@ -1128,7 +1117,8 @@ Examples:
         "--taxonomy-search",
         help="Filter taxonomy results by keyword (use with --lookup-taxonomy)",
     )
-    args = parser.parse_args()
+    add_preflight_arguments(parser)
+    args = parser.parse_args(argv)
 
     if args.limit == 0:
         args.limit = None
@@ -559,7 +559,7 @@ def run_instagram_upload(args: argparse.Namespace) -> None:
 # CLI
 # ---------------------------------------------------------------------------
 
-def main() -> None:
+def main(argv: list[str] | None = None) -> None:
     parser = argparse.ArgumentParser(
         description="Upload videos as Instagram Reels via browser automation.",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -591,7 +591,7 @@ Examples:
         "--retry-failed", action="store_true",
         help="Only retry previously failed uploads",
     )
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     if args.limit == 0:
         args.limit = None
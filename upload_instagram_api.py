@@ -14,11 +14,24 @@ Usage:
     python3 upload_instagram_api.py --source-dir output/videos --dry-run      # Preview
     python3 upload_instagram_api.py --source-dir output/videos --limit 9      # Batch
     python3 upload_instagram_api.py --source-dir output/videos --retry-failed # Retry
+    python3 upload_instagram_api.py --source-dir output/videos --limit 9 --concurrent 9
+
+Instagram fetches each reel from a public URL. With a public URL set
+(--public-url, or media_public_url in the instagram config) the videos are
+served straight from this machine with signed, short-lived links, so nothing
+is uploaded twice. An S3-compatible bucket (media_bucket) works too, and
+tmpfiles.org remains the fallback (see src/media_host.py). Hosts that upload
+stage the next --prestage videos while a container is processing.
+
+With --concurrent N, containers for up to N videos are created up front and
+polled together (asyncio, with backoff); each is published as soon as
+Instagram finishes processing it, within the account's daily publishing cap.
 """
 
 from __future__ import annotations
 
 import argparse
+import asyncio
 import json
 import sys
 import time
@@ -29,10 +42,14 @@ from urllib.parse import urlencode
 from urllib.error import HTTPError
 
 from keychain_config import load_config, save_config
+from src import credentials
+from src.credentials import NotAuthorized, TokenSource
+from src.media_host import MEDIA_HOSTS, MediaHost, TmpfilesHost, media_host_from_config
 from upload_common import (
     load_tracker,
-    save_tracker,
+    record_entry,
     record_upload,
+    uploads_since,
     jittered_delay,
     CONSECUTIVE_FAILURE_LIMIT,
 )
@@ -51,11 +68,22 @@ VIDEO_DIR = PROJECT_DIR / "output" / "videos_music"
 
 GRAPH_API_VERSION = "v22.0"
 GRAPH_API_BASE = f"https://graph.instagram.com/{GRAPH_API_VERSION}"
+TOKEN_REFRESH_URL = "https://graph.instagram.com/refresh_access_token"
+# Long-lived tokens last 60 days; refresh them in the background in the last week
+TOKEN_REFRESH_AHEAD = 7 * 86400
 
 POLL_INTERVAL = 10  # seconds
 POLL_TIMEOUT = 300  # 5 minutes max wait for processing
 
+# --concurrent: poll fast at first, then back off (Graph API: ~200 calls/hour)
+POLL_INTERVAL_MIN = 5
+POLL_INTERVAL_MAX = 30
+POLL_BACKOFF = 1.5
+
+DAILY_PUBLISH_LIMIT = 100  # API-published posts per rolling 24h
+
 INSTAGRAM_DEFAULT_DELAY = 60  # 1 min between uploads
+PRESTAGE_COUNT = 2  # videos staged ahead of the one being processed
 
 
 # ---------------------------------------------------------------------------
@@ -106,64 +134,63 @@ def discover_videos(source_dir: Path) -> list[tuple[Path, str, str]]:
 # Instagram Graph API upload flow (Resumable Upload)
 # ---------------------------------------------------------------------------
 
+def _container_status(container_id: str, access_token: str) -> str:
+    """One status check: IN_PROGRESS or FINISHED; raises on ERROR / EXPIRED."""
+    status_resp = _api_request(
+        f"{GRAPH_API_BASE}/{container_id}",
+        data={
+            "fields": "id,status,status_code",
+            "access_token": access_token,
+        },
+    )
+    status_code = status_resp.get("status_code", "UNKNOWN")
+    if status_code == "ERROR":
+        error_msg = status_resp.get("status", "Unknown error")
+        raise RuntimeError(f"Container processing failed: {error_msg}")
+    elif status_code == "EXPIRED":
+        raise RuntimeError("Container expired before publishing")
+    return status_code
+
+
 def _poll_container(container_id: str, access_token: str) -> None:
     """Poll a media container until status is FINISHED."""
     deadline = time.time() + POLL_TIMEOUT
     while time.time() < deadline:
-        status_resp = _api_request(
-            f"{GRAPH_API_BASE}/{container_id}",
-            data={
-                "fields": "id,status,status_code",
-                "access_token": access_token,
-            },
-        )
-        status_code = status_resp.get("status_code", "UNKNOWN")
+        status_code = _container_status(container_id, access_token)
         print(f"  Container status: {status_code}")
-
         if status_code == "FINISHED":
             return
-        elif status_code == "ERROR":
-            error_msg = status_resp.get("status", "Unknown error")
-            raise RuntimeError(f"Container processing failed: {error_msg}")
-        elif status_code == "EXPIRED":
-            raise RuntimeError("Container expired before publishing")
-
         time.sleep(POLL_INTERVAL)
 
     raise RuntimeError(f"Container processing timed out after {POLL_TIMEOUT}s")
 
 
-def _upload_to_temp_host(video_path: Path) -> str:
-    """Upload a video file to a temporary public host and return a direct download URL.
-
-    Uses tmpfiles.org (files auto-expire after 1 hour).
-    """
-    import subprocess
-
-    file_size_mb = video_path.stat().st_size / 1024 / 1024
-    print(f"  Uploading to temp host ({file_size_mb:.1f} MB)...")
-
-    result = subprocess.run(
-        ["curl", "-s", "-F", f"file=@{video_path}", "https://tmpfiles.org/api/v1/upload"],
-        capture_output=True, text=True, timeout=300,
+def _create_container(ig_user_id: str, access_token: str, video_url: str, caption: str) -> str:
+    """Create a REELS media container. Returns the container ID."""
+    container_resp = _api_request(
+        f"{GRAPH_API_BASE}/{ig_user_id}/media",
+        method="POST",
+        data={
+            "media_type": "REELS",
+            "video_url": video_url,
+            "caption": caption,
+            "access_token": access_token,
+        },
     )
+    return container_resp["id"]
 
-    if result.returncode != 0:
-        raise RuntimeError(f"tmpfiles.org upload failed: {result.stderr}")
-
-    resp = json.loads(result.stdout)
-    if resp.get("status") != "success":
-        raise RuntimeError(f"tmpfiles.org upload failed: {resp}")
 
-    # Convert page URL to direct download URL by inserting /dl/ after domain
-    page_url = resp["data"]["url"]
-    direct_url = page_url.replace("tmpfiles.org/", "tmpfiles.org/dl/")
-    # Ensure HTTPS
-    if direct_url.startswith("http://"):
-        direct_url = direct_url.replace("http://", "https://", 1)
-
-    print(f"  Temp URL: {direct_url}")
-    return direct_url
+def _publish_container(ig_user_id: str, access_token: str, container_id: str) -> str:
+    """Publish a FINISHED container. Returns the media ID."""
+    publish_resp = _api_request(
+        f"{GRAPH_API_BASE}/{ig_user_id}/media_publish",
+        method="POST",
+        data={
+            "creation_id": container_id,
+            "access_token": access_token,
+        },
+    )
+    return publish_resp["id"]
 
 
 def upload_reel_from_file(
@@ -171,15 +198,15 @@ def upload_reel_from_file(
     access_token: str,
     video_path: Path,
     caption: str,
+    media_host: MediaHost | None = None,
 ) -> str:
     """Upload a local video file as an Instagram Reel.
 
-    The Instagram Graph API requires a publicly accessible video_url.
-    We upload the video to a temporary file host (file.io) to get a
-    public URL, then pass that URL to the Instagram API.
+    The Instagram Graph API requires a publicly accessible video_url,
+    which ``media_host`` provides (a tmpfiles.org upload if not given).
 
     Flow:
-        1. Upload video to temp host for a public URL
+        1. Get a public URL for the video from the media host
         2. Create a media container with the public video_url
         3. Poll until container status is FINISHED
         4. Publish the container
@@ -187,85 +214,192 @@ def upload_reel_from_file(
     Returns:
         Published media ID
     """
-    # Step 1: Get a public URL for the video
-    video_url = _upload_to_temp_host(video_path)
+    if media_host is None:
+        with TmpfilesHost() as host:
+            return upload_reel_from_file(ig_user_id, access_token, video_path, caption, host)
 
-    # Step 2: Create media container
-    container_resp = _api_request(
-        f"{GRAPH_API_BASE}/{ig_user_id}/media",
-        method="POST",
-        data={
-            "media_type": "REELS",
-            "video_url": video_url,
-            "caption": caption,
-            "access_token": access_token,
-        },
-    )
-    container_id = container_resp["id"]
-    print(f"  Container created: {container_id}")
+    try:
+        # Step 1: Get a public URL for the video
+        video_url = media_host.url(video_path)
+        print(f"  Video URL ({media_host.name}): {video_url.split('?')[0]}")
+
+        # Step 2: Create media container
+        container_id = _create_container(ig_user_id, access_token, video_url, caption)
+        print(f"  Container created: {container_id}")
 
-    # Step 3: Poll container status until FINISHED
-    _poll_container(container_id, access_token)
+        # Step 3: Poll container status until FINISHED
+        _poll_container(container_id, access_token)
+    finally:
+        # Instagram has fetched the file (or given up on it)
+        media_host.release(video_path)
 
     # Step 4: Publish
-    publish_resp = _api_request(
-        f"{GRAPH_API_BASE}/{ig_user_id}/media_publish",
-        method="POST",
-        data={
-            "creation_id": container_id,
-            "access_token": access_token,
-        },
-    )
-    media_id = publish_resp["id"]
+    media_id = _publish_container(ig_user_id, access_token, container_id)
     print(f"  Published: {media_id}")
 
     return media_id
 
 
 # ---------------------------------------------------------------------------
-# Main upload loop
+# Concurrent batch publishing (--concurrent)
 # ---------------------------------------------------------------------------
 
-def _maybe_refresh_token(config: dict) -> str:
-    """Refresh the long-lived token if it's within 7 days of expiry.
+def publishing_quota(ig_user_id: str, access_token: str) -> int:
+    """Posts still allowed in the rolling 24h window.
 
-    Instagram long-lived tokens last 60 days. We refresh proactively
-    so the nightly cron never hits an expired token.
+    Asks the content_publishing_limit endpoint; if that fails, counts the
+    ledger's successes from the last 24 hours against DAILY_PUBLISH_LIMIT.
     """
-    access_token = config["access_token"]
-
     try:
-        # Try a refresh — only succeeds for valid long-lived tokens
         resp = _api_request(
-            "https://graph.instagram.com/refresh_access_token",
-            data={
-                "grant_type": "ig_refresh_token",
-                "access_token": access_token,
-            },
+            f"{GRAPH_API_BASE}/{ig_user_id}/content_publishing_limit",
+            data={"fields": "quota_usage,config", "access_token": access_token},
         )
-        new_token = resp.get("access_token")
-        if new_token and new_token != access_token:
-            config["access_token"] = new_token
-            save_config("instagram", config)
-            expires_days = resp.get("expires_in", 0) / 86400
-            print(f"  Token refreshed (expires in {expires_days:.0f} days)")
-            return new_token
-    except Exception:
-        pass  # Token still valid, refresh not needed yet
+        usage = resp["data"][0]
+        total = usage.get("config", {}).get("quota_total", DAILY_PUBLISH_LIMIT)
+        return max(0, total - usage.get("quota_usage", 0))
+    except Exception as e:
+        print(f"  Could not read publishing limit ({e}); counting from the upload ledger")
+
+    return max(0, DAILY_PUBLISH_LIMIT - uploads_since("instagram", TRACKER_FILE, 86400))
+
+
+async def _await_container(container_id: str, access_token: str, label: str) -> None:
+    """Poll one container with backoff until FINISHED, without blocking the others."""
+    deadline = time.monotonic() + POLL_TIMEOUT
+    interval = POLL_INTERVAL_MIN
+    last = None
+    while time.monotonic() < deadline:
+        status_code = await asyncio.to_thread(_container_status, container_id, access_token)
+        if status_code != last:
+            print(f"  [{label}] Container status: {status_code}")
+            last = status_code
+        if status_code == "FINISHED":
+            return
+        await asyncio.sleep(interval)
+        interval = min(POLL_INTERVAL_MAX, interval * POLL_BACKOFF)
+    raise RuntimeError(f"Container processing timed out after {POLL_TIMEOUT}s")
 
-    return access_token
+
+async def _publish_concurrently(
+    to_upload: list[tuple[Path, str, str, str]],
+    tracker: dict,
+    ig_user_id: str,
+    access_token: str,
+    media_host: MediaHost,
+    in_flight: int,
+    prestage: int = PRESTAGE_COUNT,
+) -> int:
+    """Create, poll and publish reels with up to ``in_flight`` containers at once.
+
+    Each time a slot frees up, the next ``prestage`` videos after the one
+    taking it start staging. Returns the number published.
+    """
+    slots = asyncio.Semaphore(in_flight)
+    published = 0
+    failures = 0
+
+    async def reel(i: int, video_path: Path, landmark_id: str, key: str, video_type: str) -> None:
+        nonlocal published, failures
+        async with slots:
+            if failures >= CONSECUTIVE_FAILURE_LIMIT:
+                return  # stopping; leave the rest untracked for the next run
+            # Stage the videos that will take the next free slots
+            media_host.prestage([vp for vp, *_ in to_upload[i:i + 1 + prestage]])
+            label = video_path.stem
+            try:
+                try:
+                    caption = build_caption(landmark_id, video_type=video_type)
+                    video_url = await asyncio.to_thread(media_host.url, video_path)
+                    container_id = await asyncio.to_thread(
+                        _create_container, ig_user_id, access_token, video_url, caption,
+                    )
+                    print(f"  [{label}] Container created: {container_id}")
+                    await _await_container(container_id, access_token, label)
+                finally:
+                    await asyncio.to_thread(media_host.release, video_path)
+                media_id = await asyncio.to_thread(
+                    _publish_container, ig_user_id, access_token, container_id,
+                )
+            except Exception as e:
+                record_upload(tracker, TRACKER_FILE, key, "failed", str(e))
+                failures += 1
+                print(f"  [{label}] -> Failed: {e}")
+                if failures == CONSECUTIVE_FAILURE_LIMIT:
+                    print(f"\n=== {CONSECUTIVE_FAILURE_LIMIT} failures — not starting more ===")
+                return
+
+            record_entry(tracker, TRACKER_FILE, key, {
+                "status": "success",
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "media_id": media_id,
+                "error": None,
+            })
+            failures = 0
+            published += 1
+            print(f"  [{label}] -> Published (media_id: {media_id})")
+
+    # Stage what the first wave of containers will need
+    media_host.prestage([vp for vp, *_ in to_upload[:in_flight]])
+    await asyncio.gather(*(reel(i, *item) for i, item in enumerate(to_upload)))
+    return published
+
+
+# ---------------------------------------------------------------------------
+# Credentials
+# ---------------------------------------------------------------------------
+
+def _load_credentials() -> dict | None:
+    try:
+        return load_config("instagram")
+    except FileNotFoundError:
+        return None
+
+
+def _refresh_token(config: dict) -> dict:
+    """Exchange the long-lived token for a fresh one (60 more days)."""
+    resp = _api_request(TOKEN_REFRESH_URL, data={
+        "grant_type": "ig_refresh_token",
+        "access_token": config["access_token"],
+    })
+    expires_in = resp.get("expires_in", 0)
+    config = {**config, "access_token": resp["access_token"],
+              "token_expires_at": time.time() + expires_in}
+    save_config("instagram", config)
+    print(f"  Instagram token refreshed (expires in {expires_in / 86400:.0f} days)")
+    return config
+
+
+# Configs saved before token_expires_at was recorded get one refresh in the
+# background on first use, which records it
+credentials.register("instagram", TokenSource(
+    load=_load_credentials,
+    refresh=_refresh_token,
+    expires_at=lambda config: config.get("token_expires_at"),
+    ahead=TOKEN_REFRESH_AHEAD,
+))
 
 
+# ---------------------------------------------------------------------------
+# Main upload loop
+# ---------------------------------------------------------------------------
+
 def run_instagram_upload(args: argparse.Namespace) -> None:
     """Main Instagram upload flow via Graph API."""
-    # Load credentials and auto-refresh token
-    config = load_config("instagram")
-    access_token = _maybe_refresh_token(config)
+    # Cached credentials; the token is refreshed in the background before it expires
+    try:
+        config = credentials.get_manager().record("instagram")
+    except NotAuthorized:
+        print("No Instagram credentials in Keychain (config 'instagram').")
+        sys.exit(1)
+    access_token = config["access_token"]
     ig_user_id = config.get("ig_user_id", "26401815412746202")
 
     source_dir = Path(args.source_dir) if args.source_dir else VIDEO_DIR
 
     videos = discover_videos(source_dir)
+    if args.only:
+        videos = [v for v in videos if v[0].stem in args.only]
     if not videos:
         print(f"No videos found in {source_dir}")
         return
@@ -308,7 +442,38 @@ def run_instagram_upload(args: argparse.Namespace) -> None:
         print("Dry run complete — no uploads performed.")
         return
 
-    # Upload loop
+    media_host = media_host_from_config(
+        args.media_host, config, public_url=args.public_url, port=args.media_port,
+    )
+    try:
+        if args.concurrent > 0:
+            quota = publishing_quota(ig_user_id, access_token)
+            if quota < len(to_upload):
+                print(f"Daily publishing cap: {quota} posts left — trimming the batch")
+                to_upload = to_upload[:quota]
+            started = time.time()
+            published = asyncio.run(_publish_concurrently(
+                to_upload, tracker, ig_user_id, access_token, media_host, args.concurrent,
+                args.prestage,
+            ))
+            print(f"\n=== Instagram API upload session complete ===")
+            print(f"  Published: {published}/{len(to_upload)} in {time.time() - started:.0f}s")
+            if published < len(to_upload):
+                print(f"  Re-run with --retry-failed to retry failures")
+        else:
+            _upload_videos(args, to_upload, tracker, ig_user_id, access_token, media_host)
+    finally:
+        media_host.close()
+
+
+def _upload_videos(
+    args: argparse.Namespace,
+    to_upload: list[tuple[Path, str, str, str]],
+    tracker: dict,
+    ig_user_id: str,
+    access_token: str,
+    media_host: MediaHost,
+) -> None:
     consecutive_failures = 0
     uploaded_count = 0
 
@@ -317,20 +482,23 @@ def run_instagram_upload(args: argparse.Namespace) -> None:
         print(f"[{i}/{len(to_upload)}] Uploading: {video_path.name} ({video_type})")
         print(f"  Landmark: {landmark_id}")
 
+        # Stage the next videos while this container processes
+        media_host.prestage([vp for vp, *_ in to_upload[i - 1:i + args.prestage]])
+
         try:
             media_id = upload_reel_from_file(
                 ig_user_id=ig_user_id,
                 access_token=access_token,
                 video_path=video_path,
                 caption=caption,
+                media_host=media_host,
             )
-            tracker[key] = {
+            record_entry(tracker, TRACKER_FILE, key, {
                 "status": "success",
                 "timestamp": datetime.now(timezone.utc).isoformat(),
                 "media_id": media_id,
                 "error": None,
-            }
-            save_tracker(tracker, TRACKER_FILE)
+            })
             consecutive_failures = 0
             uploaded_count += 1
             print(f"  -> Success (media_id: {media_id})")
@@ -363,7 +531,7 @@ def run_instagram_upload(args: argparse.Namespace) -> None:
 # CLI
 # ---------------------------------------------------------------------------
 
-def main() -> None:
+def main(argv: list[str] | None = None) -> None:
     parser = argparse.ArgumentParser(
         description="Upload videos as Instagram Reels via Graph API.",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -373,6 +541,9 @@ Examples:
   python3 upload_instagram_api.py --source-dir output/videos --dry-run        # Preview
   python3 upload_instagram_api.py --source-dir output/videos --limit 9        # Batch
   python3 upload_instagram_api.py --source-dir output/videos --retry-failed   # Retry
+  python3 upload_instagram_api.py --limit 9 --public-url https://media.example.com
+  python3 upload_instagram_api.py --limit 9 --media-host s3 --prestage 3
+  python3 upload_instagram_api.py --limit 9 --concurrent 9                   # One batch, polled together
 """,
     )
     parser.add_argument(
@@ -395,7 +566,33 @@ Examples:
         "--retry-failed", action="store_true",
         help="Only retry previously failed uploads",
     )
-    args = parser.parse_args()
+    parser.add_argument(
+        "--only", action="append", metavar="STEM",
+        help="Only consider this video (file stem); repeatable",
+    )
+    parser.add_argument(
+        "--media-host", choices=sorted(MEDIA_HOSTS),
+        help="Where Instagram fetches videos from (default: media_host in the "
+             "instagram config, else local with a public URL, else tmpfiles)",
+    )
+    parser.add_argument(
+        "--public-url", metavar="URL",
+        help="Public base URL that reaches the local media server (tunnel/proxy)",
+    )
+    parser.add_argument(
+        "--media-port", type=int,
+        help="Port for the local media server (default: 8765)",
+    )
+    parser.add_argument(
+        "--concurrent", type=int, default=0, metavar="N",
+        help="Process up to N containers at once, publishing each when ready "
+             "(0 = one at a time with --delay between uploads)",
+    )
+    parser.add_argument(
+        "--prestage", type=int, default=PRESTAGE_COUNT,
+        help=f"Videos to stage ahead on uploading hosts (default: {PRESTAGE_COUNT})",
+    )
+    args = parser.parse_args(argv)
 
     if args.limit == 0:
         args.limit = None
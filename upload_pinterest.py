@@ -32,14 +32,25 @@ import urllib.parse
 import webbrowser
 from datetime import datetime
 from pathlib import Path
-from zoneinfo import ZoneInfo
 
 import requests
 
+from src import credentials
+from src.credentials import CredentialError, NotAuthorized, TokenSource
+from src.http_client import PooledSession
+from src.preflight import (
+    add_arguments as add_preflight_arguments, content_type, from_args as preflight_from_args,
+)
+from src.rate_limit import get_limiter
+from src.metadata_store import niche_of
 from upload_common import (
+    design_index,
     load_tracker,
-    save_tracker,
+    pending_filter,
+    record_entry,
+    uploads_today,
     jittered_delay,
+    tracker_key,
     CONSECUTIVE_FAILURE_LIMIT,
 )
 
@@ -58,6 +69,13 @@ BOARD_CACHE_FILE = Path(__file__).parent / ".pinterest_boards.json"
 API_BASE_PROD = "https://api.pinterest.com/v5"
 API_BASE_SANDBOX = "https://api-sandbox.pinterest.com/v5"
 API_BASE = API_BASE_SANDBOX  # sandbox for trial; switch to PROD after Standard Access
+
+# Keep-alive connection pool shared by every Pinterest API call
+HTTP_POOL_SIZE = 10
+HTTP_RETRIES = 3
+SESSION = PooledSession(
+    "Pinterest", pool_size=HTTP_POOL_SIZE, retries=HTTP_RETRIES, limiter=get_limiter("pinterest"),
+)
 OAUTH_URL = "https://www.pinterest.com/oauth/"
 TOKEN_URL = "https://api.pinterest.com/v5/oauth/token"
 REDIRECT_URI = "http://localhost:9876/callback"
@@ -235,30 +253,28 @@ def _save_tokens(tokens: dict) -> None:
     _save_keychain_config("pinterest_tokens", tokens)
 
 
+def _refresh_tokens(tokens: dict) -> dict:
+    config = load_config()
+    return refresh_access_token(config["app_id"], config["app_secret"], tokens["refresh_token"])
+
+
+credentials.register("pinterest", TokenSource(
+    load=_load_tokens,
+    refresh=_refresh_tokens,
+    expires_at=lambda tokens: tokens.get("obtained_at", 0) + tokens.get("expires_in", 3600),
+))
+
+
 def get_access_token(config: dict) -> str | None:
-    """Get a valid access token, refreshing if needed."""
-    tokens = _load_tokens()
-    if not tokens:
+    """Get a valid access token (cached; refreshed in the background before expiry)."""
+    try:
+        return credentials.token("pinterest")
+    except NotAuthorized:
         return None
-
-    access_token = tokens.get("access_token")
-    expires_in = tokens.get("expires_in", 3600)
-    obtained_at = tokens.get("obtained_at", 0)
-
-    # Refresh if expiring within 5 minutes
-    if time.time() - obtained_at > (expires_in - 300):
-        refresh_tok = tokens.get("refresh_token")
-        if refresh_tok:
-            print("Access token expired, refreshing...")
-            new_tokens = refresh_access_token(
-                config["app_id"], config["app_secret"], refresh_tok
-            )
-            if new_tokens:
-                return new_tokens.get("access_token")
+    except CredentialError as e:
+        print(e)
         return None
 
-    return access_token
-
 
 # ---------------------------------------------------------------------------
 # Pinterest API client
@@ -278,18 +294,10 @@ def api_request(
         "Content-Type": "application/json",
     }
 
-    resp = requests.request(
+    resp = SESSION.request(
         method, url, headers=headers, json=json_data, params=params, timeout=60
     )
 
-    if resp.status_code == 429:
-        retry_after = int(resp.headers.get("Retry-After", 60))
-        print(f"  Rate limited. Waiting {retry_after}s...")
-        time.sleep(retry_after)
-        resp = requests.request(
-            method, url, headers=headers, json=json_data, params=params, timeout=60
-        )
-
     if resp.status_code not in (200, 201):
         raise Exception(f"API error {resp.status_code}: {resp.text[:500]}")
 
@@ -314,7 +322,7 @@ def create_pin(
         "link": link,
         "media_source": {
             "source_type": "image_base64",
-            "content_type": "image/png",
+            "content_type": content_type(image_path),
             "data": image_data,
         },
         "alt_text": title[:500],
@@ -416,55 +424,50 @@ def setup_all_boards(access_token: str) -> None:
 # Design discovery (mockups + metadata)
 # ---------------------------------------------------------------------------
 
-def discover_pinterest_designs(folder: str, source_dir: Path | None = None) -> list[tuple[Path, dict, str]]:
+def discover_pinterest_designs(
+    folder: str, source_dir: Path | None = None, key_filter=None,
+) -> list[tuple[Path, dict, str]]:
     """Find images and pair them with metadata.
 
     Returns list of (image_path, metadata_dict, niche) tuples.
 
     If source_dir is provided, looks for *.png + paired *.json in source_dir/folder/.
-    Otherwise uses the default mockup/metadata layout.
+    Otherwise uses the default mockup/metadata layout. Metadata comes from
+    the design index; ``key_filter(tracker_key)`` drops designs before
+    their metadata is parsed.
     """
+    def want(stem: str) -> bool:
+        return key_filter is None or key_filter(tracker_key(folder, Path(f"{stem}.png"), source_dir))
+
     if source_dir:
         # External source: PNG + JSON side by side in source_dir/folder/
         img_dir = source_dir / folder
-        if not img_dir.is_dir():
-            print(f"Error: source folder not found: {img_dir}")
-            sys.exit(1)
-
-        designs = []
-        for png in sorted(img_dir.glob("*.png")):
-            meta_path = png.with_suffix(".json")
-            if not meta_path.exists():
-                continue
-            with open(meta_path) as f:
-                metadata = json.load(f)
-            niche = png.stem.split("_")[0]
-            designs.append((png, metadata, niche))
-        return designs
+        store = design_index(folder, source_dir)
+        return [
+            (img_dir / f"{jf.stem}.png", metadata, niche_of(jf.stem))
+            for jf, metadata in store.iter_designs(folder, want)
+        ]
 
     # Default: mockup-based layout
     mockup_dir = MOCKUP_DIR / folder
-    meta_dir = OUTPUT_DIR / folder
 
     if not mockup_dir.is_dir():
         print(f"Error: mockup folder not found: {mockup_dir}")
         sys.exit(1)
 
+    store = design_index(folder)
     designs = []
     for mockup_png in sorted(mockup_dir.glob("*_mockup.png")):
         # Derive original design name by stripping _mockup suffix
         stem = mockup_png.stem.replace("_mockup", "")
-        meta_path = meta_dir / f"{stem}.json"
-
-        if not meta_path.exists():
+        if not want(stem):
+            continue
+        metadata = store.metadata(folder, stem)
+        if metadata is None:
             continue
-
-        with open(meta_path) as f:
-            metadata = json.load(f)
 
         # Extract niche from filename (first part before _NNN_)
-        niche = stem.split("_")[0]
-        designs.append((mockup_png, metadata, niche))
+        designs.append((mockup_png, metadata, niche_of(stem)))
 
     return designs
 
@@ -501,20 +504,9 @@ def build_pin_link(title: str, shop_name: str) -> str:
 # Daily limit tracking
 # ---------------------------------------------------------------------------
 
-def pins_uploaded_today(tracker: dict) -> int:
-    """Count pins with status=success uploaded today (EST)."""
-    today = datetime.now(ZoneInfo("America/New_York")).date()
-    count = 0
-    for entry in tracker.values():
-        if entry.get("status") != "success":
-            continue
-        try:
-            ts = datetime.fromisoformat(entry["timestamp"])
-            if ts.astimezone(ZoneInfo("America/New_York")).date() == today:
-                count += 1
-        except (ValueError, KeyError):
-            continue
-    return count
+def pins_uploaded_today() -> int:
+    """Count pins with status=success uploaded today (UTC day)."""
+    return uploads_today("pinterest", TRACKER_FILE)
 
 
 # ---------------------------------------------------------------------------
@@ -528,15 +520,14 @@ def record_pin(
 ) -> None:
     """Record a pin upload result with extended metadata."""
     from datetime import timezone
-    tracker[key] = {
+    record_entry(tracker, path, key, {
         "status": status,
         "timestamp": datetime.now(timezone.utc).isoformat(),
         "error": error,
         "pin_id": pin_id,
         "board_id": board_id,
         "board_name": board_name,
-    }
-    save_tracker(tracker, path)
+    })
 
 
 # ---------------------------------------------------------------------------
@@ -585,16 +576,17 @@ def run_pinterest_upload(args: argparse.Namespace) -> None:
     source_dir = Path(args.source_dir) if args.source_dir else None
     board_override = args.board_name
 
-    designs = discover_pinterest_designs(args.folder, source_dir=source_dir)
+    # Load tracker first so already-pinned designs are skipped unparsed
+    tracker = load_tracker(TRACKER_FILE)
+    designs = discover_pinterest_designs(
+        args.folder, source_dir=source_dir, key_filter=pending_filter(tracker, args.retry_failed),
+    )
+    location = str(source_dir / args.folder) if source_dir else f"output/mockups/{args.folder}/"
     if not designs:
-        location = str(source_dir / args.folder) if source_dir else f"output/mockups/{args.folder}/"
-        print(f"No designs found in {location}")
+        print(f"No designs to upload in {location} (all already pinned or no failures to retry).")
         return
-    location = str(source_dir / args.folder) if source_dir else f"output/mockups/{args.folder}/"
-    print(f"Found {len(designs)} designs in {location}")
+    print(f"Found {len(designs)} designs to pin in {location}")
 
-    # Load tracker and filter
-    tracker = load_tracker(TRACKER_FILE)
     # Use a source-specific prefix so external uploads don't collide with default ones
     key_prefix = f"ext:{source_dir.name}/{args.folder}" if source_dir else args.folder
     to_upload = []
@@ -625,7 +617,7 @@ def run_pinterest_upload(args: argparse.Namespace) -> None:
         to_upload = to_upload[:args.limit]
 
     # Check daily limit
-    already_today = pins_uploaded_today(tracker)
+    already_today = pins_uploaded_today()
     remaining = daily_limit - already_today
     if remaining <= 0:
         print(f"Daily limit reached ({already_today} pins today, limit {daily_limit}).")
@@ -653,85 +645,90 @@ def run_pinterest_upload(args: argparse.Namespace) -> None:
         print("Dry run complete — no pins created.")
         return
 
-    # Upload loop
+    # Upload loop — pin images are encoded in the background, ahead of the pins
+    preflight = preflight_from_args(args, "pinterest")
+    preflight.prepare(mockup_path for mockup_path, *_ in to_upload)
     consecutive_failures = 0
     uploaded_count = 0
 
-    for i, (mockup_path, meta, niche, key) in enumerate(to_upload, 1):
-        print(f"[{i}/{len(to_upload)}] Pinning: {key}")
-        print(f"  Title: {meta['title']}")
-
-        try:
-            # Refresh token if needed
-            access_token = get_access_token(config) or access_token
-
-            # Resolve board — use override name or niche lookup
-            effective_niche = "_override" if board_override else niche
-            if board_override and effective_niche not in NICHE_BOARDS:
-                NICHE_BOARDS[effective_niche] = board_override
-            board_id = resolve_board(effective_niche, access_token)
-            board_name = board_override or NICHE_BOARDS.get(niche, DEFAULT_BOARD)
-            print(f"  Board: {board_name}")
-
-            # Build pin data
-            link = build_pin_link(meta["title"], shop_name)
-            description = build_pin_description(meta, link)
-
-            # Create pin
-            result = create_pin(
-                access_token, board_id,
-                meta["title"], description, link,
-                mockup_path,
-            )
-
-            pin_id = result.get("id")
-            record_pin(
-                tracker, TRACKER_FILE, key, "success",
-                pin_id=pin_id, board_id=board_id, board_name=board_name,
-            )
-            consecutive_failures = 0
-            uploaded_count += 1
-            print(f"  -> Success (pin ID: {pin_id})")
-
-        except Exception as e:
-            record_pin(tracker, TRACKER_FILE, key, "failed", error=str(e))
-            consecutive_failures += 1
-            print(f"  -> Failed: {e}")
-
-        # Circuit breaker
-        if consecutive_failures >= CONSECUTIVE_FAILURE_LIMIT:
-            print(f"\n=== {CONSECUTIVE_FAILURE_LIMIT} consecutive failures ===")
-            print("  Something may be wrong. Stopping.")
-            break
+    with preflight:
+        for i, (mockup_path, meta, niche, key) in enumerate(to_upload, 1):
+            print(f"[{i}/{len(to_upload)}] Pinning: {key}")
+            print(f"  Title: {meta['title']}")
+
+            try:
+                # Refresh token if needed
+                access_token = get_access_token(config) or access_token
+
+                # Resolve board — use override name or niche lookup
+                effective_niche = "_override" if board_override else niche
+                if board_override and effective_niche not in NICHE_BOARDS:
+                    NICHE_BOARDS[effective_niche] = board_override
+                board_id = resolve_board(effective_niche, access_token)
+                board_name = board_override or NICHE_BOARDS.get(niche, DEFAULT_BOARD)
+                print(f"  Board: {board_name}")
+
+                # Build pin data
+                link = build_pin_link(meta["title"], shop_name)
+                description = build_pin_description(meta, link)
+
+                # Create pin
+                result = create_pin(
+                    access_token, board_id,
+                    meta["title"], description, link,
+                    preflight.path(mockup_path),
+                )
+
+                pin_id = result.get("id")
+                record_pin(
+                    tracker, TRACKER_FILE, key, "success",
+                    pin_id=pin_id, board_id=board_id, board_name=board_name,
+                )
+                consecutive_failures = 0
+                uploaded_count += 1
+                print(f"  -> Success (pin ID: {pin_id})")
+
+            except Exception as e:
+                record_pin(tracker, TRACKER_FILE, key, "failed", error=str(e))
+                consecutive_failures += 1
+                print(f"  -> Failed: {e}")
+
+            # Circuit breaker
+            if consecutive_failures >= CONSECUTIVE_FAILURE_LIMIT:
+                print(f"\n=== {CONSECUTIVE_FAILURE_LIMIT} consecutive failures ===")
+                print("  Something may be wrong. Stopping.")
+                break
 
-        # Pacing
-        if i < len(to_upload):
-            # Break after every N pins
-            if uploaded_count > 0 and uploaded_count % PINTEREST_BREAK_INTERVAL == 0:
-                pause = random.uniform(*PINTEREST_BREAK_RANGE)
-                print(f"\n--- Break ({uploaded_count} pins): pausing {pause / 60:.0f} min ---")
-                time.sleep(pause)
+            # Pacing
+            if i < len(to_upload):
+                # Break after every N pins
+                if uploaded_count > 0 and uploaded_count % PINTEREST_BREAK_INTERVAL == 0:
+                    pause = random.uniform(*PINTEREST_BREAK_RANGE)
+                    print(f"\n--- Break ({uploaded_count} pins): pausing {pause / 60:.0f} min ---")
+                    time.sleep(pause)
 
-            wait_time = jittered_delay(args.delay)
-            print(f"  Waiting {wait_time:.0f}s before next pin...")
-            time.sleep(wait_time)
+                wait_time = jittered_delay(args.delay)
+                print(f"  Waiting {wait_time:.0f}s before next pin...")
+                time.sleep(wait_time)
 
     # Summary
     print(f"\n=== Pinterest session complete ===")
     print(f"  Pinned: {uploaded_count}/{len(to_upload)}")
-    total_today = pins_uploaded_today(tracker)
+    total_today = pins_uploaded_today()
     print(f"  Daily usage: {total_today}/{daily_limit}")
+    print(f"  Preflight: {preflight.summary()}")
     failed = sum(1 for _, _, _, k in to_upload if tracker.get(k, {}).get("status") == "failed")
     if failed:
         print(f"  Failed: {failed}")
         print(f"  Re-run with --retry-failed to retry")
+    SESSION.print_latency_summary()
 
 
 # ---------------------------------------------------------------------------
 # CLI
 # ---------------------------------------------------------------------------
 
-def main() -> None:
+def main(argv: list[str] | None = None) -> None:
     parser = argparse.ArgumentParser(
         description="Upload product mockups to Pinterest as pins via API v5.",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -742,6 +739,7 @@ Examples:
   python3 upload_pinterest.py --folder tshirt --limit 10       # Batch upload
   python3 upload_pinterest.py --folder tshirt --retry-failed   # Retry failures
   python3 upload_pinterest.py --setup-boards                   # Create boards only
+  python3 upload_pinterest.py --folder tshirt --no-preflight   # Send the original PNGs
 """,
     )
     parser.add_argument(
@@ -788,11 +786,13 @@ Examples:
         "--production", action="store_true",
         help="Use production API (default: sandbox for trial access)",
     )
-    args = parser.parse_args()
+    add_preflight_arguments(parser)
+    args = parser.parse_args(argv)
 
+    # Set either way: an in-process caller may run sandbox after production
+    global API_BASE
+    API_BASE = API_BASE_PROD if args.production else API_BASE_SANDBOX
     if args.production:
-        global API_BASE
-        API_BASE = API_BASE_PROD
         print("Using PRODUCTION API\n")
     else:
         print("Using SANDBOX API (trial access)\n")
@@ -16,6 +16,7 @@ Usage:
     python3 upload_printify.py --folder poster                  # Upload all posters
     python3 upload_printify.py --folder sticker --retry-failed  # Retry failures
     python3 upload_printify.py --folder tshirt --publish        # Create + publish
+    python3 upload_printify.py --folder poster --workers 8      # More parallel designs
     python3 upload_printify.py --source-dir /path/to/designs --folder poster
 """
 
@@ -24,18 +25,23 @@ from __future__ import annotations
 import argparse
 import base64
 import json
+import queue
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 
 import requests
+from requests.adapters import HTTPAdapter
 
+from src.rate_limit import TokenBucket, get_limiter, retry_after_seconds
 from upload_common import (
     discover_designs,
     jittered_delay,
     load_tracker,
-    save_tracker,
+    record_entry,
     tracker_key,
     CONSECUTIVE_FAILURE_LIMIT,
 )
@@ -49,7 +55,9 @@ SCRIPT_DIR = Path(__file__).parent
 from keychain_config import load_config as _load_keychain_config
 TRACKER_FILE = SCRIPT_DIR / "uploaded_printify.json"
 
-DEFAULT_DELAY = 5  # seconds between API calls (no browser, can be fast)
+DEFAULT_DELAY = 0  # extra seconds between starting designs (the rate limiter paces requests)
+DEFAULT_WORKERS = 4  # designs in flight per pipeline stage
+MAX_RETRIES = 3  # attempts per request after a 429
 
 # Product blueprints and print providers
 PRODUCT_CONFIG = {
@@ -116,28 +124,71 @@ def load_config() -> dict:
 # API client
 # ---------------------------------------------------------------------------
 
+class Base64JSONBody:
+    """Streaming ``{"file_name": ..., "contents": "<base64>"}`` request body.
+
+    The image is read and base64-encoded one chunk at a time as requests
+    sends it, so memory per upload stays at about one chunk regardless of
+    image size. The length is known up front (Content-Length, no chunked
+    encoding), and each iteration re-reads the file, so a retry after a
+    429 can send the body again.
+    """
+
+    CHUNK_SIZE = 3 * 64 * 1024  # multiple of 3: chunks encode without padding
+
+    def __init__(self, file_name: str, image_path: Path):
+        self.image_path = image_path
+        self.prefix = ('{"file_name": %s, "contents": "' % json.dumps(file_name)).encode()
+        self.suffix = b'"}'
+        self.size = image_path.stat().st_size
+
+    def __len__(self) -> int:
+        encoded = 4 * ((self.size + 2) // 3)
+        return len(self.prefix) + encoded + len(self.suffix)
+
+    def __iter__(self):
+        yield self.prefix
+        with open(self.image_path, "rb") as f:
+            while chunk := f.read(self.CHUNK_SIZE):
+                yield base64.b64encode(chunk)
+        yield self.suffix
+
+
 class PrintifyAPI:
     """Thin wrapper around the Printify REST API v1."""
 
-    def __init__(self, api_token: str, shop_id: int):
+    def __init__(self, api_token: str, shop_id: int, workers: int = DEFAULT_WORKERS):
         self.api_token = api_token
         self.shop_id = shop_id
         self.base_url = "https://api.printify.com/v1"
         self.session = requests.Session()
+        # One connection per concurrent request across all pipeline stages
+        adapter = HTTPAdapter(pool_maxsize=max(10, workers * 3))
+        self.session.mount("https://", adapter)
         self.session.headers.update({
             "Authorization": f"Bearer {api_token}",
             "Content-Type": "application/json",
         })
-
-    def _request(self, method: str, endpoint: str, json_data: dict | None = None) -> dict:
+        # Process-wide Printify quotas, shared by every worker thread
+        self.limiter = get_limiter("printify")
+        self.publish_limiter = get_limiter("printify_publish")
+
+    def _request(
+        self, method: str, endpoint: str, json_data: dict | None = None,
+        limiter: TokenBucket | None = None, body: Base64JSONBody | None = None,
+    ) -> dict:
         url = f"{self.base_url}{endpoint}"
-        resp = self.session.request(method, url, json=json_data, timeout=120)
-
-        if resp.status_code == 429:
-            retry_after = int(resp.headers.get("Retry-After", 60))
-            print(f"  Rate limited. Waiting {retry_after}s...")
-            time.sleep(retry_after)
-            resp = self.session.request(method, url, json=json_data, timeout=120)
+        for attempt in range(MAX_RETRIES + 1):
+            if limiter:
+                limiter.acquire()
+            self.limiter.acquire()
+            resp = self.session.request(method, url, json=json_data, data=body, timeout=120)
+            self.limiter.update_from_headers(resp.headers)
+            if resp.status_code != 429 or attempt == MAX_RETRIES:
+                break
+            retry_after = retry_after_seconds(resp.headers.get("Retry-After"))
+            print(f"  Rate limited. Pausing requests for {retry_after:.0f}s...")
+            (limiter or self.limiter).pause(retry_after)
 
         if resp.status_code not in (200, 201):
             raise Exception(f"API {resp.status_code}: {resp.text[:500]}")
@@ -146,11 +197,10 @@ class PrintifyAPI:
 
     def upload_image(self, file_name: str, image_path: Path) -> dict:
         """Upload an image to Printify. Returns {"id": "...", ...}."""
-        image_b64 = base64.b64encode(image_path.read_bytes()).decode("ascii")
-        return self._request("POST", "/uploads/images.json", {
-            "file_name": file_name,
-            "contents": image_b64,
-        })
+        return self._request(
+            "POST", "/uploads/images.json",
+            body=Base64JSONBody(file_name, image_path),
+        )
 
     def create_product(self, product_data: dict) -> dict:
         """Create a product in the shop."""
@@ -172,6 +222,7 @@ class PrintifyAPI:
                 "variants": True,
                 "tags": True,
             },
+            limiter=self.publish_limiter,
         )
 
     def list_products(self, page: int = 1, limit: int = 50) -> dict:
@@ -260,43 +311,90 @@ def build_product_data(
 
 
 # ---------------------------------------------------------------------------
-# Upload single design
+# Pipeline
 # ---------------------------------------------------------------------------
 
-def upload_one_design(
-    api: PrintifyAPI,
-    folder: str,
-    png_path: Path,
-    metadata: dict,
-    price_override: int | None = None,
-    colors: list[str] | None = None,
-    sizes: list[str] | None = None,
-    publish: bool = False,
-) -> dict:
-    """Upload image, create product, optionally publish. Returns product dict."""
-    # Step 1: Upload image
-    print(f"  Uploading image: {png_path.name}")
-    image_result = api.upload_image(png_path.name, png_path)
-    image_id = image_result["id"]
-    print(f"  Image ID: {image_id}")
-
-    # Step 2: Create product
-    product_data = build_product_data(
-        load_config(), folder, image_id, metadata,
-        price_override=price_override, colors=colors, sizes=sizes,
-    )
-    print(f"  Creating product: {metadata['title']}")
-    product = api.create_product(product_data)
-    product_id = product["id"]
-    print(f"  Product ID: {product_id}")
-
-    # Step 3: Optionally publish
-    if publish:
-        print(f"  Publishing product...")
-        api.publish_product(product_id)
-        print(f"  Published!")
+class PrintifyPipeline:
+    """Three-stage upload pipeline: image upload -> product create -> publish.
+
+    Each stage has its own thread pool, so a design's product is created as
+    soon as its image ID arrives while later images are still uploading, and
+    publishes overlap with both. All stages share the client's rate limiter,
+    so throughput is bounded by the API quota rather than round-trip latency.
+    Results (key, product_id, error) are delivered on ``results`` for the
+    caller to record from a single thread. The caller keeps at most
+    ``capacity`` designs submitted and unreported, enough to keep every
+    stage busy without queueing the whole folder.
+    """
+
+    def __init__(
+        self,
+        api: PrintifyAPI,
+        folder: str,
+        workers: int = DEFAULT_WORKERS,
+        publish: bool = False,
+        price_override: int | None = None,
+        colors: list[str] | None = None,
+        sizes: list[str] | None = None,
+    ):
+        self.api = api
+        self.folder = folder
+        self.publish = publish
+        self.price_override = price_override
+        self.colors = colors
+        self.sizes = sizes
+        self.config = load_config()
+        self.results: queue.Queue = queue.Queue()
+        self.stop = threading.Event()
+        self.uploads = ThreadPoolExecutor(workers, thread_name_prefix="printify-upload")
+        self.creates = ThreadPoolExecutor(workers, thread_name_prefix="printify-create")
+        self.publishes = ThreadPoolExecutor(workers, thread_name_prefix="printify-publish") if publish else None
+        self.capacity = workers * (3 if publish else 2)
+
+    def submit(self, png_path: Path, metadata: dict, key: str) -> None:
+        self.uploads.submit(self._upload_image, png_path, metadata, key)
+
+    def shutdown(self) -> None:
+        """Wait for in-flight designs. Stages are drained in order, since
+        each one feeds the next."""
+        self.uploads.shutdown(wait=True)
+        self.creates.shutdown(wait=True)
+        if self.publishes:
+            self.publishes.shutdown(wait=True)
+
+    def _upload_image(self, png_path: Path, metadata: dict, key: str) -> None:
+        if self.stop.is_set():
+            self.results.put((key, None, "skipped"))
+            return
+        try:
+            image_id = self.api.upload_image(png_path.name, png_path)["id"]
+        except Exception as e:
+            self.results.put((key, None, str(e)))
+            return
+        self.creates.submit(self._create_product, metadata, key, image_id)
 
-    return product
+    def _create_product(self, metadata: dict, key: str, image_id: str) -> None:
+        try:
+            product_data = build_product_data(
+                self.config, self.folder, image_id, metadata,
+                price_override=self.price_override, colors=self.colors, sizes=self.sizes,
+            )
+            product_id = self.api.create_product(product_data)["id"]
+        except Exception as e:
+            self.results.put((key, None, str(e)))
+            return
+        if self.publishes:
+            self.publishes.submit(self._publish_product, key, product_id)
+        else:
+            self.results.put((key, product_id, None))
+
+    def _publish_product(self, key: str, product_id: str) -> None:
+        try:
+            self.api.publish_product(product_id)
+        except Exception as e:
+            self.results.put((key, product_id, f"created but publish failed: {e}"))
+            return
+        self.results.put((key, product_id, None))
 
 
 # ---------------------------------------------------------------------------
@@ -306,7 +404,7 @@ def upload_one_design(
 def run_printify_upload(args: argparse.Namespace) -> None:
     """Main Printify upload flow."""
     config = load_config()
-    api = PrintifyAPI(config["api_token"], config["shop_id"])
+    api = PrintifyAPI(config["api_token"], config["shop_id"], workers=args.workers)
 
     folder = args.folder
     if folder not in PRODUCT_CONFIG:
@@ -370,62 +468,90 @@ def run_printify_upload(args: argparse.Namespace) -> None:
         print("Dry run complete — no products created.")
         return
 
-    # Upload loop
+    # Upload pipeline
+    print(f"Workers: {args.workers} per stage\n")
+    pipeline = PrintifyPipeline(
+        api, folder,
+        workers=args.workers,
+        publish=args.publish,
+        price_override=price_override,
+        colors=colors, sizes=sizes,
+    )
     consecutive_failures = 0
     uploaded_count = 0
+    done = 0
     session_start = time.time()
 
-    for i, (png_path, meta, key) in enumerate(to_upload, 1):
-        print(f"\n[{i}/{len(to_upload)}] {key}")
-
+    def handle_result(block: bool) -> bool:
+        """Record one finished design. Returns False when none was ready."""
+        nonlocal consecutive_failures, uploaded_count, done
         try:
-            product = upload_one_design(
-                api, folder, png_path, meta,
-                price_override=price_override,
-                colors=colors, sizes=sizes,
-                publish=args.publish,
-            )
-
-            tracker[key] = {
+            key, product_id, error = pipeline.results.get(block=block)
+        except queue.Empty:
+            return False
+        done += 1
+        if error == "skipped":
+            return True
+
+        print(f"[{done}/{len(to_upload)}] {key}")
+        if error is None:
+            record_entry(tracker, TRACKER_FILE, key, {
                 "status": "success",
                 "timestamp": datetime.now(timezone.utc).isoformat(),
-                "product_id": product["id"],
+                "product_id": product_id,
                 "error": None,
-            }
-            save_tracker(tracker, TRACKER_FILE)
+            })
             consecutive_failures = 0
             uploaded_count += 1
-            print(f"  -> Success")
-
-        except Exception as e:
-            tracker[key] = {
+            print(f"  -> Success (product {product_id})")
+        else:
+            entry = {
                 "status": "failed",
                 "timestamp": datetime.now(timezone.utc).isoformat(),
-                "error": str(e),
+                "error": error,
             }
-            save_tracker(tracker, TRACKER_FILE)
+            if product_id:
+                entry["product_id"] = product_id
+            record_entry(tracker, TRACKER_FILE, key, entry)
             consecutive_failures += 1
-            print(f"  -> Failed: {e}")
+            print(f"  -> Failed: {error}")
 
         # Circuit breaker
-        if consecutive_failures >= CONSECUTIVE_FAILURE_LIMIT:
+        if consecutive_failures >= CONSECUTIVE_FAILURE_LIMIT and not pipeline.stop.is_set():
             print(f"\n=== {CONSECUTIVE_FAILURE_LIMIT} consecutive failures — stopping ===")
-            break
+            pipeline.stop.set()
 
         # Progress stats every 10 uploads
-        if uploaded_count > 0 and uploaded_count % 10 == 0:
+        if error is None and uploaded_count % 10 == 0:
             elapsed = time.time() - session_start
             rate = uploaded_count / (elapsed / 3600)
-            remaining = len(to_upload) - i
+            remaining = len(to_upload) - done
             if rate > 0:
                 eta_min = (remaining / rate) * 60
                 print(f"\n  --- Progress: {uploaded_count}/{len(to_upload)} | {rate:.1f}/hr | ~{eta_min:.0f} min remaining ---")
-
-        # Delay between uploads
-        if i < len(to_upload):
-            wait_time = jittered_delay(args.delay)
-            print(f"  Waiting {wait_time:.0f}s...")
-            time.sleep(wait_time)
+        return True
+
+    submitted = 0
+    try:
+        for png_path, meta, key in to_upload:
+            if pipeline.stop.is_set():
+                break
+            # Backpressure: wait for a design to finish before adding more
+            while submitted - done >= pipeline.capacity:
+                handle_result(block=True)
+            if pipeline.stop.is_set():
+                break
+            pipeline.submit(png_path, meta, key)
+            submitted += 1
+            while handle_result(block=False):
+                pass
+            if args.delay > 0:
+                time.sleep(jittered_delay(args.delay))
+        while done < submitted:
+            handle_result(block=True)
+    finally:
+        pipeline.stop.set()
+        pipeline.shutdown()
 
     # Summary
     elapsed = time.time() - session_start
@@ -458,6 +584,7 @@ Examples:
   python3 %(prog)s --folder sticker --retry-failed      # Retry failures
   python3 %(prog)s --folder tshirt --price 29.99        # Custom price
   python3 %(prog)s --folder tshirt --colors "Black,White,Navy"
+  python3 %(prog)s --folder poster --workers 8          # More designs in flight
   python3 %(prog)s --source-dir /path/to/designs --folder poster
 """,
     )
@@ -471,7 +598,12 @@ Examples:
     )
     parser.add_argument(
         "--delay", type=float, default=DEFAULT_DELAY,
-        help=f"Seconds between uploads (default: {DEFAULT_DELAY})",
+        help=f"Extra seconds between starting designs (default: {DEFAULT_DELAY}; "
+             "requests are already paced by the API rate limiter)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=DEFAULT_WORKERS,
+        help=f"Concurrent requests per pipeline stage (default: {DEFAULT_WORKERS})",
     )
     parser.add_argument(
         "--dry-run", action="store_true",
@@ -507,6 +639,8 @@ Examples:
     )
     args = parser.parse_args()
 
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
     if args.limit == 0:
         args.limit = None
 
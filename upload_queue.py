@@ -1,8 +1,18 @@
 #!/usr/bin/env python3
 """Randomized upload queue for all video types (promo, travel, stock).
 
-Scans all video directories, shuffles into one queue, and uploads one at a
-time to TikTok and/or Instagram. Tracks position so it resumes where it left off.
+Scans all video directories, shuffles into one queue, and uploads it to
+TikTok, Instagram and/or YouTube. The shuffled order (upload_queue.json) is
+written once per rebuild; each platform has its own cursor in the small
+upload_queue_state.json, so platforms progress independently and resume
+where they left off (see src/queue_store.py).
+
+Each platform is consumed by its own worker, in parallel. Items are claimed
+with a lease before uploading, so extra consumers (another process with the
+same --platform) never post the same video twice. API uploaders run inside
+this process (uploaders.py), so each video reuses the sessions and tokens
+warmed by the previous one; --subprocess starts a process per video instead.
+The TikTok browser uploader always gets its own process, with a timeout.
 
 Usage:
     python3 upload_queue.py --rebuild                     # Build/rebuild shuffled queue
@@ -10,21 +20,43 @@ Usage:
     python3 upload_queue.py --dry-run --limit 5           # Preview next 5
     python3 upload_queue.py --limit 1                     # Upload next 1 video
     python3 upload_queue.py --limit 1 --platform tiktok   # TikTok only
+    python3 upload_queue.py --limit 9 --platform all      # TikTok, Instagram and YouTube
+    python3 upload_queue.py --limit 1 --subprocess        # One uploader process per video
 """
 
 from __future__ import annotations
 
 import argparse
-import json
 import random
 import subprocess
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 
+import uploaders
+from src.queue_store import QueueStore, default_owner
+
 PROJECT_DIR = Path(__file__).parent
 QUEUE_FILE = PROJECT_DIR / "upload_queue.json"
+STATE_FILE = PROJECT_DIR / "upload_queue_state.json"
+
+# Uploader per platform (see uploaders.UPLOADERS); the video is picked with --only <stem>
+PLATFORM_UPLOADERS = {
+    "tiktok": "tiktok",
+    "instagram": "instagram_api",
+    "youtube": "youtube",
+}
+# Playwright uploaders: always a subprocess (each call launches its own
+# browser, so there is nothing to reuse, and it needs UPLOAD_TIMEOUT)
+BROWSER_UPLOADERS = {"tiktok"}
+PLATFORM_GROUPS = {
+    "both": ["tiktok", "instagram"],
+    "all": ["tiktok", "instagram", "youtube"],
+}
+UPLOAD_TIMEOUT = 600  # seconds; subprocess uploads only
 
 # Video directories to scan
 VIDEO_DIRS = {
@@ -56,7 +88,11 @@ def _classify_video(path: Path, video_type: str) -> dict:
     }
 
 
-def build_queue(*, seed: int = SHUFFLE_SEED) -> dict:
+def open_store() -> QueueStore:
+    return QueueStore(QUEUE_FILE, STATE_FILE)
+
+
+def build_queue(*, seed: int = SHUFFLE_SEED) -> QueueStore:
     """Scan all video dirs and build a shuffled queue."""
     videos = []
     for vtype, vdir in VIDEO_DIRS.items():
@@ -73,116 +109,95 @@ def build_queue(*, seed: int = SHUFFLE_SEED) -> dict:
     rng.shuffle(videos)
 
     queue = {
-        "version": 1,
+        "version": 2,
         "created": datetime.now(timezone.utc).isoformat(),
         "seed": seed,
-        "position": 0,
         "total": len(videos),
         "videos": videos,
     }
 
-    with open(QUEUE_FILE, "w") as f:
-        json.dump(queue, f, indent=2)
+    store = open_store()
+    store.write_order(queue)
+    return store
 
-    return queue
 
-
-def load_queue() -> dict:
-    """Load existing queue from disk."""
-    if not QUEUE_FILE.exists():
+def load_queue() -> QueueStore:
+    """Open the existing queue."""
+    store = open_store()
+    if not store.exists():
         print(f"No queue file found. Run with --rebuild first.")
         sys.exit(1)
-    with open(QUEUE_FILE) as f:
-        return json.load(f)
-
-
-def save_queue(queue: dict) -> None:
-    with open(QUEUE_FILE, "w") as f:
-        json.dump(queue, f, indent=2)
+    return store
 
 
-def show_status(queue: dict) -> None:
+def show_status(store: QueueStore, platforms: list[str]) -> None:
     """Display queue statistics."""
-    total = queue["total"]
-    pos = queue["position"]
-    remaining = total - pos
-
-    # Count by type
+    total = store.total
     by_type = {}
-    remaining_by_type = {}
-    for i, v in enumerate(queue["videos"]):
-        vtype = v["type"]
-        by_type[vtype] = by_type.get(vtype, 0) + 1
-        if i >= pos:
-            remaining_by_type[vtype] = remaining_by_type.get(vtype, 0) + 1
+    for v in store.videos:
+        by_type[v["type"]] = by_type.get(v["type"], 0) + 1
 
     print(f"\nUpload Queue Status")
     print(f"====================")
     print(f"Queue file:  {QUEUE_FILE.name}")
-    print(f"Created:     {queue['created'][:19]}")
+    print(f"Created:     {store.order['created'][:19]}")
     print(f"Total:       {total} videos")
-    print(f"Completed:   {pos}")
-    print(f"Remaining:   {remaining}")
-    print(f"Progress:    {pos}/{total} ({100 * pos / total:.0f}%)" if total > 0 else "")
-    print()
-    print(f"By type (total / remaining):")
-    for vtype in sorted(by_type.keys()):
-        t = by_type[vtype]
-        r = remaining_by_type.get(vtype, 0)
-        print(f"  {vtype:<8} {t:>3} total / {r:>3} remaining")
-
-    if remaining > 0:
-        next_v = queue["videos"][pos]
-        print(f"\nNext up: {next_v['filename']} ({next_v['type']}, {next_v['landmark']})")
-
-
-def show_dry_run(queue: dict, limit: int) -> None:
-    """Preview the next N videos in the queue."""
-    pos = queue["position"]
-    total = queue["total"]
-    remaining = total - pos
-
-    count = min(limit, remaining) if limit > 0 else remaining
-    print(f"\nNext {count} videos in queue (position {pos}/{total}):\n")
-
-    for i in range(count):
-        idx = pos + i
-        v = queue["videos"][idx]
+    print(f"By type:     " + ", ".join(f"{t} {n}" for t, n in sorted(by_type.items())))
+
+    print(f"\n{'Platform':<10} {'Done':>6} {'Left':>6} {'Progress':>9}  In flight / next up")
+    for platform in platforms:
+        p = store.progress(platform)
+        pct = f"{100 * p['done'] / total:.0f}%" if total else ""
+        if p["claimed"]:
+            note = f"{len(p['claimed'])} claimed (#{', #'.join(str(i + 1) for i in p['claimed'])})"
+        elif p["remaining"]:
+            note = store.videos[p["cursor"]]["filename"]
+        else:
+            note = "finished"
+        print(f"{platform:<10} {p['done']:>6} {p['remaining']:>6} {pct:>9}  {note}")
+
+
+def show_dry_run(store: QueueStore, limit: int, platform: str) -> None:
+    """Preview the next N videos in the queue for one platform."""
+    p = store.progress(platform)
+    total = store.total
+    pending = [i for i in range(p["cursor"], total) if i not in p["claimed"]]
+    count = min(limit, len(pending)) if limit > 0 else len(pending)
+    print(f"\nNext {count} videos for {platform} (position {p['cursor']}/{total}):\n")
+
+    for idx in pending[:count]:
+        v = store.videos[idx]
         print(f"  [{idx + 1}] {v['filename']}")
         print(f"       Type: {v['type']}, Landmark: {v['landmark']}")
         print(f"       Path: {v['path']}")
         print()
 
 
-def upload_video(video_entry: dict, platform: str) -> bool:
-    """Upload a single video to one platform. Returns True on success."""
+def upload_video(video_entry: dict, platform: str, in_process: bool = True) -> bool:
+    """Upload a single video to one platform. Returns True on success.
+
+    Runs an API uploader in this process (uploaders.run), so consecutive
+    videos reuse its sessions and tokens; browser uploaders, and any with
+    ``in_process=False``, get a subprocess.
+    """
     video_path = PROJECT_DIR / video_entry["path"]
     if not video_path.exists():
         print(f"  File not found: {video_path}")
         return False
 
-    source_dir = str(video_path.parent)
-
-    # Build the uploader command
-    if platform == "tiktok":
-        cmd = [
-            sys.executable, str(PROJECT_DIR / "upload_tiktok.py"),
-            "--source-dir", source_dir,
-            "--limit", "1",
-        ]
-    elif platform == "instagram":
-        cmd = [
-            sys.executable, str(PROJECT_DIR / "upload_instagram_api.py"),
-            "--source-dir", source_dir,
-            "--limit", "1",
-        ]
-    else:
+    if platform not in PLATFORM_UPLOADERS:
         print(f"  Unknown platform: {platform}")
         return False
 
-    print(f"  -> Uploading to {platform}...")
+    name = PLATFORM_UPLOADERS[platform]
+    options = {"source_dir": video_path.parent, "only": [video_path.stem], "limit": 1}
+
+    print(f"  [{platform}] -> Uploading {video_path.name}...")
+    if in_process and name not in BROWSER_UPLOADERS:
+        return uploaders.run(name, **options) == 0
+    cmd = uploaders.command(name, **options)
     try:
-        result = subprocess.run(cmd, cwd=str(PROJECT_DIR), timeout=600)
+        result = subprocess.run(cmd, cwd=str(PROJECT_DIR), timeout=UPLOAD_TIMEOUT)
         return result.returncode == 0
     except subprocess.TimeoutExpired:
         print(f"  -> {platform} upload timed out")
@@ -192,48 +207,72 @@ def upload_video(video_entry: dict, platform: str) -> bool:
         return False
 
 
-def run_uploads(queue: dict, *, limit: int = 1, platform: str = "both") -> None:
-    """Upload the next N videos from the queue."""
-    pos = queue["position"]
-    total = queue["total"]
-    remaining = total - pos
-
-    if remaining == 0:
+def consume(
+    store: QueueStore,
+    platform: str,
+    limit: int,
+    stop: threading.Event | None = None,
+    in_process: bool = True,
+) -> int:
+    """Claim and upload up to ``limit`` queue items for one platform."""
+    processed = 0
+    owner = default_owner()
+    while not limit or processed < limit:
+        if stop is not None and stop.is_set():
+            break
+        idx = store.claim(platform, owner)
+        if idx is None:
+            break
+        v = store.videos[idx]
+        print(f"[{platform}] [{idx + 1}/{store.total}] {v['filename']} ({v['type']}, {v['landmark']})")
+        try:
+            # In-process uploads have no timeout, so the lease must outlive them
+            with store.keep_alive(platform, idx, owner):
+                ok = upload_video(v, platform, in_process)
+        except BaseException:
+            store.release(platform, idx)  # leave it for the next run
+            raise
+        if not ok:
+            print(f"  [{platform}] Warning: upload may have failed")
+        # Advance regardless (tracker files handle individual retry)
+        store.complete(platform, idx, "done" if ok else "error")
+        processed += 1
+    return processed
+
+
+def run_uploads(
+    store: QueueStore, *, limit: int = 1, platform: str = "both", in_process: bool = True,
+) -> None:
+    """Upload the next N videos from the queue, one worker per platform."""
+    platforms = PLATFORM_GROUPS.get(platform, [platform])
+    pending = [p for p in platforms if store.progress(p)["remaining"]]
+
+    if not pending:
         print("Queue exhausted! All videos have been uploaded.")
         print("Run with --rebuild to reshuffle and start over.")
         return
 
-    count = min(limit, remaining) if limit > 0 else remaining
-    platforms = ["tiktok", "instagram"] if platform == "both" else [platform]
-
-    print(f"\nUploading {count} video(s) to {', '.join(platforms)}")
-    print(f"Queue position: {pos}/{total}\n")
-
-    uploaded = 0
-    for i in range(count):
-        idx = pos + i
-        v = queue["videos"][idx]
-        print(f"[{idx + 1}/{total}] {v['filename']} ({v['type']}, {v['landmark']})")
-
-        all_ok = True
-        for plat in platforms:
-            ok = upload_video(v, plat)
-            if not ok:
-                all_ok = False
-                print(f"  Warning: {plat} upload may have failed")
-
-        # Advance position regardless (tracker files handle individual retry)
-        queue["position"] = idx + 1
-        save_queue(queue)
-        uploaded += 1
-        print(f"  Queue advanced to position {idx + 1}")
-
-        if i < count - 1:
-            print()
-
-    print(f"\nSession complete: {uploaded} video(s) processed")
-    new_remaining = total - queue["position"]
-    print(f"Queue: {queue['position']}/{total} done, {new_remaining} remaining")
+    print(f"\nUploading up to {limit or 'all'} video(s) each to {', '.join(pending)}\n")
+
+    stop = threading.Event()
+    with ThreadPoolExecutor(max_workers=len(pending)) as pool:
+        futures = {p: pool.submit(consume, store, p, limit, stop, in_process) for p in pending}
+        try:
+            # Poll rather than block so Ctrl-C reaches the main thread
+            while not all(f.done() for f in futures.values()):
+                time.sleep(0.5)
+        except KeyboardInterrupt:
+            # Uploader subprocesses got the SIGINT; in-process ones are
+            # interrupted here. Workers claim nothing new
+            print("\n\nInterrupted — waiting for running uploads to exit...")
+            stop.set()
+            uploaders.interrupt()
+        counts = {p: f.result() for p, f in futures.items()}
+
+    print(f"\nSession complete: " + ", ".join(f"{p} {n}" for p, n in counts.items()))
+    for p in platforms:
+        prog = store.progress(p)
+        print(f"  {p:<10} {prog['done']}/{store.total} done, {prog['remaining']} remaining")
 
 
 def main() -> None:
@@ -244,33 +283,39 @@ def main() -> None:
     parser.add_argument("--rebuild", action="store_true", help="Build/rebuild shuffled queue")
     parser.add_argument("--status", action="store_true", help="Show queue statistics")
     parser.add_argument("--dry-run", action="store_true", help="Preview next videos without uploading")
-    parser.add_argument("--limit", type=int, default=1, help="Number of videos to upload (default: 1)")
+    parser.add_argument("--limit", type=int, default=1,
+                        help="Videos to upload per platform (default: 1, 0 = all)")
     parser.add_argument(
-        "--platform", choices=["tiktok", "instagram", "both"],
-        default="both", help="Platform to upload to (default: both)",
+        "--platform", choices=[*PLATFORM_UPLOADERS, *PLATFORM_GROUPS],
+        default="both", help="Platform to upload to (default: both = tiktok + instagram)",
     )
+    parser.add_argument("--subprocess", action="store_true",
+                        help=f"Start an uploader process per video (with a {UPLOAD_TIMEOUT}s "
+                             "timeout) instead of uploading in-process")
 
     args = parser.parse_args()
+    platforms = PLATFORM_GROUPS.get(args.platform, [args.platform])
 
     if args.rebuild:
-        queue = build_queue()
-        print(f"Queue built: {queue['total']} videos shuffled (seed={SHUFFLE_SEED})")
-        show_status(queue)
+        store = build_queue()
+        print(f"Queue built: {store.total} videos shuffled (seed={SHUFFLE_SEED})")
+        show_status(store, platforms)
         return
 
     if args.status:
-        queue = load_queue()
-        show_status(queue)
+        store = load_queue()
+        show_status(store, PLATFORM_GROUPS["all"])
         return
 
     if args.dry_run:
-        queue = load_queue()
-        show_dry_run(queue, args.limit)
+        store = load_queue()
+        for platform in platforms:
+            show_dry_run(store, args.limit, platform)
         return
 
     # Default: upload
-    queue = load_queue()
-    run_uploads(queue, limit=args.limit, platform=args.platform)
+    store = load_queue()
+    run_uploads(store, limit=args.limit, platform=args.platform, in_process=not args.subprocess)
 
 
 if __name__ == "__main__":
@@ -289,6 +289,12 @@ def _upload_via_input_intercept(page, png_path: Path) -> bool:
 
 def upload_single(page, png_path: Path, metadata: dict) -> None:
     """Upload one design to Society6."""
+    prepare_upload(page, png_path, metadata)
+    submit_upload(page, png_path, metadata)
+
+
+def prepare_upload(page, png_path: Path, metadata: dict) -> None:
+    """Open the upload page, attach the PNG and fill the form short of saving."""
     page.goto(UPLOAD_URL, wait_until="domcontentloaded", timeout=30000)
     time.sleep(3)
     wait_for_cloudflare(page)
@@ -521,6 +527,11 @@ def upload_single(page, png_path: Path, metadata: dict) -> None:
     except Exception:
         pass
 
+
+def submit_upload(page, png_path: Path, metadata: dict) -> None:
+    """Save a form filled by prepare_upload and verify Society6 accepted it."""
+    debug_dir = Path(__file__).parent
+
     # --- 3. Click "Save And Add Products" ---
     pre_url = page.url
     try:
@@ -612,9 +623,9 @@ def upload_single(page, png_path: Path, metadata: dict) -> None:
 # CLI
 # ---------------------------------------------------------------------------
 
-def main() -> None:
+def main(argv: list[str] | None = None) -> None:
     parser = build_arg_parser("Society6")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     if args.limit == 0:
         args.limit = None
@@ -626,6 +637,8 @@ def main() -> None:
         check_session_fn=check_session_valid,
         wait_for_login_fn=wait_for_login,
         upload_single_fn=upload_single,
+        prepare_fn=prepare_upload,
+        submit_fn=submit_upload,
     )
 
 
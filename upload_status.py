@@ -9,10 +9,12 @@ Usage:
 from __future__ import annotations
 
 import argparse
-import json
 from collections import Counter
 from pathlib import Path
 
+from src.metadata_store import get_store
+from upload_common import sync_ledger
+
 OUTPUT_DIR = Path(__file__).parent / "output"
 
 LANDMARK_DIRS = {
@@ -44,7 +46,6 @@ PLATFORMS = {
     "printify": {
         "tracker": Path(__file__).parent / "uploaded_printify.json",
         "type": "api",
-        "key_prefix": "printify:",
     },
 }
 
@@ -67,108 +68,50 @@ FOLDERS = ["tshirt", "sticker", "poster"]
 
 
 def count_designs() -> dict[str, int]:
-    """Count available designs per folder in default output."""
-    counts = {}
-    for folder in FOLDERS:
-        folder_path = OUTPUT_DIR / folder
-        if folder_path.is_dir():
-            counts[folder] = len(list(folder_path.glob("*.png")))
-        else:
-            counts[folder] = 0
-    return counts
+    """Count available designs (PNGs) per folder in default output."""
+    return {folder: _image_count(OUTPUT_DIR, folder) for folder in FOLDERS}
 
 
-def count_landmark_designs() -> dict[str, dict[str, int]]:
-    """Count landmark designs per phase per folder."""
-    counts = {}
-    for phase, base_dir in LANDMARK_DIRS.items():
-        counts[phase] = {}
-        for folder in FOLDERS:
-            folder_path = base_dir / folder
-            if folder_path.is_dir():
-                counts[phase][folder] = len(list(folder_path.glob("*.png")))
-            else:
-                counts[phase][folder] = 0
-    return counts
+def _image_count(root: Path, folder: str) -> int:
+    if not (root / folder).is_dir():
+        return 0
+    return get_store(root, [folder]).image_count(folder)
 
 
-def load_tracker(path: Path) -> dict:
-    if path.exists():
-        return json.loads(path.read_text())
-    return {}
+def count_landmark_designs() -> dict[str, dict[str, int]]:
+    """Count landmark designs per phase per folder."""
+    return {
+        phase: {folder: _image_count(base_dir, folder) for folder in FOLDERS}
+        for phase, base_dir in LANDMARK_DIRS.items()
+    }
 
 
-def split_tracker(tracker: dict, key_prefix: str = "") -> tuple[dict, dict]:
-    """Split tracker entries into POD (local) and landmark (ext:) groups."""
-    pod = {}
-    landmark = {}
-    for k, v in tracker.items():
-        raw_key = k[len(key_prefix):] if key_prefix and k.startswith(key_prefix) else k
-        if raw_key.startswith("ext:"):
-            landmark[k] = v
-        else:
-            pod[k] = v
-    return pod, landmark
-
-
-def folder_stats(entries: dict, folder: str, key_prefix: str = "") -> dict:
-    """Get success/failed counts for a folder within a set of tracker entries."""
-    folder_keys = []
-    for k in entries:
-        raw = k[len(key_prefix):] if key_prefix and k.startswith(key_prefix) else k
-        # ext: keys have format ext:output/{folder}/stem
-        if raw.startswith("ext:"):
-            parts = raw.split("/")
-            if len(parts) >= 3 and parts[1] == folder:
-                folder_keys.append(k)
-        elif raw.startswith(f"{folder}/"):
-            folder_keys.append(k)
-    success = sum(1 for k in folder_keys if entries[k].get("status") == "success")
-    failed = sum(1 for k in folder_keys if entries[k].get("status") == "failed")
-    return {"success": success, "failed": failed}
-
-
-def niche_counter(entries: dict) -> Counter:
-    """Count successful uploads by niche/landmark."""
-    by_niche = Counter()
-    for k, v in entries.items():
-        if v.get("status") == "success":
-            stem = k.split("/")[-1]
-            niche = stem.split("_")[0]
-            by_niche[niche] += 1
-    return by_niche
+def _folder_stats(counts: dict[str, Counter]) -> dict[str, dict]:
+    return {
+        f: {"success": counts.get(f, {}).get("success", 0), "failed": counts.get(f, {}).get("failed", 0)}
+        for f in FOLDERS
+    }
 
 
 def platform_stats(platform: str, info: dict) -> dict:
-    """Get upload stats for a platform."""
-    tracker = load_tracker(info["tracker"])
+    """Get upload stats for a platform (from the upload ledger)."""
+    ledger = sync_ledger(platform, info["tracker"], info.get("legacy_tracker"))
 
-    if not tracker and "legacy_tracker" in info:
-        tracker = load_tracker(info["legacy_tracker"])
-
-    key_prefix = info.get("key_prefix", "")
-    pod_entries, landmark_entries = split_tracker(tracker, key_prefix)
-
-    pod_success = sum(1 for v in pod_entries.values() if v.get("status") == "success")
-    pod_failed = sum(1 for v in pod_entries.values() if v.get("status") == "failed")
-    lm_success = sum(1 for v in landmark_entries.values() if v.get("status") == "success")
-    lm_failed = sum(1 for v in landmark_entries.values() if v.get("status") == "failed")
-
-    pod_by_folder = {f: folder_stats(pod_entries, f, key_prefix) for f in FOLDERS}
-    lm_by_folder = {f: folder_stats(landmark_entries, f, key_prefix) for f in FOLDERS}
+    pod = ledger.status_counts(platform, "pod")
+    lm = ledger.status_counts(platform, "ext")
 
     return {
-        "pod_success": pod_success,
-        "pod_failed": pod_failed,
-        "lm_success": lm_success,
-        "lm_failed": lm_failed,
-        "success": pod_success + lm_success,
-        "failed": pod_failed + lm_failed,
-        "total_tracked": len(tracker),
-        "pod_by_folder": pod_by_folder,
-        "lm_by_folder": lm_by_folder,
-        "pod_niches": niche_counter(pod_entries),
-        "lm_niches": niche_counter(landmark_entries),
+        "pod_success": pod["success"],
+        "pod_failed": pod["failed"],
+        "lm_success": lm["success"],
+        "lm_failed": lm["failed"],
+        "success": pod["success"] + lm["success"],
+        "failed": pod["failed"] + lm["failed"],
+        "total_tracked": ledger.total(platform),
+        "pod_by_folder": _folder_stats(ledger.folder_counts(platform, "pod")),
+        "lm_by_folder": _folder_stats(ledger.folder_counts(platform, "ext")),
+        "pod_niches": ledger.niche_counts(platform, "pod"),
+        "lm_niches": ledger.niche_counts(platform, "ext"),
         "type": info["type"],
     }
 
@@ -185,12 +128,14 @@ def count_videos() -> dict[str, int]:
     return counts
 
 
-def video_platform_stats(info: dict) -> dict:
+def video_platform_stats(platform: str, info: dict) -> dict:
     """Get upload stats for a video platform."""
-    tracker = load_tracker(info["tracker"])
-    success = sum(1 for v in tracker.values() if v.get("status") == "success")
-    failed = sum(1 for v in tracker.values() if v.get("status") == "failed")
-    return {"success": success, "failed": failed, "total_tracked": len(tracker), "type": info["type"]}
+    ledger = sync_ledger(platform, info["tracker"])
+    counts = ledger.status_counts(platform)
+    return {
+        "success": counts["success"], "failed": counts["failed"],
+        "total_tracked": ledger.total(platform), "type": info["type"],
+    }
 
 
 def print_dashboard(compact: bool = False) -> None:
@@ -284,7 +229,7 @@ def print_dashboard(compact: bool = False) -> None:
     print("-" * 66)
 
     for platform, info in VIDEO_PLATFORMS.items():
-        stats = video_platform_stats(info)
+        stats = video_platform_stats(platform, info)
         remaining = total_videos - stats["success"]
         pct = (stats["success"] / total_videos * 100) if total_videos else 0
         print(f"\n  {platform.upper()} [API]")
@@ -294,7 +239,7 @@ def print_dashboard(compact: bool = False) -> None:
     print("\n" + "-" * 66)
     grand_done = sum(platform_stats(p, i)["success"] for p, i in PLATFORMS.items())
     grand_total = (total_pod + total_lm) * len(PLATFORMS)
-    vid_done = sum(video_platform_stats(i)["success"] for i in VIDEO_PLATFORMS.values())
+    vid_done = sum(video_platform_stats(p, i)["success"] for p, i in VIDEO_PLATFORMS.items())
     vid_total = total_videos * len(VIDEO_PLATFORMS)
     all_done = grand_done + vid_done
     all_total = grand_total + vid_total
@@ -21,6 +21,7 @@ from pathlib import Path
 
 from PIL import Image
 
+from src.preflight import is_derivative
 from upload_common import (
     SessionExpiredError,
     CaptchaError,
@@ -201,25 +202,59 @@ def wait_for_login(page) -> None:
 
 def upload_single(page, png_path: Path, metadata: dict) -> None:
     """Upload one design to TeePublic."""
+    prepare_upload(page, png_path, metadata)
+    submit_upload(page, png_path, metadata)
+
+
+# Bordered copies made by prepare_upload, waiting for submit_upload
+_prepared_images: dict[Path, Path] = {}
+
+
+def prepare_upload(page, png_path: Path, metadata: dict) -> None:
+    """Clear pending bulk uploads and border the image (nothing is created yet).
+
+    Visiting quick_create makes a draft on TeePublic's side, so that waits
+    for submit_upload: a prepared design that is never submitted (failure
+    streak, --limit, Ctrl-C) doesn't leave an orphaned draft behind.
+    """
+    _clear_bulk_uploads(page)
+    if is_derivative(png_path):
+        # The teepublic preflight profile has already drawn the border
+        return
+    stale = _prepared_images.pop(png_path, None)
+    if stale:
+        stale.unlink(missing_ok=True)
     # Preprocess image: add corner pixels so TeePublic sees full canvas size
-    tmp_path = _prepare_image_for_teepublic(png_path)
+    _prepared_images[png_path] = _prepare_image_for_teepublic(png_path)
+
+
+def submit_upload(page, png_path: Path, metadata: dict) -> None:
+    """Create the design, upload the image, fill metadata and publish."""
+    if is_derivative(png_path):
+        upload_path = png_path
+    else:
+        upload_path = _prepared_images.pop(png_path, None) or _prepare_image_for_teepublic(png_path)
     try:
-        _do_upload(page, tmp_path, metadata)
+        _fill_edit_page(page, upload_path, metadata)
+        _publish(page)
     finally:
-        tmp_path.unlink(missing_ok=True)
+        if upload_path != png_path:
+            upload_path.unlink(missing_ok=True)
 
 
-def _do_upload(page, png_path: Path, metadata: dict) -> None:
-    """Upload one design via TeePublic's quick_create flow.
-
-    Flow: quick_create auto-creates a blank design and redirects to its edit
-    page where we upload the image, fill metadata, and publish.
-    """
-    # Clear any pending bulk uploads from previous sessions
+def _clear_bulk_uploads(page) -> None:
+    """Skip any pending bulk uploads left over from previous sessions."""
     page.goto("https://www.teepublic.com/designs/bulk_uploader/skip?id=all",
               wait_until="domcontentloaded", timeout=30000)
     time.sleep(3)
 
+
+def _fill_edit_page(page, png_path: Path, metadata: dict) -> None:
+    """Upload the image and fill metadata via TeePublic's quick_create flow.
+
+    Flow: quick_create auto-creates a blank design and redirects to its edit
+    page where we upload the image and fill metadata; _publish submits it.
+    """
     # --- Step 1: Navigate to quick_create → edit page ---
     page.goto(QUICK_CREATE_URL, wait_until="domcontentloaded", timeout=30000)
     time.sleep(5)
@@ -395,6 +430,9 @@ def _do_upload(page, png_path: Path, metadata: dict) -> None:
     # --- Set default colors for all product types ---
     _set_product_colors(page)
 
+
+def _publish(page) -> None:
+    """Submit the filled edit form with Publish and check the result."""
     # --- Step 4: Submit the form ---
     # Clear focus from tag input before submitting
     page.keyboard.press("Escape")
@@ -673,9 +711,9 @@ def _do_upload(page, png_path: Path, metadata: dict) -> None:
 # CLI
 # ---------------------------------------------------------------------------
 
-def main() -> None:
+def main(argv: list[str] | None = None) -> None:
     parser = build_arg_parser("TeePublic")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     if args.limit == 0:
         args.limit = None
@@ -687,6 +725,8 @@ def main() -> None:
         check_session_fn=check_session_valid,
         wait_for_login_fn=wait_for_login,
         upload_single_fn=upload_single,
+        prepare_fn=prepare_upload,
+        submit_fn=submit_upload,
     )
 
 
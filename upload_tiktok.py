@@ -363,6 +363,8 @@ def run_tiktok_upload(args: argparse.Namespace) -> None:
     source_dir = Path(args.source_dir) if args.source_dir else VIDEO_DIR
 
     videos = discover_videos(source_dir)
+    if args.only:
+        videos = [v for v in videos if v[0].stem in args.only]
     if not videos:
         print(f"No videos found in {source_dir}")
         return
@@ -478,7 +480,7 @@ def run_tiktok_upload(args: argparse.Namespace) -> None:
 # CLI
 # ---------------------------------------------------------------------------
 
-def main() -> None:
+def main(argv: list[str] | None = None) -> None:
     parser = argparse.ArgumentParser(
         description="Upload videos to TikTok via browser automation.",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -510,7 +512,11 @@ Examples:
         "--retry-failed", action="store_true",
         help="Only retry previously failed uploads",
     )
-    args = parser.parse_args()
+    parser.add_argument(
+        "--only", action="append", metavar="STEM",
+        help="Only consider this video (file stem); repeatable",
+    )
+    args = parser.parse_args(argv)
 
     if args.limit == 0:
         args.limit = None
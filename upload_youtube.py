@@ -16,6 +16,12 @@ Usage:
     python3 upload_youtube.py --upload --dry-run --limit 10   # Preview
     python3 upload_youtube.py --upload --retry-failed         # Retry failures
     python3 upload_youtube.py --status                        # Check stats
+    python3 upload_youtube.py --upload --chunk-size 32        # Bigger chunks, fewer round trips
+
+Videos go up with Google's resumable protocol. The session URI and the
+acknowledged byte offset are saved in the tracker after every chunk, so an
+interrupted upload picks up where it stopped on the next --upload run.
+Test against the local stand-in with --api-base (see mock_video_api.py).
 """
 
 from __future__ import annotations
@@ -23,18 +29,28 @@ from __future__ import annotations
 import argparse
 import json
 import os
-import random
 import sys
 import time
 from datetime import datetime, timezone
 from pathlib import Path
 
-import httplib2
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-from googleapiclient.http import MediaFileUpload
+import upload_common
+from src.credentials import (
+    CredentialManager,
+    NotAuthorized,
+    TokenSource,
+    get_manager,
+    refresh_grant,
+    register,
+)
+from src.http_client import PooledSession
+from src.resumable_upload import (
+    MiB,
+    GoogleResumableUpload,
+    SessionExpired,
+    UploadError,
+    UploadSession,
+)
 
 # ---------------------------------------------------------------------------
 # Constants
@@ -43,11 +59,13 @@ from googleapiclient.http import MediaFileUpload
 PROJECT_DIR = Path(__file__).parent
 CLIENT_SECRETS_FILE = PROJECT_DIR / "client_secrets.json"
 TOKEN_FILE = PROJECT_DIR / ".youtube_token.json"
-TRACKER_FILE = PROJECT_DIR / "uploaded_youtube.json"
+TRACKER_NAME = "uploaded_youtube.json"
+TRACKER_FILE = PROJECT_DIR / TRACKER_NAME  # under .mock_runs/ for --api-base runs
 
 SCOPES = ["https://www.googleapis.com/auth/youtube.upload"]
-API_SERVICE_NAME = "youtube"
-API_VERSION = "v3"
+YOUTUBE_API_BASE = "https://www.googleapis.com"
+API_BASE = YOUTUBE_API_BASE  # this run's --api-base
+UPLOAD_PATH = "/upload/youtube/v3/videos"
 
 # YouTube category IDs
 CATEGORY_ENTERTAINMENT = "24"
@@ -57,8 +75,13 @@ CATEGORY_EDUCATION = "27"
 # Shorts must be <= 60 seconds and vertical (9:16) ideally
 # But horizontal works too — YouTube auto-detects Shorts by duration + #Shorts tag
 
-UPLOAD_DELAY = 15  # seconds between uploads
-MAX_RETRIES = 3
+DEFAULT_UPLOAD_DELAY = 15  # seconds between uploads
+UPLOAD_DELAY = DEFAULT_UPLOAD_DELAY  # this run's --delay
+CHUNK_SIZE = 10 * MiB  # rounded down to a multiple of 256 KiB
+
+# One pooled session per process, so in-process runs (uploaders.run) reuse
+# its connections
+SESSION = PooledSession("YouTube")
 
 from video_captions import (
     extract_video_info,
@@ -80,6 +103,9 @@ def run_auth_flow() -> None:
         print(f"  3. Download JSON and save as {CLIENT_SECRETS_FILE}")
         return
 
+    # Only the one-time authorization needs the Google client libraries
+    from google_auth_oauthlib.flow import InstalledAppFlow
+
     flow = InstalledAppFlow.from_client_secrets_file(
         str(CLIENT_SECRETS_FILE), SCOPES
     )
@@ -98,35 +124,89 @@ def run_auth_flow() -> None:
     with open(TOKEN_FILE, "w") as f:
         json.dump(token_data, f, indent=2)
 
+    get_manager().invalidate("youtube")
     print(f"\nAuthorization successful! Token saved to {TOKEN_FILE.name}")
 
 
-def get_youtube_service():
-    """Build authenticated YouTube API service."""
+ACCESS_TOKEN_LIFETIME = 3600  # Google access tokens last an hour
+
+
+def _load_token() -> dict | None:
     if not TOKEN_FILE.exists():
+        return None
+    with open(TOKEN_FILE) as f:
+        return json.load(f)
+
+
+def _refresh_token(token_data: dict) -> dict:
+    """New access token from the stored refresh token (saved to TOKEN_FILE)."""
+    resp = refresh_grant(
+        token_data["token_uri"], token_data["refresh_token"],
+        token_data["client_id"], token_data["client_secret"],
+    )
+    token_data = {
+        **token_data,
+        "token": resp["access_token"],
+        "expires_at": resp["obtained_at"] + resp.get("expires_in", ACCESS_TOKEN_LIFETIME),
+    }
+    with open(TOKEN_FILE, "w") as f:
+        json.dump(token_data, f, indent=2)
+    return token_data
+
+
+def _token_expires_at(token_data: dict) -> float:
+    if "expires_at" in token_data:
+        return token_data["expires_at"]
+    saved_at = token_data.get("saved_at")  # written by --auth
+    if not saved_at:
+        return 0.0
+    return datetime.fromisoformat(saved_at).timestamp() + ACCESS_TOKEN_LIFETIME
+
+
+register("youtube", TokenSource(
+    load=_load_token,
+    refresh=_refresh_token,
+    expires_at=_token_expires_at,
+    access_token=lambda token_data: token_data["token"],
+))
+
+
+def get_credentials() -> CredentialManager:
+    """The shared credential cache, once the stored OAuth token has loaded."""
+    manager = get_manager()
+    try:
+        manager.record("youtube")
+    except NotAuthorized:
         print("No token found. Run: python3 upload_youtube.py --auth")
         sys.exit(1)
+    return manager
 
-    with open(TOKEN_FILE) as f:
-        token_data = json.load(f)
-
-    credentials = Credentials(
-        token=token_data["token"],
-        refresh_token=token_data["refresh_token"],
-        token_uri=token_data["token_uri"],
-        client_id=token_data["client_id"],
-        client_secret=token_data["client_secret"],
-    )
 
-    return build(API_SERVICE_NAME, API_VERSION, credentials=credentials)
+def auth_headers(credentials: CredentialManager | None) -> dict:
+    """Bearer header; the cache refreshes the access token before it expires."""
+    if credentials is None:  # --api-base stand-in
+        return {"Authorization": "Bearer mock-token"}
+    return {"Authorization": f"Bearer {credentials.token('youtube')}"}
 
 
 # ---------------------------------------------------------------------------
 # Upload
 # ---------------------------------------------------------------------------
 
-def upload_single(youtube, video_path: Path, metadata: dict) -> str:
-    """Upload a single video to YouTube. Returns video ID."""
+def upload_single(
+    http: PooledSession,
+    credentials: CredentialManager | None,
+    video_path: Path,
+    metadata: dict,
+    session: UploadSession | None = None,
+    on_progress=None,
+    chunk_size: int = CHUNK_SIZE,
+) -> str:
+    """Upload a single video to YouTube. Returns video ID.
+
+    Continues ``session`` (a saved resumable session) when given; if the
+    server has dropped it, a new session starts from byte zero.
+    """
     body = {
         "snippet": {
             "title": metadata["title"],
@@ -139,42 +219,28 @@ def upload_single(youtube, video_path: Path, metadata: dict) -> str:
             "selfDeclaredMadeForKids": False,
         },
     }
-
-    media = MediaFileUpload(
-        str(video_path),
-        mimetype="video/mp4",
-        resumable=True,
-        chunksize=1024 * 1024 * 10,  # 10MB chunks
-    )
-
-    request = youtube.videos().insert(
-        part="snippet,status",
-        body=body,
-        media_body=media,
-    )
-
-    # Resumable upload with retry
-    response = None
-    retry = 0
-    while response is None:
+    init_url = f"{API_BASE}{UPLOAD_PATH}?uploadType=resumable&part=snippet,status"
+
+    for _ in range(2):
+        if session is None:
+            session = GoogleResumableUpload.initiate(
+                http, init_url, video_path, body, chunk_size, headers=auth_headers(credentials),
+            )
+            if on_progress:
+                on_progress(session)
+        upload = GoogleResumableUpload(
+            http, video_path, session, on_progress, headers=auth_headers(credentials),
+        )
         try:
-            status, response = request.next_chunk()
-            if status:
-                pct = int(status.progress() * 100)
-                print(f"  Uploading... {pct}%")
-        except HttpError as e:
-            if e.resp.status in [500, 502, 503, 504]:
-                retry += 1
-                if retry > MAX_RETRIES:
-                    raise
-                wait = random.uniform(1, 2 ** retry)
-                print(f"  Retrying in {wait:.0f}s (attempt {retry}/{MAX_RETRIES})")
-                time.sleep(wait)
-            else:
-                raise
-
-    video_id = response["id"]
-    return video_id
+            if session.offset:
+                # Ask the server what it actually holds before sending more
+                if upload.query_offset():
+                    return upload.result["id"]
+            return upload.run()["id"]
+        except SessionExpired:
+            print("  Upload session expired — starting over")
+            session = None
+    raise UploadError(410, "Upload session expired twice")
 
 
 # ---------------------------------------------------------------------------
@@ -182,27 +248,22 @@ def upload_single(youtube, video_path: Path, metadata: dict) -> str:
 # ---------------------------------------------------------------------------
 
 def load_tracker() -> dict:
-    if TRACKER_FILE.exists():
-        with open(TRACKER_FILE) as f:
-            return json.load(f)
-    return {}
-
+    return upload_common.load_tracker(TRACKER_FILE)
 
-def save_tracker(tracker: dict) -> None:
-    with open(TRACKER_FILE, "w") as f:
-        json.dump(tracker, f, indent=2)
 
-
-def record(tracker: dict, key: str, status: str, video_id: str = "", error: str = "") -> None:
-    tracker[key] = {
+def record(tracker: dict, key: str, status: str, video_id: str = "", error: str = "",
+           session: UploadSession | None = None) -> None:
+    entry = {
         "status": status,
         "uploaded_at": datetime.now(timezone.utc).isoformat(),
     }
     if video_id:
-        tracker[key]["video_id"] = video_id
+        entry["video_id"] = video_id
     if error:
-        tracker[key]["error"] = error
-    save_tracker(tracker)
+        entry["error"] = error
+    if session:
+        entry["upload_session"] = session.to_dict()
+    upload_common.record_entry(tracker, TRACKER_FILE, key, entry)
 
 
 # ---------------------------------------------------------------------------
@@ -227,7 +288,8 @@ def discover_videos(source_dirs: list[Path]) -> list[tuple[Path, str, str]]:
 
 def run_upload(args: argparse.Namespace) -> None:
     """Main upload flow."""
-    youtube = get_youtube_service()
+    credentials = None if args.api_base else get_credentials()
+    http = SESSION
 
     source_dirs = [
         PROJECT_DIR / "output" / "videos_music",
@@ -238,6 +300,8 @@ def run_upload(args: argparse.Namespace) -> None:
         source_dirs = [Path(args.source_dir)]
 
     all_videos = discover_videos(source_dirs)
+    if args.only:
+        all_videos = [v for v in all_videos if v[0].stem in args.only]
     print(f"Found {len(all_videos)} total videos\n")
 
     tracker = load_tracker()
@@ -247,7 +311,9 @@ def run_upload(args: argparse.Namespace) -> None:
         entry = tracker.get(key, {})
         status = entry.get("status")
 
-        if args.retry_failed and status == "failed":
+        if status == "uploading":
+            to_upload.append((video_path, landmark_id, video_type, key))
+        elif args.retry_failed and status == "failed":
             to_upload.append((video_path, landmark_id, video_type, key))
         elif status == "success":
             continue
@@ -266,7 +332,8 @@ def run_upload(args: argparse.Namespace) -> None:
     if args.dry_run:
         for i, (vp, lid, vt, key) in enumerate(to_upload, 1):
             meta = build_youtube_metadata(lid, video_type=vt)
-            print(f"  [{i}] {key}")
+            resume = UploadSession.from_entry(tracker.get(key), vp)
+            print(f"  [{i}] {key}" + (f"  (resume at {resume.progress:.0%})" if resume else ""))
             print(f"       Title: {meta['title']}")
             print(f"       Tags: {', '.join(meta['tags'][:8])}...")
             print()
@@ -280,21 +347,32 @@ def run_upload(args: argparse.Namespace) -> None:
         print(f"[{i}/{len(to_upload)}] {video_path.name} ({video_type})")
         print(f"  Title: {metadata['title']}")
 
+        def save_progress(session: UploadSession, key: str = key) -> None:
+            record(tracker, key, "uploading", session=session)
+
         try:
-            video_id = upload_single(youtube, video_path, metadata)
+            video_id = upload_single(
+                http, credentials, video_path, metadata,
+                session=UploadSession.from_entry(tracker.get(key), video_path),
+                on_progress=save_progress,
+                chunk_size=args.chunk_size * MiB,
+            )
             record(tracker, key, "success", video_id=video_id)
             uploaded += 1
             print(f"  -> Success! https://youtube.com/shorts/{video_id}")
-        except HttpError as e:
+        except UploadError as e:
             error_msg = str(e)
             record(tracker, key, "failed", error=error_msg)
             failed += 1
             print(f"  -> Failed: {error_msg[:100]}")
 
             # Check for quota exceeded
-            if e.resp.status == 403 and "quotaExceeded" in error_msg:
+            if e.status == 403 and "quotaExceeded" in error_msg:
                 print(f"\n=== YouTube daily quota exceeded — stopping ===")
                 break
+        except (KeyboardInterrupt, SystemExit):
+            print(f"\n  Interrupted — {key} resumes from its last chunk on the next run")
+            raise
         except Exception as e:
             record(tracker, key, "failed", error=str(e))
             failed += 1
@@ -320,10 +398,13 @@ def show_status() -> None:
     yt_entries = {k: v for k, v in tracker.items() if k.startswith("youtube/")}
     success = sum(1 for v in yt_entries.values() if v.get("status") == "success")
     failed = sum(1 for v in yt_entries.values() if v.get("status") == "failed")
+    partial = sum(1 for v in yt_entries.values() if v.get("status") == "uploading")
     print(f"\nYouTube upload stats:")
     print(f"  Total tracked: {len(yt_entries)}")
     print(f"  Success: {success}")
     print(f"  Failed: {failed}")
+    if partial:
+        print(f"  Interrupted (will resume): {partial}")
 
     if TOKEN_FILE.exists():
         with open(TOKEN_FILE) as f:
@@ -337,8 +418,8 @@ def show_status() -> None:
 # CLI
 # ---------------------------------------------------------------------------
 
-def main() -> None:
-    global UPLOAD_DELAY
+def main(argv: list[str] | None = None) -> None:
+    global UPLOAD_DELAY, API_BASE, TRACKER_FILE
 
     parser = argparse.ArgumentParser(
         description="YouTube Shorts uploader via Data API v3",
@@ -349,16 +430,33 @@ def main() -> None:
     parser.add_argument("--status", action="store_true", help="Show upload stats")
     parser.add_argument("--source-dir", type=str, help="Video source directory")
     parser.add_argument("--limit", type=int, default=0, help="Max videos to upload")
-    parser.add_argument("--delay", type=float, default=UPLOAD_DELAY, help="Seconds between uploads")
+    parser.add_argument("--delay", type=float, default=DEFAULT_UPLOAD_DELAY,
+                        help=f"Seconds between uploads (default: {DEFAULT_UPLOAD_DELAY})")
     parser.add_argument("--dry-run", action="store_true", help="Preview without uploading")
     parser.add_argument("--retry-failed", action="store_true", help="Retry failed uploads")
-
-    args = parser.parse_args()
+    parser.add_argument("--only", action="append", metavar="STEM",
+                        help="Only consider this video (file stem); repeatable")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE // MiB, metavar="MB",
+                        help=f"Upload chunk size in MB (default: {CHUNK_SIZE // MiB})")
+    parser.add_argument("--api-base", metavar="URL",
+                        help="Upload to a local mock_video_api.py server instead of YouTube")
+
+    args = parser.parse_args(argv)
+
+    # Set on every run: in-process runs (uploaders.run) share this module,
+    # so an earlier run's --api-base or --delay must not carry over
+    API_BASE = (args.api_base or YOUTUBE_API_BASE).rstrip("/")
+    TRACKER_FILE = PROJECT_DIR / TRACKER_NAME
+    UPLOAD_DELAY = args.delay
+    if args.api_base:
+        # Keep stand-in uploads out of the real tracker and ledger
+        upload_common.MOCK_RUN_DIR.mkdir(exist_ok=True)
+        TRACKER_FILE = upload_common.MOCK_RUN_DIR / TRACKER_NAME
+        print(f"API base: {API_BASE} (tracker: {TRACKER_FILE})")
 
     if args.auth:
         run_auth_flow()
     elif args.upload:
-        UPLOAD_DELAY = args.delay
         run_upload(args)
     elif args.status:
         show_status()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""Run the platform uploaders in-process.
+
+Every uploader script exposes ``main(argv)``. ``run(name, ...)`` builds the
+same arguments batch_upload.py and upload_queue.py used to pass on a
+``python3 upload_<platform>.py ...`` command line and calls that instead of
+starting a new interpreter. Modules are imported once per process, so a run
+skips the interpreter start-up and imports and reuses what earlier runs
+warmed: the uploaders' pooled HTTP sessions and cached credentials, and the
+one upload ledger connection (src.upload_ledger.get_ledger).
+
+A run can send its output to a log file (``log=``). Output is routed by
+context (a ContextVar), so parallel lanes each write to their own log while
+the rest of the process prints as usual; asyncio tasks and
+``asyncio.to_thread`` calls inside the uploader follow their run, threads it
+starts directly print to the terminal.
+
+Usage:
+    import uploaders
+    status = uploaders.run("etsy", folder="tshirt", limit=10, shuffle=True)
+    status = uploaders.run("youtube", source_dir="output/videos", only=["clip_01"], limit=1)
+"""
+
+from __future__ import annotations
+
+import ctypes
+import importlib
+import sys
+import threading
+import traceback
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from types import ModuleType
+from typing import TextIO
+
+PROJECT_DIR = Path(__file__).parent
+
+# Uploader name -> (module, arguments that select its upload mode)
+UPLOADERS = {
+    "redbubble": ("upload", []),
+    "teepublic": ("upload_teepublic", []),
+    "society6": ("upload_society6", []),
+    "pinterest": ("upload_pinterest", []),
+    "etsy": ("upload_etsy", []),
+    "tiktok": ("upload_tiktok", []),
+    "tiktok_api": ("tiktok_api", ["--upload"]),
+    "instagram": ("upload_instagram", []),
+    "instagram_api": ("upload_instagram_api", []),
+    "youtube": ("upload_youtube", ["--upload"]),
+}
+
+_lock = threading.Lock()
+_running: dict[int, str] = {}  # thread ident -> uploader name
+_output: ContextVar[TextIO | None] = ContextVar("uploader_output", default=None)
+
+
+# ---------------------------------------------------------------------------
+# Arguments
+# ---------------------------------------------------------------------------
+
+def build_argv(
+    name: str,
+    folder: str | None = None,
+    limit: int | None = None,
+    *,
+    source_dir: str | Path | None = None,
+    only: Iterable[str] = (),
+    shuffle: bool = False,
+    retry_failed: bool = False,
+    dry_run: bool = False,
+    daily_limit: int | None = None,
+    extra: Iterable[str] = (),
+) -> list[str]:
+    """Command-line arguments for an uploader (without the script path)."""
+    _, argv = UPLOADERS[name]
+    argv = list(argv)
+    if source_dir:
+        argv += ["--source-dir", str(source_dir)]
+    if folder:
+        argv += ["--folder", folder]
+    if shuffle:
+        argv.append("--shuffle")
+    if limit:
+        argv += ["--limit", str(limit)]
+    for stem in only:
+        argv += ["--only", stem]
+    if retry_failed:
+        argv.append("--retry-failed")
+    if dry_run:
+        argv.append("--dry-run")
+    if daily_limit:
+        argv += ["--daily-limit", str(daily_limit)]
+    return argv + list(extra)
+
+
+def command(name: str, *args, **kwargs) -> list[str]:
+    """The equivalent subprocess command (same arguments as ``build_argv``)."""
+    module, _ = UPLOADERS[name]
+    return [sys.executable, str(PROJECT_DIR / f"{module}.py"), *build_argv(name, *args, **kwargs)]
+
+
+def load(name: str) -> ModuleType:
+    """Import an uploader module (once per process)."""
+    module, _ = UPLOADERS[name]
+    return importlib.import_module(module)
+
+
+# ---------------------------------------------------------------------------
+# Output routing
+# ---------------------------------------------------------------------------
+
+class _RoutedOutput:
+    """sys.stdout/sys.stderr stand-in that writes to the current run's log, if any."""
+
+    def __init__(self, default: TextIO):
+        self.default = default
+
+    @property
+    def target(self) -> TextIO:
+        return _output.get() or self.default
+
+    def write(self, text: str) -> int:
+        return self.target.write(text)
+
+    def flush(self) -> None:
+        self.target.flush()
+
+    def __getattr__(self, name: str):
+        return getattr(self.target, name)
+
+
+def _install() -> None:
+    with _lock:
+        if not isinstance(sys.stdout, _RoutedOutput):
+            sys.stdout = _RoutedOutput(sys.stdout)
+        if not isinstance(sys.stderr, _RoutedOutput):
+            sys.stderr = _RoutedOutput(sys.stderr)
+
+
+@contextmanager
+def output_to(stream: TextIO | None) -> Iterator[None]:
+    """Send stdout and stderr in this context to ``stream`` (None: leave as is)."""
+    if stream is None:
+        yield
+        return
+    _install()
+    token = _output.set(stream)
+    try:
+        yield
+    finally:
+        stream.flush()
+        _output.reset(token)
+
+
+# ---------------------------------------------------------------------------
+# Run
+# ---------------------------------------------------------------------------
+
+def _exit_status(code) -> int:
+    """What the interpreter would exit with for SystemExit(code)."""
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+def run(
+    name: str,
+    folder: str | None = None,
+    limit: int | None = None,
+    *,
+    log: TextIO | None = None,
+    **options,
+) -> int:
+    """Run an uploader in this process. Returns its exit status (0 = ok).
+
+    ``options`` are the keyword arguments of ``build_argv``. A SystemExit
+    from the uploader becomes its status; any other exception is printed
+    and returns 1. An ``interrupt()`` returns 130, as Ctrl-C would.
+    """
+    argv = build_argv(name, folder, limit, **options)
+    module = load(name)
+    ident = threading.get_ident()
+    with output_to(log):
+        with _lock:
+            _running[ident] = name
+        try:
+            module.main(argv)
+        except SystemExit as e:
+            return _exit_status(e.code)
+        except KeyboardInterrupt:
+            print("\n  Interrupted.")
+            return 130
+        except Exception:
+            traceback.print_exc()
+            return 1
+        finally:
+            with _lock:
+                _running.pop(ident, None)
+    return 0
+
+
+def interrupt() -> int:
+    """Raise KeyboardInterrupt in every thread inside ``run()``; returns how many.
+
+    This is what Ctrl-C did to uploader subprocesses. The exception arrives
+    at the uploader's next Python instruction, so a step in the middle of a
+    ``time.sleep`` stops when the sleep ends.
+    """
+    with _lock:
+        for ident in _running:
+            ctypes.pythonapi.PyThreadState_SetAsyncExc(
+                ctypes.c_ulong(ident), ctypes.py_object(KeyboardInterrupt),
+            )
+        return len(_running)